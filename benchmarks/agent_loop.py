@@ -0,0 +1,414 @@
+# Copyright (c) Nex-AGI. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""End-to-end benchmark of the agent loop against the local mock LLM server.
+
+Runs real agents (SDK clients, HTTP, parsing, hooks, tool and sub-agent
+execution) against :mod:`mock_llm_server` in a set of scenarios:
+
+- ``long_history``: tool turns on top of a long pre-existing conversation
+- ``parallel_tools``: many parallel tool calls per turn
+- ``subagent_tree``: every agent delegates to all of its sub-agents, several levels deep
+- ``batch``: a ``<use_batch_agent>`` block over a JSONL file
+- ``streaming``: tool turns with streamed responses (OpenAI chat format)
+- ``anthropic_streaming``: the same through the Anthropic messages format
+
+For each scenario it reports model iterations per second, the mean time per
+iteration spent outside model calls, sub-agents and batches (framework overhead),
+mean per-phase times from :class:`ProfilingMiddleware` and the memory still
+allocated after the runs (``tracemalloc``, measured in a separate pass).
+Timings are measured ``--repeats`` times (``--runs`` agent runs each) and the
+median is reported, together with the run-to-run noise: the median absolute
+deviation relative to the median.
+
+With ``--baseline`` the results are compared to a stored run: a scenario
+regresses when its median iterations per second drop, or its median overhead
+or memory growth rise, by more than ``--tolerance`` plus the larger noise of
+the two measurements; the script then exits with status 1. Baselines are
+machine-specific, record one with ``--update-baseline`` on the machine that
+checks against it.
+
+Usage::
+
+    python benchmarks/agent_loop.py --baseline benchmarks/baseline.json
+    python benchmarks/agent_loop.py --scenarios batch streaming --latency 0.05
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import logging
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from mock_llm_server import MockBehavior, MockLLMServer  # noqa: E402
+
+from nexau import create_agent  # noqa: E402
+from nexau.archs.llm.llm_config import LLMConfig  # noqa: E402
+from nexau.archs.main_sub.agent import Agent  # noqa: E402
+from nexau.archs.main_sub.execution.profiling import ProfilingMiddleware  # noqa: E402
+from nexau.archs.main_sub.utils.token_counter import TokenCounter  # noqa: E402
+from nexau.archs.tool.tool import Tool  # noqa: E402
+
+REPORTED_PHASES = ("model_call", "network", "parse_response", "execute_calls", "format_results", "token_count")
+
+
+@dataclass
+class Scenario:
+    """A benchmark scenario: mock behavior plus the agent it drives."""
+
+    name: str
+    behavior: MockBehavior
+    build: Callable[[LLMConfig, ProfilingMiddleware], Agent]
+    message: str = "Run the benchmark task."
+    history: list[dict[str, Any]] = field(default_factory=list)
+    api_type: str = "openai_chat_completion"
+    stream: bool = False
+
+
+def lookup_tool() -> Tool:
+    schema = {
+        "type": "object",
+        "properties": {"query": {"type": "string"}, "limit": {"type": "integer"}},
+        "required": ["query", "limit"],
+    }
+
+    def lookup(query: str, limit: int) -> dict[str, Any]:
+        return {"query": query, "results": [f"{query}-{i}" for i in range(3)], "limit": limit}
+
+    return Tool(name="lookup", description="Look up a query.", input_schema=schema, implementation=lookup)
+
+
+def agent_factory(
+    name: str,
+    llm_config: LLMConfig,
+    profiler: ProfilingMiddleware,
+    *,
+    tools: bool = True,
+    sub_agents: list[tuple[str, Callable[[], Agent]]] | None = None,
+    max_iterations: int = 50,
+) -> Callable[[], Agent]:
+    def build() -> Agent:
+        return create_agent(
+            name=name,
+            system_prompt=f"You are the {name} benchmark agent.",
+            llm_config=llm_config,
+            tools=[lookup_tool()] if tools else [],
+            sub_agents=sub_agents,
+            middlewares=[profiler],
+            tool_call_mode="openai",
+            max_iterations=max_iterations,
+            max_running_subagents=8,
+            retry_attempts=1,
+            # Keeps runs offline (tiktoken may download its encoding)
+            token_counter=TokenCounter(strategy="fallback").count_tokens,
+        )
+
+    return build
+
+
+def tree_factory(llm_config: LLMConfig, profiler: ProfilingMiddleware, depth: int, fanout: int, level: int = 0) -> Callable[[], Agent]:
+    """Agent whose sub-agents form a complete tree of the given depth and fanout."""
+    children = []
+    if level < depth:
+        child = tree_factory(llm_config, profiler, depth, fanout, level + 1)
+        children = [(f"level{level + 1}_{index}", child) for index in range(fanout)]
+    return agent_factory("root" if level == 0 else f"level{level}", llm_config, profiler, tools=False, sub_agents=children or None)
+
+
+def long_history(size: int) -> list[dict[str, Any]]:
+    history: list[dict[str, Any]] = []
+    for index in range(size):
+        history.append({"role": "user", "content": f"Question {index}: " + "lorem ipsum " * 20})
+        history.append({"role": "assistant", "content": f"Answer {index}: " + "dolor sit amet " * 20})
+    return history
+
+
+def build_scenarios(args: argparse.Namespace, workdir: Path) -> dict[str, Scenario]:
+    batch_file = workdir / "batch.jsonl"
+    batch_file.write_text("".join(json.dumps({"text": f"record {i}"}) + "\n" for i in range(args.batch_size)), encoding="utf-8")
+    pacing = {"latency": args.latency, "tokens_per_second": args.tokens_per_second}
+
+    def single(llm_config: LLMConfig, profiler: ProfilingMiddleware) -> Agent:
+        return agent_factory("main", llm_config, profiler)()
+
+    def batch(llm_config: LLMConfig, profiler: ProfilingMiddleware) -> Agent:
+        worker = agent_factory("worker", llm_config, profiler, tools=False)
+        return agent_factory("main", llm_config, profiler, tools=False, sub_agents=[("worker", worker)])()
+
+    def tree(llm_config: LLMConfig, profiler: ProfilingMiddleware) -> Agent:
+        return tree_factory(llm_config, profiler, args.tree_depth, args.tree_fanout)()
+
+    return {
+        "long_history": Scenario(
+            "long_history",
+            MockBehavior(turns=args.turns, tool_calls_per_turn=1, **pacing),
+            single,
+            history=long_history(args.history_size),
+        ),
+        "parallel_tools": Scenario(
+            "parallel_tools",
+            MockBehavior(turns=args.turns, tool_calls_per_turn=args.parallel_tools, **pacing),
+            single,
+        ),
+        "subagent_tree": Scenario("subagent_tree", MockBehavior(delegate="fanout", **pacing), tree),
+        "batch": Scenario("batch", MockBehavior(delegate="batch", batch_file=str(batch_file), **pacing), batch),
+        "streaming": Scenario(
+            "streaming",
+            MockBehavior(turns=args.turns, tool_calls_per_turn=4, text_tokens=200, **pacing),
+            single,
+            stream=True,
+        ),
+        "anthropic_streaming": Scenario(
+            "anthropic_streaming",
+            MockBehavior(turns=args.turns, tool_calls_per_turn=4, text_tokens=200, **pacing),
+            single,
+            api_type="anthropic_chat_completion",
+            stream=True,
+        ),
+    }
+
+
+def llm_config_for(server: MockLLMServer, scenario: Scenario) -> LLMConfig:
+    anthropic = scenario.api_type == "anthropic_chat_completion"
+    return LLMConfig(
+        model="mock-model",
+        base_url=server.url if anthropic else f"{server.url}/v1",
+        api_key="mock-key",
+        max_tokens=1024,
+        max_retries=0,
+        stream=scenario.stream,
+        api_type=scenario.api_type,
+    )
+
+
+def run_once(server: MockLLMServer, scenario: Scenario, profiler: ProfilingMiddleware) -> tuple[float, int]:
+    """Run one fresh agent; return (seconds inside ``Agent.run``, model requests)."""
+    agent = scenario.build(llm_config_for(server, scenario), profiler)
+    requests_before = server.requests
+    start = time.perf_counter()
+    agent.run(scenario.message, history=[dict(message) for message in scenario.history])
+    elapsed = time.perf_counter() - start
+    return elapsed, server.requests - requests_before
+
+
+def overhead_ms(profiler: ProfilingMiddleware, iterations: int) -> float | None:
+    """Mean time per iteration of the top-level agent outside model calls, sub-agents and batches.
+
+    Delegated work runs in parallel, so the whole ``execute_calls`` phase that
+    contains it is excluded rather than the sum of its children.
+    """
+    outside = 0.0
+    for run in profiler.runs:
+        if run.duration is None or run.agent_name not in ("main", "root"):
+            continue
+        delegating = {path[:-1] for path in run.stacks if path[-1].startswith(("sub_agent:", "batch:"))}
+        excluded = sum(entry[1] for path, entry in run.stacks.items() if path[-1] == "network" or path in delegating)
+        outside += max(0.0, run.duration - excluded)
+    return outside / iterations * 1000 if iterations else None
+
+
+def measure(server: MockLLMServer, scenario: Scenario, profiler: ProfilingMiddleware, runs: int) -> dict[str, Any]:
+    """Time ``runs`` fresh agents; return requests, seconds, iterations per second, overhead and phase means."""
+    profiler.reset()
+    total_seconds = 0.0
+    total_requests = 0
+    for _ in range(runs):
+        elapsed, requests = run_once(server, scenario, profiler)
+        total_seconds += elapsed
+        total_requests += requests
+    top_level_iterations = sum(
+        int(entry[0])
+        for run in profiler.runs
+        if run.agent_name in ("main", "root")
+        for path, entry in run.stacks.items()
+        if path[1:] == ("model_call", "network")
+    )
+    phases = profiler.summary()["phase"]
+    return {
+        "model_requests": total_requests,
+        "seconds": total_seconds,
+        "iterations_per_sec": total_requests / total_seconds if total_seconds else 0.0,
+        "overhead_ms_per_iteration": overhead_ms(profiler, top_level_iterations),
+        "phase_mean_ms": {name: phases[name]["mean_ms"] for name in REPORTED_PHASES if name in phases},
+    }
+
+
+def median_and_noise(values: list[float]) -> tuple[float, float]:
+    """Median of ``values`` and their median absolute deviation relative to it."""
+    median = statistics.median(values)
+    deviation = statistics.median(abs(value - median) for value in values)
+    return median, deviation / median if median else 0.0
+
+
+def bench_scenario(server: MockLLMServer, scenario: Scenario, runs: int, repeats: int, measure_memory: bool) -> dict[str, Any]:
+    server.behavior = scenario.behavior
+    profiler = ProfilingMiddleware(keep_runs=100_000)
+    run_once(server, scenario, profiler)  # warm-up: imports, client construction, caches
+    samples = [measure(server, scenario, profiler, runs) for _ in range(repeats)]
+
+    result: dict[str, Any] = {
+        "runs": runs,
+        "repeats": repeats,
+        "model_requests": samples[0]["model_requests"],
+        "seconds": statistics.median(sample["seconds"] for sample in samples),
+        "noise": {},
+        "samples": {},
+    }
+    for metric in ("iterations_per_sec", "overhead_ms_per_iteration"):
+        values = [sample[metric] for sample in samples if sample[metric] is not None]
+        result["samples"][metric] = values
+        result[metric], result["noise"][metric] = median_and_noise(values) if values else (None, 0.0)
+    result["phase_mean_ms"] = {
+        name: statistics.median(sample["phase_mean_ms"][name] for sample in samples if name in sample["phase_mean_ms"])
+        for name in REPORTED_PHASES
+        if any(name in sample["phase_mean_ms"] for sample in samples)
+    }
+
+    if measure_memory:
+        profiler = ProfilingMiddleware(keep_runs=1)
+        gc.collect()
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        for _ in range(runs):
+            run_once(server, scenario, profiler)
+        gc.collect()
+        after, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        result["memory_growth_kib"] = max(0, after - before) / 1024
+        result["memory_peak_kib"] = peak / 1024
+    return result
+
+
+def compare(results: dict[str, Any], baseline: dict[str, Any], tolerance: float) -> list[str]:
+    """Return one message per metric that regressed beyond its band.
+
+    The band is ``tolerance`` (a fraction) plus the larger relative noise of the
+    current and baseline medians, so metrics that vary a lot between repeats on
+    this machine need a proportionally larger change to count as a regression.
+    """
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get("scenarios", {}).get(name)
+        if not previous:
+            continue
+
+        def band(metric: str) -> float:
+            return tolerance + max(current.get("noise", {}).get(metric, 0.0), previous.get("noise", {}).get(metric, 0.0))
+
+        allowed = band("iterations_per_sec")
+        if current["iterations_per_sec"] < previous["iterations_per_sec"] * (1 - allowed):
+            regressions.append(
+                f"{name}: iterations/s {current['iterations_per_sec']:.1f} < baseline {previous['iterations_per_sec']:.1f} "
+                f"(band {allowed:.0%})",
+            )
+        for metric in ("overhead_ms_per_iteration", "memory_growth_kib"):
+            now, before = current.get(metric), previous.get(metric)
+            allowed = band(metric)
+            # Tiny absolute values are noise; only compare above a small floor
+            if now is not None and before is not None and now > max(before, 1.0) * (1 + allowed):
+                regressions.append(f"{name}: {metric} {now:.2f} > baseline {before:.2f} (band {allowed:.0%})")
+    return regressions
+
+
+def print_table(results: dict[str, Any]) -> None:
+    print(
+        f"{'scenario':<20} {'runs':>5} {'repeats':>8} {'requests':>9} {'iter/s':>9} {'noise':>7} "
+        f"{'overhead ms/iter':>17} {'noise':>7} {'mem growth KiB':>15}",
+    )
+    for name, result in results.items():
+        overhead = result["overhead_ms_per_iteration"]
+        memory = result.get("memory_growth_kib")
+        noise = result["noise"]
+        print(
+            f"{name:<20} {result['runs']:>5} {result['repeats']:>8} {result['model_requests']:>9} {result['iterations_per_sec']:>9.1f} "
+            f"{noise['iterations_per_sec']:>7.1%} {(f'{overhead:.2f}' if overhead is not None else '-'):>17} "
+            f"{noise['overhead_ms_per_iteration']:>7.1%} {(f'{memory:.1f}' if memory is not None else '-'):>15}",
+        )
+    print("\nMedian times are shown; noise is the median absolute deviation across repeats.")
+    print("\nMean phase time (ms)")
+    print(f"{'scenario':<20} " + " ".join(f"{phase:>15}" for phase in REPORTED_PHASES))
+    for name, result in results.items():
+        means = result["phase_mean_ms"]
+        print(f"{name:<20} " + " ".join(f"{means[p]:>15.2f}" if means.get(p) is not None else f"{'-':>15}" for p in REPORTED_PHASES))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenarios", nargs="*", help="Scenarios to run (default: all)")
+    parser.add_argument("--runs", type=int, default=5, help="Agent runs per measurement")
+    parser.add_argument("--repeats", type=int, default=5, help="Measurements per scenario; their median is reported")
+    parser.add_argument("--turns", type=int, default=3, help="Tool-calling turns per run")
+    parser.add_argument("--history-size", type=int, default=200, help="Prior user/assistant pairs in long_history")
+    parser.add_argument("--parallel-tools", type=int, default=16, help="Tool calls per turn in parallel_tools")
+    parser.add_argument("--tree-depth", type=int, default=2, help="Levels below the root in subagent_tree")
+    parser.add_argument("--tree-fanout", type=int, default=3, help="Sub-agents per agent in subagent_tree")
+    parser.add_argument("--batch-size", type=int, default=20, help="Records in the batch scenario")
+    parser.add_argument("--latency", type=float, default=0.0, help="Mock seconds before the first byte")
+    parser.add_argument("--tokens-per-second", type=float, default=0.0, help="Mock output pacing (0 = unpaced)")
+    parser.add_argument("--no-memory", action="store_true", help="Skip the tracemalloc pass")
+    parser.add_argument("--baseline", type=Path, help="Baseline JSON to compare against")
+    parser.add_argument("--update-baseline", action="store_true", help="Write the results to --baseline instead of comparing")
+    parser.add_argument(
+        "--tolerance", type=float, default=0.25, help="Allowed relative regression on top of the measured noise (0.25 = 25%%)"
+    )
+    parser.add_argument("--json", type=Path, help="Also write the results to this file")
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    results: dict[str, Any] = {}
+    with tempfile.TemporaryDirectory() as workdir, MockLLMServer() as server:
+        scenarios = build_scenarios(args, Path(workdir))
+        unknown = set(args.scenarios or ()) - set(scenarios)
+        if unknown:
+            raise SystemExit(f"Unknown scenarios: {', '.join(sorted(unknown))} (available: {', '.join(scenarios)})")
+        for name in args.scenarios or scenarios:
+            results[name] = bench_scenario(server, scenarios[name], args.runs, max(1, args.repeats), measure_memory=not args.no_memory)
+
+    print_table(results)
+    report = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "settings": {key: value for key, value in vars(args).items() if not isinstance(value, Path) and key != "update_baseline"},
+        "scenarios": results,
+    }
+    if args.json:
+        args.json.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+    if args.baseline and args.update_baseline:
+        args.baseline.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+        print(f"\nBaseline written to {args.baseline}")
+    elif args.baseline:
+        regressions = compare(results, json.loads(args.baseline.read_text(encoding="utf-8")), args.tolerance)
+        if regressions:
+            print("\nRegressions against the baseline:")
+            for line in regressions:
+                print(f"  {line}")
+            raise SystemExit(1)
+        print(f"\nNo regressions beyond {args.tolerance:.0%} plus noise against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,388 @@
+# Copyright (c) Nex-AGI. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Deterministic local LLM server for benchmarks.
+
+Speaks the OpenAI chat completions (``POST /v1/chat/completions``) and
+Anthropic messages (``POST /v1/messages``) wire formats, streamed (SSE) or
+not, so the real SDK clients and the whole agent loop can be exercised
+without a provider. Responses are scripted by :class:`MockBehavior` from the
+request itself, so concurrent agents and sub-agents each get a consistent
+conversation:
+
+- ``delegate="fanout"``: an agent offered sub-agent tools calls all of them
+  in its first turn, then answers;
+- ``delegate="batch"``: an agent offered sub-agent tools emits a
+  ``<use_batch_agent>`` block over ``batch_file`` in its first turn;
+- otherwise the agent calls its first tool ``tool_calls_per_turn`` times in
+  parallel for ``turns`` turns, then answers.
+
+Latency before the first byte and the token rate are configurable.
+
+Usage::
+
+    python benchmarks/mock_llm_server.py --port 8765 --latency 0.2 --tokens-per-second 200
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import threading
+import time
+import uuid
+from dataclasses import dataclass, replace
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Literal
+
+SUB_AGENT_PREFIX = "sub-agent-"
+
+
+@dataclass(frozen=True)
+class MockBehavior:
+    """Script and pacing of the mock model.
+
+    Attributes:
+        latency: Seconds before the first byte of every response
+        tokens_per_second: Output pacing (0 sends everything at once)
+        tokens_per_chunk: Words per streamed content delta
+        text_tokens: Words of text in every response
+        turns: Tool-calling turns before the final answer
+        tool_calls_per_turn: Parallel tool calls per turn
+        delegate: How agents offered sub-agent tools use them
+        batch_file: JSONL file named in the batch block
+        batch_template: Message template of the batch block
+    """
+
+    latency: float = 0.0
+    tokens_per_second: float = 0.0
+    tokens_per_chunk: int = 4
+    text_tokens: int = 24
+    turns: int = 1
+    tool_calls_per_turn: int = 1
+    delegate: Literal["none", "fanout", "batch"] = "none"
+    batch_file: str | None = None
+    batch_template: str = "Summarize: {text}"
+
+
+@dataclass
+class _Turn:
+    text: str
+    tool_calls: list[tuple[str, str, dict[str, Any]]]
+    prompt_tokens: int
+    output_tokens: int
+
+
+class MockLLMServer:
+    """Threaded HTTP server answering with scripted model turns."""
+
+    def __init__(self, behavior: MockBehavior | None = None, host: str = "127.0.0.1", port: int = 0) -> None:
+        self.behavior = behavior or MockBehavior()
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), _Handler)
+        self._httpd.daemon_threads = True
+        self._httpd.mock = self  # type: ignore[attr-defined]
+        self._thread: threading.Thread | None = None
+
+    @property
+    def url(self) -> str:
+        """Base URL (Anthropic clients use it as is, OpenAI clients need ``/v1`` appended)."""
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host!s}:{port}"
+
+    def configure(self, **changes: Any) -> None:
+        """Replace fields of the current behavior."""
+        self.behavior = replace(self.behavior, **changes)
+
+    def start(self) -> MockLLMServer:
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="mock-llm-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self) -> MockLLMServer:
+        return self.start()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.stop()
+
+    def count_request(self) -> None:
+        with self._lock:
+            self.requests += 1
+
+    def plan_turn(self, messages: list[dict[str, Any]], tools: list[dict[str, Any]], system: Any = None) -> _Turn:
+        """Decide the next model turn from the conversation so far."""
+        behavior = self.behavior
+        completed = _tool_turns(messages)
+        tool_specs = [_tool_spec(tool) for tool in tools or []]
+        sub_agents = [spec for spec in tool_specs if spec[0].startswith(SUB_AGENT_PREFIX)]
+        plain_tools = [spec for spec in tool_specs if not spec[0].startswith(SUB_AGENT_PREFIX)]
+        text = _words(behavior.text_tokens, seed=len(messages))
+        calls: list[tuple[str, str, dict[str, Any]]] = []
+
+        if sub_agents and behavior.delegate == "fanout" and completed == 0:
+            calls = [(_call_id(), name, {"message": f"Handle part {index}"}) for index, (name, _) in enumerate(sub_agents)]
+        elif sub_agents and behavior.delegate == "batch" and completed == 0 and behavior.batch_file:
+            worker = sub_agents[0][0][len(SUB_AGENT_PREFIX) :]
+            text += (
+                f"\n<use_batch_agent><agent_name>{worker}</agent_name><input_data_source>"
+                f"<file_name>{behavior.batch_file}</file_name><format>jsonl</format></input_data_source>"
+                f"<message>{behavior.batch_template}</message></use_batch_agent>"
+            )
+        elif plain_tools and behavior.delegate == "none" and completed < behavior.turns:
+            name, schema = plain_tools[0]
+            calls = [(_call_id(), name, _arguments(schema, index)) for index in range(behavior.tool_calls_per_turn)]
+
+        prompt_chars = len(json.dumps(messages, default=str)) + len(json.dumps(system, default=str))
+        output_tokens = behavior.text_tokens + sum(len(json.dumps(args)) // 4 for _, _, args in calls)
+        return _Turn(text=text, tool_calls=calls, prompt_tokens=prompt_chars // 4, output_tokens=output_tokens)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def log_message(self, format: str, *args: Any) -> None:
+        return
+
+    @property
+    def mock(self) -> MockLLMServer:
+        return self.server.mock  # type: ignore[attr-defined]
+
+    def do_POST(self) -> None:
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length") or 0)) or b"{}")
+        self.mock.count_request()
+        behavior = self.mock.behavior
+        if self.path.rstrip("/").endswith("/chat/completions"):
+            turn = self.mock.plan_turn(body.get("messages", []), body.get("tools", []))
+            time.sleep(behavior.latency)
+            if body.get("stream"):
+                self._stream(_openai_chunks(body, turn, behavior), anthropic=False)
+            else:
+                self._pace(turn.output_tokens)
+                self._json(_openai_completion(body, turn))
+        elif self.path.rstrip("/").endswith("/messages"):
+            turn = self.mock.plan_turn(body.get("messages", []), body.get("tools", []), body.get("system"))
+            time.sleep(behavior.latency)
+            if body.get("stream"):
+                self._stream(_anthropic_events(body, turn, behavior), anthropic=True)
+            else:
+                self._pace(turn.output_tokens)
+                self._json(_anthropic_message(body, turn))
+        else:
+            self._json({"error": {"message": f"Unknown path {self.path}"}}, status=404)
+
+    def _pace(self, tokens: int) -> None:
+        if self.mock.behavior.tokens_per_second > 0:
+            time.sleep(tokens / self.mock.behavior.tokens_per_second)
+
+    def _json(self, payload: dict[str, Any], status: int = 200) -> None:
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _stream(self, events: list[tuple[dict[str, Any] | str, int]], anthropic: bool) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for payload, tokens in events:
+            self._pace(tokens)
+            if isinstance(payload, str):
+                frame = f"data: {payload}\n\n"
+            elif anthropic:
+                frame = f"event: {payload['type']}\ndata: {json.dumps(payload)}\n\n"
+            else:
+                frame = f"data: {json.dumps(payload)}\n\n"
+            data = frame.encode()
+            self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+            self.wfile.flush()
+        self.wfile.write(b"0\r\n\r\n")
+
+
+def _tool_turns(messages: list[dict[str, Any]]) -> int:
+    """Count assistant turns that called tools or delegated a batch.
+
+    Prior conversation (plain text turns) and the framework's feedback
+    messages do not count, so the script restarts for every new prompt.
+    """
+    turns = 0
+    for message in messages:
+        if message.get("role") != "assistant":
+            continue
+        content = message.get("content")
+        if message.get("tool_calls") or (isinstance(content, str) and "<use_batch_agent>" in content):
+            turns += 1
+        elif isinstance(content, list) and any(
+            isinstance(block, dict) and (block.get("type") == "tool_use" or "<use_batch_agent>" in str(block.get("text", "")))
+            for block in content
+        ):
+            turns += 1
+    return turns
+
+
+def _tool_spec(tool: dict[str, Any]) -> tuple[str, dict[str, Any]]:
+    """Return (name, JSON schema) of an OpenAI or Anthropic tool definition."""
+    if "function" in tool:
+        return tool["function"]["name"], tool["function"].get("parameters") or {}
+    return tool["name"], tool.get("input_schema") or {}
+
+
+def _arguments(schema: dict[str, Any], index: int) -> dict[str, Any]:
+    """Fill every property of a tool schema with a deterministic value."""
+    values: dict[str, Any] = {}
+    for name, prop in (schema.get("properties") or {}).items():
+        kind = prop.get("type")
+        if kind == "integer":
+            values[name] = index
+        elif kind == "number":
+            values[name] = float(index)
+        elif kind == "boolean":
+            values[name] = True
+        else:
+            values[name] = f"item-{index}"
+    return values
+
+
+def _words(count: int, seed: int = 0) -> str:
+    return " ".join(f"w{(seed + index) % 97}" for index in range(count))
+
+
+def _call_id() -> str:
+    return f"call_{uuid.uuid4().hex[:12]}"
+
+
+def _text_pieces(text: str, per_chunk: int) -> list[str]:
+    words = text.split(" ")
+    step = max(1, per_chunk)
+    return [" ".join(words[i : i + step]) + (" " if i + step < len(words) else "") for i in range(0, len(words), step)]
+
+
+def _openai_completion(body: dict[str, Any], turn: _Turn) -> dict[str, Any]:
+    message: dict[str, Any] = {"role": "assistant", "content": turn.text}
+    if turn.tool_calls:
+        message["tool_calls"] = [
+            {"id": call_id, "type": "function", "function": {"name": name, "arguments": json.dumps(args)}}
+            for call_id, name, args in turn.tool_calls
+        ]
+    return {
+        "id": f"chatcmpl-{uuid.uuid4().hex[:12]}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": body.get("model", "mock"),
+        "choices": [{"index": 0, "message": message, "finish_reason": "tool_calls" if turn.tool_calls else "stop"}],
+        "usage": {
+            "prompt_tokens": turn.prompt_tokens,
+            "completion_tokens": turn.output_tokens,
+            "total_tokens": turn.prompt_tokens + turn.output_tokens,
+        },
+    }
+
+
+def _openai_chunks(body: dict[str, Any], turn: _Turn, behavior: MockBehavior) -> list[tuple[dict[str, Any] | str, int]]:
+    base = {"id": f"chatcmpl-{uuid.uuid4().hex[:12]}", "object": "chat.completion.chunk", "created": int(time.time())}
+    base["model"] = body.get("model", "mock")
+
+    def chunk(delta: dict[str, Any], finish_reason: str | None = None) -> dict[str, Any]:
+        return {**base, "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}]}
+
+    events: list[tuple[dict[str, Any] | str, int]] = [(chunk({"role": "assistant", "content": ""}), 0)]
+    events += [(chunk({"content": piece}), behavior.tokens_per_chunk) for piece in _text_pieces(turn.text, behavior.tokens_per_chunk)]
+    for index, (call_id, name, args) in enumerate(turn.tool_calls):
+        start = {"index": index, "id": call_id, "type": "function", "function": {"name": name, "arguments": ""}}
+        events.append((chunk({"tool_calls": [start]}), 0))
+        arguments = json.dumps(args)
+        events.append((chunk({"tool_calls": [{"index": index, "function": {"arguments": arguments}}]}), len(arguments) // 4))
+    events.append((chunk({}, "tool_calls" if turn.tool_calls else "stop"), 0))
+    usage = {"prompt_tokens": turn.prompt_tokens, "completion_tokens": turn.output_tokens}
+    usage["total_tokens"] = turn.prompt_tokens + turn.output_tokens
+    events.append(({**base, "choices": [], "usage": usage}, 0))
+    events.append(("[DONE]", 0))
+    return events
+
+
+def _anthropic_message(body: dict[str, Any], turn: _Turn) -> dict[str, Any]:
+    content: list[dict[str, Any]] = [{"type": "text", "text": turn.text}]
+    content += [{"type": "tool_use", "id": call_id, "name": name, "input": args} for call_id, name, args in turn.tool_calls]
+    return {
+        "id": f"msg_{uuid.uuid4().hex[:12]}",
+        "type": "message",
+        "role": "assistant",
+        "model": body.get("model", "mock"),
+        "content": content,
+        "stop_reason": "tool_use" if turn.tool_calls else "end_turn",
+        "stop_sequence": None,
+        "usage": {"input_tokens": turn.prompt_tokens, "output_tokens": turn.output_tokens},
+    }
+
+
+def _anthropic_events(body: dict[str, Any], turn: _Turn, behavior: MockBehavior) -> list[tuple[dict[str, Any] | str, int]]:
+    message = _anthropic_message(body, turn)
+    start = {**message, "content": [], "stop_reason": None, "usage": {"input_tokens": turn.prompt_tokens, "output_tokens": 0}}
+    events: list[tuple[dict[str, Any] | str, int]] = [({"type": "message_start", "message": start}, 0)]
+    events.append(({"type": "content_block_start", "index": 0, "content_block": {"type": "text", "text": ""}}, 0))
+    for piece in _text_pieces(turn.text, behavior.tokens_per_chunk):
+        delta = {"type": "content_block_delta", "index": 0, "delta": {"type": "text_delta", "text": piece}}
+        events.append((delta, behavior.tokens_per_chunk))
+    events.append(({"type": "content_block_stop", "index": 0}, 0))
+    for index, (call_id, name, args) in enumerate(turn.tool_calls, start=1):
+        block = {"type": "tool_use", "id": call_id, "name": name, "input": {}}
+        events.append(({"type": "content_block_start", "index": index, "content_block": block}, 0))
+        arguments = json.dumps(args)
+        delta = {"type": "content_block_delta", "index": index, "delta": {"type": "input_json_delta", "partial_json": arguments}}
+        events.append((delta, len(arguments) // 4))
+        events.append(({"type": "content_block_stop", "index": index}, 0))
+    stop = {"stop_reason": message["stop_reason"], "stop_sequence": None}
+    events.append(({"type": "message_delta", "delta": stop, "usage": {"output_tokens": turn.output_tokens}}, 0))
+    events.append(({"type": "message_stop"}, 0))
+    return events
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds before the first byte")
+    parser.add_argument("--tokens-per-second", type=float, default=0.0, help="output pacing (0 = unpaced)")
+    parser.add_argument("--turns", type=int, default=1, help="tool-calling turns before the final answer")
+    parser.add_argument("--tool-calls", type=int, default=1, help="parallel tool calls per turn")
+    parser.add_argument("--delegate", choices=["none", "fanout", "batch"], default="none")
+    args = parser.parse_args()
+
+    behavior = MockBehavior(
+        latency=args.latency,
+        tokens_per_second=args.tokens_per_second,
+        turns=args.turns,
+        tool_calls_per_turn=args.tool_calls,
+        delegate=args.delegate,
+    )
+    server = MockLLMServer(behavior, host=args.host, port=args.port)
+    print(f"Mock LLM server on {server.url} (OpenAI base_url: {server.url}/v1)")
+    server.start()
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+# Copyright (c) Nex-AGI. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Micro-benchmark for the streaming aggregators.
+
+Feeds synthetic OpenAI chat, Anthropic and Responses API streams made of SDK
+event objects into the aggregators and reports chunks per second, once with
+the objects as they come from the SDK and once with a ``model_dump()`` per
+chunk (the previous behaviour). Both runs must produce the same message.
+
+Usage::
+
+    python benchmarks/stream_aggregation.py --chunks 5000 --repeat 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from collections.abc import Callable
+from typing import Any
+
+from anthropic.types import RawMessageStreamEvent
+from openai.types.chat import ChatCompletionChunk
+from openai.types.responses import ResponseStreamEvent
+from pydantic import TypeAdapter
+
+from nexau.archs.main_sub.execution.llm_caller import (
+    AnthropicStreamAggregator,
+    OpenAIChatStreamAggregator,
+    OpenAIResponsesStreamAggregator,
+)
+
+
+def openai_chat_stream(chunks: int) -> list[Any]:
+    """Text deltas followed by one tool call streamed in fragments."""
+    text_chunks = chunks // 2
+
+    def chunk(delta: dict[str, Any], finish_reason: str | None = None) -> ChatCompletionChunk:
+        return ChatCompletionChunk.model_validate(
+            {
+                "id": "chatcmpl-bench",
+                "object": "chat.completion.chunk",
+                "created": 0,
+                "model": "bench-model",
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+            },
+        )
+
+    events = [chunk({"role": "assistant", "content": "token "})]
+    events += [chunk({"content": "token "}) for _ in range(text_chunks - 1)]
+    events.append(
+        chunk({"tool_calls": [{"index": 0, "id": "call_1", "type": "function", "function": {"name": "lookup", "arguments": ""}}]})
+    )
+    events += [chunk({"tool_calls": [{"index": 0, "function": {"arguments": '"x'}}]}) for _ in range(chunks - text_chunks - 2)]
+    events.append(chunk({}, finish_reason="tool_calls"))
+    return events
+
+
+def anthropic_stream(chunks: int) -> list[Any]:
+    """A text block followed by a tool_use block with streamed input."""
+    adapter: TypeAdapter[Any] = TypeAdapter(RawMessageStreamEvent)
+    text_chunks = chunks // 2
+    raw: list[dict[str, Any]] = [
+        {
+            "type": "message_start",
+            "message": {
+                "id": "msg_bench",
+                "type": "message",
+                "role": "assistant",
+                "model": "bench-model",
+                "content": [],
+                "stop_reason": None,
+                "stop_sequence": None,
+                "usage": {"input_tokens": 10, "output_tokens": 1},
+            },
+        },
+        {"type": "content_block_start", "index": 0, "content_block": {"type": "text", "text": ""}},
+    ]
+    raw += [{"type": "content_block_delta", "index": 0, "delta": {"type": "text_delta", "text": "token "}}] * text_chunks
+    raw += [
+        {"type": "content_block_stop", "index": 0},
+        {"type": "content_block_start", "index": 1, "content_block": {"type": "tool_use", "id": "toolu_1", "name": "lookup", "input": {}}},
+        {"type": "content_block_delta", "index": 1, "delta": {"type": "input_json_delta", "partial_json": '{"q": "'}},
+    ]
+    raw += [{"type": "content_block_delta", "index": 1, "delta": {"type": "input_json_delta", "partial_json": "x"}}] * (
+        chunks - text_chunks
+    )
+    raw += [
+        {"type": "content_block_delta", "index": 1, "delta": {"type": "input_json_delta", "partial_json": '"}'}},
+        {"type": "content_block_stop", "index": 1},
+        {"type": "message_delta", "delta": {"stop_reason": "tool_use", "stop_sequence": None}, "usage": {"output_tokens": chunks}},
+        {"type": "message_stop"},
+    ]
+    return [adapter.validate_python(event) for event in raw]
+
+
+def responses_stream(chunks: int) -> list[Any]:
+    """A message with text deltas followed by a function call with argument deltas."""
+    adapter: TypeAdapter[Any] = TypeAdapter(ResponseStreamEvent)
+    text_chunks = chunks // 2
+    sequence = iter(range(chunks * 2 + 16))
+    raw: list[dict[str, Any]] = [
+        {
+            "type": "response.output_item.added",
+            "output_index": 0,
+            "item": {"type": "message", "id": "msg_1", "role": "assistant", "status": "in_progress", "content": []},
+        },
+        {
+            "type": "response.content_part.added",
+            "item_id": "msg_1",
+            "output_index": 0,
+            "content_index": 0,
+            "part": {"type": "output_text", "text": "", "annotations": []},
+        },
+    ]
+    raw += [
+        {
+            "type": "response.output_text.delta",
+            "item_id": "msg_1",
+            "output_index": 0,
+            "content_index": 0,
+            "delta": "token ",
+            "logprobs": [],
+        },
+    ] * text_chunks
+    raw.append(
+        {
+            "type": "response.output_item.added",
+            "output_index": 1,
+            "item": {
+                "type": "function_call",
+                "id": "fc_1",
+                "call_id": "call_1",
+                "name": "lookup",
+                "arguments": "",
+                "status": "in_progress",
+            },
+        },
+    )
+    raw += [{"type": "response.function_call_arguments.delta", "item_id": "fc_1", "output_index": 1, "delta": "x"}] * (chunks - text_chunks)
+    return [adapter.validate_python({**event, "sequence_number": next(sequence)}) for event in raw]
+
+
+STREAMS: dict[str, tuple[Callable[[int], list[Any]], type]] = {
+    "openai_chat": (openai_chat_stream, OpenAIChatStreamAggregator),
+    "anthropic": (anthropic_stream, AnthropicStreamAggregator),
+    "responses": (responses_stream, OpenAIResponsesStreamAggregator),
+}
+
+
+def aggregate(aggregator_cls: type, events: list[Any], dump: bool) -> tuple[dict[str, Any], float]:
+    """Feed every event and return the final payload and the elapsed seconds."""
+    aggregator = aggregator_cls()
+    start = time.perf_counter()
+    if dump:
+        for event in events:
+            aggregator.consume(event.model_dump())
+    else:
+        for event in events:
+            aggregator.consume(event)
+    result = aggregator.finalize()
+    return result, time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunks", type=int, default=5000, help="Events per synthetic stream")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per variant; the best run is reported")
+    args = parser.parse_args()
+
+    print(f"{'stream':<12} {'model_dump chunks/s':>20} {'typed chunks/s':>16} {'speedup':>8}")
+    for name, (build, aggregator_cls) in STREAMS.items():
+        events = build(args.chunks)
+        dumped, dumped_time = min((aggregate(aggregator_cls, events, dump=True) for _ in range(args.repeat)), key=lambda run: run[1])
+        typed, typed_time = min((aggregate(aggregator_cls, events, dump=False) for _ in range(args.repeat)), key=lambda run: run[1])
+        if typed != dumped:
+            raise SystemExit(f"{name}: typed aggregation differs from the model_dump result")
+        print(
+            f"{name:<12} {len(events) / dumped_time:>20,.0f} {len(events) / typed_time:>16,.0f} {dumped_time / typed_time:>7.1f}x",
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -43,6 +43,7 @@ from nexau.archs.main_sub.execution.hooks import (
     AfterToolHookInput,
     AfterToolHookResult,
 )
+from nexau.archs.main_sub.execution.stream_events import StreamEvent, StreamEventType
 
 if TYPE_CHECKING:  # pragma: no cover - imported for type checking only
     from nexau.archs.main_sub.agent import Agent
@@ -57,7 +58,13 @@ def send_message(msg_type, content, metadata=None):
     message = {"type": msg_type, "content": content}
     if metadata:
         message["metadata"] = metadata
-    print(json.dumps(message), flush=True)
+    print(json.dumps(message, default=str), flush=True)
+
+
+def send_stream_event(event: StreamEvent):
+    """Forward a live agent event (text/reasoning delta, tool call, tool result, ...) to the CLI."""
+    content = event.data.get("text") or event.data.get("delta") or ""
+    send_message("stream", content, metadata=event.to_dict())
 
 
 def create_cli_progress_hook():
@@ -328,8 +335,9 @@ def main():
 
                     send_message("step", "Processing request...", metadata={"type": "start"})
 
-                    # Run the agent
-                    response = agent.run(
+                    # Run the agent, forwarding events while the model generates
+                    response = None
+                    for event in agent.run_stream(
                         user_message,
                         context={
                             "date": get_date(),
@@ -341,10 +349,17 @@ def main():
                                 "working_directory": os.getcwd(),
                             },
                         },
-                    )
-
-                    send_message("step", "Request completed", metadata={"type": "complete"})
-                    send_message("response", response)
+                    ):
+                        if event.type == StreamEventType.DONE:
+                            response = event.data.get("response")
+                        elif event.type == StreamEventType.ERROR:
+                            send_message("error", event.data.get("error", ""))
+                        else:
+                            send_stream_event(event)
+
+                    if response is not None:
+                        send_message("step", "Request completed", metadata={"type": "complete"})
+                        send_message("response", response)
                     send_message("ready", "")
 
             except ConfigError as e:
@@ -147,6 +147,7 @@ export default function App({yamlPath}) {
 	const [activeSubAgentId, setActiveSubAgentId] = useState(null);
 	const agentProcess = useRef(null);
 	const currentStepsRef = useRef([]);
+	const streamingTextRef = useRef('');
 	const {exit} = useApp();
 
 	const ensureSubAgentEntry = (metadata = {}, content = '') => ({
@@ -210,6 +211,7 @@ export default function App({yamlPath}) {
 							setStatusMessage(message.content);
 							break;
 						case 'ready':
+							streamingTextRef.current = '';
 							setIsReady(true);
 							setIsProcessing(false);
 							setStatusMessage('');
@@ -296,7 +298,21 @@ export default function App({yamlPath}) {
 							setStatusMessage(message.content);
 							setIsProcessing(true);
 							break;
+						case 'stream':
+							// Live events from Agent.run_stream; show the main agent's text as it is generated
+							if (metadata.parent_agent_id) break;
+							if (metadata.type === 'model_retry') {
+								streamingTextRef.current = '';
+							} else if (metadata.type === 'text_delta') {
+								streamingTextRef.current += message.content;
+								const lastLine = streamingTextRef.current.trimEnd().split('\n').pop() || '';
+								setStatusMessage(lastLine.slice(-120));
+							} else if (metadata.type === 'tool_call_start' && metadata.data?.name) {
+								setStatusMessage(`Calling ${metadata.data.name}...`);
+							}
+							break;
 						case 'response':
+							streamingTextRef.current = '';
 							// Add final response and preserve the steps with it
 							setMessages(prev => [
 								...prev,
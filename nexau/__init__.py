@@ -16,7 +16,9 @@ from .archs.config.config_loader import load_agent_config
 from .archs.llm import LLMConfig
 from .archs.main_sub.agent import Agent, create_agent
 from .archs.main_sub.config import AgentConfig
+from .archs.main_sub.execution.stream_events import StreamEvent, StreamEventType
 from .archs.main_sub.skill import Skill
+from .archs.main_sub.utils.logging_utils import configure_logging
 from .archs.tool import Tool
 from .archs.tracer import BaseTracer, CompositeTracer, Span, SpanType, TraceContext
 
@@ -28,6 +30,9 @@ __all__ = [
     "load_agent_config",
     "AgentConfig",
     "Skill",
+    "StreamEvent",
+    "StreamEventType",
+    "configure_logging",
     # Tracer components
     "BaseTracer",
     "CompositeTracer",
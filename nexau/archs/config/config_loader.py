@@ -14,13 +14,16 @@
 
 """Configuration loading system for agents and tools."""
 
+import copy
 import importlib
 import inspect
 import logging
 import os
 import re
+import threading
 import traceback
 from collections.abc import Callable
+from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Any, Literal
 
@@ -32,6 +35,7 @@ from ..llm import LLMConfig
 from ..main_sub import Agent, create_agent
 from ..main_sub.agent_context import GlobalStorage
 from ..main_sub.config import AgentConfigBase, HookDefinition
+from ..main_sub.execution.batch_cache import DEFAULT_BATCH_CACHE_MAX_AGE, DEFAULT_BATCH_CACHE_SIZE_LIMIT
 from ..main_sub.prompt_builder import PromptBuilder
 from ..main_sub.skill import Skill
 from ..tool import Tool
@@ -41,6 +45,11 @@ logger = logging.getLogger(__name__)
 
 dotenv.load_dotenv()
 
+_ENV_PLACEHOLDER_PATTERN = re.compile(r"\$\{env\.([A-Za-z_][A-Za-z0-9_]*)\}")
+_VARIABLE_PLACEHOLDER_PATTERN = re.compile(
+    r"\$\{variables\.([A-Za-z_][A-Za-z0-9_]*(?:\.[A-Za-z_][A-Za-z0-9_]*)*)\}",
+)
+
 
 class ConfigError(Exception):
     """Exception raised for configuration errors."""
@@ -133,6 +142,7 @@ class AgentBuilder:
         self.base_path: Path = base_path
         self.agent_params: dict[str, Any] = {}
         self.overrides: dict[str, Any] | None = None
+        self.compiled: CompiledAgentConfig | None = None
 
     def _import_and_instantiate(
         self,
@@ -212,6 +222,20 @@ class AgentBuilder:
             "max_running_subagents",
             5,
         )
+        self.agent_params["max_tool_workers"] = self.config.get("max_tool_workers")
+        self.agent_params["max_batch_workers"] = self.config.get("max_batch_workers")
+        self.agent_params["sub_agent_pool_min_size"] = self.config.get("sub_agent_pool_min_size", 0)
+        self.agent_params["sub_agent_pool_max_size"] = self.config.get("sub_agent_pool_max_size", 4)
+        self.agent_params["sub_agent_pool_idle_timeout"] = self.config.get("sub_agent_pool_idle_timeout", 300.0)
+        self.agent_params["stream_tool_dispatch"] = self.config.get("stream_tool_dispatch", False)
+        self.agent_params["adaptive_concurrency"] = self.config.get("adaptive_concurrency", False)
+        self.agent_params["max_adaptive_concurrency"] = self.config.get("max_adaptive_concurrency")
+        self.agent_params["batch_cache_dir"] = self.config.get("batch_cache_dir")
+        self.agent_params["batch_cache_max_age"] = self.config.get("batch_cache_max_age", DEFAULT_BATCH_CACHE_MAX_AGE)
+        self.agent_params["batch_cache_size_limit"] = self.config.get("batch_cache_size_limit", DEFAULT_BATCH_CACHE_SIZE_LIMIT)
+        self.agent_params["batch_processes"] = self.config.get("batch_processes", 0)
+        self.agent_params["batch_shards"] = self.config.get("batch_shards")
+        self.agent_params["batch_work_dir"] = self.config.get("batch_work_dir")
         self.agent_params["system_prompt"] = self.config.get("system_prompt")
         self.agent_params["system_prompt_type"] = self.config.get(
             "system_prompt_type",
@@ -411,9 +435,10 @@ class AgentBuilder:
         """
         tools = []
         tool_configs = self.config.get("tools", [])
+        tool_definitions = self.compiled.tool_definitions if self.compiled else {}
         for tool_config in tool_configs:
             try:
-                tool = load_tool_from_config(tool_config, self.base_path)
+                tool = load_tool_from_config(tool_config, self.base_path, tool_definitions)
                 tools.append(tool)
             except Exception as e:
                 raise ConfigError(
@@ -433,11 +458,13 @@ class AgentBuilder:
 
         # build skills from skill folders
         skill_configs = self.config.get("skills", [])
+        compiled_skills = self.compiled.skills if self.compiled else {}
         for skill_folder in skill_configs:
             try:
                 if not Path(skill_folder).is_absolute():
                     skill_folder = self.base_path / skill_folder
-                skill = Skill.from_folder(skill_folder)
+                compiled_skill = compiled_skills.get(str(skill_folder))
+                skill = copy.copy(compiled_skill) if compiled_skill else Skill.from_folder(skill_folder)
                 skills.append(skill)
             except Exception as e:
                 raise ConfigError(
@@ -568,6 +595,18 @@ class AgentBuilder:
         self.overrides = overrides
         return self
 
+    def set_compiled_config(self, compiled: "CompiledAgentConfig | None") -> "AgentBuilder":
+        """Reuse tool definitions and skills already parsed by a compiled config.
+
+        Args:
+            compiled: Compiled configuration for the file being built
+
+        Returns:
+            Self for method chaining
+        """
+        self.compiled = compiled
+        return self
+
     def get_agent(self, global_storage: GlobalStorage | None = None) -> Agent:
         """Create the final agent instance.
 
@@ -627,21 +666,22 @@ def apply_agent_name_overrides(
 def load_yaml_with_vars(path):
     with open(path, encoding="utf-8") as f:
         config_text = f.read()
+    return _load_yaml_text_with_vars(config_text, path)
+
 
+def _load_yaml_text_with_vars(config_text: str, path) -> Any:
     # 替换变量
     base_dir = os.path.dirname(os.path.abspath(path))
     config_text = config_text.replace("${this_file_dir}", base_dir)
 
     # Replace ${env.VAR_NAME} placeholders with environment variables
-    env_pattern = re.compile(r"\$\{env\.([A-Za-z_][A-Za-z0-9_]*)\}")
-
     def _replace_env(match: re.Match[str]) -> str:
         env_name = match.group(1)
         if env_name not in os.environ:
             raise ConfigError(f"Environment variable '{env_name}' is not set")
         return os.environ[env_name]
 
-    config_text = env_pattern.sub(_replace_env, config_text)
+    config_text = _ENV_PLACEHOLDER_PATTERN.sub(_replace_env, config_text)
 
     # deal variables in the YAML file
     loaded_config = yaml.safe_load(config_text)
@@ -657,10 +697,6 @@ def load_yaml_with_vars(path):
         raise ConfigError("'variables' must be a mapping if provided in YAML")
 
     # Replace ${variables.foo.bar} occurrences directly in the raw text
-    var_pattern = re.compile(
-        r"\$\{variables\.([A-Za-z_][A-Za-z0-9_]*(?:\.[A-Za-z_][A-Za-z0-9_]*)*)\}",
-    )
-
     def _resolve_var(match: re.Match[str]) -> str:
         path = match.group(1).split(".")
         current: Any = yaml_variables
@@ -674,7 +710,7 @@ def load_yaml_with_vars(path):
             )
         return str(current)
 
-    config_text = var_pattern.sub(_resolve_var, config_text)
+    config_text = _VARIABLE_PLACEHOLDER_PATTERN.sub(_resolve_var, config_text)
     resolved_config = yaml.safe_load(config_text)
     if isinstance(resolved_config, dict):
         resolved_config.pop("variables", None)
@@ -686,6 +722,7 @@ def load_agent_config(
     overrides: dict[str, Any] | None = None,
     template_context: dict[str, Any] | None = None,
     global_storage: GlobalStorage | None = None,
+    use_cache: bool = True,
 ) -> Agent:
     """
     Load agent configuration from YAML file.
@@ -695,6 +732,8 @@ def load_agent_config(
         overrides: Dictionary of configuration overrides
         template_context: Context variables for Jinja template rendering
         global_storage: Optional global storage instance
+        use_cache: Reuse the compiled configuration while the YAML files and
+            referenced environment variables are unchanged
 
     Returns:
         Configured Agent instance
@@ -704,36 +743,11 @@ def load_agent_config(
         if not path.exists():
             raise ConfigError(f"Configuration file not found: {config_path}")
 
-        # Load YAML configuration
-        config = load_yaml_with_vars(path)
-
-        if not config:
-            raise ConfigError(
-                f"Empty or invalid configuration file: {config_path}",
-            )
-
-        config = normalize_agent_config_dict(config)
-
-        # Apply overrides based on agent name after validation
-        if overrides:
-            config = apply_agent_name_overrides(config, overrides)
-
-        # Create builder and construct agent
-        builder = AgentBuilder(config, path.parent)
-
-        agent = (
-            builder.set_overrides(overrides)
-            .build_core_properties()
-            .build_llm_config()
-            .build_mcp_servers()
-            .build_hooks()
-            .build_tracers()
-            .build_tools()
-            .build_sub_agents()
-            .build_skills()
-            .build_system_prompt_path()
-            .get_agent(global_storage)
-        )
+        if not use_cache:
+            agent_config_cache.invalidate(path)
+        compiled = agent_config_cache.get(path)
+        config = compiled.config
+        agent = compiled.build(overrides=overrides, global_storage=global_storage)
 
         # Apply template context if provided and using Jinja templates
         if config.get("system_prompt_type") == "jinja" and template_context:
@@ -752,13 +766,18 @@ def load_agent_config(
         )
 
 
-def load_tool_from_config(tool_config: dict[str, Any], base_path: Path) -> Tool:
+def load_tool_from_config(
+    tool_config: dict[str, Any],
+    base_path: Path,
+    tool_definitions: dict[str, dict[str, Any]] | None = None,
+) -> Tool:
     """
     Load a tool from configuration.
 
     Args:
         tool_config: Tool configuration dictionary
         base_path: Base path for resolving relative paths
+        tool_definitions: Already parsed tool YAML definitions keyed by resolved path
 
     Returns:
         Configured Tool instance
@@ -787,11 +806,14 @@ def load_tool_from_config(tool_config: dict[str, Any], base_path: Path) -> Tool:
         )
 
     # Resolve YAML path
-    if not Path(yaml_path).is_absolute():
-        yaml_path = base_path / yaml_path
+    yaml_path = _resolve_config_path(yaml_path, base_path)
 
-    # Create tool
-    tool = Tool.from_yaml(str(yaml_path), binding, as_skill=as_skill, extra_kwargs=extra_kwargs)
+    # Create tool, reusing the parsed definition when one is available
+    tool_definition = (tool_definitions or {}).get(str(yaml_path))
+    if tool_definition is not None:
+        tool = Tool.from_definition(tool_definition, binding, as_skill=as_skill, extra_kwargs=extra_kwargs)
+    else:
+        tool = Tool.from_yaml(str(yaml_path), binding, as_skill=as_skill, extra_kwargs=extra_kwargs)
 
     # Override tool name with config-provided alias if present
     if name and tool.name != name:
@@ -801,6 +823,28 @@ def load_tool_from_config(tool_config: dict[str, Any], base_path: Path) -> Tool:
     return tool
 
 
+class SubAgentConfigFactory:
+    """Factory that loads a sub-agent from its YAML config each time it is called.
+
+    Unlike a closure it can be pickled, so sub-agents can also be built in
+    worker processes (e.g. by the sharded batch runner).
+    """
+
+    def __init__(self, config_path: str, overrides: dict[str, Any] | None = None):
+        self.config_path = config_path
+        self.overrides = overrides
+
+    def __call__(self, global_storage: GlobalStorage | None = None) -> Agent:
+        return load_agent_config(
+            self.config_path,
+            overrides=self.overrides,
+            global_storage=global_storage,
+        )
+
+    def __repr__(self) -> str:
+        return f"SubAgentConfigFactory({self.config_path!r})"
+
+
 def load_sub_agent_from_config(
     sub_config: dict[str, Any],
     base_path: Path,
@@ -825,23 +869,12 @@ def load_sub_agent_from_config(
     if not config_path:
         raise ConfigError(f"Sub-agent '{name}' missing 'config_path' field")
 
-    config_path = Path(config_path)
-
     # Resolve config path
-    if not config_path.is_absolute():
-        config_path = base_path / config_path
+    config_path = _resolve_config_path(config_path, base_path)
 
     _prevalidate_agent_file(config_path)
 
-    # Create factory function that loads agent when called
-    def agent_factory(global_storage: GlobalStorage | None = None):
-        return load_agent_config(
-            str(config_path),
-            overrides=overrides,
-            global_storage=global_storage,
-        )
-
-    return (name, agent_factory)
+    return (name, SubAgentConfigFactory(str(config_path), overrides))
 
 
 def import_from_string(import_string: str) -> Any:
@@ -924,20 +957,199 @@ def _format_validation_error(exc: ValidationError) -> str:
 
 
 def _prevalidate_agent_file(path: Path) -> None:
-    """Validate a referenced agent config file once to surface schema errors early."""
+    """Compile a referenced agent config file to surface schema errors early."""
 
     resolved = path.resolve()
-    if resolved in _validated_agent_paths:
-        return
     if not resolved.exists():
         raise ConfigError(f"Sub-agent configuration file not found: {resolved}")
 
-    config = load_yaml_with_vars(resolved)
-    if not config:
-        raise ConfigError(f"Empty or invalid configuration file: {resolved}")
+    agent_config_cache.get(resolved)
+
+
+def _resolve_config_path(path: str | Path, base_path: Path) -> Path:
+    """Resolve a path from an agent config relative to the config's directory."""
+    path = Path(path)
+    if not path.is_absolute():
+        path = base_path / path
+    return path
+
+
+FileSignature = tuple[int, int]
+
+
+def _file_signature(path: Path) -> FileSignature:
+    stat = path.stat()
+    return stat.st_mtime_ns, stat.st_size
+
+
+@dataclass
+class CompiledAgentConfig:
+    """An agent YAML file parsed, validated and resolved once.
+
+    Holds the normalized config, the parsed definitions of every tool YAML
+    and skill it references, and the compiled configs of its sub-agents.
+    Agents are built from it without reading or validating YAML again.
+    """
+
+    path: Path
+    config: dict[str, Any]
+    tool_definitions: dict[str, dict[str, Any]] = field(default_factory=dict)
+    skills: dict[str, Skill] = field(default_factory=dict)
+    sub_agents: dict[str, "CompiledAgentConfig"] = field(default_factory=dict)
+    dependencies: dict[Path, FileSignature] = field(default_factory=dict)
+    env: dict[str, str | None] = field(default_factory=dict)
+
+    @property
+    def base_path(self) -> Path:
+        """Directory that relative paths in the config are resolved against."""
+        return self.path.parent
+
+    def is_current(self) -> bool:
+        """Whether the files and environment variables it was built from are unchanged."""
+        for name, value in self.env.items():
+            if os.environ.get(name) != value:
+                return False
+        for dependency, signature in self.dependencies.items():
+            try:
+                if _file_signature(dependency) != signature:
+                    return False
+            except OSError:
+                return False
+        return True
+
+    def build(
+        self,
+        overrides: dict[str, Any] | None = None,
+        global_storage: GlobalStorage | None = None,
+    ) -> Agent:
+        """Build a new Agent from the compiled configuration.
+
+        Args:
+            overrides: Dictionary of configuration overrides
+            global_storage: Optional global storage instance
+
+        Returns:
+            Configured Agent instance
+        """
+        # Overrides and the builder may mutate nested values; keep the cached config intact
+        config = copy.deepcopy(self.config)
+        if overrides:
+            config = apply_agent_name_overrides(config, overrides)
+
+        return (
+            AgentBuilder(config, self.base_path)
+            .set_overrides(overrides)
+            .set_compiled_config(self)
+            .build_core_properties()
+            .build_llm_config()
+            .build_mcp_servers()
+            .build_hooks()
+            .build_tracers()
+            .build_tools()
+            .build_sub_agents()
+            .build_skills()
+            .build_system_prompt_path()
+            .get_agent(global_storage)
+        )
+
+
+class AgentConfigCache:
+    """Process-wide cache of compiled agent configurations.
+
+    Entries are keyed by resolved file path and stay valid while the file,
+    the tool YAMLs and skills it references, and the ``${env.*}`` variables it
+    uses are unchanged.
+    """
+
+    def __init__(self) -> None:
+        self._entries: dict[Path, CompiledAgentConfig] = {}
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, config_path: str | Path) -> CompiledAgentConfig:
+        """Return the compiled config for a YAML file, compiling it if needed.
+
+        Raises:
+            ConfigError: If the file or one of its sub-agent configs is invalid
+        """
+        return self._get(Path(config_path).resolve(), ())
+
+    def invalidate(self, config_path: str | Path | None = None) -> None:
+        """Drop one cached entry, or all of them when no path is given."""
+        with self._lock:
+            if config_path is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(Path(config_path).resolve(), None)
+
+    def stats(self) -> dict[str, int]:
+        """Return entry, hit and miss counts."""
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+    def _get(self, path: Path, stack: tuple[Path, ...]) -> CompiledAgentConfig:
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and entry.is_current():
+                self.hits += 1
+                return entry
+
+            self.misses += 1
+            entry = self._compile(path, stack + (path,))
+            self._entries[path] = entry
+            return entry
+
+    def _compile(self, path: Path, stack: tuple[Path, ...]) -> CompiledAgentConfig:
+        if not path.exists():
+            raise ConfigError(f"Configuration file not found: {path}")
+
+        # Take the signature before reading so a concurrent edit invalidates the entry
+        dependencies: dict[Path, FileSignature] = {path: _file_signature(path)}
+        config_text = path.read_text(encoding="utf-8")
+        env = {name: os.environ.get(name) for name in sorted(set(_ENV_PLACEHOLDER_PATTERN.findall(config_text)))}
+
+        raw_config = _load_yaml_text_with_vars(config_text, path)
+        if not raw_config:
+            raise ConfigError(f"Empty or invalid configuration file: {path}")
+        config = normalize_agent_config_dict(raw_config)
+        compiled = CompiledAgentConfig(path=path, config=config, dependencies=dependencies, env=env)
+
+        for tool_config in config.get("tools", []):
+            yaml_path = tool_config.get("yaml_path")
+            if not yaml_path:
+                continue
+            tool_path = _resolve_config_path(yaml_path, path.parent)
+            try:
+                signature = _file_signature(tool_path)
+                compiled.tool_definitions[str(tool_path)] = Tool.load_definition(str(tool_path))
+            except Exception:
+                # Left to the builder, which reports the error against the tool name
+                continue
+            dependencies[tool_path] = signature
+
+        for skill_folder in config.get("skills", []):
+            folder = _resolve_config_path(skill_folder, path.parent)
+            try:
+                signature = _file_signature(folder / "SKILL.md")
+                compiled.skills[str(folder)] = Skill.from_folder(folder)
+            except Exception:
+                continue
+            dependencies[folder / "SKILL.md"] = signature
+
+        for sub_config in config.get("sub_agents", []):
+            sub_path = _resolve_config_path(sub_config["config_path"], path.parent).resolve()
+            if sub_path in stack:
+                # Recursive agent trees are compiled once, on their first visit
+                continue
+            try:
+                compiled.sub_agents[sub_config["name"]] = self._get(sub_path, stack)
+            except ConfigError as e:
+                raise ConfigError(f"Error loading sub-agent '{sub_config['name']}': {e}") from e
 
-    normalize_agent_config_dict(config)
-    _validated_agent_paths.add(resolved)
+        logger.debug(f"📦 Compiled agent config {path}")
+        return compiled
 
 
-_validated_agent_paths: set[Path] = set()
+# Global instance
+agent_config_cache = AgentConfigCache()
@@ -12,6 +12,16 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+from .client_registry import LLMClientRegistry, llm_client_registry
 from .llm_config import LLMConfig
+from .retry_policy import CircuitOpenError, EndpointGuardRegistry, RetryPolicy, endpoint_guards
 
-__all__ = ["LLMConfig"]
+__all__ = [
+    "LLMConfig",
+    "LLMClientRegistry",
+    "llm_client_registry",
+    "RetryPolicy",
+    "CircuitOpenError",
+    "EndpointGuardRegistry",
+    "endpoint_guards",
+]
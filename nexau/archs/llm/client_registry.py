@@ -0,0 +1,234 @@
+# Copyright (c) Nex-AGI. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Process-wide registry of pooled LLM SDK clients."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+from typing import Any
+
+import anthropic
+import httpx
+import openai
+
+from .llm_config import LLMConfig
+
+logger = logging.getLogger(__name__)
+
+ClientKey = tuple[str, str | None, str | None, float | None, bool]
+
+_OPENAI_API_TYPES = ("openai_responses", "openai_chat_completion")
+_ANTHROPIC_API_TYPE = "anthropic_chat_completion"
+
+
+class LLMClientRegistry:
+    """Hand out shared, connection-pooled SDK clients.
+
+    Clients are keyed by ``(api_type, base_url, api_key, timeout)`` plus
+    whether the async variant is requested, so every agent and sub-agent that
+    talks to the same endpoint reuses one HTTP connection pool instead of
+    paying for a new TLS handshake per Agent instance. The OpenAI and
+    Anthropic SDK clients are thread-safe; a config that only differs in
+    ``max_retries`` gets a lightweight copy that shares the same pool.
+
+    Async clients are bound to the event loop their connections were opened
+    on, so they are only shared within one running loop; each new loop (e.g.
+    every ``asyncio.run``) gets its own, and those of closed loops are
+    dropped. Only synchronous clients are shared process-wide.
+    """
+
+    def __init__(
+        self,
+        max_connections: int | None = 100,
+        max_keepalive_connections: int | None = 20,
+        keepalive_expiry: float | None = 30.0,
+    ):
+        """Initialize registry.
+
+        Args:
+            max_connections: Maximum concurrent connections per client
+            max_keepalive_connections: Maximum idle connections kept alive per client
+            keepalive_expiry: Seconds an idle connection is kept before closing
+        """
+        self._limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self._clients: dict[ClientKey, Any] = {}
+        self._async_clients: dict[asyncio.AbstractEventLoop, dict[ClientKey, Any]] = {}
+        self._lock = threading.Lock()
+        self._cleanup_registered = False
+
+    @property
+    def limits(self) -> httpx.Limits:
+        """Connection pool limits applied to newly created clients."""
+        return self._limits
+
+    def configure(
+        self,
+        max_connections: int | None = None,
+        max_keepalive_connections: int | None = None,
+        keepalive_expiry: float | None = None,
+    ) -> None:
+        """Change the pool limits used for clients created from now on.
+
+        Args:
+            max_connections: Maximum concurrent connections per client
+            max_keepalive_connections: Maximum idle connections kept alive per client
+            keepalive_expiry: Seconds an idle connection is kept before closing
+        """
+        with self._lock:
+            self._limits = httpx.Limits(
+                max_connections=max_connections if max_connections is not None else self._limits.max_connections,
+                max_keepalive_connections=(
+                    max_keepalive_connections if max_keepalive_connections is not None else self._limits.max_keepalive_connections
+                ),
+                keepalive_expiry=keepalive_expiry if keepalive_expiry is not None else self._limits.keepalive_expiry,
+            )
+
+    def get_client(self, llm_config: LLMConfig) -> Any:
+        """Return the shared synchronous client for ``llm_config``.
+
+        Raises:
+            ValueError: If the API type is not supported
+        """
+        return self._get(llm_config, asynchronous=False)
+
+    def get_async_client(self, llm_config: LLMConfig) -> Any:
+        """Return the async client for ``llm_config`` shared on the running event loop.
+
+        Outside a running loop a new, unshared client is returned.
+
+        Raises:
+            ValueError: If the API type is not supported
+        """
+        return self._get(llm_config, asynchronous=True)
+
+    def stats(self) -> dict[str, Any]:
+        """Return the number of pooled clients and the active pool limits."""
+        with self._lock:
+            return {
+                "clients": len(self._clients) + sum(len(clients) for clients in self._async_clients.values()),
+                "max_connections": self._limits.max_connections,
+                "max_keepalive_connections": self._limits.max_keepalive_connections,
+                "keepalive_expiry": self._limits.keepalive_expiry,
+            }
+
+    def close_all(self) -> None:
+        """Close every pooled synchronous client and forget all clients.
+
+        Async clients can only be closed on an event loop; use
+        :meth:`aclose_all` for them. Here they are only dropped.
+        """
+        with self._lock:
+            clients = list(self._clients.items())
+            self._clients.clear()
+            self._async_clients.clear()
+
+        for key, client in clients:
+            try:
+                client.close()
+            except Exception as e:
+                logger.error(f"❌ Error closing LLM client for {key[0]}: {e}")
+
+        if clients:
+            logger.info(f"🧹 Closed {len(clients)} pooled LLM client(s)")
+
+    async def aclose_all(self) -> None:
+        """Close every pooled client, awaiting the async ones of the running loop.
+
+        Async clients of other loops cannot be closed from here and are dropped.
+        """
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            clients = list(self._clients.items()) + list(self._async_clients.get(loop, {}).items())
+            self._clients.clear()
+            self._async_clients.clear()
+
+        for key, client in clients:
+            try:
+                if key[-1]:
+                    await client.close()
+                else:
+                    client.close()
+            except Exception as e:
+                logger.error(f"❌ Error closing LLM client for {key[0]}: {e}")
+
+    def _get(self, llm_config: LLMConfig, asynchronous: bool) -> Any:
+        key: ClientKey = (
+            llm_config.api_type,
+            llm_config.base_url,
+            llm_config.api_key,
+            llm_config.timeout,
+            asynchronous,
+        )
+        client_kwargs = llm_config.to_client_kwargs()
+        max_retries = client_kwargs.get("max_retries")
+
+        with self._lock:
+            clients = self._loop_clients() if asynchronous else self._clients
+            client = clients.get(key)
+            if client is None:
+                client = self._create_client(llm_config.api_type, client_kwargs, asynchronous)
+                clients[key] = client
+                logger.debug(f"🔌 Created pooled {'async ' if asynchronous else ''}LLM client for {llm_config.api_type}")
+            self._register_cleanup()
+
+        if max_retries is not None and max_retries != getattr(client, "max_retries", None):
+            # Shares the underlying HTTP client, so the connection pool is reused
+            return client.with_options(max_retries=max_retries)
+        return client
+
+    def _loop_clients(self) -> dict[ClientKey, Any]:
+        """Async clients of the running loop; called with the lock held."""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # Not on a loop yet: the caller gets a client nobody else will share
+            return {}
+        for closed in [other for other in self._async_clients if other.is_closed()]:
+            # Their connections died with the loop; they cannot even be closed any more
+            del self._async_clients[closed]
+        return self._async_clients.setdefault(loop, {})
+
+    def _create_client(self, api_type: str, client_kwargs: dict[str, Any], asynchronous: bool) -> Any:
+        if api_type == _ANTHROPIC_API_TYPE:
+            sdk: Any = anthropic
+            client_cls = anthropic.AsyncAnthropic if asynchronous else anthropic.Anthropic
+        elif api_type in _OPENAI_API_TYPES:
+            sdk = openai
+            client_cls = openai.AsyncOpenAI if asynchronous else openai.OpenAI
+        else:
+            raise ValueError(f"Invalid API type: {api_type}")
+
+        http_client_cls = sdk.DefaultAsyncHttpxClient if asynchronous else sdk.DefaultHttpxClient
+        http_client = http_client_cls(limits=self._limits)
+        return client_cls(http_client=http_client, **client_kwargs)
+
+    def _register_cleanup(self) -> None:
+        if self._cleanup_registered:
+            return
+        # Imported lazily: the cleanup manager lives in main_sub, which imports this package
+        from nexau.archs.main_sub.utils.cleanup_manager import cleanup_manager
+
+        cleanup_manager.register_shutdown_hook(self.close_all)
+        self._cleanup_registered = True
+
+
+# Global instance
+llm_client_registry = LLMClientRegistry()
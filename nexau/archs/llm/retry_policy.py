@@ -0,0 +1,435 @@
+# Copyright (c) Nex-AGI. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Retry policy, circuit breaker and rate limiting shared by all LLM callers."""
+
+from __future__ import annotations
+
+import logging
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from email.utils import parsedate_to_datetime
+from enum import Enum
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+EndpointKey = tuple[str | None, str | None, str | None]
+
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+_DURATION_UNITS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+
+class ErrorClass(Enum):
+    """How a failed LLM call should be treated."""
+
+    RATE_LIMIT = "rate_limit"
+    OVERLOADED = "overloaded"
+    SERVER = "server"
+    TIMEOUT = "timeout"
+    CONNECTION = "connection"
+    CLIENT = "client"
+    CIRCUIT_OPEN = "circuit_open"
+    UNKNOWN = "unknown"
+
+
+# Failures that say something about the endpoint's health
+_BREAKER_ERRORS = {ErrorClass.OVERLOADED, ErrorClass.SERVER, ErrorClass.TIMEOUT, ErrorClass.CONNECTION}
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an endpoint whose circuit breaker is open."""
+
+    def __init__(self, endpoint: str, retry_after: float):
+        super().__init__(f"Circuit breaker open for {endpoint}; retry in {retry_after:.1f}s")
+        self.retry_after = retry_after
+
+
+@dataclass
+class RetryDecision:
+    """Outcome of classifying a failed attempt."""
+
+    retry: bool
+    delay: float
+    error_class: ErrorClass
+    retry_after: float | None = None
+
+
+def _status_code(error: BaseException) -> int | None:
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    return status if isinstance(status, int) else None
+
+
+def classify_error(error: BaseException) -> ErrorClass:
+    """Classify an exception raised by an LLM call.
+
+    Works on OpenAI, Anthropic and httpx exceptions without importing the
+    SDKs, by looking at the HTTP status and the exception class hierarchy.
+    """
+    if isinstance(error, CircuitOpenError):
+        return ErrorClass.CIRCUIT_OPEN
+
+    status = _status_code(error)
+    if status is not None:
+        if status == 429:
+            return ErrorClass.RATE_LIMIT
+        if status in (503, 529):
+            return ErrorClass.OVERLOADED
+        if status >= 500:
+            return ErrorClass.SERVER
+        if status == 408:
+            return ErrorClass.TIMEOUT
+        if status == 409:
+            return ErrorClass.UNKNOWN
+        if status >= 400:
+            return ErrorClass.CLIENT
+
+    names = {cls.__name__ for cls in type(error).__mro__}
+    if names & {"APITimeoutError", "TimeoutException", "TimeoutError"}:
+        return ErrorClass.TIMEOUT
+    if names & {"APIConnectionError", "TransportError", "ConnectionError"}:
+        return ErrorClass.CONNECTION
+    return ErrorClass.UNKNOWN
+
+
+def _parse_duration(value: str) -> float | None:
+    """Parse ``x-ratelimit-reset-*`` durations such as ``1s``, ``6m0s`` or ``20ms``."""
+    parts = _DURATION_PART.findall(value)
+    if not parts or "".join(number + unit for number, unit in parts) != value.strip():
+        return None
+    return sum(float(number) * _DURATION_UNITS[unit] for number, unit in parts)
+
+
+def retry_after_seconds(error: BaseException) -> float | None:
+    """Return the server-requested wait from the error's response headers, if any.
+
+    Honors ``retry-after-ms``, ``retry-after`` (seconds or HTTP date) and, for
+    exhausted limits, the OpenAI-style ``x-ratelimit-reset-*`` headers.
+    """
+    headers = getattr(getattr(error, "response", None), "headers", None)
+    if headers is None:
+        return None
+
+    value = headers.get("retry-after-ms")
+    if value is not None:
+        try:
+            return max(0.0, float(value) / 1000)
+        except ValueError:
+            pass
+
+    value = headers.get("retry-after")
+    if value is not None:
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            try:
+                retry_at = parsedate_to_datetime(value)
+                return max(0.0, (retry_at - datetime.now(retry_at.tzinfo)).total_seconds())
+            except (TypeError, ValueError):
+                pass
+
+    waits = []
+    for limit in ("requests", "tokens"):
+        if headers.get(f"x-ratelimit-remaining-{limit}") != "0":
+            continue
+        reset = headers.get(f"x-ratelimit-reset-{limit}")
+        wait = _parse_duration(reset) if reset else None
+        if wait is not None:
+            waits.append(wait)
+    return max(waits) if waits else None
+
+
+class RetryPolicy:
+    """Decide whether and how long to wait before retrying an LLM call.
+
+    Backoff uses full jitter, a uniform draw from ``[0, base * 2**attempt]``
+    capped at ``max_delay``, so parallel agents that failed together do not
+    retry together. A server-provided wait replaces the exponential backoff
+    and gets a small jitter on top.
+    """
+
+    def __init__(
+        self,
+        base_delay: float = 1.0,
+        max_delay: float = 60.0,
+        max_retry_after: float = 300.0,
+        rng: random.Random | None = None,
+    ):
+        """Initialize retry policy.
+
+        Args:
+            base_delay: Backoff ceiling for the first retry, in seconds
+            max_delay: Upper bound for jittered backoff, in seconds
+            max_retry_after: Longest server-requested wait that is still honored;
+                longer waits fail the call instead
+            rng: Random source, for reproducible delays
+        """
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_retry_after = max_retry_after
+        self._rng = rng or random.Random()
+
+    def decide(self, error: BaseException, attempt: int) -> RetryDecision:
+        """Classify ``error`` from the zero-based ``attempt`` and pick a delay."""
+        error_class = classify_error(error)
+        if error_class is ErrorClass.CLIENT:
+            return RetryDecision(retry=False, delay=0.0, error_class=error_class)
+
+        if isinstance(error, CircuitOpenError):
+            hinted: float | None = error.retry_after
+        else:
+            hinted = retry_after_seconds(error)
+
+        if hinted is not None:
+            if hinted > self.max_retry_after:
+                return RetryDecision(retry=False, delay=0.0, error_class=error_class, retry_after=hinted)
+            delay = hinted + self._rng.uniform(0, self.base_delay)
+            return RetryDecision(retry=True, delay=delay, error_class=error_class, retry_after=hinted)
+
+        ceiling = min(self.max_delay, self.base_delay * 2**attempt)
+        return RetryDecision(retry=True, delay=self._rng.uniform(0, ceiling), error_class=error_class)
+
+
+class CircuitBreaker:
+    """Stop calling an endpoint after repeated failures, then probe it again.
+
+    After ``failure_threshold`` consecutive endpoint failures the circuit
+    opens and calls fail fast with :class:`CircuitOpenError`. Once
+    ``recovery_timeout`` has passed a single probe call is let through; its
+    success closes the circuit, any other outcome (an endpoint failure, a
+    rate limit, a client error or cancellation) opens it again.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int = 5, recovery_timeout: float = 30.0):
+        """Initialize circuit breaker.
+
+        Args:
+            name: Endpoint name, used in errors and logs
+            failure_threshold: Consecutive failures that open the circuit
+            recovery_timeout: Seconds the circuit stays open before a probe
+        """
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.recovery_timeout = recovery_timeout
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        """Current state: closed, open or half_open."""
+        with self._lock:
+            return self._state
+
+    def before_call(self) -> bool:
+        """Raise :class:`CircuitOpenError` unless a call may go through now.
+
+        Returns:
+            True if the call is the half-open probe; pass it to :meth:`end_probe` once the call ends
+        """
+        with self._lock:
+            if self._state == self.CLOSED:
+                return False
+            remaining = self._opened_at + self.recovery_timeout - time.monotonic()
+            if self._state == self.OPEN and remaining <= 0:
+                self._state = self.HALF_OPEN
+                logger.info(f"🔌 Circuit breaker for {self.name} half-open, probing")
+                return True
+            raise CircuitOpenError(self.name, max(remaining, 0.0) if self._state == self.OPEN else self.recovery_timeout)
+
+    def record_success(self) -> None:
+        """Close the circuit after a successful call."""
+        with self._lock:
+            if self._state != self.CLOSED:
+                logger.info(f"✅ Circuit breaker for {self.name} closed")
+            self._state = self.CLOSED
+            self._failures = 0
+
+    def record_failure(self) -> None:
+        """Count an endpoint failure, opening the circuit at the threshold."""
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    logger.warning(f"⚠️ Circuit breaker for {self.name} opened after {self._failures} failure(s)")
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+
+    def end_probe(self) -> None:
+        """Open the circuit again if the probe ended without closing it.
+
+        Called when the probe call finishes however it finished, so a probe
+        that was rate limited, rejected or cancelled cannot leave the circuit
+        half-open with no probe running.
+        """
+        with self._lock:
+            if self._state == self.HALF_OPEN:
+                logger.warning(f"⚠️ Circuit breaker for {self.name} reopened, probe did not succeed")
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+
+
+class TokenBucket:
+    """Request rate limiter shared by every caller of one endpoint.
+
+    ``reserve`` takes a token and returns how long the caller must wait for
+    it, so the same bucket serves threads and event loops. ``pause`` holds
+    back all callers, e.g. for a rate-limit response's ``Retry-After``.
+    """
+
+    def __init__(self, rate: float | None = None, capacity: float | None = None):
+        """Initialize token bucket.
+
+        Args:
+            rate: Requests per second; None disables rate limiting
+            capacity: Burst size; defaults to one second worth of requests
+        """
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate or 1.0)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Take one token and return the seconds to wait before using it."""
+        with self._lock:
+            now = time.monotonic()
+            wait = max(0.0, self._paused_until - now)
+            if not self.rate:
+                return wait
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            if self._tokens < 0:
+                wait = max(wait, -self._tokens / self.rate)
+            return wait
+
+    def pause(self, seconds: float) -> None:
+        """Hold back every caller for ``seconds``."""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+
+class EndpointGuard:
+    """Circuit breaker and token bucket for one LLM endpoint."""
+
+    def __init__(self, name: str, breaker: CircuitBreaker, bucket: TokenBucket):
+        self.name = name
+        self.breaker = breaker
+        self.bucket = bucket
+
+    def start_call(self) -> tuple[float, bool]:
+        """Check the circuit and reserve a rate-limit slot.
+
+        Returns:
+            Seconds to wait for the slot, and whether the call is the circuit's
+            probe; a probe must be passed to :meth:`finish_call` in a ``finally``
+
+        Raises:
+            CircuitOpenError: If the endpoint's circuit is open
+        """
+        probe = self.breaker.before_call()
+        return self.bucket.reserve(), probe
+
+    def finish_call(self, probe: bool) -> None:
+        """Resolve the circuit's probe once the call has ended, whatever the outcome."""
+        if probe:
+            self.breaker.end_probe()
+
+    def record_success(self) -> None:
+        """Report a successful call."""
+        self.breaker.record_success()
+
+    def record_failure(self, decision: RetryDecision) -> None:
+        """Report a failed call classified by the retry policy."""
+        if decision.error_class in _BREAKER_ERRORS:
+            self.breaker.record_failure()
+        if decision.error_class is ErrorClass.RATE_LIMIT and decision.retry_after:
+            # Every agent on this endpoint backs off, not only the one that hit the limit
+            self.bucket.pause(decision.retry_after)
+
+
+class EndpointGuardRegistry:
+    """Process-wide endpoint guards, keyed by ``(api_type, base_url, model)``."""
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        recovery_timeout: float = 30.0,
+        requests_per_second: float | None = None,
+        burst: float | None = None,
+    ):
+        """Initialize registry.
+
+        Args:
+            failure_threshold: Consecutive failures that open an endpoint's circuit
+            recovery_timeout: Seconds a circuit stays open before a probe
+            requests_per_second: Per-endpoint request rate; None means unlimited
+            burst: Token bucket capacity
+        """
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.requests_per_second = requests_per_second
+        self.burst = burst
+        self._guards: dict[EndpointKey, EndpointGuard] = {}
+        self._lock = threading.Lock()
+
+    def configure(self, **settings: Any) -> None:
+        """Change settings for guards created from now on and drop existing ones."""
+        with self._lock:
+            for name, value in settings.items():
+                if not hasattr(self, name) or name.startswith("_"):
+                    raise ValueError(f"Unknown endpoint guard setting: {name}")
+                setattr(self, name, value)
+            self._guards.clear()
+
+    def get(self, llm_config: Any) -> EndpointGuard:
+        """Return the shared guard for ``llm_config``'s endpoint."""
+        key: EndpointKey = (
+            getattr(llm_config, "api_type", None),
+            getattr(llm_config, "base_url", None),
+            getattr(llm_config, "model", None),
+        )
+        with self._lock:
+            guard = self._guards.get(key)
+            if guard is None:
+                name = f"{key[1] or key[0]} ({key[2]})"
+                guard = EndpointGuard(
+                    name,
+                    CircuitBreaker(name, self.failure_threshold, self.recovery_timeout),
+                    TokenBucket(self.requests_per_second, self.burst),
+                )
+                self._guards[key] = guard
+            return guard
+
+    def reset(self) -> None:
+        """Forget all endpoint state."""
+        with self._lock:
+            self._guards.clear()
+
+
+# Global instance
+endpoint_guards = EndpointGuardRegistry()
@@ -14,21 +14,30 @@
 
 """Refactored Agent implementation for the NexAU framework."""
 
+import asyncio
 import copy
 import logging
+import threading
 import uuid
-from collections.abc import Callable
+from collections.abc import AsyncIterator, Callable, Iterator
+from contextvars import copy_context
 from typing import Any, Literal
 
-import anthropic
-import openai
-
+from nexau.archs.llm.client_registry import llm_client_registry
 from nexau.archs.llm.llm_config import LLMConfig
 from nexau.archs.main_sub.agent_context import AgentContext, GlobalStorage
 from nexau.archs.main_sub.agent_state import AgentState
 from nexau.archs.main_sub.config import AgentConfig, ExecutionConfig
+from nexau.archs.main_sub.execution.batch_cache import DEFAULT_BATCH_CACHE_MAX_AGE, DEFAULT_BATCH_CACHE_SIZE_LIMIT
 from nexau.archs.main_sub.execution.executor import Executor
+from nexau.archs.main_sub.execution.stream_events import AgentEventStream, StreamEvent, StreamEventType
 from nexau.archs.main_sub.prompt_builder import PromptBuilder
+from nexau.archs.main_sub.prompt_cache import (
+    prompt_cache,
+    system_prompt_fingerprint,
+    system_prompt_is_cacheable,
+    tool_payload_fingerprint,
+)
 from nexau.archs.main_sub.skill import Skill
 from nexau.archs.main_sub.sub_agent_naming import build_sub_agent_tool_name
 from nexau.archs.main_sub.tool_call_modes import (
@@ -36,6 +45,7 @@ from nexau.archs.main_sub.tool_call_modes import (
     normalize_tool_call_mode,
 )
 from nexau.archs.main_sub.utils.cleanup_manager import cleanup_manager
+from nexau.archs.main_sub.utils.logging_utils import configure_logging_from_env
 from nexau.archs.main_sub.utils.token_counter import TokenCounter
 from nexau.archs.tracer.context import TraceContext
 from nexau.archs.tracer.core import BaseTracer, SpanType
@@ -50,6 +60,7 @@ if not logger.handlers:
     handler.setFormatter(formatter)
     logger.addHandler(handler)
     logger.setLevel(logging.INFO)
+configure_logging_from_env()
 
 
 class Agent:
@@ -78,7 +89,14 @@ class Agent:
 
         self.tool_call_mode = normalize_tool_call_mode(self.exec_config.tool_call_mode)
         self.use_structured_tool_calls = self.tool_call_mode in STRUCTURED_TOOL_CALL_MODES
-        self.tool_call_payload = self._build_tool_call_payload() if self.use_structured_tool_calls else []
+        self.tool_call_payload = (
+            prompt_cache.get_tool_payload(
+                tool_payload_fingerprint(self.tool_call_mode, self.config.tools, self.config.sub_agent_factories or {}),
+                self._build_tool_call_payload,
+            )
+            if self.use_structured_tool_calls
+            else []
+        )
 
         # Initialize services
         self.openai_client = self._initialize_openai_client()
@@ -114,10 +132,6 @@ class Agent:
 
     def _initialize_openai_client(self) -> Any:
         """Initialize OpenAI client from LLM config."""
-        if openai is None:
-            logger.warning("⚠️ OpenAI package not available")
-            return None
-
         # Guard clause
         if isinstance(self.config.llm_config, dict):
             llm_config = LLMConfig(**self.config.llm_config)
@@ -127,14 +141,8 @@ class Agent:
             llm_config = LLMConfig()
 
         try:
-            if llm_config.api_type == "anthropic_chat_completion":
-                client_kwargs = llm_config.to_client_kwargs()
-                return anthropic.Anthropic(**client_kwargs)
-            elif llm_config.api_type in ["openai_responses", "openai_chat_completion"]:
-                client_kwargs = llm_config.to_client_kwargs()
-                return openai.OpenAI(**client_kwargs)
-            else:
-                raise ValueError(f"Invalid API type: {llm_config.api_type}")
+            # Shared across agents and sub-agents so connection pools stay warm
+            return llm_client_registry.get_client(llm_config)
         except Exception as e:
             logger.error(f"❌ Failed to initialize OpenAI client: {e}")
             return None
@@ -274,6 +282,11 @@ class Agent:
             max_iterations=self.exec_config.max_iterations,
             max_context_tokens=self.exec_config.max_context_tokens,
             max_running_subagents=self.exec_config.max_running_subagents,
+            max_tool_workers=self.exec_config.max_tool_workers,
+            max_batch_workers=self.exec_config.max_batch_workers,
+            sub_agent_pool_min_size=self.exec_config.sub_agent_pool_min_size,
+            sub_agent_pool_max_size=self.exec_config.sub_agent_pool_max_size,
+            sub_agent_pool_idle_timeout=self.exec_config.sub_agent_pool_idle_timeout,
             retry_attempts=self.exec_config.retry_attempts,
             token_counter=token_counter,
             after_model_hooks=self.config.after_model_hooks,
@@ -284,6 +297,15 @@ class Agent:
             global_storage=self.global_storage,
             tool_call_mode=self.tool_call_mode,
             openai_tools=self.tool_call_payload,
+            stream_tool_dispatch=self.exec_config.stream_tool_dispatch,
+            adaptive_concurrency=self.exec_config.adaptive_concurrency,
+            max_adaptive_concurrency=self.exec_config.max_adaptive_concurrency,
+            batch_cache_dir=self.exec_config.batch_cache_dir,
+            batch_cache_max_age=self.exec_config.batch_cache_max_age,
+            batch_cache_size_limit=self.exec_config.batch_cache_size_limit,
+            batch_processes=self.exec_config.batch_processes,
+            batch_shards=self.exec_config.batch_shards,
+            batch_work_dir=self.exec_config.batch_work_dir,
         )
 
     def _resolve_token_counter(self) -> TokenCounter:
@@ -293,7 +315,8 @@ class Agent:
             return configured_counter
 
         if callable(configured_counter):
-            custom_counter = TokenCounter()
+            # The fallback strategy skips loading a tiktoken encoding that would be replaced anyway
+            custom_counter = TokenCounter(strategy="fallback")
             custom_counter._counter = configured_counter  # type: ignore[attr-defined]
             return custom_counter
 
@@ -312,18 +335,7 @@ class Agent:
         logger.info(f"🤖 Agent '{self.config.name}' starting execution")
         logger.info(f"📝 User message: {message}")
 
-        # Merge initial state/config/context with provided ones
-        merged_state = {**(self.config.initial_state or {})}
-        if state:
-            merged_state.update(state)
-
-        merged_config = {**(self.config.initial_config or {})}
-        if config:
-            merged_config.update(config)
-
-        merged_context = {**(self.config.initial_context or {})}
-        if context:
-            merged_context.update(context)
+        merged_context = self._merge_run_inputs(context, state, config)
 
         # Get tracer from global storage
         tracer: BaseTracer | None = self.global_storage.get("tracer")
@@ -333,30 +345,7 @@ class Agent:
 
         # Create agent context
         with AgentContext(context=merged_context) as ctx:
-            # Build and add system prompt to history
-            system_prompt = self.prompt_builder.build_system_prompt(
-                agent_config=self.config,
-                tools=self.config.tools,
-                sub_agent_factories=self.config.sub_agent_factories,
-                runtime_context=merged_context,
-                include_tool_instructions=not self.use_structured_tool_calls,
-            )
-            if not self.history:
-                self.history = [{"role": "system", "content": system_prompt}]
-
-            if history:
-                self.history.extend(history)
-
-            self.history.append({"role": "user", "content": message})
-
-            # Create the AgentState instance
-            agent_state = AgentState(
-                agent_name=self._agent_name,
-                agent_id=self._agent_id,
-                context=ctx,
-                global_storage=self.global_storage,
-                parent_agent_state=parent_agent_state,
-            )
+            agent_state = self._prepare_run(message, history, merged_context, ctx, parent_agent_state)
 
             # Execute with or without tracing
             if tracer:
@@ -370,6 +359,220 @@ class Agent:
             else:
                 return self._run_inner(agent_state, merged_context)
 
+    async def arun(
+        self,
+        message: str,
+        history: list[dict] | None = None,
+        context: dict | None = None,
+        state: dict[str, Any] | None = None,
+        config: dict[str, Any] | None = None,
+        parent_agent_state: AgentState | None = None,
+    ) -> str:
+        """Run agent with a message on the current event loop and return response.
+
+        Async counterpart of :meth:`run`. LLM calls, coroutine and MCP tools and
+        sub-agents are awaited natively, so many agents can run concurrently in
+        one process. Each concurrent session should use its own Agent instance.
+        """
+        logger.info(f"🤖 Agent '{self.config.name}' starting async execution")
+        logger.info(f"📝 User message: {message}")
+
+        merged_context = self._merge_run_inputs(context, state, config)
+
+        tracer: BaseTracer | None = self.global_storage.get("tracer")
+        span_type = SpanType.SUB_AGENT if parent_agent_state else SpanType.AGENT
+
+        with AgentContext(context=merged_context) as ctx:
+            agent_state = self._prepare_run(message, history, merged_context, ctx, parent_agent_state)
+
+            if tracer:
+                return await self._arun_with_tracing(
+                    tracer=tracer,
+                    span_type=span_type,
+                    message=message,
+                    agent_state=agent_state,
+                    merged_context=merged_context,
+                )
+            else:
+                return await self._arun_inner(agent_state, merged_context)
+
+    def run_stream(
+        self,
+        message: str,
+        history: list[dict] | None = None,
+        context: dict | None = None,
+        state: dict[str, Any] | None = None,
+        config: dict[str, Any] | None = None,
+        max_pending_events: int = 256,
+    ) -> Iterator[StreamEvent]:
+        """Run agent with a message and yield normalized events as they happen.
+
+        The run executes on a worker thread and hands events over through a
+        bounded :class:`AgentEventStream`: while ``max_pending_events`` are
+        unread, the model stream and tool reporting wait for the consumer.
+        Sub-agents report into the same stream. The last event is ``done``
+        with the response, or ``error`` if the run raised.
+
+        Closing the iterator early discards further events but waits for the
+        run to finish, so the agent's history stays consistent.
+
+        Yields:
+            StreamEvent for text and reasoning deltas, tool calls, tool results
+            and sub-agent lifecycle
+        """
+        stream = AgentEventStream(max_pending=max_pending_events)
+
+        def produce() -> None:
+            with stream.activate():
+                try:
+                    response = self.run(message, history=history, context=context, state=state, config=config)
+                except Exception as e:
+                    stream.emit(self._final_stream_event(StreamEventType.ERROR, error=str(e)))
+                else:
+                    stream.emit(self._final_stream_event(StreamEventType.DONE, response=response))
+                finally:
+                    stream.finish()
+
+        # Run in a copy of the caller's context so the current trace span is inherited
+        worker = threading.Thread(
+            target=copy_context().run,
+            args=(produce,),
+            name=f"nexau-stream-{self._agent_name}",
+            daemon=True,
+        )
+        worker.start()
+        try:
+            yield from stream
+        finally:
+            stream.close()
+            worker.join()
+
+    async def arun_stream(
+        self,
+        message: str,
+        history: list[dict] | None = None,
+        context: dict | None = None,
+        state: dict[str, Any] | None = None,
+        config: dict[str, Any] | None = None,
+        max_pending_events: int = 256,
+    ) -> AsyncIterator[StreamEvent]:
+        """Async counterpart of :meth:`run_stream` running :meth:`arun` on the current loop.
+
+        Async model streams pause between chunks while the consumer is behind.
+        """
+        stream = AgentEventStream(max_pending=max_pending_events)
+
+        async def produce() -> None:
+            with stream.activate():
+                try:
+                    response = await self.arun(message, history=history, context=context, state=state, config=config)
+                except Exception as e:
+                    stream.emit(self._final_stream_event(StreamEventType.ERROR, error=str(e)))
+                else:
+                    stream.emit(self._final_stream_event(StreamEventType.DONE, response=response))
+                finally:
+                    stream.finish()
+
+        task = asyncio.create_task(produce())
+        try:
+            async for event in stream:
+                yield event
+        finally:
+            stream.close()
+            await task
+
+    def _final_stream_event(self, event_type: StreamEventType, **data: Any) -> StreamEvent:
+        return StreamEvent(type=event_type, agent_name=self._agent_name, agent_id=self._agent_id, data=data)
+
+    def _merge_run_inputs(
+        self,
+        context: dict | None,
+        state: dict[str, Any] | None,
+        config: dict[str, Any] | None,
+    ) -> dict[str, Any]:
+        """Merge initial state/config/context with provided ones and return the context."""
+        merged_state = {**(self.config.initial_state or {})}
+        if state:
+            merged_state.update(state)
+
+        merged_config = {**(self.config.initial_config or {})}
+        if config:
+            merged_config.update(config)
+
+        merged_context = {**(self.config.initial_context or {})}
+        if context:
+            merged_context.update(context)
+        return merged_context
+
+    def _prepare_run(
+        self,
+        message: str,
+        history: list[dict] | None,
+        merged_context: dict[str, Any],
+        ctx: AgentContext,
+        parent_agent_state: AgentState | None,
+    ) -> AgentState:
+        """Add the system prompt, history and user message, then build the AgentState."""
+        # Build and add system prompt to history
+        if not self.history:
+
+            def build_system_prompt() -> str:
+                return self.prompt_builder.build_system_prompt(
+                    agent_config=self.config,
+                    tools=self.config.tools,
+                    sub_agent_factories=self.config.sub_agent_factories,
+                    runtime_context=merged_context,
+                    include_tool_instructions=not self.use_structured_tool_calls,
+                )
+
+            if system_prompt_is_cacheable(self.config, merged_context):
+                # Shared across runs and agent instances so the request prefix stays byte-identical
+                system_prompt = prompt_cache.get_system_prompt(
+                    system_prompt_fingerprint(
+                        self.config,
+                        self.config.tools,
+                        self.config.sub_agent_factories or {},
+                        merged_context,
+                        include_tool_instructions=not self.use_structured_tool_calls,
+                    ),
+                    build_system_prompt,
+                )
+            else:
+                # Time-varying built-ins such as {{ timestamp }} are rendered per run
+                system_prompt = build_system_prompt()
+            self.history = [{"role": "system", "content": system_prompt}]
+
+        if history:
+            self.history.extend(history)
+
+        self.history.append({"role": "user", "content": message})
+
+        # Create the AgentState instance
+        return AgentState(
+            agent_name=self._agent_name,
+            agent_id=self._agent_id,
+            context=ctx,
+            global_storage=self.global_storage,
+            parent_agent_state=parent_agent_state,
+        )
+
+    def _build_agent_trace_context(
+        self,
+        tracer: BaseTracer,
+        span_type: SpanType,
+        message: str,
+    ) -> TraceContext:
+        span_name = f"Agent: {self._agent_name}"
+        inputs = {
+            "message": message,
+            "agent_id": self._agent_id,
+        }
+        attributes = {
+            "agent_name": self._agent_name,
+            "model": getattr(self.config.llm_config, "model", None),
+        }
+        return TraceContext(tracer, span_name, span_type, inputs, attributes)
+
     def _run_with_tracing(
         self,
         tracer: BaseTracer,
@@ -390,17 +593,7 @@ class Agent:
         Returns:
             Agent response string
         """
-        span_name = f"Agent: {self._agent_name}"
-        inputs = {
-            "message": message,
-            "agent_id": self._agent_id,
-        }
-        attributes = {
-            "agent_name": self._agent_name,
-            "model": getattr(self.config.llm_config, "model", None),
-        }
-
-        trace_ctx = TraceContext(tracer, span_name, span_type, inputs, attributes)
+        trace_ctx = self._build_agent_trace_context(tracer, span_type, message)
         with trace_ctx:
             try:
                 response = self._run_inner(agent_state, merged_context)
@@ -411,6 +604,21 @@ class Agent:
                 # TraceContext will handle the error, but we still need to re-raise
                 raise
 
+    async def _arun_with_tracing(
+        self,
+        tracer: BaseTracer,
+        span_type: SpanType,
+        message: str,
+        agent_state: AgentState,
+        merged_context: dict[str, Any],
+    ) -> str:
+        """Async counterpart of :meth:`_run_with_tracing`."""
+        trace_ctx = self._build_agent_trace_context(tracer, span_type, message)
+        with trace_ctx:
+            response = await self._arun_inner(agent_state, merged_context)
+            trace_ctx.set_outputs({"response": response})
+            return response
+
     def _run_inner(
         self,
         agent_state: AgentState,
@@ -431,40 +639,63 @@ class Agent:
                 self.history,
                 agent_state,
             )
-            self.history = updated_messages
+            return self._complete_run(response, updated_messages)
 
-            # Add final assistant response to history if not already included
-            if not self.history or self.history[-1]["role"] != "assistant" or self.history[-1]["content"] != response:
-                self.history.append(
-                    {"role": "assistant", "content": response},
-                )
+        except Exception as e:
+            return self._handle_run_error(e, merged_context)
 
-            logger.info(
-                f"✅ Agent '{self.config.name}' completed execution",
+    async def _arun_inner(
+        self,
+        agent_state: AgentState,
+        merged_context: dict[str, Any],
+    ) -> str:
+        """Async counterpart of :meth:`_run_inner`."""
+        try:
+            response, updated_messages = await self.executor.aexecute(
+                self.history,
+                agent_state,
             )
-            return response
+            return self._complete_run(response, updated_messages)
 
         except Exception as e:
-            logger.error(
-                f"❌ Agent '{self.config.name}' encountered error: {e}",
+            return self._handle_run_error(e, merged_context)
+
+    def _complete_run(self, response: str, updated_messages: list[dict[str, Any]]) -> str:
+        self.history = updated_messages
+
+        # Add final assistant response to history if not already included
+        if not self.history or self.history[-1]["role"] != "assistant" or self.history[-1]["content"] != response:
+            self.history.append(
+                {"role": "assistant", "content": response},
             )
 
-            if self.config.error_handler:
-                error_response = self.config.error_handler(
-                    e,
-                    self,
-                    merged_context,
-                )
-                self.history.append(
-                    {"role": "assistant", "content": error_response},
-                )
-                return error_response
-            else:
-                error_message = f"Error: {str(e)}"
-                self.history.append(
-                    {"role": "assistant", "content": error_message},
-                )
-                raise
+        logger.info(
+            f"✅ Agent '{self.config.name}' completed execution",
+        )
+        return response
+
+    def _handle_run_error(self, e: Exception, merged_context: dict[str, Any]) -> str:
+        """Record the error in history and return the handler's response, or re-raise."""
+        logger.error(
+            f"❌ Agent '{self.config.name}' encountered error: {e}",
+        )
+
+        if self.config.error_handler:
+            error_response = self.config.error_handler(
+                e,
+                self,
+                merged_context,
+            )
+            self.history.append(
+                {"role": "assistant", "content": error_response},
+            )
+            return error_response
+        else:
+            error_message = f"Error: {str(e)}"
+            self.history.append(
+                {"role": "assistant", "content": error_message},
+            )
+            raise e
 
     def add_tool(self, tool) -> None:
         """Add a tool to the agent."""
@@ -481,6 +712,25 @@ class Agent:
         """Enqueue a message to be added to the history."""
         self.executor.enqueue_message(message)
 
+    def reset(self) -> None:
+        """Clear conversation state so this instance can serve a new, unrelated run.
+
+        Configuration, tools, clients and sub-agent factories are kept, which is
+        what makes reusing an instance cheaper than building a new one. A
+        configured agent id is kept; an instance without one gets a new id, so
+        traces and stream events of the next run are not attributed to the
+        previous one.
+
+        Raises:
+            RuntimeError: If the agent has been stopped
+        """
+        self.executor.reset()
+        self.history = []
+        self.queued_messages = []
+        if not self.config.agent_id:
+            self._agent_id = str(uuid.uuid4())
+            self.executor.agent_id = self._agent_id
+
     def stop(self) -> None:
         """Clean up this agent and all its running sub-agents."""
         logger.info(
@@ -510,6 +760,11 @@ def create_agent(
     max_iterations: int = 100,
     max_context_tokens: int = 128000,
     max_running_subagents: int = 5,
+    max_tool_workers: int | None = None,
+    max_batch_workers: int | None = None,
+    sub_agent_pool_min_size: int = 0,
+    sub_agent_pool_max_size: int = 4,
+    sub_agent_pool_idle_timeout: float | None = 300.0,
     error_handler: Callable | None = None,
     retry_attempts: int = 5,
     timeout: int = 300,
@@ -532,6 +787,15 @@ def create_agent(
     # Global storage parameter
     global_storage: GlobalStorage | None = None,
     tool_call_mode: str = "xml",
+    stream_tool_dispatch: bool = False,
+    adaptive_concurrency: bool = False,
+    max_adaptive_concurrency: int | None = None,
+    batch_cache_dir: str | None = None,
+    batch_cache_max_age: float | None = DEFAULT_BATCH_CACHE_MAX_AGE,
+    batch_cache_size_limit: int = DEFAULT_BATCH_CACHE_SIZE_LIMIT,
+    batch_processes: int = 0,
+    batch_shards: int | None = None,
+    batch_work_dir: str | None = None,
     tracers: list[BaseTracer] | None = None,
     **llm_kwargs,
 ) -> Agent:
@@ -567,7 +831,21 @@ def create_agent(
         "max_iterations": max_iterations,
         "max_context_tokens": max_context_tokens,
         "max_running_subagents": max_running_subagents,
+        "max_tool_workers": max_tool_workers,
+        "max_batch_workers": max_batch_workers,
+        "sub_agent_pool_min_size": sub_agent_pool_min_size,
+        "sub_agent_pool_max_size": sub_agent_pool_max_size,
+        "sub_agent_pool_idle_timeout": sub_agent_pool_idle_timeout,
         "tool_call_mode": tool_call_mode,
+        "stream_tool_dispatch": stream_tool_dispatch,
+        "adaptive_concurrency": adaptive_concurrency,
+        "max_adaptive_concurrency": max_adaptive_concurrency,
+        "batch_cache_dir": batch_cache_dir,
+        "batch_cache_max_age": batch_cache_max_age,
+        "batch_cache_size_limit": batch_cache_size_limit,
+        "batch_processes": batch_processes,
+        "batch_shards": batch_shards,
+        "batch_work_dir": batch_work_dir,
         "retry_attempts": retry_attempts,
         "timeout": timeout,
         "tracers": tracers or [],
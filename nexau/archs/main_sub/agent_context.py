@@ -17,6 +17,7 @@
 import threading
 from collections.abc import Callable
 from contextlib import contextmanager
+from contextvars import ContextVar, Token
 from typing import Any
 
 
@@ -26,32 +27,22 @@ class AgentContext:
     def __init__(self, context: dict[str, Any] | None = None):
         """Initialize agent context with context."""
         self.context = context or {}
-        self._original_context = None
+        self._token: Token[AgentContext | None] | None = None
 
         # Track if context has been modified (for prompt refresh)
         self._context_modified = False
         self._modification_callbacks: list[Callable] = []
 
     def __enter__(self):
-        """Enter the context and set the thread-local context."""
-        global _current_context
-        self._original_context = _current_context.context.copy() if _current_context else {}
-
-        # Set current context
-        _current_context = self
+        """Enter the context and make it current for this thread or task."""
+        self._token = _current_context.set(self)
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
-        """Exit the context and restore previous context."""
-        global _current_context
-        if self._original_context is not None:
-            # Restore previous context if it existed
-            if self._original_context:
-                _current_context = AgentContext(self._original_context)
-            else:
-                _current_context = None
-        else:
-            _current_context = None
+        """Exit the context and restore the previous one."""
+        if self._token is not None:
+            _current_context.reset(self._token)
+            self._token = None
 
     def update_context(self, updates: dict[str, Any]):
         """Update context with new values."""
@@ -107,36 +98,40 @@ class AgentContext:
         return merged
 
 
-# Thread-local storage for the current context
-_current_context: AgentContext | None = None
+# Current context, isolated per thread and per asyncio task so that concurrent
+# agent runs never observe each other's context
+_current_context: ContextVar[AgentContext | None] = ContextVar("agent_context", default=None)
 
 
 def get_context() -> AgentContext | None:
     """Get the current agent context."""
-    return _current_context
+    return _current_context.get()
 
 
 def get_context_dict() -> dict[str, Any]:
     """Get the current agent context dictionary."""
-    if _current_context is None:
+    current = _current_context.get()
+    if current is None:
         raise RuntimeError(
             "No agent context available. Make sure you're calling this within an agent context.",
         )
-    return _current_context.context
+    return current.context
 
 
 def get_context_variables() -> dict[str, Any]:
     """Get all context variables for prompt rendering."""
-    if _current_context is None:
+    current = _current_context.get()
+    if current is None:
         return {}
-    return _current_context.get_context_variables()
+    return current.get_context_variables()
 
 
 def merge_context_variables(existing_context: dict[str, Any]) -> dict[str, Any]:
     """Merge context variables with existing context."""
-    if _current_context is None:
+    current = _current_context.get()
+    if current is None:
         return existing_context
-    return _current_context.merge_context_variables(existing_context)
+    return current.merge_context_variables(existing_context)
 
 
 class GlobalStorage:
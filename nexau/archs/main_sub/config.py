@@ -29,6 +29,7 @@ from ..tool import Tool
 from ..tool.builtin.skill_tool import load_skill
 from ..tracer.composite import CompositeTracer
 from ..tracer.core import BaseTracer
+from .execution.batch_cache import DEFAULT_BATCH_CACHE_MAX_AGE, DEFAULT_BATCH_CACHE_SIZE_LIMIT
 from .tool_call_modes import normalize_tool_call_mode
 
 TTool = TypeVar("TTool")
@@ -88,8 +89,22 @@ class AgentConfigBase[TTool, TSkill, TSubAgent, THook](BaseModel):
     global_storage: dict[str, Any] = Field(default_factory=dict)
     max_context_tokens: int = Field(default=128000, ge=1)
     max_running_subagents: int = Field(default=5, ge=0)
+    max_tool_workers: int | None = Field(default=None, ge=1)
+    max_batch_workers: int | None = Field(default=None, ge=1)
+    sub_agent_pool_min_size: int = Field(default=0, ge=0)
+    sub_agent_pool_max_size: int = Field(default=4, ge=0)
+    sub_agent_pool_idle_timeout: float | None = Field(default=300.0, ge=0)
     max_iterations: int = Field(default=100, ge=1)
     tool_call_mode: str = "openai"
+    stream_tool_dispatch: bool = False
+    adaptive_concurrency: bool = False
+    max_adaptive_concurrency: int | None = Field(default=None, ge=1)
+    batch_cache_dir: str | None = None
+    batch_cache_max_age: float | None = Field(default=DEFAULT_BATCH_CACHE_MAX_AGE, gt=0)
+    batch_cache_size_limit: int = Field(default=DEFAULT_BATCH_CACHE_SIZE_LIMIT, ge=1)
+    batch_processes: int = Field(default=0, ge=0)
+    batch_shards: int | None = Field(default=None, ge=1)
+    batch_work_dir: str | None = None
     retry_attempts: int = Field(default=5, ge=0)
     timeout: int = Field(default=300, ge=1)
     tracers: list[Any] = Field(default_factory=list)
@@ -102,9 +117,23 @@ class ExecutionConfig:
     max_iterations: int = 100
     max_context_tokens: int = 128000
     max_running_subagents: int = 5
+    max_tool_workers: int | None = None
+    max_batch_workers: int | None = None
+    sub_agent_pool_min_size: int = 0
+    sub_agent_pool_max_size: int = 4
+    sub_agent_pool_idle_timeout: float | None = 300.0
     retry_attempts: int = 5
     timeout: int = 300
     tool_call_mode: str = "openai"
+    stream_tool_dispatch: bool = False
+    adaptive_concurrency: bool = False
+    max_adaptive_concurrency: int | None = None
+    batch_cache_dir: str | None = None
+    batch_cache_max_age: float | None = DEFAULT_BATCH_CACHE_MAX_AGE
+    batch_cache_size_limit: int = DEFAULT_BATCH_CACHE_SIZE_LIMIT
+    batch_processes: int = 0
+    batch_shards: int | None = None
+    batch_work_dir: str | None = None
 
     def __post_init__(self) -> None:
         """Validate execution configuration."""
@@ -118,9 +147,23 @@ class ExecutionConfig:
             max_iterations=agent_config.max_iterations,
             max_context_tokens=agent_config.max_context_tokens,
             max_running_subagents=agent_config.max_running_subagents,
+            max_tool_workers=agent_config.max_tool_workers,
+            max_batch_workers=agent_config.max_batch_workers,
+            sub_agent_pool_min_size=agent_config.sub_agent_pool_min_size,
+            sub_agent_pool_max_size=agent_config.sub_agent_pool_max_size,
+            sub_agent_pool_idle_timeout=agent_config.sub_agent_pool_idle_timeout,
             retry_attempts=agent_config.retry_attempts,
             timeout=agent_config.timeout,
             tool_call_mode=agent_config.tool_call_mode,
+            stream_tool_dispatch=agent_config.stream_tool_dispatch,
+            adaptive_concurrency=agent_config.adaptive_concurrency,
+            max_adaptive_concurrency=agent_config.max_adaptive_concurrency,
+            batch_cache_dir=agent_config.batch_cache_dir,
+            batch_cache_max_age=agent_config.batch_cache_max_age,
+            batch_cache_size_limit=agent_config.batch_cache_size_limit,
+            batch_processes=agent_config.batch_processes,
+            batch_shards=agent_config.batch_shards,
+            batch_work_dir=agent_config.batch_work_dir,
         )
 
 
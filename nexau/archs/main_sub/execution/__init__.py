@@ -14,9 +14,18 @@
 
 """Execution components for agent task processing."""
 
-from .batch_processor import BatchProcessor
+from .batch_cache import BatchResultCache
+from .batch_processor import BatchProcessor, BatchProgress
+from .batch_readers import BatchReader, BatchShard, JsonlLineIndex, register_batch_reader
+from .batch_sharding import ShardedBatchRunner
+from .cache_breakpoints import CacheBreakpointPlanner
+from .concurrency import AdaptiveConcurrencyLimiter
+from .execution_pool import ExecutionPool
 from .executor import Executor
 from .llm_caller import LLMCaller
+from .profiling import ProfilingMiddleware
+from .stream_dispatch import StreamingToolDispatcher
+from .stream_events import AgentEventStream, StreamEvent, StreamEventType
 from .subagent_manager import SubAgentManager
 from .tool_executor import ToolExecutor
 
@@ -26,4 +35,19 @@ __all__ = [
     "LLMCaller",
     "Executor",
     "BatchProcessor",
+    "BatchProgress",
+    "BatchReader",
+    "BatchResultCache",
+    "BatchShard",
+    "ShardedBatchRunner",
+    "JsonlLineIndex",
+    "register_batch_reader",
+    "ExecutionPool",
+    "AdaptiveConcurrencyLimiter",
+    "ProfilingMiddleware",
+    "StreamingToolDispatcher",
+    "CacheBreakpointPlanner",
+    "AgentEventStream",
+    "StreamEvent",
+    "StreamEventType",
 ]
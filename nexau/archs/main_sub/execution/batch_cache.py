@@ -0,0 +1,122 @@
+# Copyright (c) Nex-AGI. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Persistent cache of batch item results keyed by sub-agent config and prompt."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import threading
+from typing import Any
+
+from diskcache import Cache
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_CACHE_DIR = "./.batch_cache"
+DEFAULT_BATCH_CACHE_MAX_AGE = 7 * 24 * 3600.0
+DEFAULT_BATCH_CACHE_SIZE_LIMIT = 1 << 30
+
+
+def message_digest(agent_name: str, message: str) -> str:
+    """Content address of a rendered batch message sent to ``agent_name``."""
+    return hashlib.sha256(json.dumps([agent_name, message], ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+class BatchResultCache:
+    """Results of successful batch items that survive across runs.
+
+    Entries are keyed by the sub-agent's configuration fingerprint and the
+    rendered message, so a changed prompt, model or tool set never serves a
+    stale answer. Entries expire after ``max_age`` seconds, and once the
+    cache grows past ``size_limit`` bytes the oldest entries are evicted
+    first. The underlying disk cache is opened on first use and is safe to
+    share between threads and processes.
+    """
+
+    def __init__(
+        self,
+        directory: str = DEFAULT_BATCH_CACHE_DIR,
+        max_age: float | None = DEFAULT_BATCH_CACHE_MAX_AGE,
+        size_limit: int = DEFAULT_BATCH_CACHE_SIZE_LIMIT,
+    ):
+        """Initialize batch result cache.
+
+        Args:
+            directory: Directory holding the cache
+            max_age: Seconds an entry stays valid; ``None`` keeps entries until evicted by size
+            size_limit: Maximum cache size in bytes
+        """
+        self.directory = directory
+        self.max_age = max_age
+        self.size_limit = size_limit
+        self._cache: Cache | None = None
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    @staticmethod
+    def key(config_fingerprint: str, message: str) -> str:
+        """Cache key of ``message`` answered by a sub-agent with ``config_fingerprint``."""
+        return hashlib.sha256(json.dumps([config_fingerprint, message], ensure_ascii=False).encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> str | None:
+        """Return the cached result for ``key``, or None on a miss."""
+        result = self._open().get(key)
+        with self._lock:
+            if result is None:
+                self._misses += 1
+            else:
+                self._hits += 1
+        return result if isinstance(result, str) else None
+
+    def set(self, key: str, result: str) -> None:
+        """Store a successful result."""
+        try:
+            self._open().set(key, result, expire=self.max_age)
+        except Exception as e:
+            # A full disk or a locked database must not fail the batch item
+            logger.warning(f"⚠️ Could not store batch result in {self.directory}: {e}")
+
+    def stats(self) -> dict[str, Any]:
+        """Return hit/miss counts, the entry count and the size on disk."""
+        with self._lock:
+            stats: dict[str, Any] = {"hits": self._hits, "misses": self._misses}
+        cache = self._cache
+        stats["entries"] = len(cache) if cache is not None else 0
+        stats["size_bytes"] = cache.volume() if cache is not None else 0
+        return stats
+
+    def clear(self) -> None:
+        """Drop every entry."""
+        self._open().clear()
+
+    def close(self) -> None:
+        """Close the underlying disk cache; it is reopened on the next use."""
+        with self._lock:
+            cache, self._cache = self._cache, None
+        if cache is not None:
+            cache.close()
+
+    def _open(self) -> Cache:
+        with self._lock:
+            if self._cache is None:
+                self._cache = Cache(self.directory, size_limit=self.size_limit)
+                # Drop entries that expired while no run was using the cache
+                expired = self._cache.expire()
+                if expired:
+                    logger.info(f"🧹 Removed {expired} expired batch results from {self.directory}")
+            return self._cache
@@ -14,32 +14,129 @@
 
 """Batch processing functionality for agents."""
 
+from __future__ import annotations
+
+import heapq
+import itertools
 import json
 import logging
 import os
 import re
+import time
 import xml.etree.ElementTree as ET
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from contextvars import copy_context
-from typing import Any, cast
+from dataclasses import dataclass, field
+from typing import Any
 
 from ..utils.xml_utils import XMLParser
+from .batch_cache import BatchResultCache, message_digest
+from .batch_readers import BatchReader, BatchShard, create_batch_reader
+from .concurrency import AdaptiveConcurrencyLimiter
+from .execution_pool import BATCH_LANE, ExecutionPool
 
 logger = logging.getLogger(__name__)
 
+# Results shown in the summary returned to the model
+DISPLAYED_RESULTS = 3
+
+# (line, reader position, data) of one input item
+_Item = tuple[int, int, dict[str, Any]]
+
+
+@dataclass
+class BatchProgress:
+    """Live counters of the batch being processed.
+
+    ``read``, ``submitted`` and ``completed`` count the items of this run,
+    ``resumed`` the items an interrupted earlier run already finished.
+    ``succeeded`` and ``failed`` include the resumed items. ``deduplicated``
+    items reused the result of an identical message in this run and
+    ``cached`` items were answered from the persistent result cache; neither
+    was submitted.
+    """
+
+    file_path: str
+    results_path: str
+    read: int = 0
+    submitted: int = 0
+    in_flight: int = 0
+    completed: int = 0
+    succeeded: int = 0
+    failed: int = 0
+    resumed: int = 0
+    deduplicated: int = 0
+    cached: int = 0
+    started_at: float = field(default_factory=time.time)
+
+    @property
+    def total(self) -> int:
+        """Items with a recorded result."""
+        return self.succeeded + self.failed
+
+    def to_dict(self) -> dict[str, Any]:
+        """Return the counters and the completion rate as plain data."""
+        elapsed = max(time.time() - self.started_at, 1e-9)
+        return {
+            "file_path": self.file_path,
+            "results_path": self.results_path,
+            "read": self.read,
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "in_flight": self.in_flight,
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "resumed": self.resumed,
+            "deduplicated": self.deduplicated,
+            "cached": self.cached,
+            "items_per_second": self.completed / elapsed,
+        }
+
 
 class BatchProcessor:
     """Handles batch processing of data through sub-agents."""
 
-    def __init__(self, subagent_manager, max_workers: int = 5):
+    def __init__(
+        self,
+        subagent_manager,
+        max_workers: int = 5,
+        execution_pool: ExecutionPool | None = None,
+        max_in_flight: int | None = None,
+        output_dir: str | None = None,
+        checkpoint_every: int = 50,
+        concurrency_limiter: AdaptiveConcurrencyLimiter | None = None,
+        result_cache: BatchResultCache | None = None,
+        memo_size: int = 10000,
+    ):
         """Initialize batch processor.
 
         Args:
             subagent_manager: SubAgentManager instance
-            max_workers: Maximum number of parallel workers
+            max_workers: Maximum number of parallel workers when no shared pool is used
+            execution_pool: Optional shared pool whose batch lane runs the items
+            max_in_flight: Maximum items submitted but not finished (defaults to twice ``max_workers``)
+            output_dir: Directory for ``<input>.results.jsonl`` and the checkpoint (defaults to the input's directory)
+            checkpoint_every: Finished items between checkpoint writes and progress logs
+            concurrency_limiter: Optional adaptive limit on how many items run at once;
+                the in-flight window then defaults to twice its maximum
+            result_cache: Optional persistent cache of results keyed by the
+                sub-agent's configuration and the rendered message
+            memo_size: Distinct results kept in memory to answer repeated
+                messages within a run
         """
         self.subagent_manager = subagent_manager
         self.max_workers = max_workers
+        self.execution_pool = execution_pool
+        self.concurrency_limiter = concurrency_limiter
+        if max_in_flight is None:
+            max_in_flight = 2 * max(max_workers, concurrency_limiter.max_limit if concurrency_limiter else 0)
+        self.max_in_flight = max(1, max_in_flight)
+        self.output_dir = output_dir
+        self.checkpoint_every = max(1, checkpoint_every)
+        self.result_cache = result_cache
+        self.memo_size = max(0, memo_size)
+        self.progress: BatchProgress | None = None
         self.xml_parser = XMLParser()
 
     def execute_batch_agent_from_xml(self, xml_content: str) -> str:
@@ -114,144 +211,151 @@ class BatchProcessor:
         file_path: str,
         data_format: str,
         message_template: str,
+        shard: BatchShard | None = None,
     ) -> str:
-        """Process batch data from file and execute agent calls in parallel.
+        """Stream batch data from file and execute agent calls in parallel.
+
+        Lines are read lazily and at most ``max_in_flight`` items are pending
+        at any time. With a concurrency limiter, an item is only submitted
+        once it holds a slot, so the limiter sets how many items run. Every
+        finished item is appended to the results file as soon as it
+        completes, and a checkpoint records how far the input has been fully
+        processed, so an interrupted batch resumes where it stopped when it is
+        run again. Only the first few results stay in memory for the returned
+        summary.
+
+        Items are content-addressed by their rendered message: an item whose
+        message is already running waits for that run, one whose message
+        already finished in this run reuses its result, and with a result
+        cache one answered by an earlier run is served from the cache.
+
+        With a ``shard``, only the records of that shard are processed and
+        its results and checkpoint go to files named after the shard, so
+        several shards of one input can run side by side.
 
         Args:
             agent_name: Name of the agent to use for processing
             file_path: Path to the data file
             data_format: Format of the data file
             message_template: Template for messages to send to agent
+            shard: Optional slice of the input planned by ``BatchReader.shards``
 
         Returns:
             JSON string with processing results
         """
-        if data_format.lower() != "jsonl":
-            raise ValueError(
-                f"Unsupported data format: {data_format}. Only 'jsonl' is supported.",
-            )
-
-        # Read and validate JSONL file
-        batch_data = []
-        try:
-            with open(file_path, encoding="utf-8") as f:
-                for line_num, line in enumerate(f, 1):
-                    line = line.strip()
-                    if not line:
-                        continue
-                    try:
-                        data = json.loads(line)
-                        if not isinstance(data, dict):
-                            logger.warning(
-                                f"Line {line_num}: Expected JSON object, got {type(data).__name__}",
-                            )
-                            continue
-                        batch_data.append((line_num, data))
-                    except json.JSONDecodeError as e:
-                        logger.error(f"Line {line_num}: Invalid JSON - {e}")
-                        continue
-        except Exception as e:
-            raise ValueError(f"Error reading file {file_path}: {e}")
-
-        if not batch_data:
-            return "Batch processing completed: 0 items processed (no valid JSON objects found)"
-
-        # Validate message template uses valid keys
+        reader = create_batch_reader(data_format, file_path, index_dir=self.output_dir)
+        run = _BatchRun(self, reader, agent_name, data_format.lower(), message_template, shard)
+        self.progress = run.progress
         template_keys = self._extract_template_keys(message_template)
-        sample_data = batch_data[0][1]
-        invalid_keys = [key for key in template_keys if key not in sample_data]
-        if invalid_keys:
-            raise ValueError(
-                f"Message template uses invalid keys: {invalid_keys}. Available keys in data: {list(sample_data.keys())}",
-            )
+        use_shared_pool = self.execution_pool is not None and not self.execution_pool.is_shutdown
+        local_executor = None if use_shared_pool else ThreadPoolExecutor(max_workers=self.max_workers)
+        in_flight = _InFlightItems(self.memo_size)
+        cache = self.result_cache
+        config_fingerprint = self._config_fingerprint(agent_name) if cache is not None else None
+        # Items of a batch started inside a sub-agent run under the caller's slot
+        limiter = self.concurrency_limiter
+        slots = limiter if limiter is not None and not limiter.holds_slot() else None
+        finished = False
+        try:
+            records = reader.records(*run.resume())
+            if shard is not None:
+                records = itertools.takewhile(lambda record: record[1] < shard.end_position, records)
+            for line_num, offset, data in records:
+                if run.is_done(line_num):
+                    continue
+                if run.progress.read == 0:
+                    # Validate message template uses valid keys
+                    invalid_keys = [key for key in template_keys if key not in data]
+                    if invalid_keys:
+                        raise ValueError(
+                            f"Message template uses invalid keys: {invalid_keys}. Available keys in data: {list(data.keys())}",
+                        )
+                run.progress.read += 1
+                run.read_position = (offset, line_num)
 
-        # Execute batch processing in parallel
-        results = []
-        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-            # Submit all batch items for parallel execution
-            futures = {}
-            for line_num, data in batch_data:
                 # Render message template with data
                 try:
-                    rendered_message = self._render_message_template(
-                        message_template,
-                        data,
-                    )
-                    # Propagate current tracing context into the worker thread
-                    task_ctx = copy_context()
-                    future = executor.submit(
-                        task_ctx.run,
-                        self._execute_batch_item_safe,
-                        agent_name,
-                        rendered_message,
-                        line_num,
-                    )
-                    futures[future] = (line_num, data)
-                except Exception as e:
-                    results.append(
-                        {
-                            "line": line_num,
-                            "status": "error",
-                            "error": f"Template rendering failed: {e}",
-                            "data": data,
-                        },
-                    )
-
-            # Collect results as they complete
-            for future in as_completed(futures):
-                line_num, data = futures[future]
-                try:
-                    result = future.result()
-                    results.append(
-                        {
-                            "line": line_num,
-                            "status": "success",
-                            "result": result,
-                            "data": data,
-                        },
-                    )
+                    rendered_message = self._render_message_template(message_template, data)
                 except Exception as e:
-                    results.append(
-                        {
-                            "line": line_num,
-                            "status": "error",
-                            "error": str(e),
-                            "data": data,
-                        },
-                    )
-
-        # Sort results by line number
-        results.sort(key=lambda x: cast(int, x["line"]))
-
-        # Generate summary
-        total_items = len(results)
-        successful_items = len(
-            [r for r in results if r["status"] == "success"],
-        )
-        failed_items = total_items - successful_items
-
-        summary = f"Batch processing completed: {successful_items}/{total_items} items successful, {failed_items} failed"
-
-        # Limit detailed results to first 3 items to prevent overly long responses
-        displayed_results = results[:3]
-        remaining_count = max(0, len(results) - 3)
-
-        # Include limited detailed results
-        detailed_results = {
-            "summary": summary,
-            "total_items": total_items,
-            "successful_items": successful_items,
-            "failed_items": failed_items,
-            "displayed_results": displayed_results,
-            "remaining_items": remaining_count,
-        }
-
-        if remaining_count > 0:
-            detailed_results["note"] = (
-                f"Showing first 3 results. {remaining_count} additional results not displayed to keep response concise."
-            )
+                    run.record({"line": line_num, "status": "error", "error": f"Template rendering failed: {e}", "data": data})
+                    continue
+
+                digest = message_digest(agent_name, rendered_message)
+                if in_flight.join(digest, (line_num, offset, data)):
+                    run.progress.deduplicated += 1
+                    continue
+                memoized = in_flight.memoized(digest)
+                if memoized is not None:
+                    origin, result = memoized
+                    run.progress.deduplicated += 1
+                    run.record({"line": line_num, "status": "success", "result": result, "data": data, "duplicate_of": origin})
+                    continue
+                cache_key = BatchResultCache.key(config_fingerprint, rendered_message) if config_fingerprint else None
+                if cache is not None and cache_key is not None:
+                    cached = cache.get(cache_key)
+                    if cached is not None:
+                        run.progress.cached += 1
+                        run.record({"line": line_num, "status": "success", "result": cached, "data": data, "cached": True})
+                        in_flight.memoize(digest, line_num, cached)
+                        continue
 
-        return json.dumps(detailed_results, indent=2, ensure_ascii=False)
+                if slots is not None:
+                    slots.acquire()
+                try:
+                    future = self._submit_item(local_executor, agent_name, rendered_message, line_num, slots is not None)
+                except BaseException:
+                    if slots is not None:
+                        slots.release()
+                    raise
+                in_flight.add(future, digest, cache_key, (line_num, offset, data))
+                run.progress.submitted += 1
+                run.progress.in_flight = len(in_flight)
+                if len(in_flight) >= self.max_in_flight:
+                    self._collect_results(run, in_flight)
+            run.read_position = None
+
+            while in_flight:
+                self._collect_results(run, in_flight)
+            finished = True
+        finally:
+            for future in in_flight.futures:
+                # Items that never started still hold the slot acquired for them
+                if future.cancel() and slots is not None:
+                    slots.release()
+            if local_executor is not None:
+                local_executor.shutdown(wait=True)
+            run.close(finished, in_flight.positions())
+            reader.close()
+
+        return run.summary(data_format)
+
+    def _collect_results(self, run: _BatchRun, in_flight: _InFlightItems) -> None:
+        """Wait until at least one in-flight item finishes and record it and its duplicates."""
+        done, _ = wait(in_flight.futures, return_when=FIRST_COMPLETED)
+        for future in done:
+            digest, cache_key, items = in_flight.pop(future)
+            origin = items[0][0]
+            try:
+                result = future.result()
+            except Exception as e:
+                for line_num, _, data in items:
+                    run.record(_with_origin({"line": line_num, "status": "error", "error": str(e), "data": data}, origin))
+                continue
+            in_flight.memoize(digest, origin, result)
+            if self.result_cache is not None and cache_key is not None:
+                self.result_cache.set(cache_key, result)
+            for line_num, _, data in items:
+                run.record(_with_origin({"line": line_num, "status": "success", "result": result, "data": data}, origin))
+        run.progress.in_flight = len(in_flight)
+        run.maybe_checkpoint(in_flight.positions())
+
+    def _config_fingerprint(self, agent_name: str) -> str | None:
+        """Fingerprint of the sub-agent's configuration, or None if it cannot be resolved."""
+        try:
+            return self.subagent_manager.config_fingerprint(agent_name)
+        except Exception as e:
+            logger.warning(f"⚠️ Batch result cache disabled for agent '{agent_name}': {e}")
+            return None
 
     def _extract_template_keys(self, template: str) -> list[str]:
         """Extract variable keys from message template.
@@ -285,11 +389,43 @@ class BatchProcessor:
                 f"Template key '{missing_key}' not found in data. Available keys: {available_keys}",
             )
 
+    def _submit_item(
+        self,
+        local_executor: ThreadPoolExecutor | None,
+        agent_name: str,
+        message: str,
+        line_num: int,
+        holds_slot: bool = False,
+    ) -> Future[str]:
+        """Submit a batch item to the shared batch lane or a local executor."""
+        if local_executor is None and self.execution_pool is not None:
+            return self.execution_pool.submit(
+                BATCH_LANE,
+                self._execute_batch_item_safe,
+                agent_name,
+                message,
+                line_num,
+                holds_slot,
+            )
+
+        assert local_executor is not None
+        # Propagate current tracing context into the worker thread
+        task_ctx = copy_context()
+        return local_executor.submit(
+            task_ctx.run,
+            self._execute_batch_item_safe,
+            agent_name,
+            message,
+            line_num,
+            holds_slot,
+        )
+
     def _execute_batch_item_safe(
         self,
         agent_name: str,
         message: str,
         line_num: int,
+        holds_slot: bool = False,
     ) -> str:
         """Safely execute a single batch item.
 
@@ -297,6 +433,8 @@ class BatchProcessor:
             agent_name: Name of the agent to use
             message: Message to send to agent
             line_num: Line number for logging
+            holds_slot: The item was submitted holding a concurrency slot,
+                released once it finishes
 
         Returns:
             Result from agent execution
@@ -305,9 +443,273 @@ class BatchProcessor:
             logger.info(
                 f"🔄 Processing batch item {line_num} with agent '{agent_name}'",
             )
-            result = self.subagent_manager.call_sub_agent(agent_name, message)
+            if holds_slot and self.concurrency_limiter is not None:
+                with self.concurrency_limiter.slot(acquired=True):
+                    result = self.subagent_manager.call_sub_agent(agent_name, message)
+            else:
+                result = self.subagent_manager.call_sub_agent(agent_name, message)
             logger.info(f"✅ Batch item {line_num} completed successfully")
             return result
         except Exception as e:
             logger.error(f"❌ Batch item {line_num} failed: {e}")
             raise
+
+
+def _with_origin(record: dict[str, Any], origin: int) -> dict[str, Any]:
+    """Mark a record whose result came from the item on line ``origin``."""
+    if record["line"] != origin:
+        record["duplicate_of"] = origin
+    return record
+
+
+class _InFlightItems:
+    """Submitted items grouped by the digest of their rendered message.
+
+    Each distinct message runs once; items with the same message join the
+    first one and share its outcome. Results of finished messages are kept
+    in a bounded LRU memo so later duplicates are answered without running.
+    """
+
+    def __init__(self, memo_size: int) -> None:
+        self.futures: dict[Future[str], tuple[str, str | None]] = {}
+        self._items: dict[str, list[_Item]] = {}
+        self._memo: OrderedDict[str, tuple[int, str]] = OrderedDict()
+        self._memo_size = memo_size
+
+    def __len__(self) -> int:
+        return len(self.futures)
+
+    def add(self, future: Future[str], digest: str, cache_key: str | None, item: _Item) -> None:
+        self.futures[future] = (digest, cache_key)
+        self._items[digest] = [item]
+
+    def join(self, digest: str, item: _Item) -> bool:
+        """Attach ``item`` to the running item with the same message, if there is one."""
+        items = self._items.get(digest)
+        if items is None:
+            return False
+        items.append(item)
+        return True
+
+    def pop(self, future: Future[str]) -> tuple[str, str | None, list[_Item]]:
+        """Remove a finished future; return its digest, cache key and items, the submitted one first."""
+        digest, cache_key = self.futures.pop(future)
+        return digest, cache_key, self._items.pop(digest)
+
+    def memoized(self, digest: str) -> tuple[int, str] | None:
+        """Return (origin line, result) of a message that already finished in this run."""
+        entry = self._memo.get(digest)
+        if entry is not None:
+            self._memo.move_to_end(digest)
+        return entry
+
+    def memoize(self, digest: str, origin: int, result: str) -> None:
+        if not self._memo_size:
+            return
+        self._memo[digest] = (origin, result)
+        self._memo.move_to_end(digest)
+        while len(self._memo) > self._memo_size:
+            self._memo.popitem(last=False)
+
+    def positions(self) -> list[tuple[int, int]]:
+        """(position, line) of every item not finished yet, duplicates included."""
+        return [(offset, line_num) for items in self._items.values() for line_num, offset, _ in items]
+
+
+class _BatchRun:
+    """Results file, checkpoint and counters of one :meth:`BatchProcessor._process_batch_data` call.
+
+    The results file is the source of truth: one JSON object per finished
+    item, in completion order. The checkpoint stores the reader position
+    below which every item is finished (the lowest position still in
+    flight), so a resumed run restarts the reader there and skips the few
+    later items the results file already holds. Checkpoints only apply to
+    the same input file, format, agent and template; a finished batch
+    removes its checkpoint.
+    """
+
+    def __init__(
+        self,
+        processor: BatchProcessor,
+        reader: BatchReader,
+        agent_name: str,
+        data_format: str,
+        message_template: str,
+        shard: BatchShard | None = None,
+    ) -> None:
+        file_path = reader.path
+        directory = processor.output_dir or os.path.dirname(os.path.abspath(file_path))
+        base = os.path.join(directory, os.path.basename(file_path))
+        if shard is not None:
+            base = f"{base}.{shard.label}"
+        self.results_path = f"{base}.results.jsonl"
+        self.checkpoint_path = f"{base}.checkpoint.json"
+        self.checkpoint_every = processor.checkpoint_every
+        self.file_path = file_path
+        self.progress = BatchProgress(file_path=file_path, results_path=self.results_path)
+        self.start = (shard.start_position, shard.start_number) if shard is not None else (0, 1)
+        self.start_line = self.start[1]
+        self.end_position = shard.end_position if shard is not None else reader.end_position
+        # (position, line) of the latest item read; None once the input is exhausted
+        self.read_position: tuple[int, int] | None = self.start
+        self._done_after: set[int] = set()
+        self._displayed: list[tuple[int, str]] = []
+        self._results_file: Any = None
+        self._checkpointed_at = 0
+        self._last_line = 0
+        stat = os.stat(file_path)
+        self._identity: dict[str, Any] = {
+            "file_path": os.path.abspath(file_path),
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "format": data_format,
+            "agent_name": agent_name,
+            "message_template": message_template,
+        }
+        if shard is not None:
+            self._identity["shard"] = [shard.index, shard.count, shard.start_position, shard.end_position]
+
+    def resume(self) -> tuple[int, int]:
+        """Load a matching checkpoint; return the (position, line) to start reading from."""
+        checkpoint = self._load_checkpoint()
+        if checkpoint is None:
+            return self.start
+        self.start_line = int(checkpoint["line"])
+        self.read_position = (int(checkpoint["offset"]), self.start_line)
+        with open(self.results_path, "rb+") as results:
+            # Drop a record torn by the interruption
+            content_end = 0
+            for raw in results:
+                if not raw.endswith(b"\n"):
+                    break
+                content_end += len(raw)
+                try:
+                    record = json.loads(raw)
+                except json.JSONDecodeError:
+                    continue
+                self._count(record, raw.decode("utf-8").rstrip("\n"))
+                if record["line"] >= self.start_line:
+                    self._done_after.add(record["line"])
+            results.truncate(content_end)
+        self.progress.resumed = self.progress.total
+        logger.info(f"♻️ Resuming batch {self.file_path} at line {self.start_line}: {self.progress.resumed} items already finished")
+        return self.read_position
+
+    def is_done(self, line_num: int) -> bool:
+        return line_num in self._done_after
+
+    def record(self, record: dict[str, Any]) -> None:
+        """Append one finished item to the results file and the counters."""
+        if self._results_file is None:
+            os.makedirs(os.path.dirname(self.results_path), exist_ok=True)
+            self._results_file = open(self.results_path, "a" if self.progress.resumed else "w", encoding="utf-8")
+        line = json.dumps(record, ensure_ascii=False, default=str)
+        self._results_file.write(line + "\n")
+        self._last_line = max(self._last_line, int(record["line"]))
+        self.progress.completed += 1
+        self._count(record, line)
+
+    def _count(self, record: dict[str, Any], line: str) -> None:
+        if record.get("status") == "success":
+            self.progress.succeeded += 1
+        else:
+            self.progress.failed += 1
+        # Keep the DISPLAYED_RESULTS lowest line numbers in a max-heap
+        entry = (-int(record["line"]), line)
+        if len(self._displayed) < DISPLAYED_RESULTS:
+            heapq.heappush(self._displayed, entry)
+        elif entry > self._displayed[0]:
+            heapq.heapreplace(self._displayed, entry)
+
+    def maybe_checkpoint(self, pending: list[tuple[int, int]]) -> None:
+        """Write a checkpoint and log progress every ``checkpoint_every`` finished items."""
+        if self.progress.completed - self._checkpointed_at >= self.checkpoint_every:
+            self._checkpointed_at = self.progress.completed
+            self._write_checkpoint(pending)
+            logger.info(f"📊 Batch progress {self.file_path}: {self.progress.to_dict()}")
+
+    def close(self, finished: bool, pending: list[tuple[int, int]]) -> None:
+        """Close the results and either drop the checkpoint (finished) or write a final one."""
+        if finished:
+            if os.path.exists(self.checkpoint_path):
+                os.remove(self.checkpoint_path)
+        elif self.progress.completed:
+            self._write_checkpoint(pending)
+            logger.warning(f"⚠️ Batch {self.file_path} interrupted; rerun it to resume from {self.checkpoint_path}")
+        if self._results_file is not None:
+            self._results_file.close()
+
+    def _write_checkpoint(self, pending: list[tuple[int, int]]) -> None:
+        """Persist the lowest (offset, line) not known to be finished: in flight or being read."""
+        if self._results_file is not None:
+            self._results_file.flush()
+        if self.read_position is not None:
+            pending = [*pending, self.read_position]
+        offset, line = min(pending) if pending else (self.end_position, self._last_line + 1)
+        checkpoint = {**self._identity, "offset": offset, "line": line, "progress": self.progress.to_dict()}
+        tmp_path = f"{self.checkpoint_path}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(checkpoint, f)
+            os.replace(tmp_path, self.checkpoint_path)
+        except OSError as e:
+            logger.warning(f"⚠️ Failed to write batch checkpoint {self.checkpoint_path}: {e}")
+
+    def _load_checkpoint(self) -> dict[str, Any] | None:
+        if not os.path.exists(self.checkpoint_path):
+            return None
+        try:
+            with open(self.checkpoint_path, encoding="utf-8") as f:
+                checkpoint = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"⚠️ Ignoring unreadable batch checkpoint {self.checkpoint_path}: {e}")
+            return None
+        if any(checkpoint.get(key) != value for key, value in self._identity.items()) or not os.path.exists(self.results_path):
+            logger.warning(f"⚠️ Batch checkpoint {self.checkpoint_path} belongs to another input or template; starting over")
+            return None
+        return checkpoint
+
+    def summary(self, data_format: str) -> str:
+        displayed_results = [json.loads(line) for _, line in sorted(self._displayed, reverse=True)]
+        return format_batch_summary(self.progress, displayed_results, data_format)
+
+
+def format_batch_summary(progress: BatchProgress, displayed_results: list[dict[str, Any]], data_format: str) -> str:
+    """Render the summary returned to the model for a finished batch.
+
+    Args:
+        progress: Counters of the batch
+        displayed_results: Records of the first few items by line number
+        data_format: Format of the input, named when no item was found
+    """
+    total_items = progress.total
+    if total_items == 0:
+        kind = "JSON objects" if data_format.lower() in ("jsonl", "indexed_jsonl") else "records"
+        return f"Batch processing completed: 0 items processed (no valid {kind} found)"
+    summary = f"Batch processing completed: {progress.succeeded}/{total_items} items successful, {progress.failed} failed"
+    remaining_count = max(0, total_items - len(displayed_results))
+
+    # Include limited detailed results
+    detailed_results: dict[str, Any] = {
+        "summary": summary,
+        "total_items": total_items,
+        "successful_items": progress.succeeded,
+        "failed_items": progress.failed,
+        "displayed_results": displayed_results,
+        "remaining_items": remaining_count,
+        "results_file": progress.results_path,
+    }
+    if progress.resumed:
+        detailed_results["resumed_items"] = progress.resumed
+    if progress.deduplicated:
+        detailed_results["deduplicated_items"] = progress.deduplicated
+    if progress.cached:
+        detailed_results["cached_items"] = progress.cached
+
+    if remaining_count > 0:
+        detailed_results["note"] = (
+            f"Showing first {len(displayed_results)} results. {remaining_count} additional results not displayed "
+            f"to keep response concise; all results are in {progress.results_path}."
+        )
+
+    return json.dumps(detailed_results, indent=2, ensure_ascii=False)
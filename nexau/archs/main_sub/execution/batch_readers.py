@@ -0,0 +1,472 @@
+# Copyright (c) Nex-AGI. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Streaming input readers for batch processing.
+
+A reader yields ``(record number, position, object)`` for each input record,
+lazily and in file order. ``position`` is a cursor the reader can restart
+from (a byte offset, a row index or a line index) and grows with the record
+number, so the batch engine can checkpoint the lowest unfinished position and
+resume there without rereading what came before.
+
+The reader is chosen by the ``<format>`` element of ``<use_batch_agent>``:
+
+- ``jsonl``: JSON object per line, read sequentially
+- ``indexed_jsonl``: JSON object per line, read through a memory-mapped line
+  offset index (:class:`JsonlLineIndex`) built once next to the input
+- ``csv`` / ``tsv``: one object per row keyed by the header, values as strings
+- ``parquet``: one object per row, streamed by row group (requires ``pyarrow``)
+
+Readers also plan how an input splits into contiguous shards
+(:meth:`BatchReader.shards`) that can be processed independently, e.g. by
+separate processes.
+
+Further formats can be added with :func:`register_batch_reader`.
+"""
+
+from __future__ import annotations
+
+import csv
+import json
+import logging
+import mmap
+import os
+import struct
+from abc import ABC, abstractmethod
+from array import array
+from collections.abc import Iterator
+from dataclasses import dataclass
+from typing import Any, BinaryIO
+
+logger = logging.getLogger(__name__)
+
+# A record as yielded by the readers: (record number, resume position, object)
+BatchRecord = tuple[int, int, dict[str, Any]]
+
+
+@dataclass(frozen=True)
+class BatchShard:
+    """Contiguous slice of a batch input planned by :meth:`BatchReader.shards`.
+
+    The shard holds the records from ``start_position`` up to, but not
+    including, ``end_position``; its first record is number ``start_number``,
+    so records keep the numbers they have in the whole input.
+    """
+
+    index: int
+    count: int
+    start_position: int
+    start_number: int
+    end_position: int
+
+    @property
+    def label(self) -> str:
+        """Name of the shard used in the file names of its output."""
+        return f"shard-{self.index:04d}-of-{self.count:04d}"
+
+
+def _shard_starts(total: int, shard_count: int) -> list[int]:
+    """Index of the first of ``total`` items in each of ``shard_count`` near-equal shards; empty shards are dropped."""
+    if shard_count < 1:
+        raise ValueError(f"Shard count must be at least 1, got {shard_count}")
+    return sorted({total * i // shard_count for i in range(shard_count)}) if total else []
+
+
+def _plan_shards(starts: list[tuple[int, int]], end_position: int) -> list[BatchShard]:
+    """Build shards from the (position, number) each one starts at; each shard ends where the next begins."""
+    if not starts:
+        return []
+    ends = [position for position, _ in starts[1:]] + [end_position]
+    return [
+        BatchShard(index, len(starts), position, number, end)
+        for index, ((position, number), end) in enumerate(zip(starts, ends, strict=True))
+    ]
+
+
+class BatchReader(ABC):
+    """Lazy reader of one batch input file."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+
+    @property
+    @abstractmethod
+    def end_position(self) -> int:
+        """Position just past the last record."""
+
+    @abstractmethod
+    def records(self, start_position: int = 0, start_number: int = 1) -> Iterator[BatchRecord]:
+        """Yield the records from ``start_position``, numbering the first one ``start_number``.
+
+        Raises:
+            ValueError: If the file cannot be read
+        """
+
+    def shards(self, shard_count: int) -> list[BatchShard]:
+        """Split the input into at most ``shard_count`` contiguous shards of near-equal size.
+
+        The default reads every record once; readers that can find record
+        boundaries without parsing override it.
+
+        Raises:
+            ValueError: If ``shard_count`` is below 1 or the file cannot be read
+        """
+        positions, numbers = array("Q"), array("Q")
+        for number, position, _ in self.records():
+            positions.append(position)
+            numbers.append(number)
+        return _plan_shards([(positions[i], numbers[i]) for i in _shard_starts(len(positions), shard_count)], self.end_position)
+
+    def close(self) -> None:
+        """Release resources held between calls."""
+        return
+
+
+def _parse_object(raw: bytes, line_num: int, path: str) -> dict[str, Any] | None:
+    """Decode one JSONL line; blank, invalid and non-object lines are skipped with a log."""
+    try:
+        line = raw.decode("utf-8").strip()
+    except UnicodeDecodeError as e:
+        raise ValueError(f"Error reading file {path}: {e}")
+    if not line:
+        return None
+    try:
+        data = json.loads(line)
+    except json.JSONDecodeError as e:
+        logger.error(f"Line {line_num}: Invalid JSON - {e}")
+        return None
+    if not isinstance(data, dict):
+        logger.warning(
+            f"Line {line_num}: Expected JSON object, got {type(data).__name__}",
+        )
+        return None
+    return data
+
+
+def _open_binary(path: str) -> BinaryIO:
+    try:
+        return open(path, "rb")
+    except Exception as e:
+        raise ValueError(f"Error reading file {path}: {e}")
+
+
+class JsonlReader(BatchReader):
+    """Sequential JSONL reader; positions are byte offsets of the lines."""
+
+    def __init__(self, path: str) -> None:
+        super().__init__(path)
+        # Fail on creation, not on the first read
+        _open_binary(path).close()
+
+    @property
+    def end_position(self) -> int:
+        return os.path.getsize(self.path)
+
+    def records(self, start_position: int = 0, start_number: int = 1) -> Iterator[BatchRecord]:
+        with _open_binary(self.path) as f:
+            f.seek(start_position)
+            offset = start_position
+            for line_num, raw in enumerate(f, start_number):
+                line_offset = offset
+                offset += len(raw)
+                data = _parse_object(raw, line_num, self.path)
+                if data is not None:
+                    yield line_num, line_offset, data
+
+    def shards(self, shard_count: int) -> list[BatchShard]:
+        # Split by physical lines: one pass to count them, one to find the boundary offsets
+        with _open_binary(self.path) as f:
+            total = sum(1 for _ in f)
+            wanted = set(_shard_starts(total, shard_count))
+            f.seek(0)
+            starts: list[tuple[int, int]] = []
+            offset = 0
+            for line_index, raw in enumerate(f):
+                if line_index in wanted:
+                    starts.append((offset, line_index + 1))
+                offset += len(raw)
+        return _plan_shards(starts, self.end_position)
+
+
+class _LineCursor:
+    """Iterates decoded lines of a binary file and tracks the offset consumed so far."""
+
+    def __init__(self, f: BinaryIO, offset: int) -> None:
+        self._f = f
+        self.offset = offset
+
+    def __iter__(self) -> _LineCursor:
+        return self
+
+    def __next__(self) -> str:
+        raw = self._f.readline()
+        if not raw:
+            raise StopIteration
+        self.offset += len(raw)
+        return raw.decode("utf-8")
+
+
+class CsvReader(BatchReader):
+    """Streamed CSV reader; rows become objects keyed by the header, positions are byte offsets.
+
+    Record numbers count data rows from 1. Quoted fields may span lines.
+    """
+
+    delimiter = ","
+
+    def __init__(self, path: str) -> None:
+        super().__init__(path)
+        _open_binary(path).close()
+        self._header: tuple[list[str], int] | None = None
+
+    @property
+    def end_position(self) -> int:
+        return os.path.getsize(self.path)
+
+    def _read_header(self, f: BinaryIO) -> tuple[list[str], int]:
+        if self._header is None:
+            cursor = _LineCursor(f, 0)
+            header = next(csv.reader(cursor, delimiter=self.delimiter), [])
+            self._header = ([name.lstrip("\ufeff") if i == 0 else name for i, name in enumerate(header)], cursor.offset)
+        return self._header
+
+    def records(self, start_position: int = 0, start_number: int = 1) -> Iterator[BatchRecord]:
+        with _open_binary(self.path) as f:
+            try:
+                header, data_start = self._read_header(f)
+                offset = max(start_position, data_start)
+                f.seek(offset)
+                cursor = _LineCursor(f, offset)
+                reader = csv.reader(cursor, delimiter=self.delimiter)
+                row_start = offset
+                for number, row in enumerate(reader, start_number):
+                    if not row:
+                        row_start = cursor.offset
+                        continue
+                    if len(row) != len(header):
+                        logger.warning(f"Row {number}: Expected {len(header)} fields, got {len(row)}")
+                    yield number, row_start, dict(zip(header, row, strict=False))
+                    row_start = cursor.offset
+            except (UnicodeDecodeError, csv.Error) as e:
+                raise ValueError(f"Error reading file {self.path}: {e}")
+
+
+class TsvReader(CsvReader):
+    """Tab-separated variant of :class:`CsvReader`."""
+
+    delimiter = "\t"
+
+
+class ParquetReader(BatchReader):
+    """Parquet reader streaming one row group at a time; positions are row indexes."""
+
+    batch_size = 1024
+
+    def __init__(self, path: str) -> None:
+        super().__init__(path)
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ValueError("Reading parquet batch input requires pyarrow. Install it with: pip install pyarrow")
+        try:
+            self._file = pq.ParquetFile(path)
+        except Exception as e:
+            raise ValueError(f"Error reading file {path}: {e}")
+
+    @property
+    def end_position(self) -> int:
+        return self._file.metadata.num_rows
+
+    def records(self, start_position: int = 0, start_number: int = 1) -> Iterator[BatchRecord]:
+        metadata = self._file.metadata
+        # Skip whole row groups before the start position without reading them
+        first_group, group_start = 0, 0
+        while first_group < metadata.num_row_groups and group_start + metadata.row_group(first_group).num_rows <= start_position:
+            group_start += metadata.row_group(first_group).num_rows
+            first_group += 1
+        row_groups = list(range(first_group, metadata.num_row_groups))
+        if not row_groups:
+            return
+        position = group_start
+        for batch in self._file.iter_batches(batch_size=self.batch_size, row_groups=row_groups):
+            for data in batch.to_pylist():
+                if position >= start_position:
+                    yield start_number + position - start_position, position, data
+                position += 1
+
+    def shards(self, shard_count: int) -> list[BatchShard]:
+        return _plan_shards([(row, row + 1) for row in _shard_starts(self.end_position, shard_count)], self.end_position)
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class JsonlLineIndex:
+    """Memory-mapped index of line start offsets of a JSONL file.
+
+    The index is a sidecar file (``<input>.idx`` by default) holding a header
+    with the input's size and modification time followed by one unsigned
+    64-bit offset per line. It is built with one pass over the input and
+    rebuilt when the input changes. Lookups are random access, so a range of
+    lines (a shard, or the lines after a checkpoint) is read without scanning
+    the lines before it.
+    """
+
+    MAGIC = b"NXJLIDX1"
+    _HEADER = struct.Struct("<8sQQQ")
+
+    def __init__(self, path: str, index_path: str | None = None) -> None:
+        self.path = path
+        self.index_path = index_path or f"{path}.idx"
+        self._data_file = _open_binary(path)
+        self._size = os.fstat(self._data_file.fileno()).st_size
+        self._data = mmap.mmap(self._data_file.fileno(), 0, access=mmap.ACCESS_READ) if self._size else None
+        if not self._load():
+            self._build()
+            if not self._load():
+                raise ValueError(f"Failed to build line index {self.index_path}")
+
+    def _load(self) -> bool:
+        try:
+            index_file = open(self.index_path, "rb")
+        except OSError:
+            return False
+        with index_file:
+            header = index_file.read(self._HEADER.size)
+            if len(header) < self._HEADER.size:
+                return False
+            magic, size, mtime_ns, count = self._HEADER.unpack(header)
+            stat = os.stat(self.path)
+            if magic != self.MAGIC or size != stat.st_size or mtime_ns != stat.st_mtime_ns:
+                return False
+            self._index = mmap.mmap(index_file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._offsets = memoryview(self._index)[self._HEADER.size : self._HEADER.size + 8 * count].cast("Q")
+        return True
+
+    def _build(self) -> None:
+        logger.info(f"🗂️ Building line index {self.index_path}")
+        stat = os.stat(self.path)
+        tmp_path = f"{self.index_path}.tmp"
+        count = 0
+        with open(tmp_path, "wb") as out:
+            out.write(self._HEADER.pack(self.MAGIC, 0, 0, 0))
+            chunk = array("Q")
+            start = 0
+            while self._data is not None and start < self._size:
+                chunk.append(start)
+                end = self._data.find(b"\n", start)
+                start = self._size if end < 0 else end + 1
+                if len(chunk) >= 65536:
+                    chunk.tofile(out)
+                    count += len(chunk)
+                    chunk = array("Q")
+            chunk.tofile(out)
+            count += len(chunk)
+            out.seek(0)
+            out.write(self._HEADER.pack(self.MAGIC, stat.st_size, stat.st_mtime_ns, count))
+        os.replace(tmp_path, self.index_path)
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    def offset(self, line_index: int) -> int:
+        """Byte offset where line ``line_index`` (0-based) starts."""
+        return self._offsets[line_index]
+
+    def line(self, line_index: int) -> bytes:
+        """Raw bytes of line ``line_index`` (0-based), including its newline."""
+        assert self._data is not None
+        end = self._offsets[line_index + 1] if line_index + 1 < len(self._offsets) else self._size
+        return self._data[self._offsets[line_index] : end]
+
+    def shard(self, shard_index: int, shard_count: int) -> range:
+        """Line indexes of shard ``shard_index`` of ``shard_count`` contiguous, near-equal shards."""
+        if not 0 <= shard_index < shard_count:
+            raise ValueError(f"Shard index {shard_index} out of range for {shard_count} shards")
+        total = len(self)
+        return range(total * shard_index // shard_count, total * (shard_index + 1) // shard_count)
+
+    def close(self) -> None:
+        """Unmap the index and the input."""
+        self._offsets.release()
+        self._index.close()
+        if self._data is not None:
+            self._data.close()
+        self._data_file.close()
+
+    def __enter__(self) -> JsonlLineIndex:
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+
+class IndexedJsonlReader(BatchReader):
+    """JSONL reader over a :class:`JsonlLineIndex`; positions are 0-based line indexes."""
+
+    def __init__(self, path: str, index_path: str | None = None) -> None:
+        super().__init__(path)
+        self.index = JsonlLineIndex(path, index_path)
+
+    @property
+    def end_position(self) -> int:
+        return len(self.index)
+
+    def records(self, start_position: int = 0, start_number: int = 1) -> Iterator[BatchRecord]:
+        for line_index in range(start_position, len(self.index)):
+            line_num = start_number + line_index - start_position
+            data = _parse_object(self.index.line(line_index), line_num, self.path)
+            if data is not None:
+                yield line_num, line_index, data
+
+    def shards(self, shard_count: int) -> list[BatchShard]:
+        return _plan_shards([(line_index, line_index + 1) for line_index in _shard_starts(len(self.index), shard_count)], len(self.index))
+
+    def close(self) -> None:
+        self.index.close()
+
+
+BATCH_READERS: dict[str, type[BatchReader]] = {
+    "jsonl": JsonlReader,
+    "indexed_jsonl": IndexedJsonlReader,
+    "csv": CsvReader,
+    "tsv": TsvReader,
+    "parquet": ParquetReader,
+}
+
+
+def register_batch_reader(data_format: str, reader_cls: type[BatchReader]) -> None:
+    """Make ``reader_cls`` available as ``<format>`` ``data_format`` of batch calls."""
+    BATCH_READERS[data_format.lower()] = reader_cls
+
+
+def create_batch_reader(data_format: str, path: str, *, index_dir: str | None = None) -> BatchReader:
+    """Return the reader registered for ``data_format``.
+
+    Args:
+        data_format: Value of the ``<format>`` element (case-insensitive)
+        path: Input file
+        index_dir: Directory for the line index of ``indexed_jsonl`` (defaults to the input's directory)
+
+    Raises:
+        ValueError: If the format is unknown or the file cannot be opened
+    """
+    reader_cls = BATCH_READERS.get(data_format.lower())
+    if reader_cls is None:
+        raise ValueError(
+            f"Unsupported data format: {data_format}. Supported formats: {', '.join(BATCH_READERS)}.",
+        )
+    if issubclass(reader_cls, IndexedJsonlReader) and index_dir is not None:
+        return reader_cls(path, os.path.join(index_dir, f"{os.path.basename(path)}.idx"))
+    return reader_cls(path)
@@ -0,0 +1,524 @@
+# Copyright (c) Nex-AGI. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Batch processing sharded across worker processes and hosts.
+
+:class:`BatchProcessor` runs the items of a batch in threads of one process,
+so tool work that holds the GIL caps throughput whatever ``max_workers`` is.
+:class:`ShardedBatchRunner` splits the input into contiguous shards
+(:meth:`BatchReader.shards`) and runs each shard through
+``BatchProcessor._process_batch_data`` in a worker process of a process pool.
+
+The shards are coordinated through files in a work directory, which doubles
+as the queue when several hosts run the same batch on a shared file system:
+
+- ``plan.json``: the shard boundaries, written by the first runner and used
+  by every runner on the directory
+- ``<input>.shard-NNNN-of-MMMM.claim``: created exclusively by the process
+  running the shard and touched as a heartbeat; a claim whose heartbeat
+  stopped for ``claim_timeout`` seconds, or whose process on this host died,
+  is taken over
+- ``<input>.shard-NNNN-of-MMMM.results.jsonl`` and ``.checkpoint.json``: the
+  shard's output, so a taken-over or rerun shard resumes where it stopped
+- ``<input>.shard-NNNN-of-MMMM.done``: the shard's counters once finished
+
+Once every shard is done, one runner merges the shard results in input
+order into ``<input>.results.jsonl`` and renders the summary of
+``_process_batch_data``; the other runners return the same summary.
+
+The files live in a subdirectory named after the batch identity: the input
+file version, format, agent, message template and agent configuration. A
+changed input or configuration therefore starts a fresh batch, while an
+interrupted one resumes its shards. A finished batch is run again unless
+the runner is created with ``resume=True``, which returns its summary.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import pickle
+import shutil
+import socket
+import threading
+import time
+import uuid
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import asdict, dataclass
+from multiprocessing import get_context
+from typing import Any
+
+from .batch_cache import BatchResultCache
+from .batch_processor import DISPLAYED_RESULTS, BatchProcessor, BatchProgress, format_batch_summary
+from .batch_readers import BatchShard, create_batch_reader
+
+logger = logging.getLogger(__name__)
+
+# Batch processor of a worker process, built once by the pool initializer
+_worker_processor: BatchProcessor | None = None
+
+
+class ShardedBatchRunner:
+    """Runs a batch as shards in a process pool, optionally together with other hosts.
+
+    Every host that runs the same batch with the same ``output_dir`` (or
+    ``work_dir``) on a shared file system takes part: shards are claimed one
+    at a time, so hosts and processes pick up work until none is left. The
+    first runner to start fixes the shard plan. Items are deduplicated within
+    a shard; a ``result_cache`` is shared by all processes of a host.
+
+    Worker processes are started with ``spawn`` by default, so the agent
+    factory must be picklable: a module-level function or the factory of a
+    YAML sub-agent. Each worker builds its own sub-agents from it.
+    """
+
+    def __init__(
+        self,
+        agent_name: str,
+        agent_factory: Callable[..., Any],
+        processes: int | None = None,
+        shards: int | None = None,
+        threads_per_process: int = 5,
+        output_dir: str | None = None,
+        work_dir: str | None = None,
+        result_cache: BatchResultCache | None = None,
+        claim_timeout: float = 300.0,
+        poll_interval: float = 5.0,
+        start_method: str = "spawn",
+        config_fingerprint: str | None = None,
+        resume: bool = False,
+    ):
+        """Initialize sharded batch runner.
+
+        Args:
+            agent_name: Name of the sub-agent that processes the items
+            agent_factory: Factory building the sub-agent in each worker process
+            processes: Worker processes on this host (defaults to the CPU count)
+            shards: Shards the input is split into (defaults to ``processes``;
+                use more when several hosts share the batch)
+            threads_per_process: Items run at once in each worker process
+            output_dir: Directory for the merged ``<input>.results.jsonl``
+                (defaults to the input's directory)
+            work_dir: Directory for the plan, claims and shard output
+                (defaults to ``<output_dir>/<input>.shards``)
+            result_cache: Optional persistent result cache; workers open
+                their own handle on its directory
+            claim_timeout: Seconds without a heartbeat after which a shard
+                claimed by another process is taken over
+            poll_interval: Seconds between checks while shards claimed
+                elsewhere are still running
+            start_method: Multiprocessing start method of the workers
+            config_fingerprint: Fingerprint of the sub-agent's configuration;
+                batches run with another configuration never share shards
+            resume: Return the summary of an identical batch that already
+                finished instead of running it again
+
+        Raises:
+            ValueError: If the agent factory cannot be sent to worker processes
+        """
+        self.agent_name = agent_name
+        self.agent_factory = agent_factory
+        self.processes = max(1, processes or os.cpu_count() or 1)
+        self.shards = max(1, shards or self.processes)
+        self.threads_per_process = max(1, threads_per_process)
+        self.output_dir = output_dir
+        self.work_dir = work_dir
+        self.result_cache = result_cache
+        self.claim_timeout = claim_timeout
+        self.poll_interval = poll_interval
+        self.start_method = start_method
+        self.config_fingerprint = config_fingerprint
+        self.resume = resume
+        if start_method != "fork":
+            try:
+                pickle.dumps(agent_factory)
+            except Exception as e:
+                raise ValueError(
+                    f"Agent factory of '{agent_name}' cannot be sent to worker processes: {e}. "
+                    "Use a module-level function or a YAML sub-agent config."
+                )
+
+    def run(self, file_path: str, data_format: str, message_template: str) -> str:
+        """Process the batch and return the summary of the merged results.
+
+        Args:
+            file_path: Path to the data file
+            data_format: Format of the data file
+            message_template: Template for messages to send to agent
+
+        Returns:
+            JSON string with processing results, as returned by ``_process_batch_data``
+        """
+        output_dir = self.output_dir or os.path.dirname(os.path.abspath(file_path))
+        batch = _ShardedBatch.create(
+            file_path,
+            data_format.lower(),
+            self.agent_name,
+            message_template,
+            output_dir,
+            self.work_dir or os.path.join(output_dir, f"{os.path.basename(file_path)}.shards"),
+            self.claim_timeout,
+            self.config_fingerprint,
+        )
+        summary = batch.load_summary()
+        if summary is not None:
+            if self.resume:
+                return summary
+            logger.info(f"🧹 Batch {file_path} finished before; discarding its shards to run it again")
+            batch.discard()
+
+        plan = batch.load_or_create_plan(self.shards)
+        pending = [shard for shard in plan if not batch.is_done(shard)]
+        if pending:
+            logger.info(f"🧩 Batch {file_path}: {len(pending)}/{len(plan)} shards pending, running {self.processes} worker processes")
+            self._run_shards(batch, plan)
+
+        while True:
+            summary = batch.load_summary()
+            if summary is not None:
+                return summary
+            claim = batch.claim(batch.merge_claim_path)
+            if claim is not None:
+                with claim:
+                    # Another runner may have merged between the check and the claim
+                    return batch.load_summary() or batch.merge(plan)
+            time.sleep(self.poll_interval)
+
+    def _run_shards(self, batch: _ShardedBatch, plan: list[BatchShard]) -> None:
+        """Run shards in the pool until every shard is done, here or on another host."""
+        cache = self.result_cache
+        cache_settings = (cache.directory, cache.max_age, cache.size_limit) if cache is not None else None
+        with ProcessPoolExecutor(
+            max_workers=min(self.processes, len(plan)),
+            mp_context=get_context(self.start_method),
+            initializer=_init_worker,
+            initargs=(self.agent_name, self.agent_factory, batch.work_dir, self.threads_per_process, cache_settings),
+        ) as pool:
+            while True:
+                pending = [shard for shard in plan if not batch.is_done(shard)]
+                if not pending:
+                    return
+                runnable = [shard for shard in pending if batch.claimable(batch.claim_path(shard))]
+                if not runnable:
+                    # Shards claimed by live processes elsewhere; wait for them or for their claims to go stale
+                    time.sleep(self.poll_interval)
+                    continue
+                futures = [pool.submit(_run_shard, batch, shard) for shard in runnable]
+                try:
+                    for future in as_completed(futures):
+                        future.result()
+                except BaseException:
+                    for future in futures:
+                        future.cancel()
+                    raise
+
+
+def _init_worker(
+    agent_name: str,
+    agent_factory: Callable[..., Any],
+    work_dir: str,
+    threads: int,
+    cache_settings: tuple[str, float | None, int] | None,
+) -> None:
+    """Build the batch processor of a worker process."""
+    from ..agent_context import GlobalStorage
+    from .subagent_manager import SubAgentManager
+
+    global _worker_processor
+    manager = SubAgentManager(f"{agent_name}_shard_worker", {agent_name: agent_factory}, GlobalStorage())
+    result_cache = BatchResultCache(*cache_settings) if cache_settings is not None else None
+    _worker_processor = BatchProcessor(manager, threads, output_dir=work_dir, result_cache=result_cache)
+
+
+def _run_shard(batch: _ShardedBatch, shard: BatchShard) -> bool:
+    """Claim and process one shard in a worker process; False if it was taken or finished elsewhere."""
+    processor = _worker_processor
+    assert processor is not None, "worker process was not initialized"
+    claim = batch.claim(batch.claim_path(shard))
+    if claim is None:
+        return False
+    with claim:
+        if batch.is_done(shard):
+            return False
+        logger.info(f"🧩 Processing {shard.label} of {batch.file_path} (pid {os.getpid()})")
+        processor._process_batch_data(batch.agent_name, batch.file_path, batch.data_format, batch.message_template, shard)
+        assert processor.progress is not None
+        _write_json(batch.done_path(shard), {"shard": asdict(shard), "progress": processor.progress.to_dict()})
+    return True
+
+
+@dataclass(frozen=True)
+class _ShardedBatch:
+    """Paths and identity of one sharded batch; sent to the worker processes.
+
+    Runs of a different input, format, agent, template or agent configuration
+    get their own subdirectory of the work directory, so they never mix their
+    shards.
+    """
+
+    file_path: str
+    data_format: str
+    agent_name: str
+    message_template: str
+    output_dir: str
+    work_dir: str
+    claim_timeout: float
+
+    @classmethod
+    def create(
+        cls,
+        file_path: str,
+        data_format: str,
+        agent_name: str,
+        message_template: str,
+        output_dir: str,
+        work_dir: str,
+        claim_timeout: float,
+        config_fingerprint: str | None = None,
+    ) -> _ShardedBatch:
+        # Hosts may mount the shared input at different paths, so the identity uses its name
+        stat = os.stat(file_path)
+        identity = [
+            os.path.basename(file_path),
+            stat.st_size,
+            stat.st_mtime_ns,
+            data_format,
+            agent_name,
+            message_template,
+            config_fingerprint,
+        ]
+        digest = hashlib.sha256(json.dumps(identity, ensure_ascii=False).encode("utf-8")).hexdigest()[:16]
+        work_dir = os.path.join(work_dir, digest)
+        os.makedirs(work_dir, exist_ok=True)
+        return cls(file_path, data_format, agent_name, message_template, output_dir, work_dir, claim_timeout)
+
+    @property
+    def base(self) -> str:
+        return os.path.join(self.work_dir, os.path.basename(self.file_path))
+
+    @property
+    def plan_path(self) -> str:
+        return os.path.join(self.work_dir, "plan.json")
+
+    @property
+    def merge_claim_path(self) -> str:
+        return f"{self.base}.merge.claim"
+
+    @property
+    def summary_path(self) -> str:
+        return f"{self.base}.summary.json"
+
+    @property
+    def results_path(self) -> str:
+        return os.path.join(self.output_dir, f"{os.path.basename(self.file_path)}.results.jsonl")
+
+    def claim_path(self, shard: BatchShard) -> str:
+        return f"{self.base}.{shard.label}.claim"
+
+    def done_path(self, shard: BatchShard) -> str:
+        return f"{self.base}.{shard.label}.done"
+
+    def shard_results_path(self, shard: BatchShard) -> str:
+        return f"{self.base}.{shard.label}.results.jsonl"
+
+    def is_done(self, shard: BatchShard) -> bool:
+        return os.path.exists(self.done_path(shard))
+
+    def load_or_create_plan(self, shard_count: int) -> list[BatchShard]:
+        """Return the shard plan of this batch, planning it if no runner has yet."""
+        if not os.path.exists(self.plan_path):
+            reader = create_batch_reader(self.data_format, self.file_path, index_dir=self.work_dir)
+            try:
+                shards = reader.shards(shard_count)
+            finally:
+                reader.close()
+            # Publish the plan complete or not at all; the first runner's plan wins
+            tmp_path = f"{self.plan_path}.{uuid.uuid4().hex}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"shards": [asdict(shard) for shard in shards]}, f)
+            try:
+                os.link(tmp_path, self.plan_path)
+            except FileExistsError:
+                pass
+            finally:
+                os.remove(tmp_path)
+        with open(self.plan_path, encoding="utf-8") as f:
+            return [BatchShard(**shard) for shard in json.load(f)["shards"]]
+
+    def load_summary(self) -> str | None:
+        try:
+            with open(self.summary_path, encoding="utf-8") as f:
+                return json.load(f)["summary"]
+        except FileNotFoundError:
+            return None
+
+    def discard(self) -> None:
+        """Remove the plan, claims and shard output of a finished batch so it runs again."""
+        shutil.rmtree(self.work_dir, ignore_errors=True)
+        os.makedirs(self.work_dir, exist_ok=True)
+
+    def claimable(self, path: str) -> bool:
+        """Whether the claim at ``path`` is free or stale."""
+        info = _read_claim(path)
+        return info is None or self._is_stale(path, info)
+
+    def claim(self, path: str) -> _Claim | None:
+        """Take the claim at ``path``; None if a live process holds it."""
+        token = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex}"
+        content = json.dumps({"host": socket.gethostname(), "pid": os.getpid(), "token": token, "claimed_at": time.time()})
+        for _ in range(2):
+            try:
+                fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644)
+            except FileExistsError:
+                info = _read_claim(path)
+                if info is not None and not self._is_stale(path, info):
+                    return None
+                self._steal(path)
+                continue
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(content)
+            return _Claim(path, token, self.claim_timeout)
+        return None
+
+    def _is_stale(self, path: str, info: dict[str, Any]) -> bool:
+        try:
+            age = time.time() - os.stat(path).st_mtime
+        except FileNotFoundError:
+            return True
+        if age > self.claim_timeout:
+            return True
+        return info.get("host") == socket.gethostname() and not _pid_alive(int(info.get("pid", 0)))
+
+    def _steal(self, path: str) -> None:
+        """Move a stale claim out of the way without removing a fresh claim that replaced it."""
+        stale_path = f"{path}.{uuid.uuid4().hex}.stale"
+        try:
+            os.rename(path, stale_path)
+        except FileNotFoundError:
+            return
+        info = _read_claim(stale_path)
+        if info is not None and not self._is_stale(stale_path, info):
+            # Another process took the claim over in between; give it back
+            try:
+                os.link(stale_path, path)
+            except FileExistsError:
+                pass
+        else:
+            logger.warning(f"⚠️ Taking over stale batch claim {path} held by {info}")
+        os.remove(stale_path)
+
+    def merge(self, plan: list[BatchShard]) -> str:
+        """Concatenate the shard results in input order and publish the summary."""
+        progress = BatchProgress(file_path=self.file_path, results_path=self.results_path)
+        displayed_results: list[dict[str, Any]] = []
+        os.makedirs(self.output_dir, exist_ok=True)
+        tmp_path = f"{self.results_path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as out:
+            for shard in plan:
+                with open(self.done_path(shard), encoding="utf-8") as f:
+                    shard_progress = json.load(f)["progress"]
+                progress.resumed += shard_progress["resumed"]
+                progress.deduplicated += shard_progress["deduplicated"]
+                progress.cached += shard_progress["cached"]
+                for line in _sorted_records(self.shard_results_path(shard)):
+                    record = json.loads(line)
+                    out.write(line)
+                    if record.get("status") == "success":
+                        progress.succeeded += 1
+                    else:
+                        progress.failed += 1
+                    if len(displayed_results) < DISPLAYED_RESULTS:
+                        displayed_results.append(record)
+        os.replace(tmp_path, self.results_path)
+        progress.completed = progress.total
+        summary = format_batch_summary(progress, displayed_results, self.data_format)
+        _write_json(self.summary_path, {"summary": summary, "progress": progress.to_dict()})
+        logger.info(f"🧩 Merged {len(plan)} shards of {self.file_path} into {self.results_path}")
+        return summary
+
+
+class _Claim:
+    """Held claim on a shard or the merge, kept fresh by a heartbeat thread until released."""
+
+    def __init__(self, path: str, token: str, claim_timeout: float) -> None:
+        self.path = path
+        self.token = token
+        self._interval = max(claim_timeout / 4, 0.01)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._heartbeat, name=f"batch-claim-{os.path.basename(path)}", daemon=True)
+
+    def __enter__(self) -> _Claim:
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self._stop.set()
+        self._thread.join()
+        info = _read_claim(self.path)
+        if info is not None and info.get("token") == self.token:
+            try:
+                os.remove(self.path)
+            except FileNotFoundError:
+                pass
+
+    def _heartbeat(self) -> None:
+        while not self._stop.wait(self._interval):
+            try:
+                os.utime(self.path)
+            except FileNotFoundError:
+                logger.warning(f"⚠️ Batch claim {self.path} was taken over while still running")
+                return
+
+
+def _read_claim(path: str) -> dict[str, Any] | None:
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, json.JSONDecodeError):
+        # Being written right now
+        return {}
+
+
+def _pid_alive(pid: int) -> bool:
+    if pid <= 0:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _sorted_records(path: str) -> list[str]:
+    """Lines of a shard results file ordered by record line number."""
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding="utf-8") as f:
+        lines = [line if line.endswith("\n") else f"{line}\n" for line in f if line.strip()]
+    return sorted(lines, key=lambda line: json.loads(line)["line"])
+
+
+def _write_json(path: str, data: dict[str, Any]) -> None:
+    """Write ``data`` to ``path`` atomically through a temporary file."""
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
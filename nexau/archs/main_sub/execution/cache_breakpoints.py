@@ -0,0 +1,268 @@
+# Copyright (c) Nex-AGI. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Placement of provider prompt-cache breakpoints (``cache_control`` markers)."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import threading
+from collections.abc import Hashable
+from dataclasses import dataclass, field
+from typing import Any
+
+from nexau.archs.main_sub.utils.token_counter import message_fingerprint
+
+logger = logging.getLogger(__name__)
+
+# Anthropic accepts at most four cache_control markers per request
+MAX_CACHE_BREAKPOINTS = 4
+# Anthropic looks for cache hits up to this many blocks before a breakpoint
+CACHE_LOOKBACK_BLOCKS = 20
+
+
+@dataclass
+class CacheBreakpointPlan:
+    """Where cache_control markers were placed for one request.
+
+    Attributes:
+        tools: Whether the last tool definition carries a breakpoint
+        system: Whether the system prompt carries a breakpoint
+        message_indices: Indices of history messages carrying a breakpoint
+        stable_prefix: Number of leading messages unchanged since the previous request
+        invalidated: True when a rewrite (e.g. context compaction) dropped every
+            history checkpoint of the previous request
+    """
+
+    tools: bool = False
+    system: bool = False
+    message_indices: list[int] = field(default_factory=list)
+    stable_prefix: int = 0
+    invalidated: bool = False
+
+    @property
+    def count(self) -> int:
+        """Total number of breakpoints placed."""
+        return int(self.tools) + int(self.system) + len(self.message_indices)
+
+
+def _message_digest(message: Any) -> str:
+    payload = json.dumps(message, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+def _cache_control(ttl: str | None) -> dict[str, Any]:
+    control: dict[str, Any] = {"type": "ephemeral"}
+    if ttl:
+        control["ttl"] = ttl
+    return control
+
+
+class CacheBreakpointPlanner:
+    """Spread a provider's cache breakpoints over the stable parts of a request.
+
+    Breakpoints go, in priority order, on the tool definitions, the system
+    prompt, the newest message (so the next request can read this one's
+    prefix) and the newest checkpoint of the previous request whose prefix is
+    still byte-identical. Remaining slots become rolling checkpoints spaced
+    within the provider's lookback window.
+
+    The planner remembers message digests between requests of one
+    conversation. When context compaction rewrites older turns, only the
+    history checkpoints after the first changed message are dropped; the
+    tool and system breakpoints keep hitting. Like the executor's token
+    ledger, digests are cached by message identity, so each request only
+    hashes the messages that are new or were rewritten.
+    """
+
+    def __init__(self, lookback: int = CACHE_LOOKBACK_BLOCKS):
+        """Initialize planner.
+
+        Args:
+            lookback: Maximum distance, in messages, between rolling checkpoints
+        """
+        self.lookback = max(1, lookback)
+        self._digests: list[str] = []
+        self._checkpoints: list[int] = []
+        # id(message) -> (message, fingerprint, digest). The message reference
+        # keeps the object alive so its id cannot be reused while cached.
+        self._entries: dict[int, tuple[Any, Hashable, str]] = {}
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.invalidations = 0
+
+    def reset(self) -> None:
+        """Forget the previous request, e.g. when a new conversation starts."""
+        with self._lock:
+            self._digests = []
+            self._checkpoints = []
+            self._entries = {}
+
+    def apply_anthropic(
+        self,
+        api_kwargs: dict[str, Any],
+        max_breakpoints: int = MAX_CACHE_BREAKPOINTS,
+        ttl: str | None = "5m",
+        source_messages: list[dict[str, Any]] | None = None,
+    ) -> CacheBreakpointPlan:
+        """Add cache_control markers to Anthropic ``messages.create`` kwargs in place.
+
+        ``system`` and ``messages`` are expected to be freshly built block lists.
+        ``tools`` may be a shared payload, so the list and its last entry are
+        copied rather than modified.
+
+        ``source_messages`` are the chat messages ``messages`` were converted
+        from, one per message. Unlike the freshly built blocks they are the
+        same objects from one request to the next, so unchanged messages are
+        not hashed again.
+        """
+        budget = max(0, min(max_breakpoints, MAX_CACHE_BREAKPOINTS))
+        plan = CacheBreakpointPlan()
+        control = _cache_control(ttl)
+
+        tools = api_kwargs.get("tools")
+        if budget and tools:
+            api_kwargs["tools"] = [*tools[:-1], {**tools[-1], "cache_control": control}]
+            plan.tools = True
+            budget -= 1
+
+        system = api_kwargs.get("system")
+        if budget and isinstance(system, list) and system:
+            system[-1] = {**system[-1], "cache_control": control}
+            plan.system = True
+            budget -= 1
+
+        messages = api_kwargs.get("messages") or []
+        if source_messages is None or len(source_messages) != len(messages):
+            source_messages = messages
+        self._plan_history(plan, messages, budget, source_messages)
+        for index in plan.message_indices:
+            content = messages[index]["content"]
+            content[-1] = {**content[-1], "cache_control": control}
+        return plan
+
+    def apply_openai(
+        self,
+        messages: list[dict[str, Any]],
+        max_breakpoints: int = MAX_CACHE_BREAKPOINTS,
+        ttl: str | None = None,
+        source_messages: list[dict[str, Any]] | None = None,
+    ) -> tuple[list[dict[str, Any]], CacheBreakpointPlan]:
+        """Return a copy of chat messages with cache_control on content parts.
+
+        For OpenAI-compatible gateways that forward Anthropic-style prompt
+        caching. Leading system messages are treated as the system prompt.
+        ``source_messages`` play the same role as in :meth:`apply_anthropic`,
+        for callers that sanitized copies of the conversation's messages.
+        """
+        budget = max(0, min(max_breakpoints, MAX_CACHE_BREAKPOINTS))
+        plan = CacheBreakpointPlan()
+        control = _cache_control(ttl)
+        marked = list(messages)
+
+        system_end = 0
+        while system_end < len(marked) and marked[system_end].get("role") == "system":
+            system_end += 1
+
+        def mark(index: int) -> None:
+            message = marked[index]
+            content = message.get("content")
+            if isinstance(content, str):
+                parts: list[Any] = [{"type": "text", "text": content}]
+            else:
+                parts = list(content)
+            parts[-1] = {**parts[-1], "cache_control": control}
+            marked[index] = {**message, "content": parts}
+
+        if budget and system_end and marked[system_end - 1].get("content"):
+            mark(system_end - 1)
+            plan.system = True
+            budget -= 1
+
+        history = marked[system_end:]
+        if source_messages is None or len(source_messages) != len(messages):
+            source_messages = messages
+        self._plan_history(plan, history, budget, source_messages[system_end:])
+        for index in plan.message_indices:
+            mark(system_end + index)
+        plan.message_indices = [system_end + index for index in plan.message_indices]
+        return marked, plan
+
+    def _plan_history(
+        self,
+        plan: CacheBreakpointPlan,
+        messages: list[dict[str, Any]],
+        budget: int,
+        source_messages: list[dict[str, Any]],
+    ) -> None:
+        markable = [i for i, message in enumerate(messages) if message.get("content")]
+
+        with self._lock:
+            digests = self._digest(source_messages)
+            self.requests += 1
+            stable = 0
+            for previous, current in zip(self._digests, digests):
+                if previous != current:
+                    break
+                stable += 1
+
+            chosen: list[int] = []
+            if budget and markable:
+                # Write point: the whole current prompt becomes readable next time
+                chosen.append(markable[-1])
+
+                # Read point: newest previous checkpoint whose prefix is unchanged
+                floor = -1
+                reusable = [i for i in self._checkpoints if i < stable and i not in chosen]
+                if reusable and len(chosen) < budget:
+                    floor = max(reusable)
+                    chosen.append(floor)
+                elif self._checkpoints and not reusable:
+                    plan.invalidated = True
+                    self.invalidations += 1
+                    logger.debug(f"♻️ Prompt cache checkpoints invalidated after message {stable}")
+
+                # Rolling checkpoints keep every gap within the lookback window, so a
+                # later rewrite of older turns still leaves an earlier checkpoint intact
+                candidate = chosen[0] - self.lookback
+                while len(chosen) < budget and candidate > floor:
+                    position = max((i for i in markable if i <= candidate), default=None)
+                    if position is None or position in chosen:
+                        break
+                    chosen.append(position)
+                    candidate = position - self.lookback
+
+            plan.stable_prefix = stable
+            plan.message_indices = sorted(chosen)
+            self._digests = digests
+            self._checkpoints = plan.message_indices
+
+    def _digest(self, messages: list[dict[str, Any]]) -> list[str]:
+        """Digest messages, hashing only those not seen unchanged in the previous request."""
+        entries: dict[int, tuple[Any, Hashable, str]] = {}
+        digests: list[str] = []
+        for message in messages:
+            key = id(message)
+            fingerprint = message_fingerprint(message)
+            cached = self._entries.get(key)
+            if cached is not None and cached[0] is message and cached[1] == fingerprint:
+                digest = cached[2]
+            else:
+                digest = _message_digest(message)
+            entries[key] = (message, fingerprint, digest)
+            digests.append(digest)
+        self._entries = entries
+        return digests
@@ -0,0 +1,376 @@
+# Copyright (c) Nex-AGI. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Adaptive (AIMD) concurrency limit shared by sub-agent and batch fan-out."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from collections.abc import AsyncIterator, Iterator
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from typing import Any
+
+from nexau.archs.llm.retry_policy import ErrorClass
+from nexau.archs.tracer.metrics import LatencyHistogram
+
+logger = logging.getLogger(__name__)
+
+CONCURRENCY_LIMITER_STORAGE_KEY = "concurrency_limiter"
+
+# Errors that mean the provider wants less traffic right now
+_BACKOFF_ERRORS = {ErrorClass.RATE_LIMIT, ErrorClass.OVERLOADED}
+# Errors counted against the window's error rate
+_WINDOW_ERRORS = {ErrorClass.SERVER, ErrorClass.TIMEOUT, ErrorClass.CONNECTION}
+
+# Limiter whose slot the current context holds. LLM calls made while it is
+# set report their latency and failures to it, and nested fan-out runs under
+# the parent's slot instead of waiting for a second one.
+_current_limiter: ContextVar[AdaptiveConcurrencyLimiter | None] = ContextVar("current_concurrency_limiter", default=None)
+
+
+def current_concurrency_limiter() -> AdaptiveConcurrencyLimiter | None:
+    """Return the limiter whose slot the current context holds, if any."""
+    return _current_limiter.get()
+
+
+class _Waiter:
+    """A caller queued for a slot; granted slots are handed over directly."""
+
+    __slots__ = ("event", "future", "loop", "granted")
+
+    def __init__(self, loop: asyncio.AbstractEventLoop | None = None) -> None:
+        self.loop = loop
+        self.future: asyncio.Future[None] | None = loop.create_future() if loop is not None else None
+        self.event = threading.Event() if loop is None else None
+        self.granted = False
+
+    def wake(self) -> None:
+        self.granted = True
+        if self.event is not None:
+            self.event.set()
+        elif self.loop is not None and self.future is not None:
+            self.loop.call_soon_threadsafe(_resolve, self.future)
+
+
+def _resolve(future: asyncio.Future[None]) -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+class AdaptiveConcurrencyLimiter:
+    """Concurrency limit that follows additive-increase/multiplicative-decrease.
+
+    Units of fan-out work (sub-agent calls, batch items) hold a slot while
+    they run. LLM calls made inside a slot report their latency and failures
+    back to the limiter. Every ``window_size`` samples the window is
+    evaluated: a high error rate or a p95 latency above ``latency_tolerance``
+    times the running baseline lowers the limit by ``backoff_factor``, while a
+    healthy window in which all slots were in use raises it by
+    ``increase_step``. Rate-limit and overload errors lower the limit
+    immediately, at most once per ``backoff_cooldown`` seconds.
+
+    Slots are granted in FIFO order to threads and coroutines alike, and a
+    context that already holds a slot runs nested fan-out under it, so a
+    parent never waits on a slot its own children need.
+    """
+
+    def __init__(
+        self,
+        initial_limit: int = 4,
+        min_limit: int = 1,
+        max_limit: int = 32,
+        *,
+        window_size: int = 20,
+        increase_step: int = 1,
+        backoff_factor: float = 0.5,
+        latency_tolerance: float = 1.5,
+        max_error_rate: float = 0.1,
+        backoff_cooldown: float = 1.0,
+        name: str = "nexau",
+    ):
+        """Initialize the limiter.
+
+        Args:
+            initial_limit: Starting number of slots
+            min_limit: Lowest limit backoff can reach
+            max_limit: Highest limit growth can reach
+            window_size: Samples per evaluation window
+            increase_step: Slots added after a healthy, saturated window
+            backoff_factor: Multiplier applied to the limit on backoff
+            latency_tolerance: Window p95 over baseline p95 that triggers backoff
+            max_error_rate: Window error rate that triggers backoff
+            backoff_cooldown: Minimum seconds between two backoffs
+            name: Name used in logs and stats
+        """
+        if min_limit < 1 or max_limit < min_limit:
+            raise ValueError(f"Invalid concurrency bounds: min_limit={min_limit}, max_limit={max_limit}")
+        if not 0 < backoff_factor < 1:
+            raise ValueError(f"backoff_factor must be between 0 and 1, got {backoff_factor}")
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.window_size = max(1, window_size)
+        self.increase_step = max(1, increase_step)
+        self.backoff_factor = backoff_factor
+        self.latency_tolerance = latency_tolerance
+        self.max_error_rate = max_error_rate
+        self.backoff_cooldown = backoff_cooldown
+        self.name = name
+
+        self._lock = threading.Lock()
+        self._limit = min(max_limit, max(min_limit, initial_limit))
+        self._in_use = 0
+        self._waiters: deque[_Waiter] = deque()
+        self._window = LatencyHistogram()
+        self._window_errors = 0
+        self._window_saturated = False
+        self._baseline_p95_ms: float | None = None
+        self._last_p95_ms: float | None = None
+        self._last_error_rate = 0.0
+        self._last_backoff = float("-inf")
+        self._increases = 0
+        self._decreases = 0
+        self._rate_limited = 0
+        self._samples = 0
+
+    @property
+    def limit(self) -> int:
+        """Current number of slots."""
+        return self._limit
+
+    @property
+    def in_use(self) -> int:
+        """Slots currently held."""
+        return self._in_use
+
+    def holds_slot(self) -> bool:
+        """Whether the current context already runs under a slot of this limiter."""
+        return _current_limiter.get() is self
+
+    # ------------------------------------------------------------------ slots
+
+    def acquire(self, timeout: float | None = None) -> bool:
+        """Block until a slot is free.
+
+        Args:
+            timeout: Seconds to wait at most; ``None`` waits indefinitely
+
+        Returns:
+            Whether a slot was acquired
+        """
+        with self._lock:
+            if self._try_acquire_locked():
+                return True
+            waiter = _Waiter()
+            self._waiters.append(waiter)
+
+        assert waiter.event is not None
+        if waiter.event.wait(timeout):
+            return True
+        with self._lock:
+            if waiter.granted:
+                return True
+            self._waiters.remove(waiter)
+            return False
+
+    async def aacquire(self) -> None:
+        """Wait for a slot without blocking the event loop."""
+        with self._lock:
+            if self._try_acquire_locked():
+                return
+            waiter = _Waiter(asyncio.get_running_loop())
+            self._waiters.append(waiter)
+
+        assert waiter.future is not None
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            with self._lock:
+                if not waiter.granted:
+                    self._waiters.remove(waiter)
+                    raise
+            # The slot was handed over while we were being cancelled
+            self.release()
+            raise
+
+    def release(self) -> None:
+        """Return a slot and hand it to the next waiter."""
+        with self._lock:
+            self._in_use = max(0, self._in_use - 1)
+            self._wake_locked()
+
+    @contextmanager
+    def slot(self, acquired: bool = False) -> Iterator[None]:
+        """Hold a slot for the duration of the block.
+
+        Nested use from a context that already holds a slot of this limiter
+        does not take a second one.
+
+        Args:
+            acquired: The caller already acquired the slot (e.g. before
+                submitting the work); it is only released on exit
+        """
+        if not acquired and self.holds_slot():
+            yield
+            return
+        if not acquired:
+            self.acquire()
+        token = _current_limiter.set(self)
+        try:
+            yield
+        finally:
+            _current_limiter.reset(token)
+            self.release()
+
+    @asynccontextmanager
+    async def aslot(self) -> AsyncIterator[None]:
+        """Async counterpart of :meth:`slot`."""
+        if self.holds_slot():
+            yield
+            return
+        await self.aacquire()
+        token = _current_limiter.set(self)
+        try:
+            yield
+        finally:
+            _current_limiter.reset(token)
+            self.release()
+
+    def _try_acquire_locked(self) -> bool:
+        if self._waiters or self._in_use >= self._limit:
+            return False
+        self._in_use += 1
+        self._window_saturated |= self._in_use >= self._limit
+        return True
+
+    def _wake_locked(self) -> None:
+        while self._waiters and self._in_use < self._limit:
+            self._in_use += 1
+            self._window_saturated |= self._in_use >= self._limit
+            self._waiters.popleft().wake()
+
+    # ---------------------------------------------------------------- signals
+
+    def record_latency(self, seconds: float) -> None:
+        """Record a successful call and its latency."""
+        with self._lock:
+            self._window.observe(seconds * 1000)
+            self._samples += 1
+            self._maybe_evaluate_locked()
+
+    def record_error(self, error_class: ErrorClass) -> None:
+        """Record a failed call.
+
+        Rate-limit and overload errors back off immediately; server errors,
+        timeouts and connection failures count towards the window's error
+        rate; other errors say nothing about load and are ignored.
+        """
+        with self._lock:
+            if error_class in _BACKOFF_ERRORS:
+                self._rate_limited += 1
+                self._backoff_locked(f"{error_class.value} error")
+            elif error_class in _WINDOW_ERRORS:
+                self._window_errors += 1
+                self._samples += 1
+                self._maybe_evaluate_locked()
+
+    def _maybe_evaluate_locked(self) -> None:
+        samples = self._window.count + self._window_errors
+        if samples < self.window_size:
+            return
+
+        p95 = self._window.percentile(95)
+        error_rate = self._window_errors / samples
+        self._last_p95_ms = p95
+        self._last_error_rate = error_rate
+        baseline = self._baseline_p95_ms
+
+        if error_rate > self.max_error_rate:
+            self._backoff_locked(f"error rate {error_rate:.0%}")
+        elif p95 is not None and baseline is not None and p95 > baseline * self.latency_tolerance:
+            self._backoff_locked(f"p95 {p95:.0f}ms over baseline {baseline:.0f}ms")
+        elif self._window_saturated and self._limit < self.max_limit:
+            self._limit = min(self.max_limit, self._limit + self.increase_step)
+            self._increases += 1
+            logger.info(f"📈 Concurrency limit '{self.name}' raised to {self._limit}")
+            self._wake_locked()
+
+        # The baseline follows slow drifts (e.g. growing prompts) so a
+        # sustained latency change does not keep the limit down forever
+        if p95 is not None:
+            self._baseline_p95_ms = p95 if baseline is None else 0.8 * baseline + 0.2 * p95
+        self._reset_window_locked()
+
+    def _backoff_locked(self, reason: str) -> None:
+        now = time.monotonic()
+        if now - self._last_backoff < self.backoff_cooldown:
+            return
+        self._last_backoff = now
+        new_limit = max(self.min_limit, int(self._limit * self.backoff_factor))
+        if new_limit < self._limit:
+            self._limit = new_limit
+            self._decreases += 1
+            logger.warning(f"📉 Concurrency limit '{self.name}' lowered to {self._limit} ({reason})")
+        self._reset_window_locked()
+
+    def _reset_window_locked(self) -> None:
+        self._window = LatencyHistogram()
+        self._window_errors = 0
+        self._window_saturated = self._in_use >= self._limit
+
+    def stats(self) -> dict[str, Any]:
+        """Return the current limit, slot usage and the signals behind the last adjustment."""
+        with self._lock:
+            return {
+                "name": self.name,
+                "limit": self._limit,
+                "min_limit": self.min_limit,
+                "max_limit": self.max_limit,
+                "in_use": self._in_use,
+                "waiting": len(self._waiters),
+                "samples": self._samples,
+                "window_p95_ms": self._last_p95_ms,
+                "baseline_p95_ms": self._baseline_p95_ms,
+                "window_error_rate": self._last_error_rate,
+                "increases": self._increases,
+                "decreases": self._decreases,
+                "rate_limited": self._rate_limited,
+            }
+
+
+def get_shared_concurrency_limiter(global_storage: Any, **settings: Any) -> AdaptiveConcurrencyLimiter:
+    """Return the limiter shared through global storage, creating it if needed.
+
+    Args:
+        global_storage: GlobalStorage shared by the agent hierarchy, or None
+        **settings: :class:`AdaptiveConcurrencyLimiter` arguments used when a
+            new limiter has to be created
+
+    Returns:
+        The shared limiter
+    """
+    if global_storage is None:
+        return AdaptiveConcurrencyLimiter(**settings)
+
+    with global_storage.lock_key(CONCURRENCY_LIMITER_STORAGE_KEY):
+        limiter = global_storage.get(CONCURRENCY_LIMITER_STORAGE_KEY)
+        if isinstance(limiter, AdaptiveConcurrencyLimiter):
+            return limiter
+        limiter = AdaptiveConcurrencyLimiter(**settings)
+        global_storage.set(CONCURRENCY_LIMITER_STORAGE_KEY, limiter)
+        return limiter
@@ -0,0 +1,166 @@
+# Copyright (c) Nex-AGI. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Long-lived worker pools shared by an agent hierarchy."""
+
+from __future__ import annotations
+
+import logging
+import threading
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextvars import ContextVar, copy_context
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+TOOLS_LANE = "tools"
+SUB_AGENTS_LANE = "sub_agents"
+BATCH_LANE = "batch"
+
+EXECUTION_POOL_STORAGE_KEY = "execution_pool"
+
+# Nesting level per lane for the task running in the current context. A task
+# running on level N of a lane submits work for that lane to level N + 1, so a
+# parent never waits on a child queued behind it in the same bounded pool.
+_lane_levels: ContextVar[dict[str, int]] = ContextVar("execution_pool_lane_levels", default={})
+
+
+class ExecutionPool:
+    """Bounded thread pools with named lanes for tools, sub-agents and batches.
+
+    Pools are created lazily per lane and nesting level, kept alive across
+    iterations, and shared by every agent that uses the same GlobalStorage.
+    Submitted work always runs inside a copy of the caller's context so tracer
+    spans and other context variables propagate into worker threads.
+    """
+
+    def __init__(
+        self,
+        lane_sizes: dict[str, int | None] | None = None,
+        name: str = "nexau",
+    ):
+        """Initialize execution pool.
+
+        Args:
+            lane_sizes: Maximum worker count per lane name; ``None`` uses the
+                ThreadPoolExecutor default
+            name: Prefix for worker thread names
+        """
+        self.lane_sizes: dict[str, int | None] = dict(lane_sizes or {})
+        self.name = name
+        self._executors: dict[tuple[str, int], ThreadPoolExecutor] = {}
+        self._lock = threading.Lock()
+        self._shutdown = False
+
+    @property
+    def is_shutdown(self) -> bool:
+        """Whether the pool has been shut down."""
+        return self._shutdown
+
+    def submit(self, lane: str, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Future[Any]:
+        """Submit work to a lane, propagating the current context.
+
+        Args:
+            lane: Lane name (e.g. ``"tools"``, ``"sub_agents"``, ``"batch"``)
+            fn: Callable to run
+            *args: Positional arguments for ``fn``
+            **kwargs: Keyword arguments for ``fn``
+
+        Returns:
+            Future for the submitted work
+
+        Raises:
+            RuntimeError: If the pool has been shut down
+        """
+        level = _lane_levels.get().get(lane, 0)
+        executor = self._get_executor(lane, level)
+        task_ctx = copy_context()
+        return executor.submit(task_ctx.run, self._run_in_lane, lane, level, fn, *args, **kwargs)
+
+    def shutdown(self, wait: bool = False, cancel_futures: bool = True) -> None:
+        """Shut down all lanes.
+
+        Args:
+            wait: Whether to wait for running work to finish
+            cancel_futures: Whether to cancel work that has not started yet
+        """
+        with self._lock:
+            self._shutdown = True
+            executors = list(self._executors.items())
+            self._executors.clear()
+
+        for (lane, level), executor in executors:
+            try:
+                executor.shutdown(wait=wait, cancel_futures=cancel_futures)
+            except Exception as e:
+                logger.error(f"❌ Error shutting down execution pool lane {lane}[{level}]: {e}")
+
+    def stats(self) -> dict[str, Any]:
+        """Return the configured lane sizes and the levels currently allocated."""
+        with self._lock:
+            levels: dict[str, list[int]] = {}
+            for lane, level in self._executors:
+                levels.setdefault(lane, []).append(level)
+        return {
+            "lane_sizes": dict(self.lane_sizes),
+            "levels": {lane: sorted(values) for lane, values in levels.items()},
+            "shutdown": self._shutdown,
+        }
+
+    def _get_executor(self, lane: str, level: int) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._shutdown:
+                raise RuntimeError(f"Execution pool '{self.name}' has been shut down")
+            executor = self._executors.get((lane, level))
+            if executor is None:
+                max_workers = self.lane_sizes.get(lane)
+                executor = ThreadPoolExecutor(
+                    max_workers=max(1, max_workers) if max_workers is not None else None,
+                    thread_name_prefix=f"{self.name}-{lane}-{level}",
+                )
+                self._executors[(lane, level)] = executor
+            return executor
+
+    @staticmethod
+    def _run_in_lane(lane: str, level: int, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        # Runs inside the copied context, so the update is local to this task
+        _lane_levels.set({**_lane_levels.get(), lane: level + 1})
+        return fn(*args, **kwargs)
+
+
+def get_shared_execution_pool(
+    global_storage: Any,
+    lane_sizes: dict[str, int | None] | None = None,
+) -> tuple[ExecutionPool, bool]:
+    """Return the pool shared through global storage, creating it if needed.
+
+    Args:
+        global_storage: GlobalStorage shared by the agent hierarchy, or None
+        lane_sizes: Lane sizes used when a new pool has to be created
+
+    Returns:
+        Tuple of (pool, created) where ``created`` tells whether the caller
+        created the pool and is therefore responsible for shutting it down
+    """
+    if global_storage is None:
+        return ExecutionPool(lane_sizes), True
+
+    with global_storage.lock_key(EXECUTION_POOL_STORAGE_KEY):
+        pool = global_storage.get(EXECUTION_POOL_STORAGE_KEY)
+        if isinstance(pool, ExecutionPool) and not pool.is_shutdown:
+            return pool, False
+        pool = ExecutionPool(lane_sizes)
+        global_storage.set(EXECUTION_POOL_STORAGE_KEY, pool)
+        return pool, True
@@ -14,19 +14,35 @@
 
 """Main execution orchestrator for agents."""
 
+import asyncio
 import json
 import logging
 import threading
 import uuid
 from collections import defaultdict
 from collections.abc import Callable
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from contextvars import copy_context
+from concurrent.futures import Future, as_completed
+from contextlib import nullcontext
 from copy import deepcopy
-from typing import Any
+from dataclasses import dataclass
+from typing import Any, NoReturn
 
 from nexau.archs.main_sub.agent_state import AgentState
+from nexau.archs.main_sub.execution.batch_cache import (
+    DEFAULT_BATCH_CACHE_MAX_AGE,
+    DEFAULT_BATCH_CACHE_SIZE_LIMIT,
+    BatchResultCache,
+)
 from nexau.archs.main_sub.execution.batch_processor import BatchProcessor
+from nexau.archs.main_sub.execution.batch_sharding import ShardedBatchRunner
+from nexau.archs.main_sub.execution.concurrency import AdaptiveConcurrencyLimiter, get_shared_concurrency_limiter
+from nexau.archs.main_sub.execution.execution_pool import (
+    BATCH_LANE,
+    SUB_AGENTS_LANE,
+    TOOLS_LANE,
+    ExecutionPool,
+    get_shared_execution_pool,
+)
 from nexau.archs.main_sub.execution.hooks import (
     AfterModelHook,
     AfterModelHookInput,
@@ -46,19 +62,167 @@ from nexau.archs.main_sub.execution.parse_structures import (
     SubAgentCall,
     ToolCall,
 )
+from nexau.archs.main_sub.execution.profiling import ProfilingMiddleware, profile_phase
 from nexau.archs.main_sub.execution.response_parser import ResponseParser
 from nexau.archs.main_sub.execution.stop_reason import AgentStopReason
+from nexau.archs.main_sub.execution.stream_dispatch import StreamingToolDispatcher, ToolCallStreamListener
+from nexau.archs.main_sub.execution.stream_events import (
+    StreamEventListener,
+    StreamEventType,
+    emit_stream_event,
+    get_current_event_stream,
+)
 from nexau.archs.main_sub.execution.subagent_manager import SubAgentManager
 from nexau.archs.main_sub.execution.tool_executor import ToolExecutor
 from nexau.archs.main_sub.tool_call_modes import (
     STRUCTURED_TOOL_CALL_MODES,
     normalize_tool_call_mode,
 )
-from nexau.archs.main_sub.utils.token_counter import TokenCounter
+from nexau.archs.main_sub.utils.logging_utils import capped, lazy, log_fields
+from nexau.archs.main_sub.utils.token_counter import TokenCounter, TokenLedger
 
 logger = logging.getLogger(__name__)
 
 
+@dataclass
+class _IterationBudget:
+    """Token budget planned for a single model call."""
+
+    available_tokens: int
+    desired_max_tokens: int
+    max_tokens: int
+    force_stop_reason: AgentStopReason
+    error_notes: str
+
+
+class _CallResultCollector:
+    """Accumulates tool and sub-agent results for one iteration.
+
+    Shared by the thread-pool and asyncio execution paths so both render the
+    same XML feedback and detect stop tools identically.
+    """
+
+    def __init__(self) -> None:
+        self.tool_results: list[str] = []
+        self.execution_feedbacks: list[dict[str, Any]] = []
+        self.stop_tool_detected = False
+        self.stop_tool_result: str | None = None
+
+    def add(self, call_type: str, call_obj: Any, result_data: tuple[str, Any, bool]) -> None:
+        if call_type == "tool":
+            self._add_tool_result(call_obj, *result_data)
+        elif call_type == "sub_agent":
+            self._add_sub_agent_result(call_obj, *result_data)
+
+    def add_unexpected_error(self, call_type: str, e: Exception) -> None:
+        logger.error(
+            f"❌ Unexpected error processing {call_type}: {e}",
+        )
+        self.tool_results.append(
+            f"""
+<tool_result>
+<tool_name>unknown</tool_name>
+<error>Unexpected error: {str(e)}</error>
+</tool_result>
+""",
+        )
+
+    def finish(self, processed_response: str) -> tuple[str, bool, str | None, list[dict[str, Any]]]:
+        # Append tool results to the original response
+        if self.tool_results:
+            processed_response += "\n\n" + "\n\n".join(self.tool_results)
+        return processed_response, self.stop_tool_detected, self.stop_tool_result, self.execution_feedbacks
+
+    def _add_tool_result(self, call_obj: ToolCall, tool_name: str, result: Any, is_error: bool) -> None:
+        self.execution_feedbacks.append(
+            {
+                "call_type": "tool",
+                "call": call_obj,
+                "content": result,
+                "is_error": is_error,
+            },
+        )
+        should_append_xml = getattr(call_obj, "source", "xml") != "openai"
+        if is_error:
+            logger.error(
+                f"❌ Tool '{tool_name}' error: {result}",
+            )
+            if should_append_xml:
+                self.tool_results.append(
+                    f"""
+<tool_result>
+<tool_name>{tool_name}</tool_name>
+<error>{result}</error>
+</tool_result>
+""",
+                )
+            return
+
+        logger.info("📤 Tool '%s' result: %s", tool_name, capped(result), extra=log_fields(tool=tool_name))
+        if should_append_xml:
+            self.tool_results.append(
+                f"""
+<tool_result>
+<tool_name>{tool_name}</tool_name>
+<result>{result}</result>
+</tool_result>
+""",
+            )
+
+        # Check if this tool result indicates a stop tool was executed
+        try:
+            parsed_result = json.loads(result)
+            if isinstance(
+                parsed_result,
+                dict,
+            ) and parsed_result.get("_is_stop_tool"):
+                self.stop_tool_detected = True
+                actual_result = {k: v for k, v in parsed_result.items() if k != "_is_stop_tool"}
+                if "result" in actual_result and len(actual_result) == 1:
+                    self.stop_tool_result = json.dumps(
+                        actual_result["result"],
+                        ensure_ascii=False,
+                        indent=4,
+                    )
+                else:
+                    self.stop_tool_result = json.dumps(
+                        actual_result or parsed_result,
+                        ensure_ascii=False,
+                        indent=4,
+                    )
+                logger.info(
+                    f"🛑 Stop tool '{tool_name}' result detected, will terminate after processing",
+                )
+        except (json.JSONDecodeError, TypeError):
+            pass
+
+    def _add_sub_agent_result(self, call_obj: SubAgentCall, agent_name: str, result: Any, is_error: bool) -> None:
+        result_str = result if isinstance(result, str) else json.dumps(result, ensure_ascii=False)
+        self.execution_feedbacks.append(
+            {
+                "call_type": "sub_agent",
+                "call": call_obj,
+                "content": result_str,
+                "is_error": is_error,
+            },
+        )
+        should_append_xml = not getattr(call_obj, "tool_call_id", None)
+        if is_error:
+            logger.error("❌ Sub-agent '%s' error: %s", agent_name, capped(result), extra=log_fields(sub_agent=agent_name))
+        else:
+            logger.info("📤 Sub-agent '%s' result: %s", agent_name, capped(result), extra=log_fields(sub_agent=agent_name))
+        if should_append_xml:
+            tag = "error" if is_error else "result"
+            self.tool_results.append(
+                f"""
+<tool_result>
+<tool_name>{agent_name}_sub_agent</tool_name>
+<{tag}>{result}</{tag}>
+</tool_result>
+""",
+            )
+
+
 class Executor:
     """Orchestrates execution of agent tasks with parallel processing support."""
 
@@ -74,6 +238,11 @@ class Executor:
         max_iterations: int = 100,
         max_context_tokens: int = 128000,
         max_running_subagents: int = 5,
+        max_tool_workers: int | None = None,
+        max_batch_workers: int | None = None,
+        sub_agent_pool_min_size: int = 0,
+        sub_agent_pool_max_size: int = 4,
+        sub_agent_pool_idle_timeout: float | None = 300.0,
         retry_attempts: int = 5,
         token_counter: TokenCounter | None = None,
         after_model_hooks: list[AfterModelHook] | None = None,
@@ -85,6 +254,15 @@ class Executor:
         global_storage: Any = None,
         tool_call_mode: str = "openai",
         openai_tools: list[dict[str, Any]] | None = None,
+        stream_tool_dispatch: bool = False,
+        adaptive_concurrency: bool = False,
+        max_adaptive_concurrency: int | None = None,
+        batch_cache_dir: str | None = None,
+        batch_cache_max_age: float | None = DEFAULT_BATCH_CACHE_MAX_AGE,
+        batch_cache_size_limit: int = DEFAULT_BATCH_CACHE_SIZE_LIMIT,
+        batch_processes: int = 0,
+        batch_shards: int | None = None,
+        batch_work_dir: str | None = None,
     ):
         """Initialize executor.
 
@@ -100,6 +278,11 @@ class Executor:
             max_iterations: Maximum iterations per execution
             max_context_tokens: Maximum context token limit
             max_running_subagents: Maximum concurrent sub-agents
+            max_tool_workers: Size of the shared tool worker lane (None uses the thread pool default)
+            max_batch_workers: Size of the shared batch worker lane (defaults to max_running_subagents)
+            sub_agent_pool_min_size: Idle instances per sub-agent that are never evicted
+            sub_agent_pool_max_size: Idle instances kept warm per sub-agent (0 disables reuse)
+            sub_agent_pool_idle_timeout: Seconds before surplus idle sub-agents are stopped
             retry_attempts: int of API retry attempts
             token_counter: Optional token counter instance
             before_model_hooks: Optional list of hooks called before parsing LLM response
@@ -109,10 +292,37 @@ class Executor:
             middlewares: Optional list of middleware objects applied to all phases
             tool_call_mode: Preferred tool call format ('xml', 'openai', or 'anthropic')
             openai_tools: Structured tool definitions for OpenAI/anthropic tool calls
+            stream_tool_dispatch: Start tool calls as soon as they complete in the
+                model stream instead of waiting for the full response
+            adaptive_concurrency: Share an AIMD concurrency limit across sub-agent
+                calls and batch items that grows while LLM calls are healthy and
+                backs off on rate limits or rising latency
+            max_adaptive_concurrency: Ceiling of the adaptive limit (defaults to
+                four times max_running_subagents)
+            batch_cache_dir: Directory of the persistent batch result cache
+                (None disables it)
+            batch_cache_max_age: Seconds a cached batch result stays valid
+            batch_cache_size_limit: Maximum size in bytes of the batch result cache
+            batch_processes: Worker processes that run batch shards, each with
+                max_batch_workers threads (0 runs batches in this process)
+            batch_shards: Shards a batch input is split into (defaults to
+                batch_processes; hosts sharing batch_work_dir split the shards)
+            batch_work_dir: Directory coordinating the shards of a batch,
+                shared by every host taking part (defaults to next to the results)
         """
         self.agent_name = agent_name
         self.agent_id = agent_id
         self.max_running_subagents = max_running_subagents
+        self.max_tool_workers = max_tool_workers
+        self.max_batch_workers = max_batch_workers if max_batch_workers is not None else max_running_subagents
+        self.adaptive_concurrency = adaptive_concurrency
+        self.max_adaptive_concurrency = max_adaptive_concurrency or 4 * max(1, max_running_subagents)
+        self.batch_processes = batch_processes
+        self.batch_shards = batch_shards
+        self.batch_work_dir = batch_work_dir
+
+        # Runs are profiled when a ProfilingMiddleware is configured
+        self.profiler = next((m for m in middlewares or [] if isinstance(m, ProfilingMiddleware)), None)
 
         # Initialize components
         self.middleware_manager = self._build_middleware_manager(
@@ -132,10 +342,15 @@ class Executor:
             agent_name,
             sub_agent_factories,
             global_storage,
+            pool_min_size=sub_agent_pool_min_size,
+            pool_max_size=sub_agent_pool_max_size,
+            pool_idle_timeout=sub_agent_pool_idle_timeout,
         )
         self.batch_processor = BatchProcessor(
             self.subagent_manager,
-            max_running_subagents,
+            self.max_batch_workers,
+            max_in_flight=2 * max(self.max_batch_workers, self.max_adaptive_concurrency) if adaptive_concurrency else None,
+            result_cache=BatchResultCache(batch_cache_dir, batch_cache_max_age, batch_cache_size_limit) if batch_cache_dir else None,
         )
         self.response_parser = ResponseParser()
         self.llm_caller = LLMCaller(
@@ -153,19 +368,25 @@ class Executor:
 
         # Token counting
         self.token_counter = token_counter or TokenCounter()
+        self.token_ledger = TokenLedger(self.token_counter)
 
         # Tool call behavior
         self.serial_tool_name = serial_tool_name or []
         self.tool_call_mode = normalize_tool_call_mode(tool_call_mode)
         self.use_structured_tool_calls = self.tool_call_mode in STRUCTURED_TOOL_CALL_MODES
         self.structured_tool_payload = deepcopy(openai_tools) if openai_tools else []
+        self.stream_tool_dispatch = stream_tool_dispatch
         if self.use_structured_tool_calls and not self.structured_tool_payload:
             logger.warning(
                 f"⚠️ {self.tool_call_mode.capitalize()} tool call mode enabled but no tool definitions were provided.",
             )
 
-        # Process tracking for parallel execution
-        self._running_executors: dict[str, ThreadPoolExecutor] = {}  # Maps executor_id to ThreadPoolExecutor
+        # Shared worker pool (resolved lazily from global storage) and in-flight work tracking
+        self._execution_pool: ExecutionPool | None = None
+        self._owns_execution_pool = False
+        self._concurrency_limiter: AdaptiveConcurrencyLimiter | None = None
+        self._inflight_futures: set[Future[Any]] = set()
+        self._inflight_tasks: set[asyncio.Task[Any]] = set()
         self._executor_lock = threading.Lock()
         self._shutdown_event = threading.Event()
         self.stop_signal = False
@@ -184,6 +405,19 @@ class Executor:
             f"📝 Message enqueued during execution: {message.get('role', 'unknown')} - {message.get('content', '')[:50]}...",
         )
 
+    def reset(self) -> None:
+        """Clear per-run state so the executor can serve an unrelated run.
+
+        Raises:
+            RuntimeError: If the executor has been cleaned up
+        """
+        if self._shutdown_event.is_set():
+            raise RuntimeError(f"Executor for agent '{self.agent_name}' has been shut down")
+        self.stop_signal = False
+        self.queued_messages.clear()
+        self.token_ledger.reset()
+        self.llm_caller.reset()
+
     def execute(
         self,
         history: list[dict[str, Any]],
@@ -201,290 +435,491 @@ class Executor:
         # Reset the stop signal
         self.stop_signal = False
 
-        try:
-            # Use history directly as the single source of truth
-            messages = history.copy()
-
-            # Loop until no more tool calls or sub-agent calls are made
-            iteration = 0
-            final_response = ""
+        with self._profile_run():
+            try:
+                # Use history directly as the single source of truth
+                messages = history.copy()
 
-            logger.info(
-                f"🔄 Starting iterative execution loop for agent '{self.agent_name}'",
-            )
+                # Loop until no more tool calls or sub-agent calls are made
+                iteration = 0
+                final_response = ""
+                force_stop_reason = AgentStopReason.SUCCESS
 
-            while iteration < self.max_iterations:
                 logger.info(
-                    f"🔄 Iteration {iteration + 1}/{self.max_iterations} for agent '{self.agent_name}'",
+                    f"🔄 Starting iterative execution loop for agent '{self.agent_name}'",
                 )
 
-                logger.info(
-                    f"Agent name {self.agent_name} Current stop_signal: {self.stop_signal}",
-                )
-                if self.stop_signal:
-                    logger.info(
-                        "❗️ Stop signal received, stopping execution",
-                    )
-                    return "Stop signal received.", messages
+                while iteration < self.max_iterations:
+                    if self._start_iteration(iteration, messages):
+                        return "Stop signal received.", messages
 
-                # Process any queued messages
-                if self.queued_messages:
+                    if self.middleware_manager:
+                        try:
+                            with profile_phase("before_model_hooks"):
+                                messages = self.middleware_manager.run_before_model(
+                                    self._build_before_model_input(agent_state, iteration, messages),
+                                )
+                        except Exception as e:
+                            logger.warning(f"⚠️ Before-model middleware execution failed: {e}")
+
+                    budget = self._plan_iteration_budget(iteration, messages)
+                    final_response += budget.error_notes
+                    force_stop_reason = budget.force_stop_reason
+
+                    # Call LLM to get response
                     logger.info(
-                        f"📝 Processing {len(self.queued_messages)} queued messages",
+                        "🧠 Calling LLM for agent '%s' with %s max tokens...",
+                        self.agent_name,
+                        budget.max_tokens,
                     )
-                    messages.extend(self.queued_messages)
-                    self.queued_messages = []
-
-                before_model_hook_input = BeforeModelHookInput(
-                    agent_state=agent_state,
-                    max_iterations=self.max_iterations,
-                    current_iteration=iteration,
-                    messages=messages,
-                )
-
-                if self.middleware_manager:
+                    stream_dispatcher = self._new_stream_dispatcher(agent_state, asynchronous=False)
+                    stream_listener = self._new_stream_listener(agent_state, stream_dispatcher)
                     try:
-                        messages = self.middleware_manager.run_before_model(
-                            before_model_hook_input,
+                        model_response = self.llm_caller.call_llm(
+                            messages,
+                            force_stop_reason=force_stop_reason,
+                            agent_state=agent_state,
+                            tool_call_mode=self.tool_call_mode,
+                            tools=self.structured_tool_payload if self.use_structured_tool_calls else None,
+                            stream_listener=stream_listener,
                         )
-                    except Exception as e:
-                        logger.warning(f"⚠️ Before-model middleware execution failed: {e}")
-
-                # Count current prompt tokens
-                current_prompt_tokens = self.token_counter.count_tokens(
-                    messages,
-                )
+                        if model_response is None:
+                            break
 
-                force_stop_reason = AgentStopReason.SUCCESS
-                # Check if prompt exceeds max context tokens - force stop if so
-                if current_prompt_tokens > self.max_context_tokens:
-                    logger.error(
-                        f"❌ Prompt tokens ({current_prompt_tokens}) exceed max_context_tokens \
-                            ({self.max_context_tokens}). Stopping execution.",
-                    )
-                    final_response += f"\\n\\n[Error: Prompt too long ({current_prompt_tokens} tokens) exceeds maximum context \
-                        ({self.max_context_tokens} tokens). Execution stopped.]"
-                    force_stop_reason = AgentStopReason.CONTEXT_TOKEN_LIMIT
-
-                # Calculate max_tokens dynamically based on available budget
-                available_tokens = self.max_context_tokens - current_prompt_tokens
-
-                # Get desired max_tokens from LLM config or use reasonable default
-                desired_max_tokens = 16384  # Default value
-                calculated_max_tokens = min(
-                    desired_max_tokens,
-                    available_tokens,
-                )
+                        final_response, after_model_hook_input = self._record_model_response(
+                            model_response,
+                            agent_state,
+                            iteration,
+                            messages,
+                        )
+                        if isinstance(stream_listener, StreamEventListener):
+                            stream_listener.finish_model_call(model_response, after_model_hook_input.parsed_response)
+
+                        call_outcome = self._process_xml_calls(after_model_hook_input, stream_dispatcher)
+                    finally:
+                        self._discard_stream_dispatches(stream_dispatcher)
+
+                    with profile_phase("format_results"):
+                        messages, final_response, force_stop_reason, should_break = self._apply_call_outcome(
+                            call_outcome,
+                            after_model_hook_input,
+                            iteration,
+                            budget,
+                            final_response,
+                            force_stop_reason,
+                        )
+                    if should_break:
+                        break
 
-                # Ensure we have at least some tokens for response
-                if calculated_max_tokens < 50:
-                    logger.error(
-                        f"❌ Insufficient tokens for response ({calculated_max_tokens}). Stopping execution.",
-                    )
-                    final_response += f"\\n\\n[Error: Insufficient tokens for response ({calculated_max_tokens} tokens). Context too full.]"
-                    force_stop_reason = AgentStopReason.CONTEXT_TOKEN_LIMIT
+                    iteration += 1
 
-                if iteration == self.max_iterations - 1:
-                    logger.error(
-                        "❌ Maximum iteration limit reached. Stopping execution.",
-                    )
-                    final_response += "\\n\\n[Error: Maximum iteration limit reached.]"
-                    force_stop_reason = AgentStopReason.MAX_ITERATIONS_REACHED
+                return self._finish_execution(iteration, final_response, force_stop_reason, messages)
 
-                logger.info(
-                    f"🔢 Token usage: prompt={current_prompt_tokens}, max_tokens={calculated_max_tokens}, available={available_tokens}",
-                )
+            except Exception as e:
+                self._raise_execution_error(e)
 
-                # Call LLM to get response
-                logger.info(
-                    f"🧠 Calling LLM for agent '{self.agent_name}' with {calculated_max_tokens} max tokens...",
-                )
-                model_response = self.llm_caller.call_llm(
-                    messages,
-                    force_stop_reason=force_stop_reason,
-                    agent_state=agent_state,
-                    tool_call_mode=self.tool_call_mode,
-                    tools=self.structured_tool_payload if self.use_structured_tool_calls else None,
-                )
-                if model_response is None:
-                    break
+    async def aexecute(
+        self,
+        history: list[dict[str, Any]],
+        agent_state: "AgentState",
+    ) -> tuple[str, list[dict[str, Any]]]:
+        """Async counterpart of :meth:`execute`.
 
-                assistant_content = model_response.content or ""
-                assistant_log_text = model_response.render_text() or assistant_content
+        LLM calls, coroutine/MCP tools and sub-agents are awaited on the running
+        event loop; synchronous tools are offloaded to the shared tools lane.
 
-                logger.info(
-                    f"💬 LLM Response for agent '{self.agent_name}': {assistant_log_text}",
-                )
+        Args:
+            history: Complete conversation history including system prompt and user message
+            agent_state: AgentState containing agent context and global storage
 
-                # Store this as the latest response (potential final response)
-                final_response = assistant_content
+        Returns:
+            Tuple of (agent_response, updated_messages_history)
+        """
+        self.stop_signal = False
 
-                # Parse response to check for actions
-                parsed_response = self.response_parser.parse_response(
-                    model_response,
-                )
+        with self._profile_run():
+            try:
+                messages = history.copy()
 
-                # Add the assistant's original response to conversation
-                messages.append(model_response.to_message_dict())
+                iteration = 0
+                final_response = ""
+                force_stop_reason = AgentStopReason.SUCCESS
 
-                # Process tool calls and sub-agent calls
                 logger.info(
-                    f"⚙️ Processing tool/sub-agent calls for agent '{self.agent_name}'...",
-                )
-                after_model_hook_input = AfterModelHookInput(
-                    agent_state=agent_state,
-                    max_iterations=self.max_iterations,
-                    current_iteration=iteration,
-                    original_response=assistant_content,
-                    parsed_response=parsed_response,
-                    messages=messages,
-                    model_response=model_response,
+                    f"🔄 Starting async execution loop for agent '{self.agent_name}'",
                 )
 
-                (
-                    processed_response,
-                    should_stop,
-                    stop_tool_result,
-                    updated_messages,
-                    execution_feedbacks,
-                ) = self._process_xml_calls(
-                    after_model_hook_input,
-                )
+                while iteration < self.max_iterations:
+                    if self._start_iteration(iteration, messages):
+                        return "Stop signal received.", messages
 
-                # Update messages with any modifications from hooks
-                messages = updated_messages
+                    if self.middleware_manager:
+                        try:
+                            with profile_phase("before_model_hooks"):
+                                messages = await self.middleware_manager.arun_before_model(
+                                    self._build_before_model_input(agent_state, iteration, messages),
+                                )
+                        except Exception as e:
+                            logger.warning(f"⚠️ Before-model middleware execution failed: {e}")
 
-                processed_parsed_response = after_model_hook_input.parsed_response
+                    budget = self._plan_iteration_budget(iteration, messages)
+                    final_response += budget.error_notes
+                    force_stop_reason = budget.force_stop_reason
 
-                # Check if a stop tool was executed
-                if should_stop and len(self.queued_messages) == 0:
-                    # Return the stop tool result directly, formatted as JSON if it's not a string
-                    if stop_tool_result is not None:
-                        logger.info(
-                            "🛑 Stop tool detected, returning stop tool result as final response",
+                    logger.info(
+                        "🧠 Calling LLM for agent '%s' with %s max tokens...",
+                        self.agent_name,
+                        budget.max_tokens,
+                    )
+                    stream_dispatcher = self._new_stream_dispatcher(agent_state, asynchronous=True)
+                    stream_listener = self._new_stream_listener(agent_state, stream_dispatcher)
+                    try:
+                        model_response = await self.llm_caller.acall_llm(
+                            messages,
+                            force_stop_reason=force_stop_reason,
+                            agent_state=agent_state,
+                            tool_call_mode=self.tool_call_mode,
+                            tools=self.structured_tool_payload if self.use_structured_tool_calls else None,
+                            stream_listener=stream_listener,
                         )
-                        force_stop_reason = AgentStopReason.STOP_TOOL_TRIGGERED
-                        if isinstance(stop_tool_result, str):
-                            final_response = stop_tool_result
+                        if model_response is None:
                             break
-                        else:
-                            import json
-
-                            final_response = json.dumps(
-                                stop_tool_result,
-                                indent=4,
-                                ensure_ascii=False,
-                            )
-                            break
-                    else:
-                        logger.info("🛑 No more tool calls, stop.")
-                        force_stop_reason = AgentStopReason.NO_MORE_TOOL_CALLS
-                        # Fallback to the processed response if no specific result
-                        final_response = processed_response
-                        break
 
-                # Extract just the tool results from processed_response
-                openai_tool_mode = bool(
-                    processed_parsed_response
-                    and processed_parsed_response.model_response
-                    and processed_parsed_response.model_response.tool_calls
-                )
-
-                if openai_tool_mode:
-                    for feedback in execution_feedbacks:
-                        call_obj = feedback.get("call")
-                        call_type = feedback.get("call_type")
-                        content = feedback.get("content") or ""
-
-                        if call_type == "tool":
-                            call_id = getattr(call_obj, "tool_call_id", None)
-                        elif call_type == "sub_agent":
-                            call_id = getattr(call_obj, "tool_call_id", None) or getattr(call_obj, "sub_agent_call_id", None)
-                        else:
-                            call_id = None
-
-                        if not call_id:
-                            continue
-
-                        messages.append(
-                            {
-                                "role": "tool",
-                                "tool_call_id": call_id,
-                                "content": content,
-                            },
+                        final_response, after_model_hook_input = self._record_model_response(
+                            model_response,
+                            agent_state,
+                            iteration,
+                            messages,
+                        )
+                        if isinstance(stream_listener, StreamEventListener):
+                            stream_listener.finish_model_call(model_response, after_model_hook_input.parsed_response)
+
+                        call_outcome = await self._aprocess_xml_calls(after_model_hook_input, stream_dispatcher)
+                    finally:
+                        self._discard_stream_dispatches(stream_dispatcher)
+
+                    with profile_phase("format_results"):
+                        messages, final_response, force_stop_reason, should_break = self._apply_call_outcome(
+                            call_outcome,
+                            after_model_hook_input,
+                            iteration,
+                            budget,
+                            final_response,
+                            force_stop_reason,
                         )
+                    if should_break:
+                        break
 
-                    tool_results = ""
-                else:
-                    tool_results = processed_response.replace(
-                        assistant_content,
-                        "",
-                        1,
-                    ).strip()
-
-                # Add tool results as user feedback with iteration context
-                remaining_iterations = self.max_iterations - iteration - 1
-                iteration_hint = self._build_iteration_hint(
-                    iteration + 1,
-                    self.max_iterations,
-                    remaining_iterations,
-                )
+                    iteration += 1
 
-                if tool_results:
-                    messages.append(
-                        {
-                            "role": "user",
-                            "content": f"Tool execution results:\n{tool_results}\n\n{iteration_hint}",
-                        },
-                    )
-                else:
-                    messages.append(
-                        {
-                            "role": "user",
-                            "content": f"{iteration_hint}",
-                        },
-                    )
-                current_prompt_tokens = self.token_counter.count_tokens(
-                    messages,
-                )
+                return self._finish_execution(iteration, final_response, force_stop_reason, messages)
 
-                token_limit_hint = self._build_token_limit_hint(
-                    current_prompt_tokens,
-                    self.max_context_tokens,
-                    available_tokens,
-                    desired_max_tokens,
-                )
-                messages[-1]["content"] += f"\n\n{token_limit_hint}"
+            except Exception as e:
+                self._raise_execution_error(e)
 
-                iteration += 1
+    def _profile_run(self) -> Any:
+        """Return the context manager profiling one execution (a no-op without a profiler)."""
+        if self.profiler is None:
+            return nullcontext()
+        return self.profiler.profile_run(self.agent_name, self.agent_id)
 
-            # Add note if max iterations reached
-            if iteration >= self.max_iterations:
-                force_stop_reason = AgentStopReason.MAX_ITERATIONS_REACHED
-                final_response += "\\n\\n[Note: Maximum iteration limit reached]"
+    def _start_iteration(self, iteration: int, messages: list[dict[str, Any]]) -> bool:
+        """Log the iteration, honour the stop signal and drain queued messages.
 
+        Returns:
+            True if the stop signal was received and execution should end
+        """
+        logger.info(
+            "🔄 Iteration %s/%s for agent '%s'",
+            iteration + 1,
+            self.max_iterations,
+            self.agent_name,
+            extra=log_fields(agent=self.agent_name, iteration=iteration + 1),
+        )
+        logger.debug("Agent name %s Current stop_signal: %s", self.agent_name, self.stop_signal)
+        if self.stop_signal:
             logger.info(
-                f"🔄 Force stop reason: {force_stop_reason.name}",
+                "❗️ Stop signal received, stopping execution",
             )
+            return True
+
+        # Process any queued messages
+        if self.queued_messages:
             logger.info(
-                f"🔄 Final response for agent '{self.agent_name}': {final_response}",
+                f"📝 Processing {len(self.queued_messages)} queued messages",
             )
-            return final_response, messages
+            messages.extend(self.queued_messages)
+            self.queued_messages = []
+        return False
 
-        except Exception as e:
-            force_stop_reason = AgentStopReason.ERROR_OCCURRED
-            final_response = f"Error: {str(e)}"
+    def _build_before_model_input(
+        self,
+        agent_state: "AgentState",
+        iteration: int,
+        messages: list[dict[str, Any]],
+    ) -> BeforeModelHookInput:
+        return BeforeModelHookInput(
+            agent_state=agent_state,
+            max_iterations=self.max_iterations,
+            current_iteration=iteration,
+            messages=messages,
+        )
+
+    def _plan_iteration_budget(self, iteration: int, messages: list[dict[str, Any]]) -> _IterationBudget:
+        """Count prompt tokens and decide whether this iteration must force-stop."""
+        # Count current prompt tokens (only new or modified messages are re-encoded)
+        with profile_phase("token_count"):
+            current_prompt_tokens = self.token_ledger.count(messages)
+
+        error_notes = ""
+        force_stop_reason = AgentStopReason.SUCCESS
+        # Check if prompt exceeds max context tokens - force stop if so
+        if current_prompt_tokens > self.max_context_tokens:
             logger.error(
-                f"🔄 Force stop reason: {force_stop_reason.name}",
+                f"❌ Prompt tokens ({current_prompt_tokens}) exceed max_context_tokens \
+                    ({self.max_context_tokens}). Stopping execution.",
             )
+            error_notes += f"\\n\\n[Error: Prompt too long ({current_prompt_tokens} tokens) exceeds maximum context \
+                ({self.max_context_tokens} tokens). Execution stopped.]"
+            force_stop_reason = AgentStopReason.CONTEXT_TOKEN_LIMIT
+
+        # Calculate max_tokens dynamically based on available budget
+        available_tokens = self.max_context_tokens - current_prompt_tokens
+
+        # Get desired max_tokens from LLM config or use reasonable default
+        desired_max_tokens = 16384  # Default value
+        calculated_max_tokens = min(
+            desired_max_tokens,
+            available_tokens,
+        )
+
+        # Ensure we have at least some tokens for response
+        if calculated_max_tokens < 50:
             logger.error(
-                f"🔄 Final response for agent '{self.agent_name}': {final_response}",
+                f"❌ Insufficient tokens for response ({calculated_max_tokens}). Stopping execution.",
             )
+            error_notes += f"\\n\\n[Error: Insufficient tokens for response ({calculated_max_tokens} tokens). Context too full.]"
+            force_stop_reason = AgentStopReason.CONTEXT_TOKEN_LIMIT
+
+        if iteration == self.max_iterations - 1:
             logger.error(
-                f"❌ Error in agent execution: {e}",
+                "❌ Maximum iteration limit reached. Stopping execution.",
+            )
+            error_notes += "\\n\\n[Error: Maximum iteration limit reached.]"
+            force_stop_reason = AgentStopReason.MAX_ITERATIONS_REACHED
+
+        logger.info(
+            "🔢 Token usage: prompt=%s, max_tokens=%s, available=%s",
+            current_prompt_tokens,
+            calculated_max_tokens,
+            available_tokens,
+            extra=log_fields(agent=self.agent_name, prompt_tokens=current_prompt_tokens, max_tokens=calculated_max_tokens),
+        )
+        return _IterationBudget(
+            available_tokens=available_tokens,
+            desired_max_tokens=desired_max_tokens,
+            max_tokens=calculated_max_tokens,
+            force_stop_reason=force_stop_reason,
+            error_notes=error_notes,
+        )
+
+    def _record_model_response(
+        self,
+        model_response: ModelResponse,
+        agent_state: "AgentState",
+        iteration: int,
+        messages: list[dict[str, Any]],
+    ) -> tuple[str, AfterModelHookInput]:
+        """Parse the model response, append it to the conversation and build the after-model input.
+
+        Returns:
+            Tuple of (assistant_content, after_model_hook_input)
+        """
+        assistant_content = model_response.content or ""
+
+        logger.info(
+            "💬 LLM Response for agent '%s': %s",
+            self.agent_name,
+            lazy(model_response.render_text),
+            extra=log_fields(agent=self.agent_name, iteration=iteration + 1),
+        )
+
+        # Parse response to check for actions
+        with profile_phase("parse_response"):
+            parsed_response = self.response_parser.parse_response(
+                model_response,
             )
-            # Re-raise with more context
-            raise RuntimeError(f"Error in agent execution: {e}") from e
+
+        # Add the assistant's original response to conversation
+        messages.append(model_response.to_message_dict())
+
+        # Process tool calls and sub-agent calls
+        logger.info("⚙️ Processing tool/sub-agent calls for agent '%s'...", self.agent_name)
+        after_model_hook_input = AfterModelHookInput(
+            agent_state=agent_state,
+            max_iterations=self.max_iterations,
+            current_iteration=iteration,
+            original_response=assistant_content,
+            parsed_response=parsed_response,
+            messages=messages,
+            model_response=model_response,
+            token_ledger=self.token_ledger,
+        )
+        # Store this as the latest response (potential final response)
+        return assistant_content, after_model_hook_input
+
+    def _apply_call_outcome(
+        self,
+        call_outcome: tuple[str, bool, str | None, list[dict[str, Any]], list[dict[str, Any]]],
+        after_model_hook_input: AfterModelHookInput,
+        iteration: int,
+        budget: _IterationBudget,
+        final_response: str,
+        force_stop_reason: AgentStopReason,
+    ) -> tuple[list[dict[str, Any]], str, AgentStopReason, bool]:
+        """Fold tool/sub-agent results back into the conversation.
+
+        Returns:
+            Tuple of (messages, final_response, force_stop_reason, should_break)
+        """
+        (
+            processed_response,
+            should_stop,
+            stop_tool_result,
+            updated_messages,
+            execution_feedbacks,
+        ) = call_outcome
+        assistant_content = after_model_hook_input.original_response
+
+        # Update messages with any modifications from hooks
+        messages = updated_messages
+
+        processed_parsed_response = after_model_hook_input.parsed_response
+
+        # Check if a stop tool was executed
+        if should_stop and len(self.queued_messages) == 0:
+            # Return the stop tool result directly, formatted as JSON if it's not a string
+            if stop_tool_result is not None:
+                logger.info(
+                    "🛑 Stop tool detected, returning stop tool result as final response",
+                )
+                force_stop_reason = AgentStopReason.STOP_TOOL_TRIGGERED
+                if isinstance(stop_tool_result, str):
+                    final_response = stop_tool_result
+                else:
+                    final_response = json.dumps(
+                        stop_tool_result,
+                        indent=4,
+                        ensure_ascii=False,
+                    )
+                return messages, final_response, force_stop_reason, True
+            else:
+                logger.info("🛑 No more tool calls, stop.")
+                force_stop_reason = AgentStopReason.NO_MORE_TOOL_CALLS
+                # Fallback to the processed response if no specific result
+                return messages, processed_response, force_stop_reason, True
+
+        # Extract just the tool results from processed_response
+        openai_tool_mode = bool(
+            processed_parsed_response and processed_parsed_response.model_response and processed_parsed_response.model_response.tool_calls
+        )
+
+        if openai_tool_mode:
+            for feedback in execution_feedbacks:
+                call_obj = feedback.get("call")
+                call_type = feedback.get("call_type")
+                content = feedback.get("content") or ""
+
+                if call_type == "tool":
+                    call_id = getattr(call_obj, "tool_call_id", None)
+                elif call_type == "sub_agent":
+                    call_id = getattr(call_obj, "tool_call_id", None) or getattr(call_obj, "sub_agent_call_id", None)
+                else:
+                    call_id = None
+
+                if not call_id:
+                    continue
+
+                messages.append(
+                    {
+                        "role": "tool",
+                        "tool_call_id": call_id,
+                        "content": content,
+                    },
+                )
+
+            tool_results = ""
+        else:
+            tool_results = processed_response.replace(
+                assistant_content,
+                "",
+                1,
+            ).strip()
+
+        # Add tool results as user feedback with iteration context
+        remaining_iterations = self.max_iterations - iteration - 1
+        iteration_hint = self._build_iteration_hint(
+            iteration + 1,
+            self.max_iterations,
+            remaining_iterations,
+        )
+
+        if tool_results:
+            messages.append(
+                {
+                    "role": "user",
+                    "content": f"Tool execution results:\n{tool_results}\n\n{iteration_hint}",
+                },
+            )
+        else:
+            messages.append(
+                {
+                    "role": "user",
+                    "content": f"{iteration_hint}",
+                },
+            )
+        current_prompt_tokens = self.token_ledger.count(messages)
+
+        token_limit_hint = self._build_token_limit_hint(
+            current_prompt_tokens,
+            self.max_context_tokens,
+            budget.available_tokens,
+            budget.desired_max_tokens,
+        )
+        messages[-1]["content"] += f"\n\n{token_limit_hint}"
+
+        return messages, final_response, force_stop_reason, False
+
+    def _finish_execution(
+        self,
+        iteration: int,
+        final_response: str,
+        force_stop_reason: AgentStopReason,
+        messages: list[dict[str, Any]],
+    ) -> tuple[str, list[dict[str, Any]]]:
+        # Add note if max iterations reached
+        if iteration >= self.max_iterations:
+            force_stop_reason = AgentStopReason.MAX_ITERATIONS_REACHED
+            final_response += "\\n\\n[Note: Maximum iteration limit reached]"
+
+        logger.info("🔄 Force stop reason: %s", force_stop_reason.name)
+        logger.info("🔄 Final response for agent '%s': %s", self.agent_name, capped(final_response))
+        return final_response, messages
+
+    def _raise_execution_error(self, e: Exception) -> NoReturn:
+        force_stop_reason = AgentStopReason.ERROR_OCCURRED
+        final_response = f"Error: {str(e)}"
+        logger.error(
+            f"🔄 Force stop reason: {force_stop_reason.name}",
+        )
+        logger.error(
+            f"🔄 Final response for agent '{self.agent_name}': {final_response}",
+        )
+        logger.error(
+            f"❌ Error in agent execution: {e}",
+        )
+        # Re-raise with more context
+        raise RuntimeError(f"Error in agent execution: {e}") from e
 
     @staticmethod
     def _build_middleware_manager(
@@ -536,23 +971,19 @@ class Executor:
     def _process_xml_calls(
         self,
         hook_input: AfterModelHookInput,
+        stream_dispatcher: StreamingToolDispatcher | None = None,
     ) -> tuple[str, bool, str | None, list[dict[str, Any]], list[dict[str, Any]]]:
         """Process XML tool calls and sub-agent calls using two-phase approach.
 
         Args:
-            response: Agent response containing XML calls
-            messages: Current conversation history
+            hook_input: After-model hook input carrying the model response and history
+            stream_dispatcher: Dispatcher holding tool calls already started while streaming
 
         Returns:
             Tuple of (processed_response, should_stop, stop_tool_result, updated_messages)
         """
         # Phase 1: Parse the response to extract all calls
-        logger.info("📋 Phase 1: Parsing LLM response for all executable calls")
-        response_payload: str | ModelResponse = hook_input.model_response or hook_input.original_response
-        parsed_response: ParsedResponse | None = hook_input.parsed_response or self.response_parser.parse_response(
-            response_payload,
-        )
-        hook_input.parsed_response = parsed_response
+        parsed_response = self._ensure_parsed_response(hook_input)
 
         # Keep track of current messages (may be modified by hooks)
         current_messages = hook_input.messages.copy()
@@ -561,46 +992,94 @@ class Executor:
         # Execute middlewares if any are configured (always run even if no calls)
         if self.middleware_manager:
             try:
-                parsed_response, current_messages, force_continue = self.middleware_manager.run_after_model(hook_input)
+                with profile_phase("after_model_hooks"):
+                    parsed_response, current_messages, force_continue = self.middleware_manager.run_after_model(hook_input)
             except Exception as e:
                 logger.warning(f"⚠️ After-model middleware execution failed: {e}")
 
         # If no calls found after hooks, check if we should force continue
         if not parsed_response or not parsed_response.has_calls():
-            if force_continue:
-                # Hook removed all calls but added feedback, let agent continue
-                logger.info(
-                    "🎣 No tool calls remaining, but hook requested force_continue. Agent will continue with feedback.",
-                )
-                return hook_input.original_response, False, None, current_messages, []
-            else:
-                # Normal behavior: no calls means stop
-                logger.info(
-                    "🛑 No tool calls remaining, stopping.",
-                )
-                return hook_input.original_response, True, None, current_messages, []
+            return self._no_calls_outcome(hook_input, current_messages, force_continue)
 
         # Phase 2: Execute all parsed calls
-        logger.info(
-            f"⚡ Phase 2: Executing {parsed_response.get_call_summary()}",
+        logger.info("⚡ Phase 2: Executing %s", lazy(parsed_response.get_call_summary))
+        with profile_phase("execute_calls"):
+            processed_response, should_stop, stop_tool_result, execution_feedbacks = self._execute_parsed_calls(
+                parsed_response,
+                hook_input.agent_state,
+                stream_dispatcher,
+            )
+        return processed_response, should_stop, stop_tool_result, current_messages, execution_feedbacks
+
+    async def _aprocess_xml_calls(
+        self,
+        hook_input: AfterModelHookInput,
+        stream_dispatcher: StreamingToolDispatcher | None = None,
+    ) -> tuple[str, bool, str | None, list[dict[str, Any]], list[dict[str, Any]]]:
+        """Async counterpart of :meth:`_process_xml_calls`."""
+        parsed_response = self._ensure_parsed_response(hook_input)
+
+        current_messages = hook_input.messages.copy()
+        force_continue = False
+
+        if self.middleware_manager:
+            try:
+                with profile_phase("after_model_hooks"):
+                    parsed_response, current_messages, force_continue = await self.middleware_manager.arun_after_model(hook_input)
+            except Exception as e:
+                logger.warning(f"⚠️ After-model middleware execution failed: {e}")
+
+        if not parsed_response or not parsed_response.has_calls():
+            return self._no_calls_outcome(hook_input, current_messages, force_continue)
+
+        logger.info("⚡ Phase 2: Executing %s", lazy(parsed_response.get_call_summary))
+        with profile_phase("execute_calls"):
+            processed_response, should_stop, stop_tool_result, execution_feedbacks = await self._aexecute_parsed_calls(
+                parsed_response,
+                hook_input.agent_state,
+                stream_dispatcher,
+            )
+        return processed_response, should_stop, stop_tool_result, current_messages, execution_feedbacks
+
+    def _ensure_parsed_response(self, hook_input: AfterModelHookInput) -> ParsedResponse | None:
+        logger.info("📋 Phase 1: Parsing LLM response for all executable calls")
+        response_payload: str | ModelResponse = hook_input.model_response or hook_input.original_response
+        parsed_response: ParsedResponse | None = hook_input.parsed_response or self.response_parser.parse_response(
+            response_payload,
         )
-        assert parsed_response is not None
-        processed_response, should_stop, stop_tool_result, execution_feedbacks = self._execute_parsed_calls(
-            parsed_response,
-            hook_input.agent_state,
+        hook_input.parsed_response = parsed_response
+        return parsed_response
+
+    @staticmethod
+    def _no_calls_outcome(
+        hook_input: AfterModelHookInput,
+        current_messages: list[dict[str, Any]],
+        force_continue: bool,
+    ) -> tuple[str, bool, str | None, list[dict[str, Any]], list[dict[str, Any]]]:
+        if force_continue:
+            # Hook removed all calls but added feedback, let agent continue
+            logger.info(
+                "🎣 No tool calls remaining, but hook requested force_continue. Agent will continue with feedback.",
+            )
+            return hook_input.original_response, False, None, current_messages, []
+        # Normal behavior: no calls means stop
+        logger.info(
+            "🛑 No tool calls remaining, stopping.",
         )
-        return processed_response, should_stop, stop_tool_result, current_messages, execution_feedbacks
+        return hook_input.original_response, True, None, current_messages, []
 
     def _execute_parsed_calls(
         self,
         parsed_response: ParsedResponse,
         agent_state: "AgentState",
+        stream_dispatcher: StreamingToolDispatcher | None = None,
     ) -> tuple[str, bool, str | None, list[dict[str, Any]]]:
         """Execute all parsed calls in parallel.
 
         Args:
             parsed_response: ParsedResponse containing all calls to execute
             agent_state: AgentState containing agent context and global storage
+            stream_dispatcher: Dispatcher holding tool calls already started while streaming
 
         Returns:
             Tuple of (processed_response, should_stop, stop_tool_result)
@@ -608,54 +1087,182 @@ class Executor:
         processed_response = parsed_response.original_response
 
         # Check if agent is shutting down
-        if self._shutdown_event.is_set():
-            logger.warning(
-                f"⚠️ Agent '{self.agent_name}' ({self.agent_id}) is shutting down, skipping new task execution",
-            )
+        if self._is_shutting_down():
             return processed_response, False, None, []
 
         # Handle batch agent calls first (they take priority and are not parallelized)
         if parsed_response.batch_agent_calls:
-            for batch_call in parsed_response.batch_agent_calls:
+            return processed_response + self._run_batch_calls(parsed_response), False, None, []
+
+        # Execute tool calls and sub-agent calls in parallel
+        if not parsed_response.tool_calls and not parsed_response.sub_agent_calls:
+            return processed_response, False, None, []
+
+        context_dict = self._current_context_dict()
+        execution_pool = self._get_execution_pool()
+        self._dedupe_call_ids(parsed_response)
+
+        serial_tool_names = set(self.serial_tool_name)
+        tool_futures: dict[Future[Any], tuple[str, ToolCall]] = {}
+        sub_agent_futures: dict[Future[Any], tuple[str, SubAgentCall]] = {}
+
+        try:
+            # Submit tool execution tasks
+            for tool_call in parsed_response.tool_calls:
+                future = stream_dispatcher.claim(tool_call) if stream_dispatcher else None
+                if future is None:
+                    future = self._submit(
+                        execution_pool,
+                        TOOLS_LANE,
+                        self._execute_tool_call_safe,
+                        tool_call,
+                        agent_state,
+                    )
+                tool_futures[future] = ("tool", tool_call)
+
+                if tool_call.tool_name in serial_tool_names:
+                    future.result()
+
+            # Submit sub-agent execution tasks
+            for sub_agent_call in parsed_response.sub_agent_calls:
+                future = self._submit(
+                    execution_pool,
+                    SUB_AGENTS_LANE,
+                    self._execute_sub_agent_call_safe,
+                    sub_agent_call,
+                    context_dict,
+                    parent_agent_state=agent_state,
+                )
+                sub_agent_futures[future] = ("sub_agent", sub_agent_call)
+
+            # Combine all futures
+            all_futures: dict[Future[Any], tuple[str, Any]] = {**tool_futures, **sub_agent_futures}
+
+            # Collect results as they complete
+            collector = _CallResultCollector()
+            for future in as_completed(all_futures):
+                call_type, call_obj = all_futures[future]
                 try:
-                    batch_result = self._execute_batch_call(batch_call)
-                    processed_response += f"""
+                    collector.add(call_type, call_obj, future.result())
+                except Exception as e:
+                    collector.add_unexpected_error(call_type, e)
+
+        finally:
+            # Stop tracking this iteration's work; the pool itself stays alive
+            with self._executor_lock:
+                self._inflight_futures.difference_update(tool_futures)
+                self._inflight_futures.difference_update(sub_agent_futures)
+
+        return collector.finish(processed_response)
+
+    async def _aexecute_parsed_calls(
+        self,
+        parsed_response: ParsedResponse,
+        agent_state: "AgentState",
+        stream_dispatcher: StreamingToolDispatcher | None = None,
+    ) -> tuple[str, bool, str | None, list[dict[str, Any]]]:
+        """Async counterpart of :meth:`_execute_parsed_calls` using asyncio tasks."""
+        processed_response = parsed_response.original_response
+
+        if self._is_shutting_down():
+            return processed_response, False, None, []
+
+        if parsed_response.batch_agent_calls:
+            # Batch items run on the shared batch lane; only the orchestration is offloaded
+            batch_results = await asyncio.to_thread(self._run_batch_calls, parsed_response)
+            return processed_response + batch_results, False, None, []
+
+        if not parsed_response.tool_calls and not parsed_response.sub_agent_calls:
+            return processed_response, False, None, []
+
+        context_dict = self._current_context_dict()
+        self.tool_executor.execution_pool = self._get_execution_pool()
+        self._dedupe_call_ids(parsed_response)
+
+        serial_tool_names = set(self.serial_tool_name)
+        sub_agent_limit = None if self.adaptive_concurrency else asyncio.Semaphore(max(1, self.max_running_subagents))
+        tasks: dict[asyncio.Task[Any], tuple[str, Any]] = {}
+
+        try:
+            for tool_call in parsed_response.tool_calls:
+                task = stream_dispatcher.claim(tool_call) if stream_dispatcher else None
+                if task is None:
+                    task = self._create_task(self._aexecute_tool_call_safe(tool_call, agent_state))
+                tasks[task] = ("tool", tool_call)
+
+                if tool_call.tool_name in serial_tool_names:
+                    await asyncio.wait({task})
+
+            for sub_agent_call in parsed_response.sub_agent_calls:
+                task = self._create_task(
+                    self._aexecute_sub_agent_call_safe(
+                        sub_agent_call,
+                        context_dict,
+                        parent_agent_state=agent_state,
+                        limiter=sub_agent_limit,
+                    ),
+                )
+                tasks[task] = ("sub_agent", sub_agent_call)
+
+            collector = _CallResultCollector()
+            pending: set[asyncio.Task[Any]] = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    call_type, call_obj = tasks[task]
+                    try:
+                        collector.add(call_type, call_obj, task.result())
+                    except Exception as e:
+                        collector.add_unexpected_error(call_type, e)
+
+        finally:
+            for task in tasks:
+                task.cancel()
+            with self._executor_lock:
+                self._inflight_tasks.difference_update(tasks)
+
+        return collector.finish(processed_response)
+
+    def _is_shutting_down(self) -> bool:
+        if self._shutdown_event.is_set():
+            logger.warning(
+                f"⚠️ Agent '{self.agent_name}' ({self.agent_id}) is shutting down, skipping new task execution",
+            )
+            return True
+        return False
+
+    def _run_batch_calls(self, parsed_response: ParsedResponse) -> str:
+        """Run batch agent calls sequentially and render their XML results."""
+        rendered = ""
+        for batch_call in parsed_response.batch_agent_calls:
+            try:
+                batch_result = self._execute_batch_call(batch_call)
+                rendered += f"""
 <tool_result>
 <tool_name>batch_agent</tool_name>
 <result>{batch_result}</result>
 </tool_result>
 """
-                except Exception as e:
-                    logger.error(f"❌ Batch agent call failed: {e}")
-                    processed_response += f"""
+            except Exception as e:
+                logger.error(f"❌ Batch agent call failed: {e}")
+                rendered += f"""
 <tool_result>
 <tool_name>batch_agent</tool_name>
 <error>{str(e)}</error>
 </tool_result>
 """
-            return processed_response, False, None, []
+        return rendered
 
-        # Execute tool calls and sub-agent calls in parallel
-        if not parsed_response.tool_calls and not parsed_response.sub_agent_calls:
-            return processed_response, False, None, []
-
-        # Get current context to pass to sub-agents
+    @staticmethod
+    def _current_context_dict() -> dict[str, Any] | None:
+        """Snapshot the current agent context to pass to sub-agents."""
         from ..agent_context import get_context
 
         current_context = get_context()
-        context_dict = current_context.context.copy() if current_context else None
-
-        executor_id = str(uuid.uuid4())
-        tool_executor = ThreadPoolExecutor()
-        subagent_executor = ThreadPoolExecutor(
-            max_workers=self.max_running_subagents,
-        )
-
-        # Track executors for cleanup
-        with self._executor_lock:
-            self._running_executors[f"{executor_id}_tools"] = tool_executor
-            self._running_executors[f"{executor_id}_subagents"] = subagent_executor
+        return current_context.context.copy() if current_context else None
 
+    @staticmethod
+    def _dedupe_call_ids(parsed_response: ParsedResponse) -> None:
         # Handle duplicate tool_call_ids by adding suffixes
         seen_tool_call_ids: defaultdict[str, int] = defaultdict(int)
         for idx, tool_call in enumerate(parsed_response.tool_calls):
@@ -678,194 +1285,127 @@ class Executor:
                 sub_agent_call.sub_agent_call_id = base_id
             seen_sub_agent_call_ids[base_id] += 1
 
-        serial_tool_names = set(self.serial_tool_name)
+    def _get_execution_pool(self) -> ExecutionPool:
+        """Return the hierarchy-wide worker pool, resolving it on first use."""
+        pool = self._execution_pool
+        if pool is None or pool.is_shutdown:
+            # With an adaptive limit the lanes must leave room for it to grow
+            ceiling = self.max_adaptive_concurrency if self.adaptive_concurrency else 0
+            pool, created = get_shared_execution_pool(
+                self.global_storage,
+                {
+                    TOOLS_LANE: self.max_tool_workers,
+                    SUB_AGENTS_LANE: max(self.max_running_subagents, ceiling),
+                    BATCH_LANE: max(self.max_batch_workers, ceiling),
+                },
+            )
+            self._execution_pool = pool
+            self._owns_execution_pool = created
+        return pool
+
+    def _get_concurrency_limiter(self) -> AdaptiveConcurrencyLimiter | None:
+        """Return the hierarchy-wide adaptive limiter, or None when it is disabled."""
+        if not self.adaptive_concurrency:
+            return None
+        if self._concurrency_limiter is None:
+            self._concurrency_limiter = get_shared_concurrency_limiter(
+                self.global_storage,
+                initial_limit=max(1, self.max_running_subagents),
+                max_limit=self.max_adaptive_concurrency,
+                name=self.agent_name,
+            )
+        return self._concurrency_limiter
 
-        try:
-            # Submit tool execution tasks
-            tool_futures = {}
-            for tool_call in parsed_response.tool_calls:
-                task_ctx = copy_context()
-                future = tool_executor.submit(
-                    task_ctx.run,
-                    self._execute_tool_call_safe,
-                    tool_call,
-                    agent_state,
-                )
-                tool_futures[future] = ("tool", tool_call)
+    def concurrency_stats(self) -> dict[str, Any] | None:
+        """Return the adaptive concurrency limiter's state, or None when it is disabled."""
+        limiter = self._get_concurrency_limiter()
+        return limiter.stats() if limiter is not None else None
 
-                if tool_call.tool_name in serial_tool_names:
-                    future.result()
+    def _submit(
+        self,
+        execution_pool: ExecutionPool,
+        lane: str,
+        fn: Callable[..., Any],
+        *args: Any,
+        **kwargs: Any,
+    ) -> Future[Any]:
+        """Submit work to a pool lane and track it for cancellation on cleanup."""
+        future = execution_pool.submit(lane, fn, *args, **kwargs)
+        with self._executor_lock:
+            self._inflight_futures.add(future)
+        return future
 
-            # Submit sub-agent execution tasks
-            sub_agent_futures = {}
-            for sub_agent_call in parsed_response.sub_agent_calls:
-                task_ctx = copy_context()
-                future = subagent_executor.submit(
-                    task_ctx.run,
-                    self._execute_sub_agent_call_safe,
-                    sub_agent_call,
-                    context_dict,
-                    parent_agent_state=agent_state,
-                )
-                sub_agent_futures[future] = ("sub_agent", sub_agent_call)
+    def _create_task(self, coro: Any) -> asyncio.Task[Any]:
+        """Schedule a coroutine on the running loop and track it for cancellation on cleanup."""
+        task = asyncio.get_running_loop().create_task(coro)
+        with self._executor_lock:
+            self._inflight_tasks.add(task)
+        return task
 
-            # Combine all futures
-            all_futures = {**tool_futures, **sub_agent_futures}
+    def _new_stream_dispatcher(self, agent_state: "AgentState", asynchronous: bool) -> StreamingToolDispatcher | None:
+        """Create a dispatcher for this model call when stream tool dispatch is enabled."""
+        if not self.stream_tool_dispatch:
+            return None
 
-            # Collect results as they complete
-            tool_results = []
-            execution_feedbacks: list[dict[str, Any]] = []
-            stop_tool_detected = False
-            stop_tool_result = None
+        submit: Callable[[ToolCall], Any]
+        if asynchronous:
+            self.tool_executor.execution_pool = self._get_execution_pool()
 
-            for future in as_completed(all_futures):
-                call_type, call_obj = all_futures[future]
-                try:
-                    result_data = future.result()
-                    if call_type == "tool":
-                        tool_name, result, is_error = result_data
-                        execution_feedbacks.append(
-                            {
-                                "call_type": "tool",
-                                "call": call_obj,
-                                "content": result,
-                                "is_error": is_error,
-                            },
-                        )
-                        if is_error:
-                            logger.error(
-                                f"❌ Tool '{tool_name}' error: {result}",
-                            )
-                            should_append_xml = getattr(call_obj, "source", "xml") != "openai"
-                            if should_append_xml:
-                                tool_results.append(
-                                    f"""
-<tool_result>
-<tool_name>{tool_name}</tool_name>
-<error>{result}</error>
-</tool_result>
-""",
-                                )
-                        else:
-                            logger.info(
-                                f"📤 Tool '{tool_name}' result: {result}",
-                            )
-                            should_append_xml = getattr(call_obj, "source", "xml") != "openai"
-                            tool_result_xml = f"""
-<tool_result>
-<tool_name>{tool_name}</tool_name>
-<result>{result}</result>
-</tool_result>
-"""
-                            if should_append_xml:
-                                tool_results.append(tool_result_xml)
-
-                            # Check if this tool result indicates a stop tool was executed
-                            try:
-                                parsed_result = json.loads(result)
-                                if isinstance(
-                                    parsed_result,
-                                    dict,
-                                ) and parsed_result.get("_is_stop_tool"):
-                                    stop_tool_detected = True
-                                    actual_result = {k: v for k, v in parsed_result.items() if k != "_is_stop_tool"}
-                                    if "result" in actual_result and len(actual_result) == 1:
-                                        stop_tool_result = json.dumps(
-                                            actual_result["result"],
-                                            ensure_ascii=False,
-                                            indent=4,
-                                        )
-                                    else:
-                                        stop_tool_result = (
-                                            json.dumps(
-                                                actual_result,
-                                                ensure_ascii=False,
-                                                indent=4,
-                                            )
-                                            if actual_result
-                                            else json.dumps(
-                                                parsed_result,
-                                                ensure_ascii=False,
-                                                indent=4,
-                                            )
-                                        )
-                                    logger.info(
-                                        f"🛑 Stop tool '{tool_name}' result detected, will terminate after processing",
-                                    )
-                            except (json.JSONDecodeError, TypeError):
-                                pass
-                    elif call_type == "sub_agent":
-                        agent_name, result, is_error = result_data
-                        result_str = result if isinstance(result, str) else json.dumps(result, ensure_ascii=False)
-                        execution_feedbacks.append(
-                            {
-                                "call_type": "sub_agent",
-                                "call": call_obj,
-                                "content": result_str,
-                                "is_error": is_error,
-                            },
-                        )
-                        if is_error:
-                            logger.error(
-                                f"❌ Sub-agent '{agent_name}' error: {result}",
-                            )
-                            should_append_xml = not getattr(call_obj, "tool_call_id", None)
-                            if should_append_xml:
-                                tool_results.append(
-                                    f"""
-<tool_result>
-<tool_name>{agent_name}_sub_agent</tool_name>
-<error>{result}</error>
-</tool_result>
-""",
-                                )
-                        else:
-                            logger.info(
-                                f"📤 Sub-agent '{agent_name}' result: {result}",
-                            )
-                            should_append_xml = not getattr(call_obj, "tool_call_id", None)
-                            if should_append_xml:
-                                tool_results.append(
-                                    f"""
-<tool_result>
-<tool_name>{agent_name}_sub_agent</tool_name>
-<result>{result}</result>
-</tool_result>
-""",
-                                )
-                except Exception as e:
-                    logger.error(
-                        f"❌ Unexpected error processing {call_type}: {e}",
-                    )
-                    tool_results.append(
-                        f"""
-<tool_result>
-<tool_name>unknown</tool_name>
-<error>Unexpected error: {str(e)}</error>
-</tool_result>
-""",
-                    )
+            def submit(tool_call: ToolCall) -> Any:
+                return self._create_task(self._aexecute_tool_call_safe(tool_call, agent_state))
 
-            # Append tool results to the original response
-            if tool_results:
-                processed_response += "\n\n" + "\n\n".join(tool_results)
+        else:
 
-        finally:
-            # Clean up executors
-            with self._executor_lock:
-                try:
-                    tool_executor.shutdown(wait=True, cancel_futures=False)
-                    subagent_executor.shutdown(wait=True, cancel_futures=False)
-                except Exception as e:
-                    logger.error(f"❌ Error shutting down executors: {e}")
-                finally:
-                    self._running_executors.pop(f"{executor_id}_tools", None)
-                    self._running_executors.pop(
-                        f"{executor_id}_subagents",
-                        None,
-                    )
+            def submit(tool_call: ToolCall) -> Any:
+                return self._submit(
+                    self._get_execution_pool(),
+                    TOOLS_LANE,
+                    self._execute_tool_call_safe,
+                    tool_call,
+                    agent_state,
+                )
 
-        return processed_response, stop_tool_detected, stop_tool_result, execution_feedbacks
+        return StreamingToolDispatcher(
+            submit,
+            self.response_parser._parse_tool_call,
+            skip_tools=set(self.serial_tool_name),
+        )
+
+    @staticmethod
+    def _new_stream_listener(
+        agent_state: "AgentState",
+        stream_dispatcher: StreamingToolDispatcher | None,
+    ) -> ToolCallStreamListener | None:
+        """Wrap the dispatcher so a streamed run (``Agent.run_stream``) also receives model events."""
+        stream = get_current_event_stream()
+        if stream is None:
+            return stream_dispatcher
+        return StreamEventListener(stream, agent_state, stream_dispatcher)
+
+    def _discard_stream_dispatches(self, stream_dispatcher: StreamingToolDispatcher | None) -> None:
+        """Cancel early-dispatched tool calls that the parsed response did not claim."""
+        if stream_dispatcher is None:
+            return
+        unclaimed = stream_dispatcher.release_unclaimed()
+        if not unclaimed:
+            return
+        logger.info(f"🧹 Discarding {len(unclaimed)} early-dispatched tool call(s) that were not claimed")
+        with self._executor_lock:
+            for handle in unclaimed:
+                handle.cancel()
+                self._inflight_futures.discard(handle)
+                self._inflight_tasks.discard(handle)
+
+    def _convert_tool_parameters(self, tool_call: ToolCall) -> dict[str, Any]:
+        """Convert parsed tool call parameters to the tool's declared types."""
+        converted_params = {}
+        for param_name, param_value in tool_call.parameters.items():
+            converted_params[param_name] = self.tool_executor._convert_parameter_type(
+                tool_call.tool_name,
+                param_name,
+                param_value,
+            )
+        return converted_params
 
     def _execute_tool_call_safe(
         self,
@@ -875,20 +1415,66 @@ class Executor:
         """Safely execute a tool call."""
         try:
             # Convert parameters to correct types and execute
-            converted_params = {}
-            for param_name, param_value in tool_call.parameters.items():
-                converted_params[param_name] = self.tool_executor._convert_parameter_type(
+            converted_params = self._convert_tool_parameters(tool_call)
+
+            tool_call_id = tool_call.tool_call_id or f"tool_call_{uuid.uuid4()}"
+            with profile_phase(f"tool:{tool_call.tool_name}", "tool", tool_call.tool_name):
+                result = self.tool_executor.execute_tool(
+                    agent_state,
                     tool_call.tool_name,
-                    param_name,
-                    param_value,
+                    converted_params,
+                    tool_call_id=tool_call_id,
                 )
+            emit_stream_event(
+                agent_state,
+                StreamEventType.TOOL_RESULT,
+                call_id=tool_call_id,
+                name=tool_call.tool_name,
+                output=result,
+                is_error=False,
+            )
+
+            return (
+                tool_call.tool_name,
+                json.dumps(result, indent=2, ensure_ascii=False),
+                False,
+            )
+
+        except Exception as e:
+            emit_stream_event(
+                agent_state,
+                StreamEventType.TOOL_RESULT,
+                call_id=tool_call.tool_call_id,
+                name=tool_call.tool_name,
+                output=str(e),
+                is_error=True,
+            )
+            return tool_call.tool_name, str(e), True
+
+    async def _aexecute_tool_call_safe(
+        self,
+        tool_call: ToolCall,
+        agent_state: "AgentState",
+    ) -> tuple[str, str, bool]:
+        """Async counterpart of :meth:`_execute_tool_call_safe`."""
+        try:
+            converted_params = self._convert_tool_parameters(tool_call)
 
             tool_call_id = tool_call.tool_call_id or f"tool_call_{uuid.uuid4()}"
-            result = self.tool_executor.execute_tool(
+            with profile_phase(f"tool:{tool_call.tool_name}", "tool", tool_call.tool_name):
+                result = await self.tool_executor.aexecute_tool(
+                    agent_state,
+                    tool_call.tool_name,
+                    converted_params,
+                    tool_call_id=tool_call_id,
+                )
+            emit_stream_event(
                 agent_state,
-                tool_call.tool_name,
-                converted_params,
-                tool_call_id=tool_call_id,
+                StreamEventType.TOOL_RESULT,
+                call_id=tool_call_id,
+                name=tool_call.tool_name,
+                output=result,
+                is_error=False,
             )
 
             return (
@@ -898,6 +1484,14 @@ class Executor:
             )
 
         except Exception as e:
+            emit_stream_event(
+                agent_state,
+                StreamEventType.TOOL_RESULT,
+                call_id=tool_call.tool_call_id,
+                name=tool_call.tool_name,
+                output=str(e),
+                is_error=True,
+            )
             return tool_call.tool_name, str(e), True
 
     def _execute_sub_agent_call_safe(
@@ -907,27 +1501,120 @@ class Executor:
         parent_agent_state: AgentState | None = None,
     ) -> tuple[str, str, bool]:
         """Safely execute a sub-agent call."""
+        self._emit_sub_agent_event(parent_agent_state, sub_agent_call, StreamEventType.SUB_AGENT_START)
+        limiter = self._get_concurrency_limiter()
         try:
-            result = self.subagent_manager.call_sub_agent(
-                sub_agent_call.agent_name,
-                sub_agent_call.message,
-                context,
-                parent_agent_state=parent_agent_state,
-            )
+            with (
+                limiter.slot() if limiter is not None else nullcontext(),
+                profile_phase(f"sub_agent:{sub_agent_call.agent_name}", "sub_agent", sub_agent_call.agent_name),
+            ):
+                result = self.subagent_manager.call_sub_agent(
+                    sub_agent_call.agent_name,
+                    sub_agent_call.message,
+                    context,
+                    parent_agent_state=parent_agent_state,
+                )
 
+            self._emit_sub_agent_event(parent_agent_state, sub_agent_call, StreamEventType.SUB_AGENT_COMPLETE, result=result)
             return sub_agent_call.agent_name, result, False
 
         except Exception as e:
+            self._emit_sub_agent_event(parent_agent_state, sub_agent_call, StreamEventType.SUB_AGENT_ERROR, error=str(e))
             return sub_agent_call.agent_name, str(e), True
 
+    async def _aexecute_sub_agent_call_safe(
+        self,
+        sub_agent_call: SubAgentCall,
+        context: dict[str, Any] | None = None,
+        parent_agent_state: AgentState | None = None,
+        limiter: asyncio.Semaphore | None = None,
+    ) -> tuple[str, str, bool]:
+        """Async counterpart of :meth:`_execute_sub_agent_call_safe`.
+
+        ``limiter`` bounds how many sub-agents of one iteration run at once,
+        mirroring the sub-agent lane size used by the thread-pool path. When
+        adaptive concurrency is enabled the shared limiter's slot is used instead.
+        """
+        concurrency_limiter = self._get_concurrency_limiter()
+        if limiter is None and concurrency_limiter is not None:
+            slot: Any = concurrency_limiter.aslot()
+        else:
+            slot = limiter or nullcontext()
+        try:
+            async with slot:
+                self._emit_sub_agent_event(parent_agent_state, sub_agent_call, StreamEventType.SUB_AGENT_START)
+                with profile_phase(f"sub_agent:{sub_agent_call.agent_name}", "sub_agent", sub_agent_call.agent_name):
+                    result = await self.subagent_manager.acall_sub_agent(
+                        sub_agent_call.agent_name,
+                        sub_agent_call.message,
+                        context,
+                        parent_agent_state=parent_agent_state,
+                    )
+
+            self._emit_sub_agent_event(parent_agent_state, sub_agent_call, StreamEventType.SUB_AGENT_COMPLETE, result=result)
+            return sub_agent_call.agent_name, result, False
+
+        except Exception as e:
+            self._emit_sub_agent_event(parent_agent_state, sub_agent_call, StreamEventType.SUB_AGENT_ERROR, error=str(e))
+            return sub_agent_call.agent_name, str(e), True
+
+    @staticmethod
+    def _emit_sub_agent_event(
+        parent_agent_state: AgentState | None,
+        sub_agent_call: SubAgentCall,
+        event_type: StreamEventType,
+        **data: Any,
+    ) -> None:
+        emit_stream_event(
+            parent_agent_state,
+            event_type,
+            call_id=sub_agent_call.tool_call_id,
+            name=sub_agent_call.agent_name,
+            message=sub_agent_call.message,
+            **data,
+        )
+
     def _execute_batch_call(self, batch_call: BatchAgentCall) -> str:
         """Execute a batch agent call."""
-        return self.batch_processor._process_batch_data(
-            batch_call.agent_name,
-            batch_call.file_path,
-            batch_call.data_format,
-            batch_call.message_template,
-        )
+        runner = self._get_sharded_batch_runner(batch_call.agent_name) if self.batch_processes > 0 else None
+        if runner is not None:
+            with profile_phase(f"batch:{batch_call.agent_name}"):
+                return runner.run(batch_call.file_path, batch_call.data_format, batch_call.message_template)
+
+        self.batch_processor.execution_pool = self._get_execution_pool()
+        self.batch_processor.concurrency_limiter = self._get_concurrency_limiter()
+        with profile_phase(f"batch:{batch_call.agent_name}"):
+            return self.batch_processor._process_batch_data(
+                batch_call.agent_name,
+                batch_call.file_path,
+                batch_call.data_format,
+                batch_call.message_template,
+            )
+
+    def _get_sharded_batch_runner(self, agent_name: str) -> ShardedBatchRunner | None:
+        """Return a runner for batches of ``agent_name`` in worker processes, or None to run them here."""
+        agent_factory = self.subagent_manager.sub_agent_factories.get(agent_name)
+        if agent_factory is None:
+            return None
+        try:
+            config_fingerprint = self.subagent_manager.config_fingerprint(agent_name)
+        except Exception as e:
+            logger.warning(f"⚠️ Running batch of '{agent_name}' in this process: cannot fingerprint its configuration: {e}")
+            return None
+        try:
+            return ShardedBatchRunner(
+                agent_name,
+                agent_factory,
+                processes=self.batch_processes,
+                shards=self.batch_shards,
+                threads_per_process=self.max_batch_workers,
+                work_dir=self.batch_work_dir,
+                result_cache=self.batch_processor.result_cache,
+                config_fingerprint=config_fingerprint,
+            )
+        except ValueError as e:
+            logger.warning(f"⚠️ Running batch of '{agent_name}' in this process: {e}")
+            return None
 
     def cleanup(self) -> None:
         """Clean up executor resources."""
@@ -940,18 +1627,25 @@ class Executor:
         # Shutdown subagent manager
         self.subagent_manager.shutdown()
 
-        # Shutdown all running executors
+        # Cancel work that has not started yet
         with self._executor_lock:
-            for executor_id, executor in self._running_executors.items():
-                try:
-                    logger.info(f"🛑 Shutting down executor {executor_id}")
-                    executor.shutdown(wait=False, cancel_futures=True)
-                except Exception as e:
-                    logger.error(
-                        f"❌ Error shutting down executor {executor_id}: {e}",
-                    )
-
-            self._running_executors.clear()
+            pending = list(self._inflight_futures)
+            self._inflight_futures.clear()
+            pending_tasks = list(self._inflight_tasks)
+            self._inflight_tasks.clear()
+        for future in pending:
+            future.cancel()
+        for task in pending_tasks:
+            # Tasks may belong to a loop running in another thread
+            task.get_loop().call_soon_threadsafe(task.cancel)
+
+        if self.batch_processor.result_cache is not None:
+            self.batch_processor.result_cache.close()
+
+        # Shut down the shared pool only if this executor created it
+        if self._execution_pool is not None and self._owns_execution_pool:
+            logger.info(f"🛑 Shutting down execution pool for agent '{self.agent_name}'")
+            self._execution_pool.shutdown(wait=False, cancel_futures=True)
 
         logger.info(
             f"✅ Executor cleanup completed for agent '{self.agent_name}'",
@@ -16,8 +16,12 @@
 
 from __future__ import annotations
 
+import asyncio
+import functools
 import logging
-from collections.abc import Callable
+import threading
+import time
+from collections.abc import Awaitable, Callable
 from dataclasses import dataclass
 from typing import TYPE_CHECKING, Any, Protocol, TypeVar
 
@@ -26,7 +30,10 @@ from .parse_structures import ParsedResponse
 
 if TYPE_CHECKING:
     from ..agent_state import AgentState
+    from ..utils.token_counter import TokenLedger
+    from .cache_breakpoints import CacheBreakpointPlanner
     from .executor import AgentStopReason
+    from .stream_dispatch import ToolCallStreamListener
 
 
 logger = logging.getLogger(__name__)
@@ -56,11 +63,13 @@ class AfterModelHookInput(BeforeModelHookInput):
     This class encapsulates all the information that hooks receive:
     - original_response: The raw response from the LLM
     - parsed_response: The parsed structure containing tool/agent calls
+    - token_ledger: The executor's incremental token ledger, if available
     """
 
     original_response: str
     parsed_response: ParsedResponse | None = None
     model_response: ModelResponse | None = None
+    token_ledger: TokenLedger | None = None
 
 
 HookResultT = TypeVar("HookResultT", bound="HookResult")
@@ -198,6 +207,8 @@ class ModelCallParams:
     openai_client: Any | None = None
     llm_config: Any | None = None
     retry_attempts: int = 5
+    stream_listener: ToolCallStreamListener | None = None
+    cache_planner: CacheBreakpointPlanner | None = None
 
 
 @dataclass
@@ -213,11 +224,44 @@ class ToolCallParams:
 
 ModelCallFn = Callable[[ModelCallParams], ModelResponse | None]
 ToolCallFn = Callable[[ToolCallParams], Any]
+AsyncModelCallFn = Callable[[ModelCallParams], Awaitable[ModelResponse | None]]
+AsyncToolCallFn = Callable[[ToolCallParams], Awaitable[Any]]
+
+
+async def call_sync_wrapper(
+    wrapper: Callable[[Any, Callable[[Any], Any]], Any],
+    params: Any,
+    call_next: Callable[[Any], Awaitable[Any]],
+) -> Any:
+    """Run a synchronous ``wrap_*_call`` handler from async code.
+
+    The wrapper runs in a worker thread so it cannot block the event loop; its
+    ``call_next`` schedules the async continuation back on the calling loop and
+    waits for the result, so the rest of the chain stays native async.
+    """
+    loop = asyncio.get_running_loop()
+
+    def sync_next(next_params: Any) -> Any:
+        return asyncio.run_coroutine_threadsafe(call_next(next_params), loop).result()
+
+    return await asyncio.to_thread(wrapper, params, sync_next)
 
 
 class Middleware:
     """Extensible middleware abstraction for agent execution pipeline."""
 
+    def implements(self, phase: str) -> bool:
+        """Whether this middleware does anything in ``phase``.
+
+        Phases left at the no-op defaults of this base class are skipped by
+        :class:`MiddlewareManager`. ``phase`` is a method name such as
+        ``"before_model"`` or ``"awrap_tool_call"``.
+        """
+        if phase in self.__dict__:
+            return True
+        default = getattr(Middleware, phase, None)
+        return default is None or getattr(type(self), phase, None) is not default
+
     def before_model(self, hook_input: BeforeModelHookInput) -> HookResult:
         return HookResult.no_changes()
 
@@ -245,6 +289,45 @@ class Middleware:
 
         return chunk
 
+    # Async variants used by ``Agent.arun``. The defaults delegate to the sync
+    # hooks, so existing middleware works unchanged; override these to await
+    # I/O without blocking the event loop.
+
+    async def abefore_model(self, hook_input: BeforeModelHookInput) -> HookResult:
+        return self.before_model(hook_input)
+
+    async def aafter_model(self, hook_input: AfterModelHookInput) -> HookResult:
+        return self.after_model(hook_input)
+
+    async def aafter_tool(self, hook_input: AfterToolHookInput) -> HookResult:
+        return self.after_tool(hook_input)
+
+    async def abefore_tool(self, hook_input: BeforeToolHookInput) -> HookResult:
+        return self.before_tool(hook_input)
+
+    async def awrap_model_call(self, params: ModelCallParams, call_next: AsyncModelCallFn) -> ModelResponse | None:
+        """Forward to the next handler, bridging an overridden sync ``wrap_model_call``."""
+
+        if type(self).wrap_model_call is Middleware.wrap_model_call:
+            return await call_next(params)
+        return await call_sync_wrapper(self.wrap_model_call, params, call_next)
+
+    async def awrap_tool_call(self, params: ToolCallParams, call_next: AsyncToolCallFn) -> Any:
+        """Forward to the next handler, bridging an overridden sync ``wrap_tool_call``."""
+
+        if type(self).wrap_tool_call is Middleware.wrap_tool_call:
+            return await call_next(params)
+        return await call_sync_wrapper(self.wrap_tool_call, params, call_next)
+
+
+# Phases of FunctionMiddleware that only do something when their hook is set
+_FUNCTION_HOOK_ATTRS = {
+    "before_model": "before_model_hook",
+    "after_model": "after_model_hook",
+    "after_tool": "after_tool_hook",
+    "before_tool": "before_tool_hook",
+}
+
 
 class FunctionMiddleware(Middleware):
     """Wraps legacy hook callables into middleware instances."""
@@ -264,6 +347,12 @@ class FunctionMiddleware(Middleware):
         self.before_tool_hook = before_tool_hook
         self.name = name or "function_middleware"
 
+    def implements(self, phase: str) -> bool:
+        hook_attr = _FUNCTION_HOOK_ATTRS.get(phase)
+        if hook_attr is None or getattr(type(self), phase) is not getattr(FunctionMiddleware, phase):
+            return super().implements(phase)
+        return getattr(self, hook_attr) is not None
+
     def before_model(self, hook_input: BeforeModelHookInput) -> HookResult:
         if not self.before_model_hook:
             return HookResult.no_changes()
@@ -414,11 +503,308 @@ def create_tool_after_approve_hook(tool_name: str) -> AfterModelHook:
     return _hook
 
 
+@dataclass
+class MiddlewareStats:
+    """Timing counters for one middleware phase.
+
+    Wrapper phases count self time only: the time spent in ``call_next`` is
+    attributed to the inner layers.
+    """
+
+    name: str
+    phase: str
+    calls: int = 0
+    errors: int = 0
+    total_time: float = 0.0
+    max_time: float = 0.0
+
+    @property
+    def mean_time(self) -> float:
+        return self.total_time / self.calls if self.calls else 0.0
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "name": self.name,
+            "phase": self.phase,
+            "calls": self.calls,
+            "errors": self.errors,
+            "total_time": self.total_time,
+            "mean_time": self.mean_time,
+            "max_time": self.max_time,
+        }
+
+
+# Guards updates of MiddlewareStats counters from concurrent tool threads
+_stats_lock = threading.Lock()
+
+
+class _PhaseHandler:
+    """A middleware's handler for one phase, timed on every call."""
+
+    __slots__ = ("middleware", "handler", "is_async", "stats")
+
+    def __init__(self, middleware: Any, handler: Callable[..., Any], is_async: bool, stats: MiddlewareStats) -> None:
+        self.middleware = middleware
+        self.handler = handler
+        self.is_async = is_async
+        self.stats = stats
+
+    def record(self, elapsed: float, failed: bool) -> None:
+        stats = self.stats
+        with _stats_lock:
+            stats.calls += 1
+            stats.total_time += elapsed
+            if elapsed > stats.max_time:
+                stats.max_time = elapsed
+            if failed:
+                stats.errors += 1
+
+    def __call__(self, *args: Any) -> Any:
+        start = time.perf_counter()
+        failed = False
+        try:
+            return self.handler(*args)
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            self.record(time.perf_counter() - start, failed)
+
+    async def acall(self, *args: Any) -> Any:
+        start = time.perf_counter()
+        failed = False
+        try:
+            result = self.handler(*args)
+            if self.is_async:
+                result = await result
+            return result
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            self.record(time.perf_counter() - start, failed)
+
+
+class _ChainLink:
+    """``call_next`` handed to a wrapper: runs the next layer, or the terminal call after the last one."""
+
+    __slots__ = ("_chain", "_entry", "_next", "elapsed")
+
+    def __init__(self, chain: _WrapperChain, entry: _PhaseHandler | None, next_link: Any) -> None:
+        self._chain = chain
+        self._entry = entry
+        self._next = next_link
+        self.elapsed = 0.0
+
+    def __call__(self, params: Any) -> Any:
+        start = time.perf_counter()
+        try:
+            if self._entry is None:
+                return self._chain.terminal(params)
+            return self.run(params)
+        finally:
+            self.elapsed += time.perf_counter() - start
+
+    def run(self, params: Any) -> Any:
+        """Run this layer's wrapper, timing it without the layers it calls."""
+        entry = self._entry
+        call_next = self._next
+        assert entry is not None and call_next is not None
+        call_next.elapsed = 0.0
+        start = time.perf_counter()
+        failed = False
+        try:
+            return entry.handler(params, call_next)
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            entry.record(time.perf_counter() - start - call_next.elapsed, failed)
+
+
+class _AsyncChainLink(_ChainLink):
+    """Async counterpart of :class:`_ChainLink`."""
+
+    __slots__ = ()
+
+    async def __call__(self, params: Any) -> Any:  # type: ignore[override]
+        start = time.perf_counter()
+        try:
+            if self._entry is None:
+                return await self._chain.terminal(params)
+            return await self.run(params)
+        finally:
+            self.elapsed += time.perf_counter() - start
+
+    async def run(self, params: Any) -> Any:  # type: ignore[override]
+        entry = self._entry
+        call_next = self._next
+        assert entry is not None and call_next is not None
+        call_next.elapsed = 0.0
+        start = time.perf_counter()
+        failed = False
+        try:
+            return await entry.handler(params, call_next)
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            entry.record(time.perf_counter() - start - call_next.elapsed, failed)
+
+
+def _detached_terminal(params: Any) -> Any:
+    raise RuntimeError("call_next was called after its wrapped call returned")
+
+
+class _WrapperChain:
+    """The layers of one wrapper phase linked together, serving one call at a time."""
+
+    __slots__ = ("head", "terminal")
+
+    def __init__(self, handlers: tuple[_PhaseHandler, ...], link_type: type[_ChainLink]) -> None:
+        self.terminal: Callable[[Any], Any] = _detached_terminal
+        link = link_type(self, None, None)
+        for entry in reversed(handlers):
+            link = link_type(self, entry, link)
+        self.head = link
+
+
+class _CompiledWrapper:
+    """Reusable call chains for a wrapper phase.
+
+    One chain is linked when the plan is compiled and handed to each call in
+    turn, so running the wrappers allocates nothing per layer. Concurrent
+    calls link another chain on demand. A call that raises drops its chain,
+    since a wrapper may still hold its ``call_next``.
+    """
+
+    __slots__ = ("handlers", "_link_type", "_idle")
+
+    def __init__(self, handlers: tuple[_PhaseHandler, ...], is_async: bool = False) -> None:
+        self.handlers = handlers
+        self._link_type = _AsyncChainLink if is_async else _ChainLink
+        self._idle: list[_WrapperChain] = [_WrapperChain(handlers, self._link_type)] if handlers else []
+
+    def _checkout(self, terminal: Callable[[Any], Any]) -> _WrapperChain:
+        try:
+            chain = self._idle.pop()
+        except IndexError:
+            chain = _WrapperChain(self.handlers, self._link_type)
+        chain.terminal = terminal
+        return chain
+
+    def _checkin(self, chain: _WrapperChain) -> None:
+        chain.terminal = _detached_terminal
+        self._idle.append(chain)
+
+    def __call__(self, params: Any, terminal: Callable[[Any], Any]) -> Any:
+        chain = self._checkout(terminal)
+        result = chain.head.run(params)
+        self._checkin(chain)
+        return result
+
+    async def acall(self, params: Any, terminal: Callable[[Any], Awaitable[Any]]) -> Any:
+        chain = self._checkout(terminal)
+        result = await chain.head.run(params)
+        self._checkin(chain)
+        return result
+
+
+def _resolve_handler(middleware: Any, phase: str) -> Callable[..., Any] | None:
+    """Return the handler ``middleware`` provides for ``phase``, skipping inherited no-ops."""
+    if isinstance(middleware, Middleware):
+        return getattr(middleware, phase) if middleware.implements(phase) else None
+    return getattr(middleware, phase, None)
+
+
+class MiddlewarePlan:
+    """Middleware compiled into per-phase handler arrays.
+
+    Each array holds only the middleware that actually implement the phase,
+    already in execution order (after-phases reversed), so running a phase is
+    a plain loop without attribute lookups or calls into inherited no-ops.
+    Async arrays pick the ``a``-prefixed override when there is one and fall
+    back to the sync handler; sync wrappers are pre-bridged with
+    :func:`call_sync_wrapper`. Wrapper phases are also linked into reusable
+    call chains (``*_chain``), so a wrapped call does not rebuild them.
+    """
+
+    def __init__(self, middlewares: list[Any] | tuple[Any, ...], stats: dict[tuple[int, str], MiddlewareStats] | None = None) -> None:
+        """Compile the plan.
+
+        Args:
+            middlewares: Middleware in declaration order
+            stats: Counters of a previous plan to carry over for middleware still present
+        """
+        self.middlewares = tuple(middlewares)
+        self._previous_stats = stats or {}
+        self.stats: dict[tuple[int, str], MiddlewareStats] = {}
+
+        self.before_model = self._compile("before_model")
+        self.after_model = self._compile("after_model", reverse=True)
+        self.before_tool = self._compile("before_tool")
+        self.after_tool = self._compile("after_tool", reverse=True)
+        self.stream_chunk = self._compile("stream_chunk")
+        self.wrap_model_call = self._compile("wrap_model_call")
+        self.wrap_tool_call = self._compile("wrap_tool_call")
+
+        self.abefore_model = self._compile("before_model", use_async=True)
+        self.aafter_model = self._compile("after_model", reverse=True, use_async=True)
+        self.abefore_tool = self._compile("before_tool", use_async=True)
+        self.aafter_tool = self._compile("after_tool", reverse=True, use_async=True)
+        self.awrap_model_call = self._compile("wrap_model_call", use_async=True)
+        self.awrap_tool_call = self._compile("wrap_tool_call", use_async=True)
+        del self._previous_stats
+
+        self.wrap_model_call_chain = _CompiledWrapper(self.wrap_model_call)
+        self.wrap_tool_call_chain = _CompiledWrapper(self.wrap_tool_call)
+        self.awrap_model_call_chain = _CompiledWrapper(self.awrap_model_call, is_async=True)
+        self.awrap_tool_call_chain = _CompiledWrapper(self.awrap_tool_call, is_async=True)
+
+    def matches(self, middlewares: list[Any]) -> bool:
+        """Whether the plan was compiled from exactly these middleware."""
+        return len(middlewares) == len(self.middlewares) and all(a is b for a, b in zip(middlewares, self.middlewares))
+
+    def _stats_for(self, middleware: Any, phase: str) -> MiddlewareStats:
+        key = (id(middleware), phase)
+        stats = self.stats.get(key)
+        if stats is None:
+            stats = self._previous_stats.get(key) or MiddlewareStats(
+                name=getattr(middleware, "name", None) or middleware.__class__.__name__,
+                phase=phase,
+            )
+            self.stats[key] = stats
+        return stats
+
+    def _compile(self, phase: str, *, reverse: bool = False, use_async: bool = False) -> tuple[_PhaseHandler, ...]:
+        ordered = reversed(self.middlewares) if reverse else self.middlewares
+        handlers: list[_PhaseHandler] = []
+        for middleware in ordered:
+            is_async = False
+            handler = _resolve_handler(middleware, f"a{phase}") if use_async else None
+            if handler is not None:
+                is_async = True
+            else:
+                handler = _resolve_handler(middleware, phase)
+                if handler is None:
+                    continue
+                if use_async and phase.startswith("wrap_"):
+                    handler = functools.partial(call_sync_wrapper, handler)
+                    is_async = True
+            handlers.append(_PhaseHandler(middleware, handler, is_async, self._stats_for(middleware, phase)))
+        return tuple(handlers)
+
+
 class MiddlewareManager:
-    """Coordinates middleware execution across the agent lifecycle."""
+    """Coordinates middleware execution across the agent lifecycle.
+
+    Phases run from a :class:`MiddlewarePlan` compiled on first use and
+    recompiled only when ``middlewares`` changes.
+    """
 
     def __init__(self, middlewares: list[Middleware] | None = None) -> None:
         self.middlewares: list[Middleware] = middlewares or []
+        self._plan: MiddlewarePlan | None = None
 
     def add(self, middleware: Middleware) -> None:
         self.middlewares.append(middleware)
@@ -432,23 +818,62 @@ class MiddlewareManager:
     def __len__(self) -> int:
         return len(self.middlewares)
 
+    @property
+    def plan(self) -> MiddlewarePlan:
+        """The compiled plan for the current middleware list."""
+        plan = self._plan
+        if plan is None or not plan.matches(self.middlewares):
+            plan = MiddlewarePlan(self.middlewares, plan.stats if plan is not None else None)
+            self._plan = plan
+        return plan
+
+    def stats(self) -> list[dict[str, Any]]:
+        """Return per-middleware, per-phase timing counters, most expensive first."""
+        with _stats_lock:
+            rows = [stats.to_dict() for stats in self.plan.stats.values() if stats.calls]
+        return sorted(rows, key=lambda row: row["total_time"], reverse=True)
+
+    def reset_stats(self) -> None:
+        """Zero all timing counters."""
+        with _stats_lock:
+            for stats in self.plan.stats.values():
+                stats.calls = stats.errors = 0
+                stats.total_time = stats.max_time = 0.0
+
     def run_before_model(self, hook_input: BeforeModelHookInput) -> list[dict[str, Any]]:
         current_messages = hook_input.messages
-        for idx, middleware in enumerate(self.middlewares):
-            handler = getattr(middleware, "before_model", None)
-            if handler is None:
-                continue
+        for entry in self.plan.before_model:
             try:
                 hook_input.messages = current_messages
-                result = handler(hook_input)
-                hook_result = self._normalize_result(result)
-                if hook_result.messages is not None:
-                    current_messages = hook_result.messages
-                    logger.info(f"🎣 Middleware {middleware.__class__.__name__} (before_model) modified messages")
-                else:
-                    logger.info(f"🎣 Middleware {middleware.__class__.__name__} (before_model) made no changes")
+                result = entry(hook_input)
+                current_messages = self._apply_before_model_result(entry.middleware, result, current_messages)
+            except Exception as exc:  # pragma: no cover - defensive logging
+                logger.warning(f"⚠️ Before-model middleware {entry.middleware} failed: {exc}")
+        return current_messages
+
+    async def arun_before_model(self, hook_input: BeforeModelHookInput) -> list[dict[str, Any]]:
+        """Async counterpart of :meth:`run_before_model`."""
+        current_messages = hook_input.messages
+        for entry in self.plan.abefore_model:
+            try:
+                hook_input.messages = current_messages
+                result = await entry.acall(hook_input)
+                current_messages = self._apply_before_model_result(entry.middleware, result, current_messages)
             except Exception as exc:  # pragma: no cover - defensive logging
-                logger.warning(f"⚠️ Before-model middleware {middleware} failed: {exc}")
+                logger.warning(f"⚠️ Before-model middleware {entry.middleware} failed: {exc}")
+        return current_messages
+
+    def _apply_before_model_result(
+        self,
+        middleware: Any,
+        result: HookResult | None,
+        current_messages: list[dict[str, Any]],
+    ) -> list[dict[str, Any]]:
+        hook_result = self._normalize_result(result)
+        if hook_result.messages is not None:
+            logger.info(f"🎣 Middleware {middleware.__class__.__name__} (before_model) modified messages")
+            return hook_result.messages
+        logger.info(f"🎣 Middleware {middleware.__class__.__name__} (before_model) made no changes")
         return current_messages
 
     def run_after_model(
@@ -458,122 +883,175 @@ class MiddlewareManager:
         current_parsed = hook_input.parsed_response
         current_messages = hook_input.messages
         force_continue = False
-        for middleware in reversed(self.middlewares):
-            handler = getattr(middleware, "after_model", None)
-            if handler is None:
-                continue
+        for entry in self.plan.after_model:
             try:
                 hook_input.parsed_response = current_parsed
                 hook_input.messages = current_messages
-                result = handler(hook_input)
-                hook_result = self._normalize_result(result)
-                if hook_result.parsed_response is not None:
-                    current_parsed = hook_result.parsed_response
-                    logger.info(f"🎣 Middleware {middleware.__class__.__name__} (after_model) modified parsed response")
-                if hook_result.messages is not None:
-                    current_messages = hook_result.messages
-                    logger.info(f"🎣 Middleware {middleware.__class__.__name__} (after_model) modified messages")
-                if hook_result.force_continue:
-                    force_continue = True
+                result = entry(hook_input)
+                current_parsed, current_messages, forced = self._apply_after_model_result(
+                    entry.middleware,
+                    result,
+                    current_parsed,
+                    current_messages,
+                )
+                force_continue = force_continue or forced
             except Exception as exc:  # pragma: no cover - defensive logging
-                logger.warning(f"⚠️ After-model middleware {middleware} failed: {exc}")
+                logger.warning(f"⚠️ After-model middleware {entry.middleware} failed: {exc}")
         return current_parsed, current_messages, force_continue
 
+    async def arun_after_model(
+        self,
+        hook_input: AfterModelHookInput,
+    ) -> tuple[ParsedResponse | None, list[dict[str, Any]], bool]:
+        """Async counterpart of :meth:`run_after_model`."""
+        current_parsed = hook_input.parsed_response
+        current_messages = hook_input.messages
+        force_continue = False
+        for entry in self.plan.aafter_model:
+            try:
+                hook_input.parsed_response = current_parsed
+                hook_input.messages = current_messages
+                result = await entry.acall(hook_input)
+                current_parsed, current_messages, forced = self._apply_after_model_result(
+                    entry.middleware,
+                    result,
+                    current_parsed,
+                    current_messages,
+                )
+                force_continue = force_continue or forced
+            except Exception as exc:  # pragma: no cover - defensive logging
+                logger.warning(f"⚠️ After-model middleware {entry.middleware} failed: {exc}")
+        return current_parsed, current_messages, force_continue
+
+    def _apply_after_model_result(
+        self,
+        middleware: Any,
+        result: HookResult | None,
+        current_parsed: ParsedResponse | None,
+        current_messages: list[dict[str, Any]],
+    ) -> tuple[ParsedResponse | None, list[dict[str, Any]], bool]:
+        hook_result = self._normalize_result(result)
+        if hook_result.parsed_response is not None:
+            current_parsed = hook_result.parsed_response
+            logger.info(f"🎣 Middleware {middleware.__class__.__name__} (after_model) modified parsed response")
+        if hook_result.messages is not None:
+            current_messages = hook_result.messages
+            logger.info(f"🎣 Middleware {middleware.__class__.__name__} (after_model) modified messages")
+        return current_parsed, current_messages, hook_result.force_continue
+
     def run_after_tool(self, hook_input: AfterToolHookInput, initial_output: Any) -> Any:
         current_output = initial_output
-        for middleware in reversed(self.middlewares):
-            handler = getattr(middleware, "after_tool", None)
-            if handler is None:
-                continue
+        for entry in self.plan.after_tool:
             try:
                 hook_input.tool_output = current_output
-                result = handler(hook_input)
+                result = entry(hook_input)
                 hook_result = self._normalize_result(result)
                 if hook_result.tool_output is not None:
                     current_output = hook_result.tool_output
             except Exception as exc:  # pragma: no cover - defensive logging
-                logger.warning(f"⚠️ After-tool middleware {middleware} failed: {exc}")
+                logger.warning(f"⚠️ After-tool middleware {entry.middleware} failed: {exc}")
+        return current_output
+
+    async def arun_after_tool(self, hook_input: AfterToolHookInput, initial_output: Any) -> Any:
+        """Async counterpart of :meth:`run_after_tool`."""
+        current_output = initial_output
+        for entry in self.plan.aafter_tool:
+            try:
+                hook_input.tool_output = current_output
+                result = await entry.acall(hook_input)
+                hook_result = self._normalize_result(result)
+                if hook_result.tool_output is not None:
+                    current_output = hook_result.tool_output
+            except Exception as exc:  # pragma: no cover - defensive logging
+                logger.warning(f"⚠️ After-tool middleware {entry.middleware} failed: {exc}")
         return current_output
 
     def run_before_tool(self, hook_input: BeforeToolHookInput) -> dict[str, Any]:
         current_input = hook_input.tool_input
-        for middleware in self.middlewares:
-            handler = getattr(middleware, "before_tool", None)
-            if handler is None:
-                continue
+        for entry in self.plan.before_tool:
             try:
                 hook_input.tool_input = current_input
-                result = handler(hook_input)
-                hook_result = self._normalize_result(result)
-                if hook_result.tool_input is not None:
-                    current_input = hook_result.tool_input
-                    logger.info(
-                        "🔧 Middleware %s (before_tool) modified tool input",
-                        middleware.__class__.__name__,
-                    )
+                result = entry(hook_input)
+                current_input = self._apply_before_tool_result(entry.middleware, result, current_input)
             except Exception as exc:  # pragma: no cover
-                logger.warning(f"⚠️ Before-tool middleware {middleware} failed: {exc}")
+                logger.warning(f"⚠️ Before-tool middleware {entry.middleware} failed: {exc}")
         return current_input
 
-    def wrap_model_call(self, params: ModelCallParams, call_next: ModelCallFn) -> ModelResponse | None:
-        def invoke(index: int, current_params: ModelCallParams) -> ModelResponse | None:
-            if index >= len(self.middlewares):
-                return call_next(current_params)
-
-            middleware = self.middlewares[index]
-            wrapper = getattr(middleware, "wrap_model_call", None)
-            if wrapper is None:
-                return invoke(index + 1, current_params)
-
-            def next_handler(next_params: ModelCallParams) -> ModelResponse | None:
-                return invoke(index + 1, next_params)
+    async def arun_before_tool(self, hook_input: BeforeToolHookInput) -> dict[str, Any]:
+        """Async counterpart of :meth:`run_before_tool`."""
+        current_input = hook_input.tool_input
+        for entry in self.plan.abefore_tool:
+            try:
+                hook_input.tool_input = current_input
+                result = await entry.acall(hook_input)
+                current_input = self._apply_before_tool_result(entry.middleware, result, current_input)
+            except Exception as exc:  # pragma: no cover
+                logger.warning(f"⚠️ Before-tool middleware {entry.middleware} failed: {exc}")
+        return current_input
 
-            return wrapper(current_params, next_handler)
+    def _apply_before_tool_result(
+        self,
+        middleware: Any,
+        result: HookResult | None,
+        current_input: dict[str, Any],
+    ) -> dict[str, Any]:
+        hook_result = self._normalize_result(result)
+        if hook_result.tool_input is not None:
+            logger.info(
+                "🔧 Middleware %s (before_tool) modified tool input",
+                middleware.__class__.__name__,
+            )
+            return hook_result.tool_input
+        return current_input
 
-        return invoke(0, params)
+    def wrap_model_call(self, params: ModelCallParams, call_next: ModelCallFn) -> ModelResponse | None:
+        chain = self.plan.wrap_model_call_chain
+        if not chain.handlers:
+            return call_next(params)
+        return chain(params, call_next)
 
     def stream_chunk(self, chunk: Any, params: ModelCallParams) -> Any:
         """Run stream chunks through middleware in call order."""
 
         current_chunk = chunk
-        for middleware in self.middlewares:
-            handler = getattr(middleware, "stream_chunk", None)
-            if handler is None:
-                continue
+        for entry in self.plan.stream_chunk:
             try:
-                result = handler(current_chunk, params)
+                result = entry(current_chunk, params)
                 if result is None:
                     logger.info(
                         "🎣 Middleware %s (stream_chunk) dropped a chunk",
-                        middleware.__class__.__name__,
+                        entry.middleware.__class__.__name__,
                     )
                     return None
                 if result is not current_chunk:
                     logger.info(
                         "🎣 Middleware %s (stream_chunk) modified a chunk",
-                        middleware.__class__.__name__,
+                        entry.middleware.__class__.__name__,
                     )
                 current_chunk = result
             except Exception as exc:  # pragma: no cover - defensive logging
-                logger.warning(f"⚠️ Streaming middleware {middleware} failed: {exc}")
+                logger.warning(f"⚠️ Streaming middleware {entry.middleware} failed: {exc}")
         return current_chunk
 
     def wrap_tool_call(self, params: ToolCallParams, call_next: ToolCallFn) -> Any:
-        def invoke(index: int, current_params: ToolCallParams) -> Any:
-            if index >= len(self.middlewares):
-                return call_next(current_params)
-
-            middleware = self.middlewares[index]
-            wrapper = getattr(middleware, "wrap_tool_call", None)
-            if wrapper is None:
-                return invoke(index + 1, current_params)
-
-            def next_handler(next_params: ToolCallParams) -> Any:
-                return invoke(index + 1, next_params)
-
-            return wrapper(current_params, next_handler)
-
-        return invoke(0, params)
+        chain = self.plan.wrap_tool_call_chain
+        if not chain.handlers:
+            return call_next(params)
+        return chain(params, call_next)
+
+    async def awrap_model_call(self, params: ModelCallParams, call_next: AsyncModelCallFn) -> ModelResponse | None:
+        """Async counterpart of :meth:`wrap_model_call`."""
+        chain = self.plan.awrap_model_call_chain
+        if not chain.handlers:
+            return await call_next(params)
+        return await chain.acall(params, call_next)
+
+    async def awrap_tool_call(self, params: ToolCallParams, call_next: AsyncToolCallFn) -> Any:
+        """Async counterpart of :meth:`wrap_tool_call`."""
+        chain = self.plan.awrap_tool_call_chain
+        if not chain.handlers:
+            return await call_next(params)
+        return await chain.acall(params, call_next)
 
     @staticmethod
     def _normalize_result(result: HookResult | None) -> HookResult:
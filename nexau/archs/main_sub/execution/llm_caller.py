@@ -14,22 +14,45 @@
 
 """Simple LLM API caller component."""
 
+import asyncio
 import json
 import logging
 import time
+from abc import ABC, abstractmethod
+from collections.abc import Awaitable, Callable
+from contextlib import nullcontext
 from typing import Any
 
 import openai
-
+from openai.types.chat import ChatCompletionChunk
+from openai.types.chat.chat_completion_chunk import ChoiceDelta, ChoiceDeltaToolCall
+from openai.types.responses import (
+    ResponseFunctionCallArgumentsDeltaEvent,
+    ResponseReasoningSummaryTextDeltaEvent,
+    ResponseTextDeltaEvent,
+)
+
+from nexau.archs.llm.client_registry import llm_client_registry
 from nexau.archs.llm.llm_config import LLMConfig
+from nexau.archs.llm.retry_policy import EndpointGuard, RetryDecision, RetryPolicy, endpoint_guards
 from nexau.archs.tracer.context import TraceContext, get_current_span
 from nexau.archs.tracer.core import BaseTracer, SpanType
 
 from ..agent_state import AgentState
 from ..tool_call_modes import STRUCTURED_TOOL_CALL_MODES, normalize_tool_call_mode
+from ..utils.logging_utils import capped, lazy
+from .cache_breakpoints import MAX_CACHE_BREAKPOINTS, CacheBreakpointPlanner
+from .concurrency import current_concurrency_limiter
 from .hooks import MiddlewareManager, ModelCallParams
-from .model_response import ModelResponse
+from .model_response import ModelResponse, ModelToolCall, extract_cache_usage
+from .profiling import profile_phase
 from .stop_reason import AgentStopReason
+from .stream_dispatch import StreamDeltaListener, ToolCallStreamListener
+
+try:
+    from anthropic.types import InputJSONDelta, RawContentBlockDeltaEvent, TextDelta, ThinkingDelta
+except ImportError:  # pragma: no cover - anthropic may be stubbed; events then take the dict path
+    InputJSONDelta = RawContentBlockDeltaEvent = TextDelta = ThinkingDelta = ()  # type: ignore[assignment,misc]
 
 logger = logging.getLogger(__name__)
 
@@ -44,6 +67,8 @@ class LLMCaller:
         retry_attempts: int = 5,
         middleware_manager: MiddlewareManager | None = None,
         global_storage: Any = None,
+        async_client: Any = None,
+        retry_policy: RetryPolicy | None = None,
     ):
         """Initialize LLM caller.
 
@@ -53,12 +78,24 @@ class LLMCaller:
             retry_attempts: Number of retry attempts for API calls
             middleware_manager: Optional middleware manager for wrapping calls
             global_storage: Optional global storage to retrieve tracer at call time
+            async_client: Optional async client (AsyncOpenAI/AsyncAnthropic) for
+                :meth:`acall_llm`; if omitted the pooled client of the running
+                event loop is used
+            retry_policy: Backoff and error classification for retries
         """
         self.openai_client = openai_client
+        self.async_client = async_client
         self.llm_config = llm_config
         self.retry_attempts = retry_attempts
+        self.retry_policy = retry_policy or RetryPolicy()
         self.middleware_manager = middleware_manager
         self.global_storage = global_storage
+        # Remembers this conversation's cache checkpoints between calls
+        self.cache_planner = CacheBreakpointPlanner()
+
+    def reset(self) -> None:
+        """Forget the state kept between calls of one conversation."""
+        self.cache_planner.reset()
 
     def _get_tracer(self) -> BaseTracer | None:
         """Get tracer from global storage at call time."""
@@ -66,6 +103,23 @@ class LLMCaller:
             return self.global_storage.get("tracer")
         return None
 
+    def _model_name(self) -> str:
+        """Model name used to aggregate profiled network time."""
+        return str(getattr(self.llm_config, "model", None) or "unknown")
+
+    def _get_async_client(self) -> Any:
+        """Return the async client given at construction, or the pooled one of the running event loop.
+
+        Pooled async clients are not kept on the caller: a client opened on one
+        loop fails on the next, e.g. across two ``asyncio.run`` calls.
+        """
+        if self.async_client is None and isinstance(self.llm_config, LLMConfig):
+            try:
+                return create_async_llm_client(self.llm_config)
+            except Exception as e:
+                logger.error(f"❌ Failed to initialize async LLM client: {e}")
+        return self.async_client
+
     def call_llm(
         self,
         messages: list[dict[str, str]],
@@ -74,6 +128,7 @@ class LLMCaller:
         agent_state: AgentState | None = None,
         tool_call_mode: str = "xml",
         tools: list[dict[str, Any]] | None = None,
+        stream_listener: ToolCallStreamListener | None = None,
     ) -> ModelResponse | None:
         """Call LLM with the given messages and return normalized response.
 
@@ -82,6 +137,7 @@ class LLMCaller:
             max_tokens: Maximum tokens for the response
             tool_call_mode: Tool calling strategy ('xml', 'openai', or 'anthropic')
             tools: Optional structured tool definitions for the selected mode
+            stream_listener: Optional listener notified of completed tool calls while streaming
 
         Returns:
             A normalized ModelResponse object containing content and tool calls
@@ -94,6 +150,86 @@ class LLMCaller:
                 "OpenAI client is not available. Please check your API configuration.",
             )
 
+        model_call_params = self._build_model_call_params(
+            messages,
+            max_tokens,
+            force_stop_reason,
+            agent_state,
+            tool_call_mode,
+            tools,
+        )
+        model_call_params.stream_listener = stream_listener
+
+        def base_call(params: ModelCallParams) -> ModelResponse | None:
+            return self._call_with_retry(params)
+
+        with profile_phase("model_call"):
+            if self.middleware_manager:
+                response_payload = self.middleware_manager.wrap_model_call(model_call_params, base_call)
+            else:
+                response_payload = base_call(model_call_params)
+            return self._finalize_model_response(response_payload)
+
+    async def acall_llm(
+        self,
+        messages: list[dict[str, str]],
+        max_tokens: int | None = None,
+        force_stop_reason: AgentStopReason | None = None,
+        agent_state: AgentState | None = None,
+        tool_call_mode: str = "xml",
+        tools: list[dict[str, Any]] | None = None,
+        stream_listener: ToolCallStreamListener | None = None,
+    ) -> ModelResponse | None:
+        """Async counterpart of :meth:`call_llm` using the async client.
+
+        Args:
+            messages: List of conversation messages
+            max_tokens: Maximum tokens for the response
+            tool_call_mode: Tool calling strategy ('xml', 'openai', or 'anthropic')
+            tools: Optional structured tool definitions for the selected mode
+            stream_listener: Optional listener notified of completed tool calls while streaming
+
+        Returns:
+            A normalized ModelResponse object containing content and tool calls
+
+        Raises:
+            RuntimeError: If no async client is available or API call fails
+        """
+        if not self._get_async_client() and not self.middleware_manager:
+            raise RuntimeError(
+                "Async LLM client is not available. Please check your API configuration.",
+            )
+
+        model_call_params = self._build_model_call_params(
+            messages,
+            max_tokens,
+            force_stop_reason,
+            agent_state,
+            tool_call_mode,
+            tools,
+        )
+        model_call_params.stream_listener = stream_listener
+
+        async def base_call(params: ModelCallParams) -> ModelResponse | None:
+            return await self._acall_with_retry(params)
+
+        with profile_phase("model_call"):
+            if self.middleware_manager:
+                response_payload = await self.middleware_manager.awrap_model_call(model_call_params, base_call)
+            else:
+                response_payload = await base_call(model_call_params)
+            return self._finalize_model_response(response_payload)
+
+    def _build_model_call_params(
+        self,
+        messages: list[dict[str, str]],
+        max_tokens: int | None,
+        force_stop_reason: AgentStopReason | None,
+        agent_state: AgentState | None,
+        tool_call_mode: str,
+        tools: list[dict[str, Any]] | None,
+    ) -> ModelCallParams:
+        """Build API parameters and the middleware call context."""
         normalized_mode = normalize_tool_call_mode(tool_call_mode)
         use_structured_tools = normalized_mode in STRUCTURED_TOOL_CALL_MODES
 
@@ -135,16 +271,14 @@ class LLMCaller:
             api_params = dropper(api_params)
 
         # Debug logging for LLM messages
-        if self.llm_config.debug:
+        if self.llm_config.debug and logger.isEnabledFor(logging.INFO):
             logger.info("🐛 [DEBUG] LLM Request Messages:")
             for i, msg in enumerate(messages):
-                logger.info(
-                    f"🐛 [DEBUG] Message {i}: {msg['role']} -> {msg['content']}",
-                )
+                logger.info("🐛 [DEBUG] Message %s: %s -> %s", i, msg["role"], capped(msg["content"]))
 
-        logger.info(f"🧠 Calling LLM with {max_tokens} max tokens...")
+        logger.info("🧠 Calling LLM with %s max tokens...", max_tokens)
 
-        model_call_params = ModelCallParams(
+        return ModelCallParams(
             messages=messages,
             max_tokens=max_tokens,
             force_stop_reason=force_stop_reason,
@@ -155,15 +289,11 @@ class LLMCaller:
             openai_client=self.openai_client,
             llm_config=self.llm_config,
             retry_attempts=self.retry_attempts,
+            cache_planner=self.cache_planner,
         )
 
-        def base_call(params: ModelCallParams) -> ModelResponse | None:
-            return self._call_with_retry(params)
-
-        if self.middleware_manager:
-            response_payload = self.middleware_manager.wrap_model_call(model_call_params, base_call)
-        else:
-            response_payload = base_call(model_call_params)
+    def _finalize_model_response(self, response_payload: Any) -> ModelResponse | None:
+        """Normalize the (possibly middleware-modified) payload into a ModelResponse."""
         if response_payload is None:
             return None
 
@@ -172,13 +302,15 @@ class LLMCaller:
         if model_response.content:
             from ..utils.xml_utils import XMLUtils
 
-            model_response.content = XMLUtils.restore_closing_tags(model_response.content)
+            with profile_phase("restore_xml"):
+                model_response.content = XMLUtils.restore_closing_tags(model_response.content)
 
         # Debug logging for LLM response
         if self.llm_config.debug:
-            logger.info(f"🐛 [DEBUG] LLM Response: {model_response.render_text()}")
-
-        logger.info(f"💬 LLM Response: {model_response.render_text()}")
+            logger.info("🐛 [DEBUG] LLM Response: %s", lazy(model_response.render_text))
+        else:
+            # The executor logs the response at INFO with the agent name
+            logger.debug("💬 LLM Response: %s", lazy(model_response.render_text))
 
         return model_response
 
@@ -186,55 +318,141 @@ class LLMCaller:
         self,
         params: ModelCallParams,
     ) -> ModelResponse | None:
-        """Call OpenAI client with exponential backoff retry."""
-        from .executor import AgentStopReason
-
+        """Call the LLM, retrying transient failures with jittered backoff."""
         force_stop_reason = params.force_stop_reason
 
-        if force_stop_reason and force_stop_reason != AgentStopReason.SUCCESS:
-            reason_name = getattr(force_stop_reason, "name", str(force_stop_reason))
-            logger.info(
-                f"🛑 LLM call forced to stop due to {reason_name}",
-            )
+        if _is_forced_stop(force_stop_reason):
             return None
 
-        backoff = 1
+        guard = endpoint_guards.get(self.llm_config)
         for i in range(self.retry_attempts):
+            if params.stream_listener is not None:
+                params.stream_listener.begin_attempt()
+            probe = False
             try:
-                if force_stop_reason and force_stop_reason != AgentStopReason.SUCCESS:
-                    return None
+                wait, probe = guard.start_call()
+                if wait > 0:
+                    time.sleep(wait)
                 kwargs = dict(params.api_params)
-                response_content = call_llm_with_different_client(
-                    self.openai_client,
-                    self.llm_config,
-                    kwargs,
-                    middleware_manager=self.middleware_manager,
-                    model_call_params=params,
-                    tracer=self._get_tracer(),
-                )
+                started = time.monotonic()
+                with profile_phase("network", "model", self._model_name()):
+                    response_content = call_llm_with_different_client(
+                        self.openai_client,
+                        self.llm_config,
+                        kwargs,
+                        middleware_manager=self.middleware_manager,
+                        model_call_params=params,
+                        tracer=self._get_tracer(),
+                    )
+                result = _check_response_content(kwargs, response_content)
+                guard.record_success()
+                limiter = current_concurrency_limiter()
+                if limiter is not None:
+                    limiter.record_latency(time.monotonic() - started)
+                return result
+
+            except Exception as e:
+                decision = self._handle_attempt_failure(guard, e, i)
+                if not decision.retry or i == self.retry_attempts - 1:
+                    raise e
+            finally:
+                # Cancellation skips the handlers above; the probe must not stay unresolved
+                guard.finish_call(probe)
+            time.sleep(decision.delay)
+        return None
 
-                stop = kwargs.get("stop", [])
-                if isinstance(stop, str):
-                    stop = [stop]
-                if stop and response_content.content:
-                    for s in stop:
-                        response_content.content = response_content.content.split(s)[0]
+    async def _acall_with_retry(
+        self,
+        params: ModelCallParams,
+    ) -> ModelResponse | None:
+        """Async counterpart of :meth:`_call_with_retry`; backoff never blocks the loop."""
+        if _is_forced_stop(params.force_stop_reason):
+            return None
 
-                if response_content.has_content() or response_content.has_tool_calls():
-                    return response_content
-                else:
-                    raise Exception("No response content or tool calls")
+        guard = endpoint_guards.get(self.llm_config)
+        for i in range(self.retry_attempts):
+            if params.stream_listener is not None:
+                params.stream_listener.begin_attempt()
+            probe = False
+            try:
+                wait, probe = guard.start_call()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                kwargs = dict(params.api_params)
+                started = time.monotonic()
+                with profile_phase("network", "model", self._model_name()):
+                    response_content = await acall_llm_with_different_client(
+                        self._get_async_client(),
+                        self.llm_config,
+                        kwargs,
+                        middleware_manager=self.middleware_manager,
+                        model_call_params=params,
+                        tracer=self._get_tracer(),
+                    )
+                result = _check_response_content(kwargs, response_content)
+                guard.record_success()
+                limiter = current_concurrency_limiter()
+                if limiter is not None:
+                    limiter.record_latency(time.monotonic() - started)
+                return result
 
             except Exception as e:
-                logger.error(
-                    f"❌ LLM call failed (attempt {i + 1}/{self.retry_attempts}): {e}",
-                )
-                if i == self.retry_attempts - 1:
+                decision = self._handle_attempt_failure(guard, e, i)
+                if not decision.retry or i == self.retry_attempts - 1:
                     raise e
-                time.sleep(backoff)
-                backoff *= 2
+            finally:
+                # Cancellation skips the handlers above; the probe must not stay unresolved
+                guard.finish_call(probe)
+            await asyncio.sleep(decision.delay)
         return None
 
+    def _handle_attempt_failure(self, guard: EndpointGuard, error: Exception, attempt: int) -> RetryDecision:
+        """Classify a failed attempt, report it to the endpoint guard and log it."""
+        decision = self.retry_policy.decide(error, attempt)
+        guard.record_failure(decision)
+        limiter = current_concurrency_limiter()
+        if limiter is not None:
+            limiter.record_error(decision.error_class)
+        if decision.retry and attempt < self.retry_attempts - 1:
+            logger.error(
+                f"❌ LLM call failed (attempt {attempt + 1}/{self.retry_attempts}, {decision.error_class.value}): {error}; "
+                f"retrying in {decision.delay:.2f}s",
+            )
+        else:
+            logger.error(
+                f"❌ LLM call failed (attempt {attempt + 1}/{self.retry_attempts}, {decision.error_class.value}): {error}",
+            )
+        return decision
+
+
+def _is_forced_stop(force_stop_reason: AgentStopReason | None) -> bool:
+    if force_stop_reason and force_stop_reason != AgentStopReason.SUCCESS:
+        reason_name = getattr(force_stop_reason, "name", str(force_stop_reason))
+        logger.info(
+            f"🛑 LLM call forced to stop due to {reason_name}",
+        )
+        return True
+    return False
+
+
+def _check_response_content(kwargs: dict[str, Any], response_content: ModelResponse) -> ModelResponse:
+    """Trim stop sequences and reject empty responses so they are retried."""
+    stop = kwargs.get("stop", [])
+    if isinstance(stop, str):
+        stop = [stop]
+    if stop and response_content.content:
+        for s in stop:
+            response_content.content = response_content.content.split(s)[0]
+
+    if response_content.has_content() or response_content.has_tool_calls():
+        return response_content
+    raise Exception("No response content or tool calls")
+
+
+def create_async_llm_client(llm_config: LLMConfig) -> Any:
+    """Return the shared async SDK client matching ``llm_config.api_type``."""
+    return llm_client_registry.get_async_client(llm_config)
+
 
 def call_llm_with_different_client(
     client: Any,
@@ -335,6 +553,75 @@ def _strip_responses_api_artifacts(messages: list[Any]) -> list[Any]:
     return sanitized
 
 
+def _cache_planner(model_call_params: ModelCallParams | None) -> CacheBreakpointPlanner:
+    """Return the conversation's breakpoint planner, or a fresh one for one-off calls."""
+    if model_call_params is not None and model_call_params.cache_planner is not None:
+        return model_call_params.cache_planner
+    return CacheBreakpointPlanner()
+
+
+def _build_anthropic_api_kwargs(
+    messages: list[dict[str, Any]],
+    kwargs: dict[str, Any],
+    model_call_params: ModelCallParams | None = None,
+    source_messages: list[dict[str, Any]] | None = None,
+) -> dict[str, Any]:
+    """Assemble Anthropic messages API kwargs from chat-style messages.
+
+    ``source_messages`` are the conversation's own message objects that
+    ``messages`` were sanitized from; they key the breakpoint planner's digest
+    cache, which the per-request copies never hit.
+    """
+    # 组装 Anthropic 参数
+    system_messages, user_messages = openai_to_anthropic_message(messages)
+
+    new_kwargs = kwargs.copy()
+    new_kwargs.pop("messages", None)
+    ttl = new_kwargs.pop("anthropic_cache_control_ttl", "5m")
+    max_breakpoints = new_kwargs.pop("prompt_cache_breakpoints", MAX_CACHE_BREAKPOINTS)
+
+    # Build the exact kwargs for tracing
+    api_kwargs = {"system": system_messages, "messages": user_messages, **new_kwargs}
+    _cache_planner(model_call_params).apply_anthropic(
+        api_kwargs,
+        max_breakpoints=max_breakpoints,
+        ttl=ttl,
+        # Converted one to one, so the original messages key the planner's digest cache
+        source_messages=[message for message in (source_messages or messages) if message.get("role") != "system"],
+    )
+    return api_kwargs
+
+
+def _apply_openai_cache_breakpoints(
+    kwargs: dict[str, Any],
+    model_call_params: ModelCallParams | None,
+    source_messages: list[dict[str, Any]] | None = None,
+) -> None:
+    """Mark chat messages for OpenAI-compatible gateways that forward prompt caching.
+
+    Opt-in through ``prompt_cache_breakpoints``; OpenAI itself caches prefixes
+    automatically and rejects the markers. ``source_messages`` are the
+    conversation's messages before sanitizing, see :func:`_build_anthropic_api_kwargs`.
+    """
+    max_breakpoints = kwargs.pop("prompt_cache_breakpoints", 0)
+    ttl = kwargs.pop("anthropic_cache_control_ttl", None)
+    if max_breakpoints:
+        kwargs["messages"], _ = _cache_planner(model_call_params).apply_openai(
+            kwargs["messages"],
+            max_breakpoints=max_breakpoints,
+            ttl=ttl,
+            source_messages=source_messages,
+        )
+
+
+def _set_llm_outputs(trace_ctx: TraceContext, payload: dict[str, Any]) -> None:
+    """Record the response on the span, with prompt-cache token counts as attributes."""
+    trace_ctx.set_outputs(payload)
+    cache_usage = extract_cache_usage(payload.get("usage") if isinstance(payload, dict) else None)
+    if cache_usage:
+        trace_ctx.set_attributes(cache_usage)
+
+
 def call_llm_with_anthropic_chat_completion(
     client: Any,
     kwargs: dict[str, Any],
@@ -344,36 +631,21 @@ def call_llm_with_anthropic_chat_completion(
     tracer: BaseTracer | None = None,
 ) -> ModelResponse:
     """Call Anthropic chat completion with the given messages and return response content."""
-    messages = _strip_responses_api_artifacts(kwargs.get("messages", []))
+    source_messages = kwargs.get("messages", [])
+    messages = _strip_responses_api_artifacts(source_messages)
     stream_requested = bool(kwargs.pop("stream", False))
 
     # Check if tracing is active (there's a current span and we have a tracer)
     should_trace = tracer is not None and get_current_span() is not None
 
     def llm_call(messages: list[dict[str, Any]]):
-        # 组装 Anthropic 参数
-        system_messages, user_messages = openai_to_anthropic_message(messages)
-        # set cache control ttl
-        if user_messages and user_messages[-1].get("content"):
-            content = user_messages[-1]["content"]
-            if isinstance(content, list) and content:
-                content[0]["cache_control"] = {
-                    "type": "ephemeral",
-                    "ttl": kwargs.get("anthropic_cache_control_ttl", "5m"),
-                }
-
-        new_kwargs = kwargs.copy()
-        new_kwargs.pop("messages", None)
-        new_kwargs.pop("anthropic_cache_control_ttl", None)
-
-        # Build the exact kwargs for tracing
-        api_kwargs = {"system": system_messages, "messages": user_messages, **new_kwargs}
+        api_kwargs = _build_anthropic_api_kwargs(messages, kwargs, model_call_params, source_messages)
 
         if should_trace and tracer is not None:
             trace_ctx = TraceContext(tracer, "Anthropic messages.create", SpanType.LLM, inputs=api_kwargs)
             with trace_ctx:
                 resp = client.messages.create(**api_kwargs)
-                trace_ctx.set_outputs(_to_serializable_dict(resp))
+                _set_llm_outputs(trace_ctx, _to_serializable_dict(resp))
                 return resp
         else:
             resp = client.messages.create(**api_kwargs)
@@ -384,23 +656,9 @@ def call_llm_with_anthropic_chat_completion(
         return ModelResponse.from_anthropic_message(response)
 
     def llm_stream_call(messages: list[dict[str, Any]]) -> tuple[dict[str, Any], str | None]:
-        system_messages, user_messages = openai_to_anthropic_message(messages)
-        if user_messages and user_messages[-1].get("content"):
-            content = user_messages[-1]["content"]
-            if isinstance(content, list) and content:
-                content[0]["cache_control"] = {
-                    "type": "ephemeral",
-                    "ttl": kwargs.get("anthropic_cache_control_ttl", "5m"),
-                }
-
-        new_kwargs = kwargs.copy()
-        new_kwargs.pop("messages", None)
-        new_kwargs.pop("anthropic_cache_control_ttl", None)
-
-        # Build the exact kwargs for tracing
-        api_kwargs = {"system": system_messages, "messages": user_messages, **new_kwargs}
+        api_kwargs = _build_anthropic_api_kwargs(messages, kwargs, model_call_params, source_messages)
 
-        aggregator = AnthropicStreamAggregator()
+        aggregator = AnthropicStreamAggregator(listener=_stream_listener(model_call_params))
 
         if should_trace and tracer is not None:
             trace_ctx = TraceContext(tracer, "Anthropic messages.stream", SpanType.LLM, inputs=api_kwargs)
@@ -412,7 +670,7 @@ def call_llm_with_anthropic_chat_completion(
                             continue
                         aggregator.consume(processed_event)
                 message_payload = aggregator.finalize()
-                trace_ctx.set_outputs(message_payload)
+                _set_llm_outputs(trace_ctx, message_payload)
                 return message_payload, aggregator.model_name
         else:
             with client.messages.stream(**api_kwargs) as stream:
@@ -440,8 +698,10 @@ def call_llm_with_openai_chat_completion(
 ) -> ModelResponse:
     """Call OpenAI chat completion with the given messages and return response content."""
 
-    messages = _strip_responses_api_artifacts(kwargs.get("messages", []))
+    source_messages = kwargs.get("messages", [])
+    messages = _strip_responses_api_artifacts(source_messages)
     kwargs["messages"] = messages
+    _apply_openai_cache_breakpoints(kwargs, model_call_params, source_messages)
     stream_requested = bool(kwargs.pop("stream", False) or getattr(llm_config, "stream", False))
 
     # Check if tracing is active (there's a current span and we have a tracer)
@@ -455,7 +715,7 @@ def call_llm_with_openai_chat_completion(
             payload["stream_options"] = {
                 "include_usage": True,
             }
-            aggregator = OpenAIChatStreamAggregator()
+            aggregator = OpenAIChatStreamAggregator(listener=_stream_listener(model_call_params))
             last_chunk: Any | None = None
 
             if should_trace and tracer is not None:
@@ -469,7 +729,7 @@ def call_llm_with_openai_chat_completion(
                                 continue
                             aggregator.consume(processed_chunk)
                     message_payload = aggregator.finalize()
-                    trace_ctx.set_outputs(message_payload)
+                    _set_llm_outputs(trace_ctx, message_payload)
                     return message_payload, last_chunk, aggregator.model_name
             else:
                 with client.chat.completions.create(**payload) as stream:
@@ -491,7 +751,7 @@ def call_llm_with_openai_chat_completion(
             trace_ctx = TraceContext(tracer, "OpenAI chat.completions.create", SpanType.LLM, inputs=api_kwargs)
             with trace_ctx:
                 response = client.chat.completions.create(**api_kwargs)
-                trace_ctx.set_outputs(_to_serializable_dict(response))
+                _set_llm_outputs(trace_ctx, _to_serializable_dict(response))
                 return response
         else:
             response = client.chat.completions.create(**api_kwargs)
@@ -519,33 +779,7 @@ def call_llm_with_openai_responses(
 ) -> ModelResponse:
     """Call OpenAI Responses API and normalize the outcome."""
 
-    request_payload = kwargs.copy()
-
-    messages = request_payload.pop("messages", None)
-    if messages is not None:
-        response_items, instructions = _prepare_responses_api_input(messages)
-        if response_items:
-            request_payload.setdefault("input", response_items)
-        if instructions:
-            existing_instructions = request_payload.get("instructions")
-            if existing_instructions:
-                combined_instructions = f"{existing_instructions.rstrip()}\n\n{instructions}"
-            else:
-                combined_instructions = instructions
-            request_payload["instructions"] = combined_instructions.strip()
-
-    # Responses API uses max_output_tokens instead of max_tokens
-    max_tokens = request_payload.pop("max_tokens", None)
-    if max_tokens is not None:
-        request_payload.setdefault("max_output_tokens", max_tokens)
-
-    tools = request_payload.get("tools")
-    if tools:
-        request_payload["tools"] = _normalize_responses_api_tools(tools)
-
-    stream_requested = bool(request_payload.pop("stream", False) or getattr(llm_config, "stream", False))
-
-    request_payload.pop("store", None)
+    request_payload, stream_requested = _prepare_responses_request(kwargs, llm_config)
 
     # Check if tracing is active (there's a current span and we have a tracer)
     should_trace = tracer is not None and get_current_span() is not None
@@ -555,7 +789,7 @@ def call_llm_with_openai_responses(
             trace_ctx = TraceContext(tracer, "OpenAI responses.create", SpanType.LLM, inputs=api_payload)
             with trace_ctx:
                 response = client.responses.create(**api_payload)
-                trace_ctx.set_outputs(_to_serializable_dict(response))
+                _set_llm_outputs(trace_ctx, _to_serializable_dict(response))
                 return response
         else:
             response = client.responses.create(**api_payload)
@@ -565,7 +799,7 @@ def call_llm_with_openai_responses(
         return ModelResponse.from_openai_response(call_llm(request_payload))
 
     def call_llm_stream(payload: dict[str, Any]) -> dict[str, Any]:
-        aggregator = OpenAIResponsesStreamAggregator()
+        aggregator = OpenAIResponsesStreamAggregator(listener=_stream_listener(model_call_params))
 
         if should_trace and tracer is not None:
             trace_ctx = TraceContext(tracer, "OpenAI responses.stream", SpanType.LLM, inputs=payload)
@@ -577,7 +811,7 @@ def call_llm_with_openai_responses(
                             continue
                         aggregator.consume(processed_event)
                 response_payload = aggregator.finalize()
-                trace_ctx.set_outputs(response_payload)
+                _set_llm_outputs(trace_ctx, response_payload)
                 return response_payload
         else:
             with client.responses.stream(**payload) as stream:
@@ -592,6 +826,220 @@ def call_llm_with_openai_responses(
     return ModelResponse.from_openai_response(response_payload)
 
 
+async def acall_llm_with_different_client(
+    client: Any,
+    llm_config: LLMConfig,
+    kwargs: dict[str, Any],
+    *,
+    middleware_manager: MiddlewareManager | None = None,
+    model_call_params: ModelCallParams | None = None,
+    tracer: BaseTracer | None = None,
+) -> ModelResponse:
+    """Async counterpart of :func:`call_llm_with_different_client` for AsyncOpenAI/AsyncAnthropic clients."""
+    if llm_config.api_type == "anthropic_chat_completion":
+        return await acall_llm_with_anthropic_chat_completion(
+            client,
+            kwargs,
+            middleware_manager=middleware_manager,
+            model_call_params=model_call_params,
+            tracer=tracer,
+        )
+    elif llm_config.api_type == "openai_responses":
+        return await acall_llm_with_openai_responses(
+            client,
+            kwargs,
+            middleware_manager=middleware_manager,
+            model_call_params=model_call_params,
+            llm_config=llm_config,
+            tracer=tracer,
+        )
+    elif llm_config.api_type == "openai_chat_completion":
+        return await acall_llm_with_openai_chat_completion(
+            client,
+            kwargs,
+            middleware_manager=middleware_manager,
+            model_call_params=model_call_params,
+            llm_config=llm_config,
+            tracer=tracer,
+        )
+    else:
+        raise ValueError(f"Invalid API type: {llm_config.api_type}")
+
+
+def _llm_trace_context(tracer: BaseTracer | None, name: str, inputs: dict[str, Any]) -> TraceContext | None:
+    """Return a span for the LLM request when tracing is active, else None."""
+    if tracer is None or get_current_span() is None:
+        return None
+    return TraceContext(tracer, name, SpanType.LLM, inputs=inputs)
+
+
+async def acall_llm_with_anthropic_chat_completion(
+    client: Any,
+    kwargs: dict[str, Any],
+    *,
+    middleware_manager: MiddlewareManager | None = None,
+    model_call_params: ModelCallParams | None = None,
+    tracer: BaseTracer | None = None,
+) -> ModelResponse:
+    """Async counterpart of :func:`call_llm_with_anthropic_chat_completion`."""
+    source_messages = kwargs.get("messages", [])
+    messages = _strip_responses_api_artifacts(source_messages)
+    stream_requested = bool(kwargs.pop("stream", False))
+    api_kwargs = _build_anthropic_api_kwargs(messages, kwargs, model_call_params, source_messages)
+
+    if not stream_requested:
+        trace_ctx = _llm_trace_context(tracer, "Anthropic messages.create", api_kwargs)
+        with trace_ctx or nullcontext():
+            response = await client.messages.create(**api_kwargs)
+            if trace_ctx is not None:
+                _set_llm_outputs(trace_ctx, _to_serializable_dict(response))
+        return ModelResponse.from_anthropic_message(response)
+
+    aggregator = AnthropicStreamAggregator(listener=_stream_listener(model_call_params))
+    drain = _stream_drain(model_call_params)
+    trace_ctx = _llm_trace_context(tracer, "Anthropic messages.stream", api_kwargs)
+    with trace_ctx or nullcontext():
+        async with client.messages.stream(**api_kwargs) as stream:
+            async for event in stream:
+                processed_event = _process_stream_chunk(event, middleware_manager, model_call_params)
+                if processed_event is None:
+                    continue
+                aggregator.consume(processed_event)
+                if drain is not None:
+                    await drain()
+        message_payload = aggregator.finalize()
+        if trace_ctx is not None:
+            _set_llm_outputs(trace_ctx, message_payload)
+
+    return ModelResponse.from_anthropic_message(message_payload)
+
+
+async def acall_llm_with_openai_chat_completion(
+    client: Any,
+    kwargs: dict[str, Any],
+    *,
+    middleware_manager: MiddlewareManager | None = None,
+    model_call_params: ModelCallParams | None = None,
+    llm_config: LLMConfig | None = None,
+    tracer: BaseTracer | None = None,
+) -> ModelResponse:
+    """Async counterpart of :func:`call_llm_with_openai_chat_completion`."""
+    source_messages = kwargs.get("messages", [])
+    kwargs["messages"] = _strip_responses_api_artifacts(source_messages)
+    _apply_openai_cache_breakpoints(kwargs, model_call_params, source_messages)
+    stream_requested = bool(kwargs.pop("stream", False) or getattr(llm_config, "stream", False))
+
+    if stream_requested:
+        payload = kwargs.copy()
+        payload["stream"] = True
+        payload["stream_options"] = {
+            "include_usage": True,
+        }
+        aggregator = OpenAIChatStreamAggregator(listener=_stream_listener(model_call_params))
+        drain = _stream_drain(model_call_params)
+        trace_ctx = _llm_trace_context(tracer, "OpenAI chat.completions.create (stream)", payload)
+        with trace_ctx or nullcontext():
+            stream = await client.chat.completions.create(**payload)
+            async with stream:
+                async for chunk in stream:
+                    processed_chunk = _process_stream_chunk(chunk, middleware_manager, model_call_params)
+                    if processed_chunk is None:
+                        continue
+                    aggregator.consume(processed_chunk)
+                    if drain is not None:
+                        await drain()
+            message = aggregator.finalize()
+            if trace_ctx is not None:
+                _set_llm_outputs(trace_ctx, message)
+        return ModelResponse.from_openai_message(message)
+
+    trace_ctx = _llm_trace_context(tracer, "OpenAI chat.completions.create", kwargs)
+    with trace_ctx or nullcontext():
+        response = await client.chat.completions.create(**kwargs)
+        if trace_ctx is not None:
+            _set_llm_outputs(trace_ctx, _to_serializable_dict(response))
+
+    usage = None
+    if hasattr(response, "usage") and response.usage is not None:
+        usage = _to_serializable_dict(response.usage)
+
+    return ModelResponse.from_openai_message(response.choices[0].message, usage=usage)
+
+
+async def acall_llm_with_openai_responses(
+    client: Any,
+    kwargs: dict[str, Any],
+    *,
+    middleware_manager: MiddlewareManager | None = None,
+    model_call_params: ModelCallParams | None = None,
+    llm_config: LLMConfig | None = None,
+    tracer: BaseTracer | None = None,
+) -> ModelResponse:
+    """Async counterpart of :func:`call_llm_with_openai_responses`."""
+    request_payload, stream_requested = _prepare_responses_request(kwargs, llm_config)
+
+    if not stream_requested:
+        trace_ctx = _llm_trace_context(tracer, "OpenAI responses.create", request_payload)
+        with trace_ctx or nullcontext():
+            response = await client.responses.create(**request_payload)
+            if trace_ctx is not None:
+                _set_llm_outputs(trace_ctx, _to_serializable_dict(response))
+        return ModelResponse.from_openai_response(response)
+
+    aggregator = OpenAIResponsesStreamAggregator(listener=_stream_listener(model_call_params))
+    drain = _stream_drain(model_call_params)
+    trace_ctx = _llm_trace_context(tracer, "OpenAI responses.stream", request_payload)
+    with trace_ctx or nullcontext():
+        async with client.responses.stream(**request_payload) as stream:
+            async for event in stream:
+                processed_event = _process_stream_chunk(event, middleware_manager, model_call_params)
+                if processed_event is None:
+                    continue
+                aggregator.consume(processed_event)
+                if drain is not None:
+                    await drain()
+        response_payload = aggregator.finalize()
+        if trace_ctx is not None:
+            _set_llm_outputs(trace_ctx, response_payload)
+
+    return ModelResponse.from_openai_response(response_payload)
+
+
+def _prepare_responses_request(kwargs: dict[str, Any], llm_config: LLMConfig | None) -> tuple[dict[str, Any], bool]:
+    """Translate chat-style kwargs into a Responses API payload and the stream flag."""
+    request_payload = kwargs.copy()
+
+    messages = request_payload.pop("messages", None)
+    if messages is not None:
+        response_items, instructions = _prepare_responses_api_input(messages)
+        if response_items:
+            request_payload.setdefault("input", response_items)
+        if instructions:
+            existing_instructions = request_payload.get("instructions")
+            if existing_instructions:
+                combined_instructions = f"{existing_instructions.rstrip()}\n\n{instructions}"
+            else:
+                combined_instructions = instructions
+            request_payload["instructions"] = combined_instructions.strip()
+
+    # Responses API uses max_output_tokens instead of max_tokens
+    max_tokens = request_payload.pop("max_tokens", None)
+    if max_tokens is not None:
+        request_payload.setdefault("max_output_tokens", max_tokens)
+
+    tools = request_payload.get("tools")
+    if tools:
+        request_payload["tools"] = _normalize_responses_api_tools(tools)
+
+    stream_requested = bool(request_payload.pop("stream", False) or getattr(llm_config, "stream", False))
+
+    request_payload.pop("store", None)
+    # The Responses API caches prefixes automatically and takes no breakpoints
+    request_payload.pop("prompt_cache_breakpoints", None)
+    request_payload.pop("anthropic_cache_control_ttl", None)
+    return request_payload, stream_requested
+
+
 def _prepare_responses_api_input(messages: list[dict[str, Any]]) -> tuple[list[dict[str, Any]], str | None]:
     """Convert internal message representation into Responses API input items and instructions."""
 
@@ -831,6 +1279,17 @@ def _process_stream_chunk(
     return middleware_manager.stream_chunk(chunk, model_call_params)
 
 
+def _stream_listener(model_call_params: ModelCallParams | None) -> ToolCallStreamListener | None:
+    """Return the listener that should observe this model call's stream, if any."""
+
+    return model_call_params.stream_listener if model_call_params is not None else None
+
+
+def _stream_drain(model_call_params: ModelCallParams | None) -> Callable[[], Awaitable[None]] | None:
+    """Return the listener's ``adrain`` so async streams can wait for a slow stream consumer."""
+    return getattr(_stream_listener(model_call_params), "adrain", None)
+
+
 def _safe_get(item: Any, key: str, default: Any = None) -> Any:
     """Generic attribute/dict getter."""
 
@@ -866,18 +1325,72 @@ def _to_serializable_dict(payload: Any) -> dict[str, Any]:
     return result
 
 
-class OpenAIChatStreamAggregator:
-    """Aggregate OpenAI chat completion stream chunks into a final message dict."""
+class _ChatToolCallBuilder:
+    """Accumulates one streamed chat completion tool call."""
+
+    __slots__ = ("argument_parts", "id", "name", "type")
 
     def __init__(self) -> None:
+        self.id: str | None = None
+        self.type = "function"
+        self.name: str | None = None
+        self.argument_parts: list[str] = []
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "id": self.id,
+            "type": self.type,
+            "function": {"name": self.name, "arguments": "".join(self.argument_parts)},
+        }
+
+
+class _TimedStreamAggregator(ABC):
+    """Time the per-chunk work of a stream aggregator.
+
+    Chunks are consumed while the model call's ``network`` phase is open.
+    Their processing time is carried into the ``stream_aggregation`` phase
+    that ``finalize`` records under ``network``, so the network phase's self
+    time is the time spent waiting on the wire.
+    """
+
+    consume_seconds: float = 0.0
+
+    def consume(self, chunk: Any) -> None:
+        started = time.perf_counter()
+        try:
+            self._consume(chunk)
+        finally:
+            self.consume_seconds += time.perf_counter() - started
+
+    @abstractmethod
+    def _consume(self, chunk: Any) -> None:
+        """Fold one stream chunk into the aggregate."""
+
+
+class OpenAIChatStreamAggregator(_TimedStreamAggregator):
+    """Aggregate OpenAI chat completion stream chunks into a final message dict.
+
+    ``ChatCompletionChunk`` objects from the SDK are read attribute by
+    attribute; other shapes are converted to dicts first. Text and argument
+    fragments are collected in lists and joined once.
+    """
+
+    def __init__(self, listener: ToolCallStreamListener | None = None) -> None:
         self._content_parts: list[str] = []
-        self._tool_calls: dict[int, dict[str, Any]] = {}
+        self._tool_calls: dict[int, _ChatToolCallBuilder] = {}
         self._reasoning_parts: list[str] = []
+        self._emitted_tool_calls: set[int] = set()
+        self.listener = listener
+        self._delta_listener = listener if isinstance(listener, StreamDeltaListener) else None
         self.role: str = "assistant"
         self.model_name: str | None = None
         self.usage: Any | None = None
 
-    def consume(self, chunk: Any) -> None:
+    def _consume(self, chunk: Any) -> None:
+        if isinstance(chunk, ChatCompletionChunk):
+            self._consume_sdk_chunk(chunk)
+            return
+
         payload = _to_serializable_dict(chunk)
         model = payload.get("model")
         if isinstance(model, str):
@@ -890,107 +1403,197 @@ class OpenAIChatStreamAggregator:
         choices = payload.get("choices") or []
         for choice in choices:
             choice_dict = _to_serializable_dict(choice)
-            delta = _to_serializable_dict(choice_dict.get("delta", {}))
+            self._apply_delta_payload(_to_serializable_dict(choice_dict.get("delta", {})))
 
-            role = delta.get("role")
-            if role:
-                self.role = role
+            if self.listener is not None and choice_dict.get("finish_reason"):
+                self._emit_tool_calls()
 
-            content_delta = delta.get("content")
-            if isinstance(content_delta, str):
-                self._content_parts.append(content_delta)
-            elif isinstance(content_delta, list):
-                for entry in content_delta:
-                    entry_text = _safe_get(entry, "text")
-                    if entry_text:
-                        self._content_parts.append(str(entry_text))
-
-            reasoning = delta.get("reasoning_content")
-            if isinstance(reasoning, str):
-                self._reasoning_parts.append(reasoning)
-            elif isinstance(reasoning, list):
-                for entry in reasoning:
-                    text = _safe_get(entry, "text")
-                    if text:
-                        self._reasoning_parts.append(str(text))
-
-            tool_calls = delta.get("tool_calls") or []
-            for tool_delta in tool_calls:
-                tool_dict = _to_serializable_dict(tool_delta)
-                index = int(tool_dict.get("index", 0))
-                builder = self._tool_calls.setdefault(
-                    index,
-                    {
-                        "id": tool_dict.get("id"),
-                        "type": tool_dict.get("type", "function"),
-                        "function": {"name": None, "arguments": ""},
-                    },
-                )
-                if tool_dict.get("id"):
-                    builder["id"] = tool_dict["id"]
-                if tool_dict.get("type"):
-                    builder["type"] = tool_dict["type"]
-
-                function_delta = _to_serializable_dict(tool_dict.get("function", {}))
-                if function_delta.get("name"):
-                    builder.setdefault("function", {})["name"] = function_delta["name"]
-                arguments = function_delta.get("arguments")
-                if arguments:
-                    current = builder.setdefault("function", {}).get("arguments") or ""
-                    builder["function"]["arguments"] = f"{current}{arguments}"
+    def _consume_sdk_chunk(self, chunk: ChatCompletionChunk) -> None:
+        if isinstance(chunk.model, str):
+            self.model_name = chunk.model
+
+        if chunk.usage is not None:
+            self.usage = _to_serializable_dict(chunk.usage)
+
+        for choice in chunk.choices:
+            delta = choice.delta
+            if not isinstance(delta, ChoiceDelta):
+                self._apply_delta_payload(_to_serializable_dict(delta or {}))
+            else:
+                if delta.role:
+                    self.role = delta.role
+                self._add_content(delta.content)
+                extra = delta.__pydantic_extra__
+                if extra:
+                    self._add_reasoning(extra.get("reasoning_content"))
+                for tool_delta in delta.tool_calls or ():
+                    if isinstance(tool_delta, ChoiceDeltaToolCall):
+                        function = tool_delta.function
+                        self._add_tool_delta(
+                            tool_delta.index,
+                            tool_delta.id,
+                            tool_delta.type,
+                            function.name if function is not None else None,
+                            function.arguments if function is not None else None,
+                        )
+                    else:
+                        self._add_tool_delta_payload(_to_serializable_dict(tool_delta))
+
+            if self.listener is not None and choice.finish_reason:
+                self._emit_tool_calls()
+
+    def _apply_delta_payload(self, delta: dict[str, Any]) -> None:
+        role = delta.get("role")
+        if role:
+            self.role = role
+        self._add_content(delta.get("content"))
+        self._add_reasoning(delta.get("reasoning_content"))
+        tool_calls = delta.get("tool_calls") or []
+        for tool_delta in tool_calls:
+            self._add_tool_delta_payload(_to_serializable_dict(tool_delta))
+
+    def _add_content(self, content_delta: Any) -> None:
+        if isinstance(content_delta, str):
+            self._content_parts.append(content_delta)
+            if self.listener is not None:
+                self.listener.on_text_delta(content_delta)
+        elif isinstance(content_delta, list):
+            for entry in content_delta:
+                entry_text = _safe_get(entry, "text")
+                if entry_text:
+                    self._content_parts.append(str(entry_text))
+                    if self.listener is not None:
+                        self.listener.on_text_delta(str(entry_text))
+
+    def _add_reasoning(self, reasoning: Any) -> None:
+        if isinstance(reasoning, str):
+            self._reasoning_parts.append(reasoning)
+            if self._delta_listener is not None:
+                self._delta_listener.on_reasoning_delta(reasoning)
+        elif isinstance(reasoning, list):
+            for entry in reasoning:
+                text = _safe_get(entry, "text")
+                if text:
+                    self._reasoning_parts.append(str(text))
+                    if self._delta_listener is not None:
+                        self._delta_listener.on_reasoning_delta(str(text))
+
+    def _add_tool_delta_payload(self, tool_dict: dict[str, Any]) -> None:
+        function_delta = _to_serializable_dict(tool_dict.get("function") or {})
+        self._add_tool_delta(
+            tool_dict.get("index", 0),
+            tool_dict.get("id"),
+            tool_dict.get("type"),
+            function_delta.get("name"),
+            function_delta.get("arguments"),
+        )
+
+    def _add_tool_delta(
+        self,
+        index: Any,
+        call_id: str | None,
+        call_type: str | None,
+        name: str | None,
+        arguments: Any,
+    ) -> None:
+        index = int(index or 0)
+        builder = self._tool_calls.get(index)
+        started = builder is None
+        if builder is None:
+            if self.listener is not None:
+                # Tool calls stream one after another, so a new index closes the earlier ones
+                self._emit_tool_calls(below=index)
+            builder = self._tool_calls[index] = _ChatToolCallBuilder()
+        if call_id:
+            builder.id = call_id
+        if call_type:
+            builder.type = call_type
+        if name:
+            builder.name = name
+        if arguments and not isinstance(arguments, str):
+            arguments = str(arguments)
+        if arguments:
+            builder.argument_parts.append(arguments)
+        if self._delta_listener is not None and (started or arguments):
+            self._delta_listener.on_tool_call_delta(index, builder.id, builder.name, arguments or "")
 
     def finalize(self) -> dict[str, Any]:
-        if not self._content_parts and not self._tool_calls and not self._reasoning_parts:
-            raise RuntimeError("No stream chunks were received from OpenAI chat completion")
+        with profile_phase("stream_aggregation", carried=self.consume_seconds):
+            if not self._content_parts and not self._tool_calls and not self._reasoning_parts:
+                raise RuntimeError("No stream chunks were received from OpenAI chat completion")
 
-        message: dict[str, Any] = {
-            "role": self.role or "assistant",
-            "content": "".join(self._content_parts) if self._content_parts else "",
-        }
+            if self.listener is not None:
+                self._emit_tool_calls()
 
-        if self._tool_calls:
-            ordered_calls: list[dict[str, Any]] = []
-            for index in sorted(self._tool_calls):
-                call = self._tool_calls[index]
-                function_payload = call.get("function") or {}
-                arguments = function_payload.get("arguments") or ""
-                if not isinstance(arguments, str):
-                    arguments = json.dumps(arguments, ensure_ascii=False)
-                ordered_calls.append(
-                    {
-                        "id": call.get("id"),
-                        "type": call.get("type", "function"),
-                        "function": {
-                            "name": function_payload.get("name"),
-                            "arguments": arguments,
-                        },
-                    },
-                )
-            message["tool_calls"] = ordered_calls
+            message: dict[str, Any] = {
+                "role": self.role or "assistant",
+                "content": "".join(self._content_parts) if self._content_parts else "",
+            }
 
-        if self._reasoning_parts:
-            message["reasoning_content"] = "".join(self._reasoning_parts)
+            if self._tool_calls:
+                message["tool_calls"] = [self._tool_calls[index].to_dict() for index in sorted(self._tool_calls)]
 
-        if self.model_name:
-            message["model"] = self.model_name
+            if self._reasoning_parts:
+                message["reasoning_content"] = "".join(self._reasoning_parts)
 
-        if self.usage is not None:
-            message["usage"] = self.usage
+            if self.model_name:
+                message["model"] = self.model_name
 
-        return message
+            if self.usage is not None:
+                message["usage"] = self.usage
 
+            return message
 
-class AnthropicStreamAggregator:
-    """Aggregate Anthropic streaming events into a final message payload."""
+    def _emit_tool_calls(self, below: int | None = None) -> None:
+        """Notify the listener of finished tool calls that have not been reported yet."""
+        for index in sorted(self._tool_calls):
+            if below is not None and index >= below:
+                break
+            if index in self._emitted_tool_calls:
+                continue
+            self._emitted_tool_calls.add(index)
+            builder = self._tool_calls[index]
+            if not builder.name:
+                continue
+            try:
+                tool_call = ModelToolCall.from_openai(builder.to_dict())
+            except ValueError:
+                continue
+            assert self.listener is not None
+            self.listener.on_tool_call(tool_call)
 
-    def __init__(self) -> None:
+
+class AnthropicStreamAggregator(_TimedStreamAggregator):
+    """Aggregate Anthropic streaming events into a final message payload.
+
+    ``content_block_delta`` events from the SDK are read attribute by
+    attribute; text, thinking and tool input fragments are buffered per
+    content block and joined when the block stops.
+    """
+
+    def __init__(self, listener: ToolCallStreamListener | None = None) -> None:
+        self.listener = listener
+        self._delta_listener = listener if isinstance(listener, StreamDeltaListener) else None
         self.role: str = "assistant"
         self.model_name: str | None = None
         self.usage: dict[str, Any] | None = None
         self._active_blocks: dict[int, dict[str, Any]] = {}
+        self._block_fragments: dict[int, dict[str, list[str]]] = {}
         self._completed_blocks: list[dict[str, Any]] = []
 
-    def consume(self, event: Any) -> None:
+    def _consume(self, event: Any) -> None:
+        if isinstance(event, RawContentBlockDeltaEvent):
+            delta = event.delta
+            if isinstance(delta, TextDelta):
+                self._add_text(event.index, delta.text)
+            elif isinstance(delta, InputJSONDelta):
+                self._add_fragment(event.index, "_input", delta.partial_json)
+            elif isinstance(delta, ThinkingDelta):
+                self._add_fragment(event.index, "thinking", delta.thinking)
+            else:
+                self._apply_block_delta(event.index, _to_serializable_dict(delta))
+            return
+
         payload = _to_serializable_dict(event)
         event_type = payload.get("type")
 
@@ -1010,61 +1613,96 @@ class AnthropicStreamAggregator:
             delta = _to_serializable_dict(payload.get("delta", {}))
             usage_data = delta.get("usage") or payload.get("usage")
             if usage_data:
-                self.usage = _to_serializable_dict(usage_data)
+                # Deltas carry output counts; keep input and cache counts from message_start
+                delta_usage = {key: value for key, value in _to_serializable_dict(usage_data).items() if value is not None}
+                self.usage = {**(self.usage or {}), **delta_usage}
         elif event_type == "content_block_start":
             index = payload.get("index")
             block = _to_serializable_dict(payload.get("content_block", {}))
             if block and isinstance(index, int):
-                block["_input_buffer"] = ""
-                self._active_blocks[index] = block
+                self._active_blocks[index] = dict(block)
+                if self._delta_listener is not None and block.get("type") == "tool_use":
+                    self._delta_listener.on_tool_call_delta(index, block.get("id"), block.get("name"), "")
         elif event_type == "content_block_delta":
-            self._apply_block_delta(payload)
+            self._apply_block_delta(payload.get("index"), _to_serializable_dict(payload.get("delta", {})))
         elif event_type == "content_block_stop":
             self._finalize_block(payload.get("index"))
         elif event_type == "message_stop":
             self._flush_active_blocks()
 
     def finalize(self) -> dict[str, Any]:
-        self._flush_active_blocks()
-        if not self._completed_blocks:
-            raise RuntimeError("No stream chunks were received from Anthropic messages stream")
-        message: dict[str, Any] = {
-            "role": self.role or "assistant",
-            "content": self._completed_blocks,
-        }
-        if self.model_name:
-            message["model"] = self.model_name
-        if self.usage is not None:
-            message["usage"] = self.usage
-        return message
-
-    def _apply_block_delta(self, payload: dict[str, Any]) -> None:
-        index = payload.get("index")
+        with profile_phase("stream_aggregation", carried=self.consume_seconds):
+            self._flush_active_blocks()
+            if not self._completed_blocks:
+                raise RuntimeError("No stream chunks were received from Anthropic messages stream")
+            message: dict[str, Any] = {
+                "role": self.role or "assistant",
+                "content": self._completed_blocks,
+            }
+            if self.model_name:
+                message["model"] = self.model_name
+            if self.usage is not None:
+                message["usage"] = self.usage
+            return message
+
+    def _apply_block_delta(self, index: Any, delta: dict[str, Any]) -> None:
         if not isinstance(index, int):
             return
-        delta = _to_serializable_dict(payload.get("delta", {}))
-        block = self._active_blocks.setdefault(index, {"type": "text", "text": "", "_input_buffer": ""})
         delta_type = delta.get("type")
         if delta_type == "text_delta":
-            block["type"] = "text"
-            block["text"] = block.get("text", "") + delta.get("text", "")
+            self._add_text(index, delta.get("text", ""))
         elif delta_type == "input_json_delta":
-            fragment = delta.get("partial_json", "")
-            block["_input_buffer"] = block.get("_input_buffer", "") + fragment
+            self._add_fragment(index, "_input", delta.get("partial_json", ""))
+        elif delta_type == "thinking_delta":
+            self._add_fragment(index, "thinking", delta.get("thinking", ""))
         else:
             # For other delta types, merge raw structure
+            block = self._active_block(index)
             for key, value in delta.items():
                 if key == "type":
                     continue
                 block[key] = value
 
+    def _active_block(self, index: int) -> dict[str, Any]:
+        block = self._active_blocks.get(index)
+        if block is None:
+            block = self._active_blocks[index] = {"type": "text", "text": ""}
+        return block
+
+    def _add_text(self, index: int, text: str) -> None:
+        self._active_block(index)["type"] = "text"
+        self._add_fragment(index, "text", text)
+        if self.listener is not None:
+            self.listener.on_text_delta(text)
+
+    def _add_fragment(self, index: int, key: str, fragment: str) -> None:
+        if index not in self._active_blocks:
+            self._active_blocks[index] = {"type": "text", "text": ""}
+        fragments = self._block_fragments.get(index)
+        if fragments is None:
+            fragments = self._block_fragments[index] = {}
+        parts = fragments.get(key)
+        if parts is None:
+            fragments[key] = [fragment]
+        else:
+            parts.append(fragment)
+        if self._delta_listener is not None and fragment:
+            if key == "_input":
+                self._delta_listener.on_tool_call_delta(index, None, None, fragment)
+            elif key == "thinking":
+                self._delta_listener.on_reasoning_delta(fragment)
+
     def _finalize_block(self, index: int | None) -> None:
         if index is None:
             return
         block = self._active_blocks.pop(index, None)
+        fragments = self._block_fragments.pop(index, {})
         if not block:
             return
-        input_buffer = block.pop("_input_buffer", None)
+        input_parts = fragments.pop("_input", None)
+        for key, parts in fragments.items():
+            block[key] = (block.get(key) or "") + "".join(parts)
+        input_buffer = "".join(input_parts) if input_parts else ""
         if input_buffer:
             try:
                 block["input"] = json.loads(input_buffer)
@@ -1072,6 +1710,18 @@ class AnthropicStreamAggregator:
                 block["input"] = input_buffer
         self._completed_blocks.append(block)
 
+        if self.listener is not None and block.get("type") == "tool_use":
+            arguments = block.get("input", {})
+            self.listener.on_tool_call(
+                ModelToolCall(
+                    call_id=block.get("id"),
+                    name=block.get("name") or "",
+                    arguments=arguments,
+                    raw_arguments=json.dumps(arguments, ensure_ascii=False),
+                    call_type=block.get("type", "function"),
+                ),
+            )
+
     def _flush_active_blocks(self) -> None:
         remaining = list(self._active_blocks.keys())
         for idx in remaining:
@@ -1085,18 +1735,28 @@ class ResponseMessageBuilder:
         self.item_id = item_id
         self.role = role
         self._parts: dict[int, dict[str, Any]] = {}
+        self._text_deltas: dict[int, list[str]] = {}
 
     def add_part(self, index: int, part: dict[str, Any]) -> None:
         self._parts[index] = part
+        self._text_deltas.pop(index, None)
 
     def append_text(self, index: int, delta_text: str) -> None:
         if not isinstance(delta_text, str):
             delta_text = str(delta_text)
-        part = self._parts.setdefault(index, {"type": "output_text", "text": ""})
-        part["type"] = part.get("type") or "output_text"
-        part["text"] = (part.get("text") or "") + delta_text
+        deltas = self._text_deltas.get(index)
+        if deltas is None:
+            self._text_deltas[index] = [delta_text]
+        else:
+            deltas.append(delta_text)
 
     def to_output_item(self) -> dict[str, Any]:
+        for index, deltas in self._text_deltas.items():
+            part = self._parts.setdefault(index, {"type": "output_text", "text": ""})
+            part["type"] = part.get("type") or "output_text"
+            part["text"] = (part.get("text") or "") + "".join(deltas)
+        self._text_deltas.clear()
+
         content: list[dict[str, Any]] = []
         for index in sorted(self._parts):
             part = self._parts[index]
@@ -1116,7 +1776,17 @@ class ResponseToolCallBuilder:
         self.item_id = item_id
         self.call_id = item_id
         self.name: str | None = None
-        self.arguments: str = ""
+        self._argument_parts: list[str] = []
+
+    @property
+    def arguments(self) -> str:
+        if len(self._argument_parts) > 1:
+            self._argument_parts = ["".join(self._argument_parts)]
+        return self._argument_parts[0] if self._argument_parts else ""
+
+    @arguments.setter
+    def arguments(self, value: str) -> None:
+        self._argument_parts = [value] if value else []
 
     def update_from_item(self, item: dict[str, Any]) -> None:
         if item.get("call_id"):
@@ -1132,7 +1802,7 @@ class ResponseToolCallBuilder:
             return
         if not isinstance(delta, str):
             delta = str(delta)
-        self.arguments = f"{self.arguments}{delta}"
+        self._argument_parts.append(delta)
 
     def set_arguments(self, arguments: str) -> None:
         if not arguments:
@@ -1165,6 +1835,7 @@ class ReasoningSummaryBuilder:
         self.content = list(content or [])
         self._summary_parts: dict[int, dict[str, Any]] = {}
         self._summary_order: list[int] = []
+        self._summary_deltas: dict[int, list[str]] = {}
         self._seed_initial_summary(summary)
 
     def update_from_item(self, item: dict[str, Any]) -> None:
@@ -1186,12 +1857,21 @@ class ReasoningSummaryBuilder:
     def append_summary_delta(self, index: int, delta_text: str) -> None:
         if not isinstance(delta_text, str):
             delta_text = str(delta_text)
-        entry = self._summary_parts.setdefault(index, {"type": "summary_text", "text": ""})
-        entry["text"] = f"{entry.get('text', '')}{delta_text}"
-        if index not in self._summary_order:
+        if index not in self._summary_parts:
+            self._summary_parts[index] = {"type": "summary_text", "text": ""}
             self._summary_order.append(index)
+        deltas = self._summary_deltas.get(index)
+        if deltas is None:
+            self._summary_deltas[index] = [delta_text]
+        else:
+            deltas.append(delta_text)
 
     def to_output_item(self) -> dict[str, Any]:
+        for index, deltas in self._summary_deltas.items():
+            entry = self._summary_parts[index]
+            entry["text"] = f"{entry.get('text', '')}{''.join(deltas)}"
+        self._summary_deltas.clear()
+
         summary_parts = [self._summary_parts[idx] for idx in sorted(self._summary_order)]
         item: dict[str, Any] = {
             "type": "reasoning",
@@ -1204,10 +1884,17 @@ class ReasoningSummaryBuilder:
         return item
 
 
-class OpenAIResponsesStreamAggregator:
-    """Aggregate Responses API streaming events into a final Response payload."""
+class OpenAIResponsesStreamAggregator(_TimedStreamAggregator):
+    """Aggregate Responses API streaming events into a final Response payload.
 
-    def __init__(self) -> None:
+    Text, argument and reasoning summary deltas from the SDK are read
+    attribute by attribute; other events are converted to dicts.
+    """
+
+    def __init__(self, listener: ToolCallStreamListener | None = None) -> None:
+        self.listener = listener
+        self._delta_listener = listener if isinstance(listener, StreamDeltaListener) else None
+        self._emitted_tool_items: set[str] = set()
         self._message_builders: dict[str, ResponseMessageBuilder] = {}
         self._tool_builders: dict[str, ResponseToolCallBuilder] = {}
         self._reasoning_builders: dict[str, ReasoningSummaryBuilder] = {}
@@ -1217,7 +1904,17 @@ class OpenAIResponsesStreamAggregator:
         self.model_name: str | None = None
         self.usage: Any | None = None
 
-    def consume(self, event: Any) -> None:
+    def _consume(self, event: Any) -> None:
+        if isinstance(event, ResponseTextDeltaEvent):
+            self._handle_text_delta(event.item_id, event.content_index, event.delta)
+            return
+        if isinstance(event, ResponseFunctionCallArgumentsDeltaEvent):
+            self._handle_function_arguments_delta(event.item_id, event.delta)
+            return
+        if isinstance(event, ResponseReasoningSummaryTextDeltaEvent):
+            self._handle_reasoning_delta(event.item_id, event.output_index, event.summary_index, event.delta)
+            return
+
         payload = _to_serializable_dict(event)
         event_type = payload.get("type")
 
@@ -1226,13 +1923,20 @@ class OpenAIResponsesStreamAggregator:
         elif event_type == "response.content_part.added":
             self._handle_content_part_added(payload)
         elif event_type == "response.output_text.delta":
-            self._handle_text_delta(payload)
+            self._handle_text_delta(payload.get("item_id"), payload.get("content_index", 0), payload.get("delta", ""))
         elif event_type == "response.function_call_arguments.delta":
-            self._handle_function_arguments_delta(payload)
+            self._handle_function_arguments_delta(payload.get("item_id"), payload.get("delta", ""))
         elif event_type == "response.function_call_arguments.done":
             self._handle_function_arguments_done(payload)
+        elif event_type == "response.output_item.done":
+            self._handle_output_item_done(payload)
         elif event_type == "response.reasoning_summary_text.delta":
-            self._handle_reasoning_delta(payload)
+            self._handle_reasoning_delta(
+                payload.get("item_id"),
+                payload.get("output_index", 0),
+                payload.get("summary_index", 0),
+                payload.get("delta", ""),
+            )
         elif event_type == "response.completed":
             response_data = _to_serializable_dict(payload.get("response", {}))
             self._completed_response = response_data
@@ -1247,38 +1951,39 @@ class OpenAIResponsesStreamAggregator:
             self.model_name = response_data.get("model") or self.model_name
 
     def finalize(self) -> dict[str, Any]:
-        output_items: list[dict[str, Any]] = []
-
-        for item_id in self._output_order:
-            if item_id in self._message_builders:
-                output_items.append(self._message_builders[item_id].to_output_item())
-            elif item_id in self._tool_builders:
-                output_items.append(self._tool_builders[item_id].to_output_item())
-            elif item_id in self._reasoning_builders:
-                output_items.append(self._reasoning_builders[item_id].to_output_item())
-
-        # Append any builders that were not in the initial output order
-        for item_id, message_builder in self._message_builders.items():
-            if item_id not in self._output_order:
-                output_items.append(message_builder.to_output_item())
-        for item_id, tool_builder in self._tool_builders.items():
-            if item_id not in self._output_order:
-                output_items.append(tool_builder.to_output_item())
-        for item_id, reasoning_builder in self._reasoning_builders.items():
-            if item_id not in self._output_order:
-                output_items.append(reasoning_builder.to_output_item())
-
-        if not output_items and self._completed_response is not None:
-            return self._completed_response
-
-        response_payload: dict[str, Any] = {
-            "id": self.response_id,
-            "model": self.model_name,
-            "output": output_items,
-        }
-        if self.usage is not None:
-            response_payload["usage"] = self.usage
-        return response_payload
+        with profile_phase("stream_aggregation", carried=self.consume_seconds):
+            output_items: list[dict[str, Any]] = []
+
+            for item_id in self._output_order:
+                if item_id in self._message_builders:
+                    output_items.append(self._message_builders[item_id].to_output_item())
+                elif item_id in self._tool_builders:
+                    output_items.append(self._tool_builders[item_id].to_output_item())
+                elif item_id in self._reasoning_builders:
+                    output_items.append(self._reasoning_builders[item_id].to_output_item())
+
+            # Append any builders that were not in the initial output order
+            for item_id, message_builder in self._message_builders.items():
+                if item_id not in self._output_order:
+                    output_items.append(message_builder.to_output_item())
+            for item_id, tool_builder in self._tool_builders.items():
+                if item_id not in self._output_order:
+                    output_items.append(tool_builder.to_output_item())
+            for item_id, reasoning_builder in self._reasoning_builders.items():
+                if item_id not in self._output_order:
+                    output_items.append(reasoning_builder.to_output_item())
+
+            if not output_items and self._completed_response is not None:
+                return self._completed_response
+
+            response_payload: dict[str, Any] = {
+                "id": self.response_id,
+                "model": self.model_name,
+                "output": output_items,
+            }
+            if self.usage is not None:
+                response_payload["usage"] = self.usage
+            return response_payload
 
     def _handle_output_item_added(self, payload: dict[str, Any]) -> None:
         item = _to_serializable_dict(payload.get("item", {}))
@@ -1297,6 +2002,8 @@ class OpenAIResponsesStreamAggregator:
         elif item_type == "function_call":
             tool_builder = self._tool_builders.setdefault(item_id, ResponseToolCallBuilder(item_id))
             tool_builder.update_from_item(item)
+            if self._delta_listener is not None:
+                self._delta_listener.on_tool_call_delta(item_id, tool_builder.call_id, tool_builder.name, "")
         elif item_type == "reasoning":
             reasoning_builder = self._reasoning_builders.setdefault(
                 item_id,
@@ -1311,22 +2018,27 @@ class OpenAIResponsesStreamAggregator:
         message_builder = self._message_builders.setdefault(item_id, ResponseMessageBuilder(item_id))
         message_builder.add_part(payload.get("content_index", 0), _to_serializable_dict(payload.get("part", {})))
 
-    def _handle_text_delta(self, payload: dict[str, Any]) -> None:
-        item_id = payload.get("item_id")
+    def _handle_text_delta(self, item_id: str | None, content_index: int, delta_text: Any) -> None:
         if not item_id:
             return
-        message_builder = self._message_builders.setdefault(item_id, ResponseMessageBuilder(item_id))
-        delta_text = payload.get("delta", "")
+        message_builder = self._message_builders.get(item_id)
+        if message_builder is None:
+            message_builder = self._message_builders[item_id] = ResponseMessageBuilder(item_id)
         if not isinstance(delta_text, str):
             delta_text = str(delta_text)
-        message_builder.append_text(payload.get("content_index", 0), delta_text)
+        message_builder.append_text(content_index, delta_text)
+        if self.listener is not None:
+            self.listener.on_text_delta(delta_text)
 
-    def _handle_function_arguments_delta(self, payload: dict[str, Any]) -> None:
-        item_id = payload.get("item_id")
+    def _handle_function_arguments_delta(self, item_id: str | None, delta: Any) -> None:
         if not item_id:
             return
-        tool_builder = self._tool_builders.setdefault(item_id, ResponseToolCallBuilder(item_id))
-        tool_builder.append_arguments(payload.get("delta", ""))
+        tool_builder = self._tool_builders.get(item_id)
+        if tool_builder is None:
+            tool_builder = self._tool_builders[item_id] = ResponseToolCallBuilder(item_id)
+        tool_builder.append_arguments(delta)
+        if self._delta_listener is not None and delta:
+            self._delta_listener.on_tool_call_delta(item_id, None, None, delta if isinstance(delta, str) else str(delta))
 
     def _handle_function_arguments_done(self, payload: dict[str, Any]) -> None:
         item_id = payload.get("item_id")
@@ -1334,12 +2046,37 @@ class OpenAIResponsesStreamAggregator:
             return
         tool_builder = self._tool_builders.setdefault(item_id, ResponseToolCallBuilder(item_id))
         tool_builder.set_arguments(payload.get("arguments", ""))
+        self._emit_tool_call(item_id)
+
+    def _handle_output_item_done(self, payload: dict[str, Any]) -> None:
+        item = _to_serializable_dict(payload.get("item", {}))
+        item_id = item.get("id")
+        if not item_id or item.get("type") != "function_call":
+            return
+        tool_builder = self._tool_builders.setdefault(item_id, ResponseToolCallBuilder(item_id))
+        tool_builder.update_from_item(item)
+        self._emit_tool_call(item_id)
+
+    def _emit_tool_call(self, item_id: str) -> None:
+        """Notify the listener once per finished function call item."""
+        if self.listener is None or item_id in self._emitted_tool_items:
+            return
+        tool_builder = self._tool_builders[item_id]
+        if not tool_builder.name:
+            # The name arrives with output_item.added/done; wait for it
+            return
+        self._emitted_tool_items.add(item_id)
+        tool_call = ModelResponse._tool_call_from_response_item(tool_builder.to_output_item())
+        if tool_call is not None:
+            self.listener.on_tool_call(tool_call)
 
-    def _handle_reasoning_delta(self, payload: dict[str, Any]) -> None:
-        item_id = payload.get("item_id") or f"_reasoning_{payload.get('output_index', 0)}"
-        summary_index = payload.get("summary_index", 0)
-        delta = payload.get("delta", "")
+    def _handle_reasoning_delta(self, item_id: str | None, output_index: int, summary_index: int, delta: Any) -> None:
+        item_id = item_id or f"_reasoning_{output_index}"
         if not isinstance(delta, str):
             delta = str(delta)
-        reasoning_builder = self._reasoning_builders.setdefault(item_id, ReasoningSummaryBuilder(item_id))
+        reasoning_builder = self._reasoning_builders.get(item_id)
+        if reasoning_builder is None:
+            reasoning_builder = self._reasoning_builders[item_id] = ReasoningSummaryBuilder(item_id)
         reasoning_builder.append_summary_delta(summary_index, delta)
+        if self._delta_listener is not None and delta:
+            self._delta_listener.on_reasoning_delta(delta)
@@ -123,10 +123,15 @@ class ContextCompactionMiddleware(Middleware):
         # Get token count from model response usage information
         current_tokens = self._get_current_tokens(hook_input)
 
-        # If we couldn't get token count from model response, fall back to token_counter
+        # If we couldn't get token count from model response, fall back to the
+        # executor's incremental ledger, or to token_counter when none is attached
         if current_tokens is None:
-            logger.warning("[ContextCompactionMiddleware] No usage information from model response, falling back to token_counter")
-            current_tokens = self.token_counter.count_tokens(messages)
+            if hook_input.token_ledger is not None:
+                logger.warning("[ContextCompactionMiddleware] No usage information from model response, falling back to token_ledger")
+                current_tokens = hook_input.token_ledger.count(messages)
+            else:
+                logger.warning("[ContextCompactionMiddleware] No usage information from model response, falling back to token_counter")
+                current_tokens = self.token_counter.count_tokens(messages)
 
         usage_ratio = current_tokens / self.max_context_tokens
 
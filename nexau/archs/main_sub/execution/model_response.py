@@ -60,6 +60,40 @@ def _to_serializable_dict(payload: Any) -> dict[str, Any]:
     return result
 
 
+def extract_cache_usage(usage: dict[str, Any] | None) -> dict[str, int]:
+    """Extract prompt-cache token counts from raw or normalized usage.
+
+    Understands Anthropic (``cache_read_input_tokens`` /
+    ``cache_creation_input_tokens``), OpenAI chat
+    (``prompt_tokens_details.cached_tokens``) and Responses API
+    (``input_tokens_details.cached_tokens``) formats.
+
+    Args:
+        usage: Usage dict from a model response
+
+    Returns:
+        ``cache_read_tokens`` and ``cache_write_tokens`` when reported, else an empty dict
+    """
+    if not isinstance(usage, dict):
+        return {}
+
+    cache_usage: dict[str, int] = {}
+    read = usage.get("cache_read_tokens", usage.get("cache_read_input_tokens"))
+    if read is None:
+        for details_key in ("prompt_tokens_details", "input_tokens_details"):
+            details = usage.get(details_key)
+            if isinstance(details, dict) and details.get("cached_tokens") is not None:
+                read = details["cached_tokens"]
+                break
+    if read is not None:
+        cache_usage["cache_read_tokens"] = read
+
+    write = usage.get("cache_write_tokens", usage.get("cache_creation_input_tokens"))
+    if write is not None:
+        cache_usage["cache_write_tokens"] = write
+    return cache_usage
+
+
 def _normalize_usage(usage: dict[str, Any] | None) -> dict[str, Any] | None:
     """Normalize usage information to a standard format.
 
@@ -68,6 +102,7 @@ def _normalize_usage(usage: dict[str, Any] | None) -> dict[str, Any] | None:
     - reasoning_tokens: Number of tokens used for reasoning (if applicable)
     - completion_tokens: Number of tokens in the completion/output
     - total_tokens: Total number of tokens used
+    - cache_read_tokens / cache_write_tokens: Prompt-cache counts, when reported
 
     Supports both OpenAI format (prompt_tokens, completion_tokens, total_tokens)
     and Anthropic format (input_tokens, output_tokens).
@@ -109,12 +144,22 @@ def _normalize_usage(usage: dict[str, Any] | None) -> dict[str, Any] | None:
     else:
         normalized["completion_tokens"] = 0
 
+    cache_usage = extract_cache_usage(usage)
+    normalized.update(cache_usage)
+
     # Handle total tokens
     if "total_tokens" in usage:
         normalized["total_tokens"] = usage["total_tokens"]
     else:
-        # Calculate total if not provided
-        normalized["total_tokens"] = normalized["input_tokens"] + normalized["reasoning_tokens"] + normalized["completion_tokens"]
+        # Calculate total if not provided. Anthropic's input_tokens excludes
+        # cached prompt tokens, which still occupy the context window.
+        normalized["total_tokens"] = (
+            normalized["input_tokens"]
+            + normalized["reasoning_tokens"]
+            + normalized["completion_tokens"]
+            + cache_usage.get("cache_read_tokens", 0)
+            + cache_usage.get("cache_write_tokens", 0)
+        )
 
     return normalized
 
@@ -225,6 +270,7 @@ class ModelResponse:
     - reasoning_tokens: Number of tokens used for reasoning (if applicable, 0 otherwise)
     - completion_tokens: Number of tokens in the completion/output
     - total_tokens: Total number of tokens used
+    - cache_read_tokens / cache_write_tokens: Prompt-cache counts, when reported
 
     All usage data is automatically normalized from provider-specific formats
     (e.g., OpenAI's prompt_tokens/completion_tokens, Anthropic's input_tokens/output_tokens)
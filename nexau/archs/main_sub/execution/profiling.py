@@ -0,0 +1,291 @@
+# Copyright (c) Nex-AGI. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Low-overhead profiling of where time goes inside agent runs.
+
+The executor, the LLM caller and the stream aggregators wrap each step of an
+iteration in :func:`profile_phase`. Outside a profiled run this returns a
+shared no-op context manager after a single context-variable lookup, so the
+instrumentation can stay in place. Inside a run started by
+:class:`ProfilingMiddleware`, each phase records its monotonic duration under
+its stack of enclosing phases (``agent;model_call;network;first_byte``).
+The stack follows the context into tool worker threads and asyncio tasks.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+import uuid
+from collections import deque
+from collections.abc import Iterator, Sequence
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar, Token
+from pathlib import Path
+from typing import Any
+
+from nexau.archs.tracer.metrics import DEFAULT_LATENCY_BUCKETS_MS, LatencyHistogram
+
+from .hooks import Middleware, ModelCallParams
+
+logger = logging.getLogger(__name__)
+
+# Aggregation categories of ProfilingMiddleware.summary()
+PROFILE_CATEGORIES = ("agent", "model", "tool", "sub_agent", "phase")
+
+_NO_PHASE = nullcontext()
+
+
+class _Phase:
+    """One open phase of a profiled run."""
+
+    __slots__ = ("run", "name", "category", "key", "carried", "path", "start", "marks", "_token")
+
+    def __init__(self, run: ProfileRun, name: str, category: str | None, key: str | None, carried: float = 0.0) -> None:
+        self.run = run
+        self.name = name
+        self.category = category
+        self.key = key
+        self.carried = carried
+        self.path: tuple[str, ...] = ()
+        self.start = 0.0
+        self.marks: set[str] | None = None
+        self._token: Token[_Phase | None] | None = None
+
+    def __enter__(self) -> _Phase:
+        parent = _current_phase.get()
+        self.path = (*parent.path, self.name) if parent is not None else (self.name,)
+        self._token = _current_phase.set(self)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        elapsed = time.perf_counter() - self.start + self.carried
+        if self._token is not None:
+            _current_phase.reset(self._token)
+        self.run.record(self.path, elapsed, self.category, self.key)
+
+
+# Innermost open phase of the current context (thread or asyncio task)
+_current_phase: ContextVar[_Phase | None] = ContextVar("profile_phase", default=None)
+
+
+def profile_phase(name: str, category: str | None = None, key: str | None = None, carried: float = 0.0) -> Any:
+    """Time the enclosed block as phase ``name`` of the current profiled run.
+
+    Args:
+        name: Phase name, one frame of the reported stack
+        category: Optional aggregation category (``"model"``, ``"tool"``, ...)
+        key: Name aggregated under ``category``, e.g. the model or tool name
+        carried: Seconds of work for this phase done in pieces before it was
+            opened (e.g. per-chunk stream processing), added to its duration
+
+    Returns:
+        A context manager; a shared no-op one when no run is being profiled
+    """
+    phase = _current_phase.get()
+    if phase is None:
+        return _NO_PHASE
+    return _Phase(phase.run, name, category, key, carried)
+
+
+def profile_mark_once(name: str) -> None:
+    """Record the time from the start of the innermost phase to now, once per phase.
+
+    Used for instants such as the first streamed byte of a model call; the
+    mark appears as a child of the phase that was open when it happened.
+    """
+    phase = _current_phase.get()
+    if phase is None:
+        return
+    if phase.marks is None:
+        phase.marks = set()
+    elif name in phase.marks:
+        return
+    phase.marks.add(name)
+    phase.run.record((*phase.path, name), time.perf_counter() - phase.start, None, None)
+
+
+class ProfileRun:
+    """Phase timings of one :meth:`Executor.execute` run."""
+
+    def __init__(self, agent_name: str, agent_id: str | None = None) -> None:
+        self.run_id = uuid.uuid4().hex[:12]
+        self.agent_name = agent_name
+        self.agent_id = agent_id
+        self.started_at = time.time()
+        self.duration: float | None = None
+        # Stack -> [calls, total seconds]
+        self.stacks: dict[tuple[str, ...], list[float]] = {}
+        # (category, key, seconds) for every finished phase
+        self.observations: list[tuple[str, str, float]] = []
+        self._lock = threading.Lock()
+
+    def record(self, path: tuple[str, ...], elapsed: float, category: str | None, key: str | None) -> None:
+        """Add one finished phase."""
+        with self._lock:
+            entry = self.stacks.get(path)
+            if entry is None:
+                self.stacks[path] = [1, elapsed]
+            else:
+                entry[0] += 1
+                entry[1] += elapsed
+            self.observations.append(("phase", path[-1], elapsed))
+            if category is not None:
+                self.observations.append((category, key or path[-1], elapsed))
+
+    def folded(self) -> list[str]:
+        """Return the run as collapsed stacks (``a;b;c <microseconds>``) for flame graph tools.
+
+        Each line carries the self time of its stack. Children that ran in
+        parallel (tools, sub-agents) can add up to more than their parent's
+        wall time; the parent's self time is then reported as zero.
+        """
+        with self._lock:
+            stacks = {path: entry[1] for path, entry in self.stacks.items()}
+        child_time: dict[tuple[str, ...], float] = {}
+        for path, total in stacks.items():
+            if len(path) > 1:
+                child_time[path[:-1]] = child_time.get(path[:-1], 0.0) + total
+        lines = []
+        for path in sorted(stacks):
+            self_time = max(0.0, stacks[path] - child_time.get(path, 0.0))
+            lines.append(f"{';'.join(path)} {round(self_time * 1_000_000)}")
+        return lines
+
+    def report(self) -> str:
+        """Return a readable tree of phases with total time, calls and share of the run."""
+        with self._lock:
+            stacks = {path: (int(entry[0]), entry[1]) for path, entry in self.stacks.items()}
+        run_total = self.duration or max((total for _, total in stacks.values()), default=0.0)
+        lines = [f"Profile of agent '{self.agent_name}' run {self.run_id}: {run_total * 1000:.1f} ms"]
+        for path in sorted(stacks):
+            calls, total = stacks[path]
+            share = total / run_total * 100 if run_total else 0.0
+            lines.append(f"{'  ' * len(path)}{path[-1]}: {total * 1000:.1f} ms, {calls} call(s), {share:.1f}%")
+        return "\n".join(lines)
+
+    def to_dict(self) -> dict[str, Any]:
+        """Return the run's stacks as plain data."""
+        with self._lock:
+            stacks = [
+                {"stack": list(path), "calls": int(entry[0]), "total_ms": entry[1] * 1000} for path, entry in sorted(self.stacks.items())
+            ]
+        return {
+            "run_id": self.run_id,
+            "agent_name": self.agent_name,
+            "agent_id": self.agent_id,
+            "started_at": self.started_at,
+            "duration_ms": self.duration * 1000 if self.duration is not None else None,
+            "stacks": stacks,
+        }
+
+
+class ProfilingMiddleware(Middleware):
+    """Profile every run of the agents it is configured on.
+
+    While an agent with this middleware runs, the phases of each iteration are
+    timed: before-model hooks, token counting, the model call with its network
+    time, time to first streamed chunk and stream aggregation, response
+    parsing, after-model hooks, each tool and sub-agent call, and result
+    formatting. Each finished run is kept in :attr:`runs` and, with
+    ``report_dir``, written as a collapsed-stack ``.folded`` file that flame
+    graph tools (``flamegraph.pl``, speedscope) render directly.
+
+    :meth:`summary` aggregates latency percentiles per agent, model, tool,
+    sub-agent and phase across runs. Recording costs two ``perf_counter``
+    calls and a short lock per phase, so the middleware can stay enabled.
+    """
+
+    def __init__(
+        self,
+        *,
+        report_dir: str | Path | None = None,
+        keep_runs: int = 20,
+        log_reports: bool = False,
+        buckets_ms: Sequence[float] = DEFAULT_LATENCY_BUCKETS_MS,
+    ) -> None:
+        """Initialize the profiler.
+
+        Args:
+            report_dir: Directory receiving ``<agent>-<run_id>.folded`` per finished run
+            keep_runs: Number of finished runs kept in memory
+            log_reports: Log the phase tree of every finished run at INFO
+            buckets_ms: Upper bounds of the latency histogram buckets
+        """
+        self.report_dir = Path(report_dir) if report_dir is not None else None
+        self.log_reports = log_reports
+        self.buckets_ms = tuple(buckets_ms)
+        self.runs: deque[ProfileRun] = deque(maxlen=max(1, keep_runs))
+        self._histograms: dict[tuple[str, str], LatencyHistogram] = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def profile_run(self, agent_name: str, agent_id: str | None = None) -> Iterator[ProfileRun]:
+        """Profile the enclosed agent run; used by the executor around each execution."""
+        run = ProfileRun(agent_name, agent_id)
+        root = _Phase(run, agent_name, "agent", agent_name)
+        root.path = (agent_name,)
+        token = _current_phase.set(root)
+        start = time.perf_counter()
+        try:
+            yield run
+        finally:
+            run.duration = time.perf_counter() - start
+            _current_phase.reset(token)
+            run.record(root.path, run.duration, "agent", agent_name)
+            self._finish_run(run)
+
+    def stream_chunk(self, chunk: Any, params: ModelCallParams) -> Any:
+        """Mark the first chunk of each streamed model call attempt."""
+        profile_mark_once("first_byte")
+        return chunk
+
+    @property
+    def last_run(self) -> ProfileRun | None:
+        """The most recently finished run."""
+        return self.runs[-1] if self.runs else None
+
+    def summary(self) -> dict[str, dict[str, dict[str, Any]]]:
+        """Return latency percentiles per category and name across the finished runs."""
+        with self._lock:
+            result: dict[str, dict[str, dict[str, Any]]] = {category: {} for category in PROFILE_CATEGORIES}
+            for (category, key), histogram in sorted(self._histograms.items()):
+                result.setdefault(category, {})[key] = histogram.to_dict()
+            return result
+
+    def reset(self) -> None:
+        """Drop the finished runs and the aggregated histograms."""
+        with self._lock:
+            self.runs.clear()
+            self._histograms.clear()
+
+    def _finish_run(self, run: ProfileRun) -> None:
+        with self._lock:
+            for category, key, elapsed in run.observations:
+                histogram = self._histograms.get((category, key))
+                if histogram is None:
+                    histogram = self._histograms[(category, key)] = LatencyHistogram(self.buckets_ms)
+                histogram.observe(elapsed * 1000)
+            self.runs.append(run)
+        if self.log_reports:
+            logger.info("⏱️ %s", run.report())
+        if self.report_dir is not None:
+            try:
+                self.report_dir.mkdir(parents=True, exist_ok=True)
+                path = self.report_dir / f"{run.agent_name}-{run.run_id}.folded"
+                path.write_text("\n".join(run.folded()) + "\n", encoding="utf-8")
+            except OSError as exc:
+                logger.warning(f"⚠️ Failed to write profile report: {exc}")
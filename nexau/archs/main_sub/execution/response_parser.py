@@ -23,7 +23,7 @@ import xml.etree.ElementTree as ET
 from typing import Any, cast
 
 from ..sub_agent_naming import extract_sub_agent_name, is_sub_agent_tool_name
-from ..utils.xml_utils import XMLParser
+from ..utils.xml_utils import ToolCallStreamParser, XMLParser
 from .model_response import ModelResponse
 from .parse_structures import BatchAgentCall, ParsedResponse, SubAgentCall, ToolCall
 
@@ -118,30 +118,20 @@ class ResponseParser:
     ) -> dict[str, bool]:
         """Parse XML-based constructs from the response text."""
         report = {"is_parallel_tools": False}
+        blocks = ToolCallStreamParser.scan(response_text)
+
         # Batch agent calls
-        batch_agent_pattern = r"<use_batch_agent>(.*?)</use_batch_agent>"
-        batch_agent_match = re.search(batch_agent_pattern, response_text, re.DOTALL)
-        if batch_agent_match:
+        if blocks.batch_agent is not None:
             logger.info("📊 Found batch agent call")
-            batch_call = self._parse_batch_agent_call(batch_agent_match.group(1))
+            batch_call = self._parse_batch_agent_call(blocks.batch_agent)
             if batch_call:
                 batch_agent_calls.append(batch_call)
 
         # Parallel tool calls (XML-only feature)
-        parallel_tool_calls_pattern = r"<use_parallel_tool_calls>(.*?)</use_parallel_tool_calls>"
-        parallel_tool_calls_match = re.search(
-            parallel_tool_calls_pattern,
-            response_text,
-            re.DOTALL,
-        )
-
-        if parallel_tool_calls_match:
+        if blocks.parallel_tools is not None:
             logger.info("🔧⚡ Found parallel tool calls")
             report["is_parallel_tools"] = True
-            parallel_content = parallel_tool_calls_match.group(1)
-            tool_pattern = r"<parallel_tool>(.*?)</parallel_tool>"
-            tool_matches = re.findall(tool_pattern, parallel_content, re.DOTALL)
-            for tool_xml in tool_matches:
+            for tool_xml in blocks.parallel_tools:
                 tool_call = self._parse_tool_call(tool_xml)
                 if tool_call is None:
                     continue
@@ -154,9 +144,7 @@ class ResponseParser:
             return report  # Parallel block already parsed individual calls
 
         # Individual XML tool calls (only if not already parsed in parallel block)
-        tool_pattern = r"<tool_use>(.*?)</tool_use>"
-        tool_matches = re.findall(tool_pattern, response_text, re.DOTALL)
-        for tool_xml in tool_matches:
+        for tool_xml in blocks.tool_uses:
             tool_call = self._parse_tool_call(tool_xml)
             if tool_call is None:
                 continue
@@ -0,0 +1,176 @@
+# Copyright (c) Nex-AGI. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Dispatch tool calls while the model response is still streaming."""
+
+from __future__ import annotations
+
+import json
+import logging
+import threading
+from collections import defaultdict
+from collections.abc import Callable
+from typing import Any, Protocol, runtime_checkable
+
+from ..sub_agent_naming import is_sub_agent_tool_name
+from ..utils.xml_utils import ToolCallStreamParser
+from .model_response import ModelToolCall
+from .parse_structures import ToolCall
+
+logger = logging.getLogger(__name__)
+
+# Closed XML blocks that hold a single tool call
+_XML_TOOL_CALL_TAGS = frozenset({"tool_use", "parallel_tool"})
+
+
+class ToolCallStreamListener(Protocol):
+    """Receives events from the stream aggregators as the model generates."""
+
+    def begin_attempt(self) -> None:
+        """Called before each (re)try of the model call."""
+        ...
+
+    def on_text_delta(self, delta: str) -> None:
+        """Called with every streamed text fragment."""
+        ...
+
+    def on_tool_call(self, tool_call: ModelToolCall) -> None:
+        """Called once a structured tool call has been fully streamed."""
+        ...
+
+
+@runtime_checkable
+class StreamDeltaListener(Protocol):
+    """Optional listener extension for reasoning and tool-call argument deltas.
+
+    Aggregators only report these to listeners that implement both methods.
+    """
+
+    def on_reasoning_delta(self, delta: str) -> None:
+        """Called with every streamed reasoning fragment."""
+        ...
+
+    def on_tool_call_delta(self, key: int | str, call_id: str | None, name: str | None, arguments_delta: str) -> None:
+        """Called when a structured tool call starts or streams part of its arguments.
+
+        ``key`` identifies the call within the response (its index or output
+        item id); ``call_id`` and ``name`` are None until the provider sends them.
+        """
+        ...
+
+
+class StreamingToolDispatcher:
+    """Start tool calls as soon as they are complete in the model stream.
+
+    The dispatcher listens to the stream aggregators. Each completed tool call
+    (a closed ``</tool_use>`` or ``</parallel_tool>`` block in XML mode, or a
+    finished function-call item in structured modes) is submitted right away.
+    Once the full response has been parsed, the executor claims the running
+    handle for each parsed call instead of submitting it again, so results are
+    assembled exactly as before.
+
+    Sub-agent calls and serial tools are never dispatched early. Calls are
+    matched by tool name and arguments, so a call that after-model middleware
+    removes or rewrites is not claimed; its handle is cancelled if it has not
+    started yet.
+    """
+
+    def __init__(
+        self,
+        submit: Callable[[ToolCall], Any],
+        parse_tool_xml: Callable[[str], ToolCall | None],
+        skip_tools: set[str] | None = None,
+    ):
+        """Initialize dispatcher.
+
+        Args:
+            submit: Starts a tool call and returns a cancellable handle (a
+                ``concurrent.futures.Future`` or an ``asyncio.Task``)
+            parse_tool_xml: Parses the inner XML of a tool call block
+            skip_tools: Tool names that must not be dispatched early
+        """
+        self._submit = submit
+        self._parse_tool_xml = parse_tool_xml
+        self._skip_tools = set(skip_tools or ())
+        self._lock = threading.Lock()
+        self._dispatched: defaultdict[tuple[str, str], list[Any]] = defaultdict(list)
+        self._attempt_counts: defaultdict[tuple[str, str], int] = defaultdict(int)
+        self._xml_parser = ToolCallStreamParser()
+
+    @property
+    def dispatched_count(self) -> int:
+        """Number of handles dispatched and not yet claimed or released."""
+        with self._lock:
+            return sum(len(handles) for handles in self._dispatched.values())
+
+    def begin_attempt(self) -> None:
+        # A retried model call streams the same calls again; they are matched
+        # against what the failed attempt already started instead of re-run.
+        with self._lock:
+            self._attempt_counts.clear()
+            self._xml_parser = ToolCallStreamParser()
+
+    def on_text_delta(self, delta: str) -> None:
+        if not delta:
+            return
+        for tag, content in self._xml_parser.feed(delta):
+            if tag not in _XML_TOOL_CALL_TAGS:
+                continue
+            tool_call = self._parse_tool_xml(content)
+            if tool_call is not None:
+                self._dispatch(tool_call)
+
+    def on_tool_call(self, tool_call: ModelToolCall) -> None:
+        self._dispatch(
+            ToolCall(
+                tool_name=tool_call.name,
+                parameters=tool_call.arguments if isinstance(tool_call.arguments, dict) else {"raw_arguments": tool_call.arguments},
+                raw_content=tool_call.raw_arguments,
+                tool_call_id=tool_call.call_id,
+                source="openai",
+            ),
+        )
+
+    def claim(self, tool_call: ToolCall) -> Any | None:
+        """Return the running handle for a parsed tool call, if one was dispatched."""
+        with self._lock:
+            handles = self._dispatched.get(_call_key(tool_call))
+            if handles:
+                return handles.pop(0)
+        return None
+
+    def release_unclaimed(self) -> list[Any]:
+        """Return and forget every handle that was never claimed."""
+        with self._lock:
+            handles = [handle for pending in self._dispatched.values() for handle in pending]
+            self._dispatched.clear()
+        return handles
+
+    def _dispatch(self, tool_call: ToolCall) -> None:
+        if is_sub_agent_tool_name(tool_call.tool_name) or tool_call.tool_name in self._skip_tools:
+            return
+
+        key = _call_key(tool_call)
+        with self._lock:
+            occurrence = self._attempt_counts[key]
+            self._attempt_counts[key] += 1
+            if occurrence < len(self._dispatched[key]):
+                return
+            self._dispatched[key].append(self._submit(tool_call))
+
+        logger.info(f"⚡ Dispatched tool '{tool_call.tool_name}' while the model is still streaming")
+
+
+def _call_key(tool_call: ToolCall) -> tuple[str, str]:
+    return tool_call.tool_name, json.dumps(tool_call.parameters, sort_keys=True, ensure_ascii=False, default=str)
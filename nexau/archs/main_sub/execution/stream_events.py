@@ -0,0 +1,336 @@
+# Copyright (c) Nex-AGI. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Normalized events streamed by ``Agent.run_stream`` and ``Agent.arun_stream``."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+from collections import deque
+from collections.abc import AsyncIterator, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from enum import StrEnum
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from ..agent_state import AgentState
+    from .model_response import ModelResponse, ModelToolCall
+    from .parse_structures import ParsedResponse
+    from .stream_dispatch import ToolCallStreamListener
+
+logger = logging.getLogger(__name__)
+
+# How often producers on an event loop re-check for room in a full stream
+_DRAIN_POLL_INTERVAL = 0.005
+
+
+class StreamEventType(StrEnum):
+    """Kinds of events an agent run emits while streaming."""
+
+    TEXT_DELTA = "text_delta"
+    REASONING_DELTA = "reasoning_delta"
+    TOOL_CALL_START = "tool_call_start"
+    TOOL_CALL_ARGS = "tool_call_args"
+    TOOL_CALL_END = "tool_call_end"
+    TOOL_RESULT = "tool_result"
+    SUB_AGENT_START = "sub_agent_start"
+    SUB_AGENT_COMPLETE = "sub_agent_complete"
+    SUB_AGENT_ERROR = "sub_agent_error"
+    MODEL_RETRY = "model_retry"
+    DONE = "done"
+    ERROR = "error"
+
+
+@dataclass
+class StreamEvent:
+    """One normalized event of a streaming agent run.
+
+    Attributes:
+        type: What happened
+        agent_name: Name of the agent (or sub-agent) that emitted the event
+        agent_id: Id of the emitting agent
+        parent_agent_id: Id of the calling agent when emitted by a sub-agent
+        data: Event payload, e.g. ``{"text": ...}`` for text deltas
+    """
+
+    type: StreamEventType
+    agent_name: str = ""
+    agent_id: str = ""
+    parent_agent_id: str | None = None
+    data: dict[str, Any] = field(default_factory=dict)
+
+    @classmethod
+    def for_agent(cls, agent_state: AgentState | None, event_type: StreamEventType, data: dict[str, Any]) -> StreamEvent:
+        """Build an event attributed to the agent owning ``agent_state``."""
+        if agent_state is None:
+            return cls(type=event_type, data=data)
+        parent_state = agent_state.parent_agent_state
+        return cls(
+            type=event_type,
+            agent_name=agent_state.agent_name,
+            agent_id=agent_state.agent_id,
+            parent_agent_id=parent_state.agent_id if parent_state is not None else None,
+            data=data,
+        )
+
+    def to_dict(self) -> dict[str, Any]:
+        """Return a JSON-friendly representation."""
+        payload: dict[str, Any] = {
+            "type": self.type.value,
+            "agent_name": self.agent_name,
+            "agent_id": self.agent_id,
+            "data": self.data,
+        }
+        if self.parent_agent_id is not None:
+            payload["parent_agent_id"] = self.parent_agent_id
+        return payload
+
+
+class AgentEventStream:
+    """Bounded channel carrying stream events from a running agent to one consumer.
+
+    Producers block in :meth:`emit` while ``max_pending`` events are waiting,
+    so a slow consumer slows the model stream and tool reporting down instead
+    of letting events pile up. Code running on an event loop is never blocked:
+    ``emit`` enqueues immediately there, and async model streams await
+    :meth:`adrain` between chunks instead. Once the consumer closes the stream,
+    further events are dropped.
+    """
+
+    def __init__(self, max_pending: int = 256):
+        """Initialize stream.
+
+        Args:
+            max_pending: Number of undelivered events before producers wait
+        """
+        self.max_pending = max(1, max_pending)
+        self._events: deque[StreamEvent] = deque()
+        self._condition = threading.Condition()
+        self._closed = False
+        self._finished = False
+        self._waiter: tuple[asyncio.AbstractEventLoop, asyncio.Event] | None = None
+
+    @property
+    def closed(self) -> bool:
+        """Whether the consumer has stopped reading."""
+        return self._closed
+
+    def emit(self, event: StreamEvent) -> None:
+        """Queue an event, waiting for room unless called from an event loop."""
+        with self._condition:
+            if self._closed:
+                return
+            if not _on_event_loop():
+                while len(self._events) >= self.max_pending and not self._closed:
+                    self._condition.wait()
+                if self._closed:
+                    return
+            self._events.append(event)
+            self._condition.notify_all()
+            waiter, self._waiter = self._waiter, None
+        if waiter is not None:
+            loop, ready = waiter
+            loop.call_soon_threadsafe(ready.set)
+
+    async def adrain(self) -> None:
+        """Wait until the consumer has room for more events."""
+        while len(self._events) >= self.max_pending and not self._closed:
+            await asyncio.sleep(_DRAIN_POLL_INTERVAL)
+
+    def finish(self) -> None:
+        """Mark the run as complete; the consumer stops after the queued events."""
+        with self._condition:
+            self._finished = True
+            self._condition.notify_all()
+            waiter, self._waiter = self._waiter, None
+        if waiter is not None:
+            loop, ready = waiter
+            loop.call_soon_threadsafe(ready.set)
+
+    def close(self) -> None:
+        """Stop consuming; pending and future events are discarded."""
+        with self._condition:
+            self._closed = True
+            self._events.clear()
+            self._condition.notify_all()
+
+    def get(self) -> StreamEvent | None:
+        """Return the next event, blocking until one arrives; None once the run is over."""
+        with self._condition:
+            while not self._events:
+                if self._finished or self._closed:
+                    return None
+                self._condition.wait()
+            event = self._events.popleft()
+            self._condition.notify_all()
+            return event
+
+    async def aget(self) -> StreamEvent | None:
+        """Async counterpart of :meth:`get` that waits without blocking the loop."""
+        loop = asyncio.get_running_loop()
+        while True:
+            with self._condition:
+                if self._events:
+                    event = self._events.popleft()
+                    self._condition.notify_all()
+                    return event
+                if self._finished or self._closed:
+                    return None
+                ready = asyncio.Event()
+                self._waiter = (loop, ready)
+            await ready.wait()
+
+    def __iter__(self) -> Iterator[StreamEvent]:
+        while (event := self.get()) is not None:
+            yield event
+
+    async def __aiter__(self) -> AsyncIterator[StreamEvent]:
+        while (event := await self.aget()) is not None:
+            yield event
+
+    @contextmanager
+    def activate(self) -> Iterator[AgentEventStream]:
+        """Make this the stream that agent runs in the current context report to."""
+        token = _current_stream.set(self)
+        try:
+            yield self
+        finally:
+            _current_stream.reset(token)
+
+
+def _on_event_loop() -> bool:
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+
+_current_stream: ContextVar[AgentEventStream | None] = ContextVar("nexau_event_stream", default=None)
+
+
+def get_current_event_stream() -> AgentEventStream | None:
+    """Return the stream the current run reports to, if it is being streamed."""
+    return _current_stream.get()
+
+
+def emit_stream_event(agent_state: AgentState | None, event_type: StreamEventType, **data: Any) -> None:
+    """Emit an event to the current stream; a no-op when the run is not streamed."""
+    stream = _current_stream.get()
+    if stream is None:
+        return
+    stream.emit(StreamEvent.for_agent(agent_state, event_type, data))
+
+
+class StreamEventListener:
+    """Turn stream aggregator callbacks into stream events for one model call.
+
+    Wraps the executor's own listener (the streaming tool dispatcher), so
+    early tool dispatch keeps working while events are reported. Whatever the
+    provider did not stream incrementally (non-streaming calls, tool calls
+    embedded as XML in the text) is emitted by :meth:`finish_model_call`.
+    """
+
+    def __init__(
+        self,
+        stream: AgentEventStream,
+        agent_state: AgentState | None,
+        inner: ToolCallStreamListener | None = None,
+    ):
+        """Initialize listener.
+
+        Args:
+            stream: Stream receiving the events
+            agent_state: State of the agent making the model call
+            inner: Listener to forward aggregator callbacks to
+        """
+        self._stream = stream
+        self._agent_state = agent_state
+        self._inner = inner
+        self._attempts = 0
+        self._text_streamed = False
+        self._reasoning_streamed = False
+        self._started_calls: dict[int | str, str | None] = {}
+        self._ended_calls: set[str] = set()
+
+    def _emit(self, event_type: StreamEventType, **data: Any) -> None:
+        self._stream.emit(StreamEvent.for_agent(self._agent_state, event_type, data))
+
+    def begin_attempt(self) -> None:
+        if self._inner is not None:
+            self._inner.begin_attempt()
+        if self._attempts:
+            # Consumers should discard the partial output of the failed attempt
+            self._emit(StreamEventType.MODEL_RETRY, attempt=self._attempts)
+        self._attempts += 1
+        self._text_streamed = False
+        self._reasoning_streamed = False
+        self._started_calls.clear()
+        self._ended_calls.clear()
+
+    def on_text_delta(self, delta: str) -> None:
+        if self._inner is not None:
+            self._inner.on_text_delta(delta)
+        if delta:
+            self._text_streamed = True
+            self._emit(StreamEventType.TEXT_DELTA, text=delta)
+
+    def on_reasoning_delta(self, delta: str) -> None:
+        if delta:
+            self._reasoning_streamed = True
+            self._emit(StreamEventType.REASONING_DELTA, text=delta)
+
+    def on_tool_call_delta(self, key: int | str, call_id: str | None, name: str | None, arguments_delta: str) -> None:
+        if key not in self._started_calls:
+            self._started_calls[key] = call_id
+            self._emit(StreamEventType.TOOL_CALL_START, index=key, call_id=call_id, name=name)
+        elif call_id and self._started_calls[key] is None:
+            self._started_calls[key] = call_id
+        if arguments_delta:
+            self._emit(StreamEventType.TOOL_CALL_ARGS, index=key, call_id=self._started_calls[key], delta=arguments_delta)
+
+    def on_tool_call(self, tool_call: ModelToolCall) -> None:
+        if self._inner is not None:
+            self._inner.on_tool_call(tool_call)
+        if tool_call.call_id:
+            self._ended_calls.add(tool_call.call_id)
+        self._emit(StreamEventType.TOOL_CALL_END, call_id=tool_call.call_id, name=tool_call.name, arguments=tool_call.arguments)
+
+    async def adrain(self) -> None:
+        await self._stream.adrain()
+
+    def finish_model_call(self, model_response: ModelResponse, parsed_response: ParsedResponse | None) -> None:
+        """Emit the parts of a finished model call that were not streamed."""
+        if not self._reasoning_streamed and model_response.reasoning_content:
+            self._emit(StreamEventType.REASONING_DELTA, text=model_response.reasoning_content)
+        if not self._text_streamed and model_response.content:
+            self._emit(StreamEventType.TEXT_DELTA, text=model_response.content)
+        if parsed_response is None:
+            return
+        for tool_call in parsed_response.tool_calls:
+            if tool_call.tool_call_id in self._ended_calls:
+                continue
+            self._emit(
+                StreamEventType.TOOL_CALL_START, index=tool_call.tool_call_id, call_id=tool_call.tool_call_id, name=tool_call.tool_name
+            )
+            self._emit(
+                StreamEventType.TOOL_CALL_END,
+                call_id=tool_call.tool_call_id,
+                name=tool_call.tool_name,
+                arguments=tool_call.parameters,
+            )
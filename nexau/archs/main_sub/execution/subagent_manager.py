@@ -20,6 +20,9 @@ from collections.abc import Callable
 from typing import Any
 
 from nexau.archs.main_sub.agent_state import AgentState
+from nexau.archs.main_sub.execution.subagent_pool import SubAgentPool
+from nexau.archs.main_sub.prompt_cache import agent_config_fingerprint
+from nexau.archs.main_sub.utils.logging_utils import capped, log_fields
 from nexau.archs.main_sub.utils.xml_utils import XMLParser
 
 logger = logging.getLogger(__name__)
@@ -33,6 +36,9 @@ class SubAgentManager:
         agent_name: str,
         sub_agent_factories: dict[str, Callable[..., Any]],
         global_storage=None,
+        pool_min_size: int = 0,
+        pool_max_size: int = 4,
+        pool_idle_timeout: float | None = 300.0,
     ):
         """Initialize sub-agent manager.
 
@@ -40,6 +46,9 @@ class SubAgentManager:
             agent_name: Name of the parent agent
             sub_agent_factories: Dictionary mapping sub-agent names to factory functions
             global_storage: Optional global storage to share with sub-agents
+            pool_min_size: Idle instances per sub-agent that are never evicted
+            pool_max_size: Idle instances kept warm per sub-agent (0 disables reuse)
+            pool_idle_timeout: Seconds before surplus idle instances are stopped
         """
         from nexau.archs.main_sub.agent import Agent
 
@@ -49,6 +58,12 @@ class SubAgentManager:
         self.xml_parser = XMLParser()
         self._shutdown_event = threading.Event()
         self.running_sub_agents: dict[str, Agent] = {}
+        self.pool_min_size = pool_min_size
+        self.pool_max_size = pool_max_size
+        self.pool_idle_timeout = pool_idle_timeout
+        self._pools: dict[str, SubAgentPool] = {}
+        self._pools_lock = threading.Lock()
+        self._config_fingerprints: dict[str, str] = {}
 
     def call_sub_agent(
         self,
@@ -71,8 +86,75 @@ class SubAgentManager:
             RuntimeError: If agent is shutting down
             ValueError: If sub-agent is not found
         """
-        from ..agent_context import get_context
+        sub_agent = self._start_sub_agent(sub_agent_name, message)
+
+        succeeded = False
+        try:
+            result = sub_agent.run(
+                message,
+                context=self._resolve_context(context),
+                parent_agent_state=parent_agent_state,
+            )
+
+            logger.info(
+                f"✅ Sub-agent '{sub_agent_name}' returned result to agent '{self.agent_name}'",
+            )
+            succeeded = True
+            return result
+
+        except Exception as e:
+            logger.error(f"❌ Sub-agent '{sub_agent_name}' failed: {e}")
+            raise
+
+        finally:
+            self._finish_sub_agent(sub_agent_name, sub_agent, succeeded)
+
+    async def acall_sub_agent(
+        self,
+        sub_agent_name: str,
+        message: str,
+        context: dict[str, Any] | None = None,
+        parent_agent_state: AgentState | None = None,
+    ) -> str:
+        """Async counterpart of :meth:`call_sub_agent` that awaits ``Agent.arun``.
+
+        Args:
+            sub_agent_name: Name of the sub-agent to call
+            message: Message to send to the sub-agent
+            context: Optional context to pass
+
+        Returns:
+            Result from the sub-agent
+
+        Raises:
+            RuntimeError: If agent is shutting down
+            ValueError: If sub-agent is not found
+        """
+        sub_agent = self._start_sub_agent(sub_agent_name, message)
 
+        succeeded = False
+        try:
+            result = await sub_agent.arun(
+                message,
+                context=self._resolve_context(context),
+                parent_agent_state=parent_agent_state,
+            )
+
+            logger.info(
+                f"✅ Sub-agent '{sub_agent_name}' returned result to agent '{self.agent_name}'",
+            )
+            succeeded = True
+            return result
+
+        except Exception as e:
+            logger.error(f"❌ Sub-agent '{sub_agent_name}' failed: {e}")
+            raise
+
+        finally:
+            self._finish_sub_agent(sub_agent_name, sub_agent, succeeded)
+
+    def _start_sub_agent(self, sub_agent_name: str, message: str) -> Any:
+        """Validate the call, take a sub-agent from its pool and register it as running."""
         # Check if agent is shutting down
         if self._shutdown_event.is_set():
             logger.warning(
@@ -81,7 +163,11 @@ class SubAgentManager:
             raise RuntimeError(f"Agent '{self.agent_name}' is shutting down")
 
         logger.info(
-            f"🤖➡️🤖 Agent '{self.agent_name}' calling sub-agent '{sub_agent_name}' with message: {message}",
+            "🤖➡️🤖 Agent '%s' calling sub-agent '%s' with message: %s",
+            self.agent_name,
+            sub_agent_name,
+            capped(message),
+            extra=log_fields(agent=self.agent_name, sub_agent=sub_agent_name),
         )
 
         if sub_agent_name not in self.sub_agent_factories:
@@ -89,7 +175,70 @@ class SubAgentManager:
             logger.error(f"❌ {error_msg}")
             raise ValueError(error_msg)
 
-        # Instantiate a fresh sub-agent from the factory
+        sub_agent = self.get_pool(sub_agent_name).acquire()
+        self.running_sub_agents[sub_agent.config.agent_id] = sub_agent
+        return sub_agent
+
+    def _finish_sub_agent(self, sub_agent_name: str, sub_agent: Any, succeeded: bool) -> None:
+        """Unregister a finished sub-agent and hand it back to its pool."""
+        self.running_sub_agents.pop(sub_agent.config.agent_id, None)
+        pool = self._pools.get(sub_agent_name)
+        if pool is None:
+            return
+        if succeeded and not self._shutdown_event.is_set():
+            pool.release(sub_agent)
+        else:
+            # A failed run may leave partial state behind; never reuse it
+            pool.discard(sub_agent)
+
+    def get_pool(self, sub_agent_name: str) -> SubAgentPool:
+        """Return the warm pool for a sub-agent, creating it on first use.
+
+        Raises:
+            ValueError: If sub-agent is not found
+        """
+        if sub_agent_name not in self.sub_agent_factories:
+            raise ValueError(f"Sub-agent '{sub_agent_name}' not found")
+        with self._pools_lock:
+            pool = self._pools.get(sub_agent_name)
+            if pool is None:
+                pool = SubAgentPool(
+                    sub_agent_name,
+                    lambda: self._build_sub_agent(sub_agent_name),
+                    min_size=self.pool_min_size,
+                    max_size=self.pool_max_size,
+                    idle_timeout=self.pool_idle_timeout,
+                )
+                self._pools[sub_agent_name] = pool
+            return pool
+
+    def config_fingerprint(self, sub_agent_name: str) -> str:
+        """Return the fingerprint of a sub-agent's configuration.
+
+        Computed once per factory from a pooled instance, so results produced
+        by one configuration can be told apart from those of another.
+
+        Raises:
+            ValueError: If sub-agent is not found
+        """
+        fingerprint = self._config_fingerprints.get(sub_agent_name)
+        if fingerprint is None:
+            pool = self.get_pool(sub_agent_name)
+            sub_agent = pool.acquire()
+            try:
+                fingerprint = agent_config_fingerprint(sub_agent.config)
+            finally:
+                pool.release(sub_agent)
+            self._config_fingerprints[sub_agent_name] = fingerprint
+        return fingerprint
+
+    def prewarm(self, sub_agent_names: list[str] | None = None) -> None:
+        """Build ``pool_min_size`` idle instances for the given (or all) sub-agents."""
+        for sub_agent_name in sub_agent_names or list(self.sub_agent_factories):
+            self.get_pool(sub_agent_name).prewarm()
+
+    def _build_sub_agent(self, sub_agent_name: str) -> Any:
+        """Instantiate a fresh sub-agent from its factory."""
         sub_agent_factory = self.sub_agent_factories[sub_agent_name]
 
         # Try to create sub-agent with global storage if available
@@ -113,39 +262,27 @@ class SubAgentManager:
                     sub_agent.executor.subagent_manager.global_storage = self.global_storage
         else:
             sub_agent = sub_agent_factory()
-        self.running_sub_agents[sub_agent.config.agent_id] = sub_agent
+        return sub_agent
 
-        try:
-            effective_context = None
-            if context:
-                effective_context = context
-            else:
-                # Pass current agent context state, config, and context to sub-agent
-                current_context = get_context()
-                if current_context:
-                    # Use context from current agent context if not explicitly provided
-                    effective_context = current_context.context.copy()
-
-            result = sub_agent.run(
-                message,
-                context=effective_context,
-                parent_agent_state=parent_agent_state,
-            )
+    @staticmethod
+    def _resolve_context(context: dict[str, Any] | None) -> dict[str, Any] | None:
+        """Use the explicit context, or inherit the caller's current agent context."""
+        from ..agent_context import get_context
 
-            logger.info(
-                f"✅ Sub-agent '{sub_agent_name}' returned result to agent '{self.agent_name}'",
-            )
-            self.running_sub_agents.pop(sub_agent.config.agent_id)
-            return result
+        if context:
+            return context
 
-        except Exception as e:
-            logger.error(f"❌ Sub-agent '{sub_agent_name}' failed: {e}")
-            raise
+        # Pass current agent context state, config, and context to sub-agent
+        current_context = get_context()
+        if current_context:
+            # Use context from current agent context if not explicitly provided
+            return current_context.context.copy()
+        return None
 
     def shutdown(self):
         """Signal shutdown to prevent new sub-agent tasks."""
         self._shutdown_event.set()
-        for sub_agent_id, sub_agent in self.running_sub_agents.items():
+        for sub_agent_id, sub_agent in list(self.running_sub_agents.items()):
             try:
                 sub_agent.stop()
             except Exception as e:
@@ -153,6 +290,12 @@ class SubAgentManager:
                     f"❌ Error shutting down sub-agent {sub_agent_id}: {e}",
                 )
 
+        with self._pools_lock:
+            pools = list(self._pools.values())
+            self._pools.clear()
+        for pool in pools:
+            pool.shutdown()
+
     def add_sub_agent(self, name: str, agent_factory: Callable[[], Any]):
         """Add a sub-agent factory for delegation.
 
@@ -161,3 +304,9 @@ class SubAgentManager:
             agent_factory: Factory function that creates the agent
         """
         self.sub_agent_factories[name] = agent_factory
+        self._config_fingerprints.pop(name, None)
+        # Instances built by a replaced factory must not be handed out again
+        with self._pools_lock:
+            stale_pool = self._pools.pop(name, None)
+        if stale_pool is not None:
+            stale_pool.shutdown()
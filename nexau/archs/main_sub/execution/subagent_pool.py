@@ -0,0 +1,157 @@
+# Copyright (c) Nex-AGI. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Warm pool of pre-built sub-agent instances."""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+
+class SubAgentPool:
+    """Keep built sub-agents of one kind around for reuse.
+
+    Building a sub-agent can be expensive (YAML loading, tool imports, MCP
+    initialization), so finished instances are reset and parked here instead
+    of being thrown away. Each concurrent caller still gets its own instance;
+    the pool only bounds how many idle instances are kept warm.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        factory: Callable[[], Any],
+        min_size: int = 0,
+        max_size: int = 4,
+        idle_timeout: float | None = 300.0,
+    ):
+        """Initialize sub-agent pool.
+
+        Args:
+            name: Sub-agent name, used for logging
+            factory: Builds a new sub-agent instance
+            min_size: Idle instances kept even when they exceed ``idle_timeout``
+            max_size: Maximum number of idle instances kept warm; 0 disables reuse
+            idle_timeout: Seconds an idle instance above ``min_size`` is kept;
+                None keeps instances until shutdown
+        """
+        self.name = name
+        self.factory = factory
+        self.max_size = max(0, max_size)
+        self.min_size = min(max(0, min_size), self.max_size)
+        self.idle_timeout = idle_timeout
+        self._idle: deque[tuple[Any, float]] = deque()
+        self._lock = threading.Lock()
+        self._closed = False
+        self._created = 0
+        self._reused = 0
+
+    def acquire(self) -> Any:
+        """Return a warm instance, building a new one if none is idle."""
+        self.evict_idle()
+        with self._lock:
+            if self._idle:
+                agent, _ = self._idle.pop()
+                self._reused += 1
+                logger.debug(f"♻️ Reusing pooled sub-agent '{self.name}'")
+                return agent
+        return self._build()
+
+    def release(self, agent: Any) -> None:
+        """Reset ``agent`` and park it for reuse, or stop it if the pool is full."""
+        try:
+            agent.reset()
+        except Exception as e:
+            logger.warning(f"⚠️ Could not reset sub-agent '{self.name}', discarding it: {e}")
+            self.discard(agent)
+            return
+
+        with self._lock:
+            if not self._closed and len(self._idle) < self.max_size:
+                self._idle.append((agent, time.monotonic()))
+                return
+        self.discard(agent)
+
+    def discard(self, agent: Any) -> None:
+        """Stop an instance that will not be reused."""
+        try:
+            agent.stop()
+        except Exception as e:
+            logger.error(f"❌ Error stopping sub-agent '{self.name}': {e}")
+
+    def prewarm(self) -> int:
+        """Build idle instances up to ``min_size`` and return how many were added."""
+        with self._lock:
+            missing = self.min_size - len(self._idle)
+        added = 0
+        for _ in range(max(0, missing)):
+            agent = self._build()
+            with self._lock:
+                parked = not self._closed and len(self._idle) < self.max_size
+                if parked:
+                    self._idle.append((agent, time.monotonic()))
+                    added += 1
+            if not parked:
+                self.discard(agent)
+                break
+        return added
+
+    def evict_idle(self, now: float | None = None) -> int:
+        """Stop idle instances above ``min_size`` that exceeded ``idle_timeout``."""
+        if self.idle_timeout is None:
+            return 0
+        now = time.monotonic() if now is None else now
+        evicted: list[Any] = []
+        with self._lock:
+            # Oldest instances sit at the left end of the deque
+            while len(self._idle) > self.min_size and now - self._idle[0][1] > self.idle_timeout:
+                evicted.append(self._idle.popleft()[0])
+        for agent in evicted:
+            self.discard(agent)
+        if evicted:
+            logger.debug(f"🧹 Evicted {len(evicted)} idle sub-agent(s) '{self.name}'")
+        return len(evicted)
+
+    def shutdown(self) -> None:
+        """Stop all idle instances and refuse further releases."""
+        with self._lock:
+            self._closed = True
+            idle = [agent for agent, _ in self._idle]
+            self._idle.clear()
+        for agent in idle:
+            self.discard(agent)
+
+    def stats(self) -> dict[str, Any]:
+        """Return idle, created and reused counts."""
+        with self._lock:
+            return {
+                "idle": len(self._idle),
+                "created": self._created,
+                "reused": self._reused,
+                "min_size": self.min_size,
+                "max_size": self.max_size,
+            }
+
+    def _build(self) -> Any:
+        agent = self.factory()
+        with self._lock:
+            self._created += 1
+        return agent
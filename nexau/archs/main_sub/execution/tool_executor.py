@@ -14,9 +14,11 @@
 
 """Tool execution management with XML parsing and parallel execution."""
 
+import asyncio
 import json
 import logging
 import traceback
+from collections.abc import Callable
 from typing import TYPE_CHECKING, Any
 
 if TYPE_CHECKING:
@@ -25,7 +27,9 @@ if TYPE_CHECKING:
 from nexau.archs.tracer.context import TraceContext
 from nexau.archs.tracer.core import BaseTracer, SpanType
 
+from ..utils.logging_utils import capped, log_fields
 from ..utils.xml_utils import XMLParser
+from .execution_pool import TOOLS_LANE, ExecutionPool
 from .hooks import AfterToolHookInput, BeforeToolHookInput, MiddlewareManager, ToolCallParams
 
 logger = logging.getLogger(__name__)
@@ -51,6 +55,8 @@ class ToolExecutor:
         self.stop_tools = stop_tools
         self.xml_parser = XMLParser()
         self.middleware_manager = middleware_manager
+        # Shared pool used to offload sync tools from the async path (set by the Executor)
+        self.execution_pool: ExecutionPool | None = None
 
     def execute_tool(self, agent_state: "AgentState", tool_name: str, parameters: dict[str, Any], tool_call_id: str) -> dict[str, Any]:
         """Execute a tool with given parameters.
@@ -66,12 +72,7 @@ class ToolExecutor:
         Raises:
             ValueError: If tool is not found
         """
-        if tool_name not in self.tool_registry:
-            error_msg = f"Tool '{tool_name}' for agent '{agent_state.agent_id}' not found"
-            logger.error(f"❌ {error_msg}")
-            raise ValueError(error_msg)
-
-        tool = self.tool_registry[tool_name]
+        tool = self._get_tool(agent_state, tool_name)
 
         tool_parameters = parameters.copy()
         if self.middleware_manager:
@@ -84,7 +85,11 @@ class ToolExecutor:
             tool_parameters = self.middleware_manager.run_before_tool(before_input)
 
         logger.info(
-            f"🔧 Executing tool '{tool_name}' for agent '{agent_state.agent_id}' with parameters: {tool_parameters}",
+            "🔧 Executing tool '%s' for agent '%s' with parameters: %s",
+            tool_name,
+            agent_state.agent_id,
+            capped(tool_parameters),
+            extra=log_fields(tool=tool_name, agent_id=agent_state.agent_id),
         )
 
         # Get tracer from global storage
@@ -108,6 +113,92 @@ class ToolExecutor:
                 tool_call_id=tool_call_id,
             )
 
+    async def aexecute_tool(
+        self,
+        agent_state: "AgentState",
+        tool_name: str,
+        parameters: dict[str, Any],
+        tool_call_id: str,
+    ) -> dict[str, Any]:
+        """Async counterpart of :meth:`execute_tool`.
+
+        Coroutine and MCP tools are awaited on the running loop; synchronous
+        tools are offloaded to the shared tools lane (or a default thread).
+
+        Args:
+            agent_state: AgentState containing agent context and global storage
+            tool_name: Name of the tool to execute
+            parameters: Parameters to pass to the tool
+            tool_call_id: Unique ID for this tool call
+
+        Returns:
+            Tool execution result (possibly modified by hooks)
+
+        Raises:
+            ValueError: If tool is not found
+        """
+        tool = self._get_tool(agent_state, tool_name)
+
+        tool_parameters = parameters.copy()
+        if self.middleware_manager:
+            before_input = BeforeToolHookInput(
+                agent_state=agent_state,
+                tool_name=tool_name,
+                tool_call_id=tool_call_id,
+                tool_input=tool_parameters,
+            )
+            tool_parameters = await self.middleware_manager.arun_before_tool(before_input)
+
+        logger.info(
+            "🔧 Executing tool '%s' for agent '%s' with parameters: %s",
+            tool_name,
+            agent_state.agent_id,
+            capped(tool_parameters),
+            extra=log_fields(tool=tool_name, agent_id=agent_state.agent_id),
+        )
+
+        tracer: BaseTracer | None = agent_state.get_global_value("tracer")
+        if not tracer:
+            return await self._aexecute_tool_inner(agent_state, tool, tool_name, tool_parameters, tool_call_id)
+
+        trace_ctx = self._build_tool_trace_context(tracer, agent_state, tool_name, tool_parameters, tool_call_id)
+        with trace_ctx:
+            try:
+                result = await self._aexecute_tool_inner(agent_state, tool, tool_name, tool_parameters, tool_call_id)
+                trace_ctx.set_outputs({"result": result})
+                return result
+            except Exception as e:
+                logger.error(f"❌ Tool '{tool_name}' execution failed: {e}")
+                trace_ctx.set_outputs({"result": {"status": "error", "error": str(e), "error_type": type(e).__name__}})
+                raise
+
+    def _get_tool(self, agent_state: "AgentState", tool_name: str) -> Any:
+        if tool_name not in self.tool_registry:
+            error_msg = f"Tool '{tool_name}' for agent '{agent_state.agent_id}' not found"
+            logger.error(f"❌ {error_msg}")
+            raise ValueError(error_msg)
+
+        return self.tool_registry[tool_name]
+
+    @staticmethod
+    def _build_tool_trace_context(
+        tracer: BaseTracer,
+        agent_state: "AgentState",
+        tool_name: str,
+        tool_parameters: dict[str, Any],
+        tool_call_id: str,
+    ) -> TraceContext:
+        span_name = f"Tool: {tool_name}"
+        inputs = {
+            "parameters": tool_parameters,
+            "tool_call_id": tool_call_id,
+        }
+        attributes = {
+            "agent_name": agent_state.agent_name,
+            "agent_id": agent_state.agent_id,
+        }
+        return TraceContext(tracer, span_name, SpanType.TOOL, inputs, attributes)
+
     def _execute_tool_with_tracing(
         self,
         tracer: BaseTracer,
@@ -130,17 +221,7 @@ class ToolExecutor:
         Returns:
             Tool execution result
         """
-        span_name = f"Tool: {tool_name}"
-        inputs = {
-            "parameters": tool_parameters,
-            "tool_call_id": tool_call_id,
-        }
-        attributes = {
-            "agent_name": agent_state.agent_name,
-            "agent_id": agent_state.agent_id,
-        }
-
-        trace_ctx = TraceContext(tracer, span_name, SpanType.TOOL, inputs, attributes)
+        trace_ctx = self._build_tool_trace_context(tracer, agent_state, tool_name, tool_parameters, tool_call_id)
         with trace_ctx:
             try:
                 result = self._execute_tool_inner(
@@ -178,16 +259,7 @@ class ToolExecutor:
         Returns:
             Tool execution result
         """
-        execution_params = tool_parameters.copy()
-        execution_params["agent_state"] = agent_state
-
-        call_params = ToolCallParams(
-            agent_state=agent_state,
-            tool_name=tool_name,
-            parameters=tool_parameters,
-            tool_call_id=tool_call_id,
-            execution_params=execution_params,
-        )
+        call_params = self._build_call_params(agent_state, tool_name, tool_parameters, tool_call_id)
 
         def _execute_tool_call(params: ToolCallParams) -> dict[str, Any]:
             exec_params = params.execution_params
@@ -200,22 +272,13 @@ class ToolExecutor:
                 result = self.middleware_manager.wrap_tool_call(call_params, _execute_tool_call)
             else:
                 result = _execute_tool_call(call_params)
-            logger.info(f"✅ Tool '{tool_name}' executed successfully")
+            logger.info("✅ Tool '%s' executed successfully", tool_name)
         except Exception as e:
             logger.error(f"❌ Tool '{tool_name}' execution failed: {e}")
             execution_error = e
-            result = {
-                "status": "error",
-                "error": str(e),
-                "error_type": type(e).__name__,
-            }
+            result = self._error_result(e)
 
-        if tool_name in self.stop_tools:
-            logger.info(
-                f"🛑 Stop tool '{tool_name}' executed, marking for early termination",
-            )
-            if isinstance(result, dict):
-                result["_is_stop_tool"] = True
+        result = self._mark_stop_tool(tool_name, result)
 
         if self.middleware_manager and result is not None:
             try:
@@ -230,6 +293,97 @@ class ToolExecutor:
             except Exception as hook_error:
                 logger.error(f"❌ After-tool middleware execution failed for '{tool_name}': {hook_error}")
 
+        return self._finalize_result(tool_name, result, execution_error)
+
+    async def _aexecute_tool_inner(
+        self,
+        agent_state: "AgentState",
+        tool: Any,
+        tool_name: str,
+        tool_parameters: dict[str, Any],
+        tool_call_id: str,
+    ) -> dict[str, Any]:
+        """Async counterpart of :meth:`_execute_tool_inner`."""
+        call_params = self._build_call_params(agent_state, tool_name, tool_parameters, tool_call_id)
+
+        async def _execute_tool_call(params: ToolCallParams) -> dict[str, Any]:
+            exec_params = params.execution_params
+            if getattr(tool, "is_async", False) is True:
+                return await tool.aexecute(**exec_params)
+            return await self._run_sync_tool(tool.execute, **exec_params)
+
+        execution_error = None
+        try:
+            if self.middleware_manager:
+                result = await self.middleware_manager.awrap_tool_call(call_params, _execute_tool_call)
+            else:
+                result = await _execute_tool_call(call_params)
+            logger.info("✅ Tool '%s' executed successfully", tool_name)
+        except Exception as e:
+            logger.error(f"❌ Tool '{tool_name}' execution failed: {e}")
+            execution_error = e
+            result = self._error_result(e)
+
+        result = self._mark_stop_tool(tool_name, result)
+
+        if self.middleware_manager and result is not None:
+            try:
+                hook_input = AfterToolHookInput(
+                    agent_state=agent_state,
+                    tool_name=tool_name,
+                    tool_input=tool_parameters,
+                    tool_output=result,
+                    tool_call_id=tool_call_id,
+                )
+                result = await self.middleware_manager.arun_after_tool(hook_input, result)
+            except Exception as hook_error:
+                logger.error(f"❌ After-tool middleware execution failed for '{tool_name}': {hook_error}")
+
+        return self._finalize_result(tool_name, result, execution_error)
+
+    async def _run_sync_tool(self, fn: Callable[..., Any], **kwargs: Any) -> Any:
+        """Run a blocking tool call off the event loop."""
+        pool = self.execution_pool
+        if pool is not None and not pool.is_shutdown:
+            return await asyncio.wrap_future(pool.submit(TOOLS_LANE, fn, **kwargs))
+        return await asyncio.to_thread(fn, **kwargs)
+
+    @staticmethod
+    def _build_call_params(
+        agent_state: "AgentState",
+        tool_name: str,
+        tool_parameters: dict[str, Any],
+        tool_call_id: str,
+    ) -> ToolCallParams:
+        execution_params = tool_parameters.copy()
+        execution_params["agent_state"] = agent_state
+
+        return ToolCallParams(
+            agent_state=agent_state,
+            tool_name=tool_name,
+            parameters=tool_parameters,
+            tool_call_id=tool_call_id,
+            execution_params=execution_params,
+        )
+
+    @staticmethod
+    def _error_result(error: Exception) -> dict[str, Any]:
+        return {
+            "status": "error",
+            "error": str(error),
+            "error_type": type(error).__name__,
+        }
+
+    def _mark_stop_tool(self, tool_name: str, result: Any) -> Any:
+        if tool_name in self.stop_tools:
+            logger.info(
+                f"🛑 Stop tool '{tool_name}' executed, marking for early termination",
+            )
+            if isinstance(result, dict):
+                result["_is_stop_tool"] = True
+        return result
+
+    def _finalize_result(self, tool_name: str, result: Any, execution_error: Exception | None) -> Any:
         if execution_error:
             raise execution_error
 
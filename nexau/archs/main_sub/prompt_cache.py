@@ -0,0 +1,257 @@
+# Copyright (c) Nex-AGI. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Process-wide cache of rendered system prompts and structured tool payloads."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import threading
+from collections import OrderedDict
+from collections.abc import Callable, Iterable
+from functools import lru_cache
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from jinja2 import Environment, TemplateError, meta
+
+from nexau.archs.llm.llm_config import LLMConfig
+
+if TYPE_CHECKING:
+    from nexau.archs.main_sub.config import AgentConfig
+    from nexau.archs.tool import Tool
+
+logger = logging.getLogger(__name__)
+
+# Built-in template variables whose value changes on every render
+TIME_VARYING_VARIABLES = frozenset({"timestamp"})
+
+
+def _digest(*parts: Any) -> str:
+    payload = json.dumps(parts, sort_keys=True, default=repr, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _tools_signature(tools: Iterable[Tool], sub_agent_names: Iterable[str]) -> list[Any]:
+    return [
+        [
+            [
+                tool.name,
+                tool.description,
+                tool.input_schema,
+                tool.template_override,
+                tool.as_skill,
+                tool.skill_description,
+            ]
+            for tool in tools
+        ],
+        list(sub_agent_names),
+    ]
+
+
+def _template_source_signature(agent_config: AgentConfig) -> list[Any]:
+    source = agent_config.system_prompt
+    if source and agent_config.system_prompt_type in ("file", "jinja"):
+        # File-based prompts are keyed by the file version, not only its path
+        try:
+            stat = Path(source).stat()
+            return [source, stat.st_mtime_ns, stat.st_size]
+        except OSError:
+            return [source, None, None]
+    return [source]
+
+
+@lru_cache(maxsize=256)
+def _template_variables(source_signature: tuple[Any, ...], system_prompt_type: str) -> frozenset[str] | None:
+    source = source_signature[0]
+    try:
+        if system_prompt_type in ("file", "jinja"):
+            source = Path(source).read_text(encoding="utf-8")
+        return frozenset(meta.find_undeclared_variables(Environment().parse(source)))
+    except (OSError, TemplateError):
+        return None
+
+
+def system_prompt_is_cacheable(agent_config: AgentConfig, runtime_context: dict[str, Any] | None) -> bool:
+    """Return whether the rendered system prompt is the same on every run.
+
+    Templates referencing a time-varying built-in such as ``{{ timestamp }}``
+    render differently each run unless the runtime context pins the value.
+    Templates that cannot be read or parsed are never cached.
+
+    Args:
+        agent_config: Agent configuration providing the prompt template
+        runtime_context: Context the template is rendered with
+
+    Returns:
+        True if the rendered prompt may be served from the cache
+    """
+    if not agent_config.system_prompt:
+        return True
+    variables = _template_variables(tuple(_template_source_signature(agent_config)), agent_config.system_prompt_type)
+    if variables is None:
+        return False
+    return variables.isdisjoint(TIME_VARYING_VARIABLES.difference(runtime_context or {}))
+
+
+def system_prompt_fingerprint(
+    agent_config: AgentConfig,
+    tools: Iterable[Tool],
+    sub_agent_names: Iterable[str],
+    runtime_context: dict[str, Any] | None,
+    include_tool_instructions: bool,
+) -> str:
+    """Fingerprint everything that goes into a rendered system prompt.
+
+    The agent name and id are only covered when the template renders them,
+    so instances built from the same configuration share the cached prompt.
+
+    Args:
+        agent_config: Agent configuration providing the prompt template
+        tools: Tools documented in the prompt
+        sub_agent_names: Sub-agents documented in the prompt
+        runtime_context: Context the template is rendered with
+        include_tool_instructions: Whether tool docs are rendered into the prompt
+
+    Returns:
+        Hex digest identifying the rendered prompt
+    """
+    if agent_config.system_prompt:
+        variables = _template_variables(tuple(_template_source_signature(agent_config)), agent_config.system_prompt_type)
+    else:
+        # The default system prompt renders only the agent name
+        variables = frozenset({"agent_name"})
+    return _digest(
+        "system_prompt",
+        agent_config.name if variables is None or "agent_name" in variables else None,
+        agent_config.agent_id if variables is None or "agent_id" in variables else None,
+        agent_config.system_prompt_type,
+        _template_source_signature(agent_config),
+        _tools_signature(tools, sub_agent_names) if include_tool_instructions else None,
+        runtime_context or {},
+        include_tool_instructions,
+    )
+
+
+def tool_payload_fingerprint(tool_call_mode: str, tools: Iterable[Tool], sub_agent_names: Iterable[str]) -> str:
+    """Fingerprint the structured tool definitions sent for a tool_call_mode."""
+    return _digest("tool_payload", tool_call_mode, _tools_signature(tools, sub_agent_names))
+
+
+def agent_config_fingerprint(agent_config: AgentConfig) -> str:
+    """Fingerprint the configuration that decides how an agent answers a message.
+
+    Covers the prompt template, tools, skills, sub-agents, model parameters
+    and initial context, but not the agent id, so every instance built from
+    the same configuration shares the fingerprint.
+    """
+    llm_config = agent_config.llm_config
+    return _digest(
+        "agent_config",
+        agent_config.name,
+        agent_config.system_prompt_type,
+        _template_source_signature(agent_config),
+        _tools_signature(agent_config.tools, agent_config.sub_agent_factories or {}),
+        [[skill.name, skill.description, skill.detail] for skill in agent_config.skills],
+        [llm_config.base_url, llm_config.to_openai_params()] if isinstance(llm_config, LLMConfig) else llm_config,
+        agent_config.initial_context or {},
+        agent_config.tool_call_mode,
+        agent_config.max_iterations,
+    )
+
+
+class PromptCache:
+    """Memoize the stable prefix of every LLM request.
+
+    The system prompt and the structured tool payload make up the prefix that
+    providers cache on their side. Rendering them once per fingerprint and
+    handing every agent instance the same string and the same payload object
+    keeps that prefix byte-identical across iterations, runs and sub-agent
+    instances. Cached payloads are shared and must be treated as read-only.
+    """
+
+    def __init__(self, max_entries: int = 256):
+        """Initialize prompt cache.
+
+        Args:
+            max_entries: Maximum number of prompts and payloads kept; the least
+                recently used entries are dropped first
+        """
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, Any] = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {
+            "system_prompt_hits": 0,
+            "system_prompt_misses": 0,
+            "tool_payload_hits": 0,
+            "tool_payload_misses": 0,
+            "reused_prefix_chars": 0,
+        }
+
+    def get_system_prompt(self, fingerprint: str, build: Callable[[], str]) -> str:
+        """Return the cached system prompt for ``fingerprint``, rendering it on a miss."""
+        return self._get(fingerprint, build, "system_prompt", len)
+
+    def get_tool_payload(
+        self,
+        fingerprint: str,
+        build: Callable[[], list[dict[str, Any]]],
+    ) -> list[dict[str, Any]]:
+        """Return the cached tool payload for ``fingerprint``, building it on a miss."""
+        return self._get(fingerprint, build, "tool_payload", lambda payload: len(json.dumps(payload)))
+
+    def stats(self) -> dict[str, Any]:
+        """Return hit/miss counts, the prefix reuse ratio and the entry count."""
+        with self._lock:
+            stats: dict[str, Any] = dict(self._stats)
+            stats["entries"] = len(self._entries)
+        lookups = sum(stats[f"{kind}_{outcome}"] for kind in ("system_prompt", "tool_payload") for outcome in ("hits", "misses"))
+        hits = stats["system_prompt_hits"] + stats["tool_payload_hits"]
+        stats["prefix_reuse_ratio"] = hits / lookups if lookups else 0.0
+        return stats
+
+    def clear(self) -> None:
+        """Drop all entries and reset the statistics."""
+        with self._lock:
+            self._entries.clear()
+            for key in self._stats:
+                self._stats[key] = 0
+
+    def _get(self, fingerprint: str, build: Callable[[], Any], kind: str, size: Callable[[Any], int]) -> Any:
+        key = f"{kind}:{fingerprint}"
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                value = self._entries[key]
+                self._stats[f"{kind}_hits"] += 1
+                self._stats["reused_prefix_chars"] += size(value)
+                return value
+
+        # Rendered outside the lock; a concurrent miss renders the same value
+        value = build()
+        with self._lock:
+            self._stats[f"{kind}_misses"] += 1
+            # Keep the first stored value so every caller shares one object
+            value = self._entries.setdefault(key, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        logger.debug(f"🧩 Cached {kind.replace('_', ' ')} {fingerprint[:12]}")
+        return value
+
+
+# Global instance
+prompt_cache = PromptCache()
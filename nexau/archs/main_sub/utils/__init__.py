@@ -15,12 +15,18 @@
 """Utility modules for the main_sub architecture."""
 
 from .cleanup_manager import CleanupManager
-from .token_counter import TokenCounter
-from .xml_utils import XMLParser, XMLUtils
+from .logging_utils import StructuredFormatter, configure_logging
+from .token_counter import TokenCounter, TokenLedger
+from .xml_utils import ToolCallBlocks, ToolCallStreamParser, XMLParser, XMLUtils
 
 __all__ = [
     "TokenCounter",
+    "TokenLedger",
+    "ToolCallBlocks",
+    "ToolCallStreamParser",
     "XMLParser",
     "XMLUtils",
     "CleanupManager",
+    "StructuredFormatter",
+    "configure_logging",
 ]
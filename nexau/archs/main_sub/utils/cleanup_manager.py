@@ -20,6 +20,7 @@ import os
 import signal
 import threading
 import weakref
+from collections.abc import Callable
 
 logger = logging.getLogger(__name__)
 
@@ -44,6 +45,8 @@ class CleanupManager:
 
         # Global registry to track all active agents for cleanup
         self._active_agents: set = weakref.WeakSet()
+        # Process-wide resources (shared clients, pools) released after all agents stop
+        self._shutdown_hooks: list[Callable[[], None]] = []
         self._cleanup_registered = False
         self._cleanup_lock = threading.Lock()
         self._initialized = True
@@ -53,6 +56,17 @@ class CleanupManager:
         self._active_agents.add(agent)
         self._register_cleanup_handlers()
 
+    def register_shutdown_hook(self, hook: Callable[[], None]) -> None:
+        """Register a callable that releases a process-wide resource on shutdown.
+
+        Hooks run once all active agents have been stopped, in reverse
+        registration order.
+        """
+        with self._cleanup_lock:
+            if hook not in self._shutdown_hooks:
+                self._shutdown_hooks.append(hook)
+        self._register_cleanup_handlers()
+
     def _register_cleanup_handlers(self) -> None:
         """Register cleanup handlers for process termination."""
         with self._cleanup_lock:
@@ -90,8 +104,20 @@ class CleanupManager:
                     f"❌ Error cleaning up agent {getattr(agent, 'name', 'unknown')}: {e}",
                 )
 
+        self._run_shutdown_hooks()
+
         logger.info("✅ Agent cleanup completed")
 
+    def _run_shutdown_hooks(self) -> None:
+        with self._cleanup_lock:
+            hooks = list(reversed(self._shutdown_hooks))
+
+        for hook in hooks:
+            try:
+                hook()
+            except Exception as e:
+                logger.error(f"❌ Error running shutdown hook {getattr(hook, '__qualname__', hook)}: {e}")
+
     def _signal_handler(self, signum, frame):
         """Handle termination signals by cleaning up agents."""
         logger.info(f"🚨 Received signal {signum}, initiating cleanup...")
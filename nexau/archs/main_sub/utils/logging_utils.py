@@ -0,0 +1,180 @@
+# Copyright (c) Nex-AGI. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Cheap logging helpers for the agent hot paths.
+
+Log calls on the execution hot paths pass their payloads (model responses,
+tool parameters and results, sub-agent messages) wrapped in :func:`lazy` or
+:func:`capped` as ``%s`` arguments. Nothing is rendered unless a handler
+actually emits the record, and what is rendered is cut to
+``max_value_chars``. Structured fields passed via ``extra=log_fields(...)``
+are rendered by :class:`StructuredFormatter`.
+
+Per-subsystem levels and the size cap can be set with :func:`configure_logging`
+or through the environment, e.g. ``NEXAU_LOG_LEVELS=executor=WARNING,tools=DEBUG``
+and ``NEXAU_LOG_MAX_CHARS=500``.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+from collections.abc import Callable, Mapping
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+# Logger names of the subsystems that can be tuned independently
+SUBSYSTEM_LOGGERS: dict[str, str] = {
+    "agent": "nexau.archs.main_sub.agent",
+    "executor": "nexau.archs.main_sub.execution.executor",
+    "llm": "nexau.archs.main_sub.execution.llm_caller",
+    "tools": "nexau.archs.main_sub.execution.tool_executor",
+    "sub_agents": "nexau.archs.main_sub.execution.subagent_manager",
+    "middleware": "nexau.archs.main_sub.execution.hooks",
+}
+
+DEFAULT_MAX_VALUE_CHARS = 2000
+
+# Attribute of a LogRecord holding the fields given by log_fields()
+FIELDS_ATTR = "nexau_fields"
+
+_max_value_chars = DEFAULT_MAX_VALUE_CHARS
+
+
+def get_max_value_chars() -> int:
+    """Return the current cap on rendered log values (0 means unlimited)."""
+    return _max_value_chars
+
+
+def truncate_for_log(value: Any, limit: int | None = None) -> str:
+    """Render ``value`` for a log line, cut to ``limit`` characters."""
+    text = value if isinstance(value, str) else str(value)
+    limit = _max_value_chars if limit is None else limit
+    if limit and len(text) > limit:
+        return f"{text[:limit]}... [{len(text) - limit} more chars]"
+    return text
+
+
+class LazyLogValue:
+    """Log argument computed and truncated only when the record is formatted."""
+
+    __slots__ = ("_producer", "_args", "_limit")
+
+    def __init__(self, producer: Callable[..., Any], args: tuple[Any, ...], limit: int | None) -> None:
+        self._producer = producer
+        self._args = args
+        self._limit = limit
+
+    def __str__(self) -> str:
+        try:
+            return truncate_for_log(self._producer(*self._args), self._limit)
+        except Exception as exc:  # pragma: no cover - never break logging
+            return f"<unrenderable: {exc}>"
+
+    __repr__ = __str__
+
+
+def lazy(producer: Callable[..., Any], *args: Any, limit: int | None = None) -> LazyLogValue:
+    """Defer ``producer(*args)`` until the log record is actually rendered."""
+    return LazyLogValue(producer, args, limit)
+
+
+def _identity(value: Any) -> Any:
+    return value
+
+
+def capped(value: Any, limit: int | None = None) -> LazyLogValue:
+    """Log ``value`` truncated to the size cap, stringifying it only if emitted."""
+    return LazyLogValue(_identity, (value,), limit)
+
+
+def log_fields(**fields: Any) -> dict[str, Any]:
+    """Build the ``extra`` mapping attaching structured fields to a log record."""
+    return {FIELDS_ATTR: fields}
+
+
+class StructuredFormatter(logging.Formatter):
+    """Formatter that appends the record's structured fields.
+
+    Fields are rendered as ``key=value`` pairs, or the whole record as one
+    JSON object per line with ``json_lines=True``. Field values are truncated
+    like any other lazily logged value.
+    """
+
+    def __init__(self, fmt: str | None = None, datefmt: str | None = None, *, json_lines: bool = False) -> None:
+        super().__init__(fmt, datefmt)
+        self.json_lines = json_lines
+
+    def format(self, record: logging.LogRecord) -> str:
+        fields: Mapping[str, Any] = getattr(record, FIELDS_ATTR, None) or {}
+        if self.json_lines:
+            payload: dict[str, Any] = {
+                "time": self.formatTime(record, self.datefmt),
+                "level": record.levelname,
+                "logger": record.name,
+                "message": record.getMessage(),
+            }
+            payload.update({key: truncate_for_log(value) for key, value in fields.items()})
+            if record.exc_info:
+                payload["exc_info"] = self.formatException(record.exc_info)
+            return json.dumps(payload, ensure_ascii=False)
+        message = super().format(record)
+        if not fields:
+            return message
+        rendered = " ".join(f"{key}={truncate_for_log(value)}" for key, value in fields.items())
+        return f"{message} | {rendered}"
+
+
+def configure_logging(
+    *,
+    levels: Mapping[str, int | str] | None = None,
+    max_value_chars: int | None = None,
+) -> None:
+    """Set per-subsystem log levels and the size cap for logged values.
+
+    Args:
+        levels: Level per subsystem name (see ``SUBSYSTEM_LOGGERS``) or full logger name
+        max_value_chars: Maximum rendered length of a logged payload; 0 disables the cap
+
+    Raises:
+        ValueError: If a level name is unknown
+    """
+    global _max_value_chars
+
+    if max_value_chars is not None:
+        _max_value_chars = max(0, max_value_chars)
+    for subsystem, level in (levels or {}).items():
+        if isinstance(level, str):
+            resolved = logging.getLevelName(level.strip().upper())
+            if not isinstance(resolved, int):
+                raise ValueError(f"Unknown log level '{level}' for '{subsystem}'")
+            level = resolved
+        logging.getLogger(SUBSYSTEM_LOGGERS.get(subsystem, subsystem)).setLevel(level)
+
+
+def configure_logging_from_env(environ: Mapping[str, str] | None = None) -> None:
+    """Apply ``NEXAU_LOG_LEVELS`` and ``NEXAU_LOG_MAX_CHARS`` if set."""
+    environ = os.environ if environ is None else environ
+    levels: dict[str, str] = {}
+    for item in environ.get("NEXAU_LOG_LEVELS", "").split(","):
+        name, sep, level = item.partition("=")
+        if sep and name.strip():
+            levels[name.strip()] = level
+    max_chars = environ.get("NEXAU_LOG_MAX_CHARS")
+    try:
+        configure_logging(levels=levels, max_value_chars=int(max_chars) if max_chars else None)
+    except ValueError as exc:
+        logger.warning(f"⚠️ Ignoring invalid logging environment settings: {exc}")
@@ -14,8 +14,9 @@
 
 """Token counting utilities for agents."""
 
+import json
 import logging
-from collections.abc import Callable
+from collections.abc import Callable, Hashable
 from typing import Any
 
 logger = logging.getLogger(__name__)
@@ -107,3 +108,87 @@ class TokenCounter:
             Total token count
         """
         return self._counter(messages)
+
+
+class TokenLedger:
+    """Incremental per-message token accounting on top of a TokenCounter.
+
+    The executor re-counts the whole history several times per iteration. The
+    ledger caches a token count for every message, keyed by the identity of the
+    message dict and a fingerprint of its role and content, so that only
+    messages that are new or were rewritten (e.g. by middleware) are encoded
+    again. Entries for messages that disappear from the history (for example
+    after compaction) are dropped on the next count.
+    """
+
+    def __init__(self, token_counter: TokenCounter | None = None):
+        """Initialize the ledger.
+
+        Args:
+            token_counter: Counter used to encode individual messages
+        """
+        self.token_counter = token_counter or TokenCounter()
+        # id(message) -> (message, fingerprint, tokens). The message reference
+        # keeps the object alive so its id cannot be reused while cached.
+        self._entries: dict[int, tuple[dict[str, Any], Hashable, int]] = {}
+        self._total = 0
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def total(self) -> int:
+        """Token total of the most recently counted message list."""
+        return self._total
+
+    def count(self, messages: list[dict[str, Any]]) -> int:
+        """Count tokens for messages, re-encoding only new or changed ones.
+
+        Args:
+            messages: List of message dictionaries with 'role' and 'content' keys
+
+        Returns:
+            Total token count
+        """
+        entries: dict[int, tuple[dict[str, Any], Hashable, int]] = {}
+        total = 0
+        for message in messages:
+            key = id(message)
+            fingerprint = message_fingerprint(message)
+            cached = self._entries.get(key)
+            if cached is not None and cached[0] is message and cached[1] == fingerprint:
+                tokens = cached[2]
+                self.hits += 1
+            else:
+                tokens = self.token_counter.count_tokens([message])
+                self.misses += 1
+            entries[key] = (message, fingerprint, tokens)
+            total += tokens
+
+        self._entries = entries
+        self._total = total
+        return total
+
+    def reset(self) -> None:
+        """Drop all cached counts."""
+        self._entries = {}
+        self._total = 0
+        self.hits = 0
+        self.misses = 0
+
+
+def message_fingerprint(message: Any) -> Hashable:
+    """Build a cheap check that a cached message object was not modified in place.
+
+    Used by caches keyed on message identity (:class:`TokenLedger`, the cache
+    breakpoint planner). Covers the role, the content and the number of keys.
+    ``str`` hashes are cached by the interpreter, so fingerprinting an unchanged
+    content string costs O(1) after the first call.
+    """
+    if not isinstance(message, dict):
+        return hash(json.dumps(message, sort_keys=True, ensure_ascii=False, default=str))
+    content = message.get("content", "")
+    if isinstance(content, str):
+        content_hash = hash(content)
+    else:
+        content_hash = hash(json.dumps(content, sort_keys=True, ensure_ascii=False, default=str))
+    return (message.get("role", ""), content_hash, len(message))
@@ -18,9 +18,26 @@ import html
 import logging
 import re
 import xml.etree.ElementTree as ET
+from dataclasses import dataclass, field
 
 logger = logging.getLogger(__name__)
 
+# Element names the direct tree builder accepts; anything else goes through ElementTree
+_XML_NAME_PATTERN = re.compile(r"[A-Za-z_][A-Za-z0-9_]*")
+# Content that ElementTree would reject, normalize or treat as markup
+_UNSAFE_XML_CONTENT_PATTERN = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f\r\ud800-\udfff\ufffe\uffff]|\]\]>|\[CDATA\[")
+
+_BATCH_AGENT_TAG = "use_batch_agent"
+_PARALLEL_CALLS_TAG = "use_parallel_tool_calls"
+_PARALLEL_TOOL_TAG = "parallel_tool"
+_TOOL_USE_TAG = "tool_use"
+# Opening and closing tags of the call blocks, mapped to (block, is_opening)
+_BLOCK_TAGS: dict[str, tuple[str, bool]] = {}
+for _tag in (_BATCH_AGENT_TAG, _PARALLEL_CALLS_TAG, _PARALLEL_TOOL_TAG, _TOOL_USE_TAG):
+    _BLOCK_TAGS[f"<{_tag}>"] = (_tag, True)
+    _BLOCK_TAGS[f"</{_tag}>"] = (_tag, False)
+_MAX_BLOCK_TAG_LENGTH = max(len(tag) for tag in _BLOCK_TAGS)
+
 
 class XMLUtils:
     """Utility functions for XML processing."""
@@ -144,6 +161,12 @@ class XMLParser:
 
     def parse_xml_content(self, xml_content: str) -> ET.Element:
         """Parse XML content using multiple strategies to handle malformed XML."""
+        # Fast path: simple well-formed content is turned into a tree directly,
+        # giving the same result as the CDATA strategy below
+        root = self._build_tree_directly(xml_content)
+        if root is not None:
+            return root
+
         # Strategy 0: Always preprocess parameter content with CDATA
         # This ensures parameter values are treated as plain text
         try:
@@ -224,6 +247,95 @@ class XMLParser:
             f"Unable to parse XML content after multiple strategies. Content preview: {xml_content[:200]}...",
         )
 
+    def _build_tree_directly(self, xml_content: str) -> ET.Element | None:
+        """Build the tree in one scan, or return None to use the parsing strategies.
+
+        Handles plain elements without attributes, entities or comments.
+        Children of ``<parameter>`` are taken verbatim up to their closing tag,
+        as the CDATA preprocessing would. Anything else is left to ElementTree
+        so that its error handling and fallbacks stay unchanged.
+        """
+        if _UNSAFE_XML_CONTENT_PATTERN.search(xml_content):
+            return None
+
+        root = ET.Element("root")
+        stack = [root]
+        last_closed: ET.Element | None = None
+        pos = 0
+        while True:
+            lt = xml_content.find("<", pos)
+            text_end = len(xml_content) if lt == -1 else lt
+            if text_end > pos:
+                text = xml_content[pos:text_end]
+                if "&" in text:
+                    return None
+                if last_closed is None:
+                    stack[-1].text = text
+                else:
+                    last_closed.tail = text
+            if lt == -1:
+                break
+
+            gt = xml_content.find(">", lt)
+            if gt == -1:
+                return None
+            is_closing = xml_content.startswith("/", lt + 1)
+            name = xml_content[lt + 1 + is_closing : gt]
+            if not _XML_NAME_PATTERN.fullmatch(name):
+                return None
+
+            if is_closing:
+                if len(stack) == 1 or stack[-1].tag != name:
+                    return None
+                last_closed = stack.pop()
+                pos = gt + 1
+            elif name == "parameter":
+                block_end = xml_content.find("</parameter>", gt + 1)
+                if block_end == -1:
+                    return None
+                last_closed = ET.SubElement(stack[-1], name)
+                if not self._build_parameters_directly(last_closed, xml_content, gt + 1, block_end):
+                    return None
+                pos = block_end + len("</parameter>")
+            else:
+                stack.append(ET.SubElement(stack[-1], name))
+                last_closed = None
+                pos = gt + 1
+
+        return root if len(stack) == 1 else None
+
+    def _build_parameters_directly(self, params_elem: ET.Element, xml_content: str, start: int, end: int) -> bool:
+        """Add the verbatim parameter values between ``start`` and ``end``."""
+        last_param: ET.Element | None = None
+        pos = start
+        while True:
+            lt = xml_content.find("<", pos, end)
+            text_end = end if lt == -1 else lt
+            if text_end > pos:
+                text = xml_content[pos:text_end]
+                if "&" in text:
+                    return False
+                if last_param is None:
+                    params_elem.text = text
+                else:
+                    last_param.tail = text
+            if lt == -1:
+                return True
+
+            gt = xml_content.find(">", lt, end)
+            if gt == -1:
+                return False
+            name = xml_content[lt + 1 : gt]
+            if not _XML_NAME_PATTERN.fullmatch(name):
+                return False
+            closing_tag = f"</{name}>"
+            value_end = xml_content.find(closing_tag, gt + 1, end)
+            if value_end == -1:
+                return False
+            last_param = ET.SubElement(params_elem, name)
+            last_param.text = xml_content[gt + 1 : value_end] or None
+            pos = value_end + len(closing_tag)
+
     def _wrap_parameter_content_in_cdata(self, xml_content: str) -> str:
         """Wrap all parameter element content in CDATA to treat as plain text."""
 
@@ -262,3 +374,148 @@ class XMLParser:
         )
 
         return result
+
+
+@dataclass
+class ToolCallBlocks:
+    """Raw contents of the XML call blocks found in a model response.
+
+    Attributes:
+        batch_agent: Content of the first closed ``<use_batch_agent>`` block
+        parallel_tools: Contents of the ``<parallel_tool>`` entries of the first
+            closed ``<use_parallel_tool_calls>`` block, or None without one
+        tool_uses: Contents of every closed ``<tool_use>`` block
+    """
+
+    batch_agent: str | None = None
+    parallel_tools: list[str] | None = None
+    tool_uses: list[str] = field(default_factory=list)
+
+
+class _BlockCapture:
+    """Collects the content of one open block across chunks."""
+
+    __slots__ = ("parts", "start")
+
+    def __init__(self, start: int):
+        self.parts: list[str] = []
+        self.start = start
+
+
+class ToolCallStreamParser:
+    """Single-pass scanner for the ``<tool_use>`` / ``<use_parallel_tool_calls>`` /
+    ``<use_batch_agent>`` grammar.
+
+    Every ``<`` of the input is looked at once, whether the text arrives in one
+    piece or chunk by chunk from a stream. The blocks found are the ones the
+    non-greedy patterns ``<tag>(.*?)</tag>`` would match: a block ends at the
+    first closing tag after its opening tag, only the first batch block and the
+    first parallel block count, ``<parallel_tool>`` entries are only collected
+    inside that parallel block, and blocks that are never closed (a truncated
+    response) are ignored.
+    """
+
+    def __init__(self) -> None:
+        self._tail = ""
+        self._open: dict[str, _BlockCapture] = {}
+        self._parallel_tools: list[str] = []
+        self.blocks = ToolCallBlocks()
+
+    def feed(self, chunk: str) -> list[tuple[str, str]]:
+        """Scan the next piece of the response.
+
+        Args:
+            chunk: Text following everything fed so far
+
+        Returns:
+            ``(tag, content)`` for each block closed by this chunk, in order.
+            ``parallel_tool`` entries are reported as they close; they only
+            reach :attr:`blocks` once their enclosing parallel block closes.
+        """
+        text = self._tail + chunk if self._tail else chunk
+        closed: list[tuple[str, str]] = []
+        for capture in self._open.values():
+            capture.start = 0
+
+        pos = 0
+        safe_end = len(text)
+        while True:
+            lt = text.find("<", pos)
+            if lt == -1:
+                break
+            gt = text.find(">", lt + 1, lt + _MAX_BLOCK_TAG_LENGTH)
+            if gt == -1:
+                remainder = text[lt:]
+                if len(remainder) < _MAX_BLOCK_TAG_LENGTH and any(tag.startswith(remainder) for tag in _BLOCK_TAGS):
+                    # A block tag may be split across chunks; rescan it with the next one
+                    safe_end = lt
+                    break
+                pos = lt + 1
+                continue
+            match = _BLOCK_TAGS.get(text[lt : gt + 1])
+            if match is None:
+                pos = lt + 1
+                continue
+            pos = gt + 1
+            self._on_tag(match[0], match[1], text, lt, pos, closed)
+
+        for capture in self._open.values():
+            if safe_end > capture.start:
+                capture.parts.append(text[capture.start : safe_end])
+        self._tail = text[safe_end:]
+        return closed
+
+    def close(self) -> ToolCallBlocks:
+        """Finish the response; blocks that are still open are dropped."""
+        self._tail = ""
+        self._open.clear()
+        self._parallel_tools = []
+        return self.blocks
+
+    @classmethod
+    def scan(cls, text: str) -> ToolCallBlocks:
+        """Scan a complete response."""
+        parser = cls()
+        parser.feed(text)
+        return parser.close()
+
+    def _on_tag(
+        self,
+        tag: str,
+        is_open: bool,
+        text: str,
+        start: int,
+        end: int,
+        closed: list[tuple[str, str]],
+    ) -> None:
+        capture = self._open.get(tag)
+        if is_open:
+            if capture is not None:
+                return  # Part of the open block's content
+            if tag == _BATCH_AGENT_TAG and self.blocks.batch_agent is not None:
+                return
+            if tag == _PARALLEL_CALLS_TAG and self.blocks.parallel_tools is not None:
+                return
+            if tag == _PARALLEL_TOOL_TAG and _PARALLEL_CALLS_TAG not in self._open:
+                return
+            self._open[tag] = _BlockCapture(end)
+            return
+
+        if capture is None:
+            return
+        del self._open[tag]
+        capture.parts.append(text[capture.start : start])
+        content = "".join(capture.parts)
+        closed.append((tag, content))
+
+        if tag == _TOOL_USE_TAG:
+            self.blocks.tool_uses.append(content)
+        elif tag == _PARALLEL_TOOL_TAG:
+            self._parallel_tools.append(content)
+        elif tag == _PARALLEL_CALLS_TAG:
+            # An entry still open here would only close outside the block
+            self._open.pop(_PARALLEL_TOOL_TAG, None)
+            self.blocks.parallel_tools = self._parallel_tools
+            self._parallel_tools = []
+        else:
+            self.blocks.batch_agent = content
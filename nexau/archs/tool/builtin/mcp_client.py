@@ -16,7 +16,7 @@
 
 import asyncio
 import logging
-from collections.abc import Callable, Sequence
+from collections.abc import Awaitable, Callable, Sequence
 from contextlib import AbstractAsyncContextManager
 from dataclasses import dataclass
 from typing import TYPE_CHECKING, Any
@@ -635,6 +635,7 @@ class MCPTool(Tool):
         self._session_type = type(client_session).__name__
         self._session_params: dict[str, Any] | MCPServerConfig | None = None
         self._sync_executor: Callable[..., dict[str, Any]] = self._execute_sync
+        self._async_executor: Callable[..., Awaitable[dict[str, Any]]] = self._execute_async
 
         # Store session parameters for thread-safe recreation
         if isinstance(client_session, HTTPMCPSession):
@@ -649,6 +650,7 @@ class MCPTool(Tool):
 
         if server_config and server_config.use_cache:
             self._sync_executor = cache_result(self._sync_executor)
+            self._async_executor = cache_result(self._async_executor)
 
         # Convert MCP tool to NexAU tool format
         super().__init__(
@@ -894,15 +896,27 @@ class MCPTool(Tool):
                 # No existing loop, that's fine
                 pass
 
+    @property
+    def is_async(self) -> bool:
+        """MCP tools are awaited natively on the caller's event loop."""
+        return True
+
     def execute(self, **kwargs) -> dict[str, Any]:
         """Execute the MCP tool synchronously (for backward compatibility)."""
+        return self._sync_executor(**self._filter_call_kwargs(kwargs))
+
+    async def aexecute(self, **kwargs) -> dict[str, Any]:
+        """Execute the MCP tool on the running event loop without a private loop."""
+        return await self._async_executor(**self._filter_call_kwargs(kwargs))
+
+    @staticmethod
+    def _filter_call_kwargs(kwargs: dict[str, Any]) -> dict[str, Any]:
         # Filter out agent_state and global_storage parameters as they're not needed for MCP tools
         # and cause JSON serialization errors
         filtered_kwargs = {k: v for k, v in kwargs.items() if k not in ("agent_state", "global_storage")}
-        filtered_kwargs = dict(
+        return dict(
             sorted(filtered_kwargs.items(), key=lambda x: x[0]),
         )
-        return self._sync_executor(**filtered_kwargs)
 
     async def _execute_async(self, **kwargs) -> dict[str, Any]:
         """Execute the MCP tool asynchronously."""
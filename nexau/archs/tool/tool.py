@@ -14,6 +14,8 @@
 
 """Tool implementation for the NexAU framework."""
 
+import asyncio
+import copy
 import functools
 import inspect
 import json
@@ -52,26 +54,43 @@ class ToolYamlSchema(BaseModel):
     builtin: str | None = None
 
 
-def cache_result(func):
-    @functools.wraps(func)
-    def wrapper(*args, **kwargs):
-        if hasattr(func, "__self__"):
-            self = func.__self__
-            method = f"{self.__class__.__name__}."
-        else:
-            method = ""
-        method += func.__name__
+def _cache_key(func, args, kwargs) -> str:
+    if hasattr(func, "__self__"):
+        self = func.__self__
+        method = f"{self.__class__.__name__}."
+    else:
+        method = ""
+    method += func.__name__
 
-        args = [arg for arg in args if not isinstance(arg, AgentState)]
+    args = [arg for arg in args if not isinstance(arg, AgentState)]
 
-        kwargs = {k: v for k, v in kwargs.items() if not isinstance(v, AgentState)}
+    kwargs = {k: v for k, v in kwargs.items() if not isinstance(v, AgentState)}
 
-        key = json.dumps(
-            {"method": method, "args": args, "kwargs": kwargs},
-            sort_keys=True,
-            default=str,
-            ensure_ascii=False,
-        )
+    return json.dumps(
+        {"method": method, "args": args, "kwargs": kwargs},
+        sort_keys=True,
+        default=str,
+        ensure_ascii=False,
+    )
+
+
+def cache_result(func):
+    if inspect.iscoroutinefunction(func):
+
+        @functools.wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            key = _cache_key(func, args, kwargs)
+            result = cache.get(key)
+            if result is None:
+                result = await func(*args, **kwargs)
+                cache.set(key, result)
+            return result
+
+        return async_wrapper
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        key = _cache_key(func, args, kwargs)
 
         result = cache.get(key)
         if result is None:
@@ -84,6 +103,10 @@ def cache_result(func):
     return wrapper
 
 
+async def _await(awaitable: Any) -> Any:
+    return await awaitable
+
+
 class ConfigError(Exception):
     """Exception raised for configuration errors."""
 
@@ -146,6 +169,17 @@ class Tool:
         **kwargs,
     ) -> "Tool":
         """Load tool definition from YAML file and bind to implementation."""
+        return cls.from_definition(
+            cls.load_definition(yaml_path),
+            binding,
+            as_skill=as_skill,
+            extra_kwargs=extra_kwargs,
+            **kwargs,
+        )
+
+    @staticmethod
+    def load_definition(yaml_path: str) -> dict[str, Any]:
+        """Read and validate a tool YAML file into a plain definition dict."""
         path = Path(yaml_path)
         if not path.exists():
             raise FileNotFoundError(f"Tool YAML file not found: {yaml_path}")
@@ -154,13 +188,8 @@ class Tool:
             tool_def_model = ToolYamlSchema.model_validate(yaml.safe_load(f))
         tool_def = tool_def_model.model_dump()
 
-        # Extract required fields
         name = tool_def["name"]
-        description = tool_def["description"]
-        skill_description = tool_def.get("skill_description", "")
         input_schema = tool_def.get("input_schema", {})
-        use_cache = tool_def.get("use_cache", False)
-        disable_parallel = tool_def.get("disable_parallel", False)
 
         if "global_storage" in input_schema:
             raise ValueError(
@@ -174,28 +203,83 @@ class Tool:
                 "which will be injected by the framework, please remove it from the tool definition."
             )
 
-        template_override = tool_def.get("template_override")
-        timeout = tool_def.get("timeout")
+        return tool_def
 
-        # Create tool instance
+    @classmethod
+    def from_definition(
+        cls,
+        tool_def: dict[str, Any],
+        binding: Callable | str | None,
+        as_skill: bool = False,
+        extra_kwargs: dict[str, Any] | None = None,
+        **kwargs,
+    ) -> "Tool":
+        """Create a tool from a definition returned by :meth:`load_definition`."""
         return cls(
-            name=name,
-            description=description,
-            skill_description=skill_description,
-            input_schema=input_schema,
+            name=tool_def["name"],
+            description=tool_def["description"],
+            skill_description=tool_def.get("skill_description", ""),
+            # Each tool gets its own schema copy; definitions may be cached and shared
+            input_schema=copy.deepcopy(tool_def.get("input_schema", {})),
             implementation=binding,
             as_skill=as_skill,
-            use_cache=use_cache,
-            disable_parallel=disable_parallel,
-            template_override=template_override,
-            timeout=timeout,
+            use_cache=tool_def.get("use_cache", False),
+            disable_parallel=tool_def.get("disable_parallel", False),
+            template_override=tool_def.get("template_override"),
+            timeout=tool_def.get("timeout"),
             extra_kwargs=extra_kwargs,
             **kwargs,
         )
 
+    @property
+    def is_async(self) -> bool:
+        """Whether the implementation is a coroutine function that can be awaited natively."""
+        try:
+            implementation = self._resolve_implementation()
+        except Exception:
+            # Let execute() surface the import error through the normal path
+            return False
+        return inspect.iscoroutinefunction(implementation)
+
     def execute(self, **params) -> dict:
         """Execute the tool with given parameters."""
+        implementation, filtered_params = self._prepare_call(params)
+
+        try:
+            # Execute the implementation
+            result = implementation(**filtered_params)
+            if inspect.isawaitable(result):
+                # Coroutine tools called from sync code get a private event loop
+                result = asyncio.run(_await(result))
+
+            return self._normalize_result(result)
 
+        except Exception as e:
+            return self._error_result(e)
+
+    async def aexecute(self, **params) -> dict:
+        """Execute the tool from async code.
+
+        Coroutine implementations are awaited directly; synchronous ones run in a
+        worker thread so they never block the event loop.
+        """
+        implementation, filtered_params = self._prepare_call(params)
+
+        try:
+            if inspect.iscoroutinefunction(implementation):
+                result = await implementation(**filtered_params)
+            else:
+                result = await asyncio.to_thread(implementation, **filtered_params)
+                if inspect.isawaitable(result):
+                    result = await result
+
+            return self._normalize_result(result)
+
+        except Exception as e:
+            return self._error_result(e)
+
+    def _resolve_implementation(self) -> Callable:
+        """Import the implementation lazily on first use."""
         if self.implementation is None:
             if self.implementation_import_path:
                 logger.info(f"Dynamic importing tool implementation '{self.name}': {self.implementation_import_path}")
@@ -209,6 +293,11 @@ class Tool:
                 self.implementation = func
             else:
                 raise ValueError(f"Tool '{self.name}' has no implementation")
+        return self.implementation
+
+    def _prepare_call(self, params: dict[str, Any]) -> tuple[Callable, dict[str, Any]]:
+        """Resolve the implementation and build validated call parameters."""
+        implementation = self._resolve_implementation()
 
         # Handle agent_state parameter
         merged_params = {**self.extra_kwargs, **params}
@@ -216,7 +305,7 @@ class Tool:
         filtered_params = merged_params.copy()
         if "agent_state" in merged_params:
             # Check if the function signature accepts agent_state
-            sig = inspect.signature(self.implementation)
+            sig = inspect.signature(implementation)
             if "agent_state" not in sig.parameters:
                 # Remove agent_state if function doesn't accept it
                 filtered_params.pop("agent_state", None)
@@ -233,24 +322,23 @@ class Tool:
                 f"Invalid parameters for tool '{self.name}': {validation_params}",
             )
 
-        try:
-            # Execute the implementation
-            result = self.implementation(**filtered_params)
+        return implementation, filtered_params
 
-            # Ensure result is a dictionary
-            if not isinstance(result, dict):
-                result = {"result": result}
-
-            return result
+    @staticmethod
+    def _normalize_result(result: Any) -> dict:
+        # Ensure result is a dictionary
+        if not isinstance(result, dict):
+            result = {"result": result}
+        return result
 
-        except Exception as e:
-            # Return error information
-            return {
-                "error": str(e),
-                "error_type": type(e).__name__,
-                "traceback": traceback.format_exc(),
-                "tool_name": self.name,
-            }
+    def _error_result(self, error: Exception) -> dict:
+        # Return error information
+        return {
+            "error": str(error),
+            "error_type": type(error).__name__,
+            "traceback": traceback.format_exc(),
+            "tool_name": self.name,
+        }
 
     def validate_params(self, params: dict) -> bool:
         """Validate parameters against schema.
@@ -17,6 +17,9 @@
 from nexau.archs.tracer.composite import CompositeTracer
 from nexau.archs.tracer.context import TraceContext, get_current_span, reset_current_span, set_current_span
 from nexau.archs.tracer.core import BaseTracer, Span, SpanType
+from nexau.archs.tracer.export import BatchExporter
+from nexau.archs.tracer.metrics import LatencyHistogram, SpanMetrics
+from nexau.archs.tracer.payload import SpanPayloadPolicy, set_default_payload_policy
 
 __all__ = [
     "BaseTracer",
@@ -24,6 +27,11 @@ __all__ = [
     "SpanType",
     "TraceContext",
     "CompositeTracer",
+    "BatchExporter",
+    "LatencyHistogram",
+    "SpanMetrics",
+    "SpanPayloadPolicy",
+    "set_default_payload_policy",
     "get_current_span",
     "set_current_span",
     "reset_current_span",
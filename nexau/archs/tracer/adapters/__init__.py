@@ -16,8 +16,10 @@
 
 from nexau.archs.tracer.adapters.in_memory import InMemoryTracer
 from nexau.archs.tracer.adapters.langfuse import LangfuseTracer
+from nexau.archs.tracer.adapters.local import LocalTracer
 
 __all__ = [
     "InMemoryTracer",
     "LangfuseTracer",
+    "LocalTracer",
 ]
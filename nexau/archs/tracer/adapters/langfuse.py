@@ -16,11 +16,14 @@
 
 import json
 import logging
+import random
+import time
 import uuid
 from datetime import datetime
 from typing import Any
 
 from nexau.archs.tracer.core import BaseTracer, Span, SpanType
+from nexau.archs.tracer.export import BatchExporter, OverflowPolicy, release_exporter, shared_exporter
 
 logger = logging.getLogger(__name__)
 
@@ -31,6 +34,9 @@ except ImportError:
     Langfuse = None  # type: ignore
     pass
 
+# vendor_obj of spans left out by sampling; their children are skipped too
+_NOT_SAMPLED = object()
+
 
 class LangfuseTracer(BaseTracer):
     """Tracer adapter for Langfuse observability platform.
@@ -58,6 +64,13 @@ class LangfuseTracer(BaseTracer):
         - LANGFUSE_PUBLIC_KEY
         - LANGFUSE_SECRET_KEY
         - LANGFUSE_HOST
+
+    By default spans are exported by a background :class:`BatchExporter`
+    shared by all tracers with the same export settings: the agent thread
+    only creates the Langfuse observation (so hierarchy and start times stay
+    exact), while serializing inputs and outputs, updating and ending
+    observations and flushing the client happen on the worker. Pending data
+    is flushed by :meth:`flush`, :meth:`shutdown` and at exit.
     """
 
     def __init__(
@@ -70,6 +83,13 @@ class LangfuseTracer(BaseTracer):
         tags: list[str] | None = None,
         debug: bool = False,
         enabled: bool = True,
+        async_export: bool = True,
+        max_queue_size: int = 10_000,
+        batch_size: int = 100,
+        flush_interval: float = 1.0,
+        overflow_policy: OverflowPolicy = "drop",
+        sample_rate: float = 1.0,
+        max_field_chars: int | None = None,
     ):
         """Initialize Langfuse tracer.
 
@@ -79,6 +99,13 @@ class LangfuseTracer(BaseTracer):
             host: Langfuse host URL (or use LANGFUSE_HOST env var)
             debug: Enable debug logging
             enabled: Whether tracing is enabled (can be disabled for testing)
+            async_export: Export from a background thread; False updates and flushes inline on every span end
+            max_queue_size: Maximum number of pending export operations
+            batch_size: Export operations per client flush
+            flush_interval: Maximum seconds before pending data is flushed
+            overflow_policy: ``"drop"`` discards operations when the queue is full, ``"block"`` waits for room
+            sample_rate: Fraction of root traces to export; children follow their root
+            max_field_chars: Truncate exported input/output strings to this length; None (default) exports them whole
 
         Raises:
             ImportError: If langfuse package is not installed
@@ -88,6 +115,9 @@ class LangfuseTracer(BaseTracer):
 
         self.enabled = enabled
         self.debug = debug
+        self.sample_rate = min(1.0, max(0.0, sample_rate))
+        self.max_field_chars = max_field_chars
+        self.exporter: BatchExporter | None = None
 
         if not self.enabled:
             self.client = None
@@ -110,6 +140,14 @@ class LangfuseTracer(BaseTracer):
         self.tags = tags
 
         self.client = Langfuse(**client_kwargs)
+        if async_export:
+            self.exporter = shared_exporter(
+                self.client.flush,
+                max_queue_size=max_queue_size,
+                batch_size=batch_size,
+                flush_interval=flush_interval,
+                overflow_policy=overflow_policy,
+            )
         logger.info(f"Langfuse tracer initialized (host: {host or 'default'})")
 
     def start_span(
@@ -154,6 +192,13 @@ class LangfuseTracer(BaseTracer):
         if not self.enabled or self.client is None:
             return span
 
+        is_root = parent_span is None or parent_span.vendor_obj is None
+        if (parent_span is not None and parent_span.vendor_obj is _NOT_SAMPLED) or (
+            is_root and self.sample_rate < 1.0 and random.random() >= self.sample_rate
+        ):
+            span.vendor_obj = _NOT_SAMPLED
+            return span
+
         # Prepare common parameters
         langfuse_params: dict[str, Any] = {
             "name": name,
@@ -170,12 +215,12 @@ class LangfuseTracer(BaseTracer):
         if self.tags:
             langfuse_params["metadata"]["langfuse_tags"] = self.tags
 
-        # Serialize inputs properly
-        if inputs:
-            langfuse_params["input"] = self._serialize_for_langfuse(inputs)
+        # Serialize inputs properly; the exporter does it off the agent thread
+        if inputs and self.exporter is None:
+            langfuse_params["input"] = self._serialize_for_langfuse(inputs, self.max_field_chars)
 
         try:
-            if parent_span is None or parent_span.vendor_obj is None:
+            if is_root:
                 # Root level: Create a Trace
                 langfuse_span = self.client.start_span(**langfuse_params)
                 span.vendor_obj = langfuse_span
@@ -205,6 +250,9 @@ class LangfuseTracer(BaseTracer):
         except Exception as e:
             logger.warning(f"Failed to create Langfuse span '{name}': {e}")
 
+        if inputs and self.exporter is not None and span.vendor_obj is not None:
+            self.exporter.submit(self._export_input, span.vendor_obj, _snapshot(inputs))
+
         return span
 
     def end_span(
@@ -230,37 +278,26 @@ class LangfuseTracer(BaseTracer):
         if error is not None:
             span.error = str(error)
 
-        if not self.enabled or span.vendor_obj is None:
+        if not self.enabled or span.vendor_obj is None or span.vendor_obj is _NOT_SAMPLED:
             return
 
-        try:
-            langfuse_span = span.vendor_obj
-
-            # Prepare update parameters
-            update_params: dict[str, Any] = {}
-
-            if outputs is not None:
-                update_params["output"] = self._serialize_for_langfuse(outputs)
-                if "model" in outputs and "usage" in outputs:
-                    langfuse_span.update(model=outputs["model"], usage_details=outputs["usage"])
-
-            if error is not None:
-                update_params["level"] = "ERROR"
-                update_params["status_message"] = str(error)
-
-            if attributes:
-                # Merge with existing metadata
-                existing_metadata = getattr(langfuse_span, "metadata", {}) or {}
-                update_params["metadata"] = {**existing_metadata, **attributes}
-
-            # Update the Langfuse object
-            if update_params:
-                langfuse_span.update(**update_params)
-
-            # End the span (for timing)
-            if hasattr(langfuse_span, "end"):
-                langfuse_span.end()
+        error_message = str(error) if error is not None else None
+        if self.exporter is not None:
+            self.exporter.submit(
+                self._export_end,
+                span.vendor_obj,
+                _snapshot(outputs),
+                error_message,
+                attributes,
+                time.time_ns(),
+            )
+            if span.parent_id is None:
+                # A finished trace is a natural point to ship what is pending
+                self.exporter.request_flush()
+            return
 
+        try:
+            self._export_end(span.vendor_obj, outputs, error_message, attributes)
             if self.debug:
                 duration = span.duration_ms()
                 logger.debug(f"Ended Langfuse span: {span.name} (duration={duration:.2f}ms)")
@@ -270,8 +307,55 @@ class LangfuseTracer(BaseTracer):
         except Exception as e:
             logger.warning(f"Failed to end Langfuse span '{span.name}': {e}")
 
+    def _export_input(self, langfuse_span: Any, inputs: Any) -> None:
+        langfuse_span.update(input=self._serialize_for_langfuse(inputs, self.max_field_chars))
+
+    def _export_end(
+        self,
+        langfuse_span: Any,
+        outputs: Any,
+        error_message: str | None,
+        attributes: dict[str, Any] | None,
+        end_time_ns: int | None = None,
+    ) -> None:
+        """Update a Langfuse object with the span's results and end it."""
+        # Prepare update parameters
+        update_params: dict[str, Any] = {}
+
+        if outputs is not None:
+            update_params["output"] = self._serialize_for_langfuse(outputs, self.max_field_chars)
+            if "model" in outputs and "usage" in outputs:
+                langfuse_span.update(model=outputs["model"], usage_details=outputs["usage"])
+
+        if error_message is not None:
+            update_params["level"] = "ERROR"
+            update_params["status_message"] = error_message
+
+        if attributes:
+            # Merge with existing metadata
+            existing_metadata = getattr(langfuse_span, "metadata", {}) or {}
+            update_params["metadata"] = {**existing_metadata, **attributes}
+
+        # Update the Langfuse object
+        if update_params:
+            langfuse_span.update(**update_params)
+
+        # End the span (for timing); the recorded end time is used when ended later
+        if hasattr(langfuse_span, "end"):
+            if end_time_ns is None:
+                langfuse_span.end()
+            else:
+                try:
+                    langfuse_span.end(end_time=end_time_ns)
+                except TypeError:
+                    langfuse_span.end()
+
     def flush(self) -> None:
         """Flush pending data to Langfuse."""
+        if self.exporter is not None:
+            if not self.exporter.flush():
+                logger.warning("Timed out flushing Langfuse data")
+            return
         if self.enabled and self.client is not None:
             try:
                 self.client.flush()
@@ -281,7 +365,12 @@ class LangfuseTracer(BaseTracer):
                 logger.warning(f"Failed to flush Langfuse data: {e}")
 
     def shutdown(self) -> None:
-        """Shutdown the Langfuse client."""
+        """Export pending data and shutdown the Langfuse client."""
+        if self.exporter is not None and self.client is not None:
+            if not release_exporter(self.exporter, self.client.flush):
+                logger.warning("Timed out flushing Langfuse data")
+            if self.exporter.dropped:
+                logger.warning(f"Langfuse exporter dropped {self.exporter.dropped} export operations (queue full)")
         if self.enabled and self.client is not None:
             try:
                 self.client.shutdown()
@@ -290,7 +379,7 @@ class LangfuseTracer(BaseTracer):
                 logger.warning(f"Failed to shutdown Langfuse client: {e}")
 
     @staticmethod
-    def _serialize_for_langfuse(data: Any) -> Any:
+    def _serialize_for_langfuse(data: Any, max_chars: int | None = None) -> Any:
         """Serialize data for Langfuse API.
 
         Langfuse accepts strings, dicts, and lists. Complex objects
@@ -298,6 +387,7 @@ class LangfuseTracer(BaseTracer):
 
         Args:
             data: Data to serialize
+            max_chars: Truncate strings longer than this many characters
 
         Returns:
             Langfuse-compatible representation
@@ -305,18 +395,42 @@ class LangfuseTracer(BaseTracer):
         if data is None:
             return None
 
-        if isinstance(data, (str, int, float, bool)):
+        if isinstance(data, str):
+            return _truncate(data, max_chars)
+
+        if isinstance(data, (int, float, bool)):
             return data
 
         if isinstance(data, dict):
             # Recursively serialize dict values
-            return {k: LangfuseTracer._serialize_for_langfuse(v) for k, v in data.items()}
+            return {k: LangfuseTracer._serialize_for_langfuse(v, max_chars) for k, v in data.items()}
 
         if isinstance(data, (list, tuple)):
-            return [LangfuseTracer._serialize_for_langfuse(item) for item in data]
+            return [LangfuseTracer._serialize_for_langfuse(item, max_chars) for item in data]
 
         # For other types, convert to JSON string
         try:
-            return json.dumps(data, ensure_ascii=False, default=str)
+            return _truncate(json.dumps(data, ensure_ascii=False, default=str), max_chars)
         except (TypeError, ValueError):
-            return str(data)
+            return _truncate(str(data), max_chars)
+
+
+def _truncate(text: str, max_chars: int | None) -> str:
+    if max_chars is None or len(text) <= max_chars:
+        return text
+    return f"{text[:max_chars]}... [truncated {len(text) - max_chars} chars]"
+
+
+def _snapshot(data: Any) -> Any:
+    """Copy the containers of a payload so later in-place changes (e.g. appended messages) are not exported.
+
+    Only the top two levels are copied; values are serialized later on the exporter thread.
+    """
+    if isinstance(data, dict):
+        return {
+            key: list(value) if isinstance(value, list) else dict(value) if isinstance(value, dict) else value
+            for key, value in data.items()
+        }
+    if isinstance(data, list):
+        return list(data)
+    return data
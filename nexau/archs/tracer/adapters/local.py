@@ -0,0 +1,413 @@
+# Copyright (c) Nex-AGI. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Local tracer writing spans to a rotating file or an OTLP collector."""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+import time
+import urllib.request
+import uuid
+from collections import deque
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Literal
+
+from nexau.archs.tracer.core import BaseTracer, Span, SpanType
+from nexau.archs.tracer.export import BatchExporter, OverflowPolicy, release_exporter, shared_exporter
+from nexau.archs.tracer.metrics import DEFAULT_LATENCY_BUCKETS_MS, SpanMetrics
+from nexau.archs.tracer.payload import truncate_payload
+
+logger = logging.getLogger(__name__)
+
+SpanFormat = Literal["ndjson", "otlp"]
+
+# OTLP status codes and span kind
+_STATUS_OK = 1
+_STATUS_ERROR = 2
+_SPAN_KIND_INTERNAL = 1
+
+
+@dataclass
+class _LocalSpanHandle:
+    """Vendor object of a span started by :class:`LocalTracer`."""
+
+    trace_id: str
+    span_id: str
+    parent_span_id: str | None
+    name: str
+    span_type: SpanType
+    start_time_ns: int
+    start_perf: float
+    inputs: dict[str, Any] = field(default_factory=dict)
+    attributes: dict[str, Any] = field(default_factory=dict)
+
+
+class LocalTracer(BaseTracer):
+    """Production tracer for offline performance analysis, without a SaaS backend.
+
+    Finished spans are:
+
+    - kept in a fixed-size ring buffer (:meth:`recent_spans`);
+    - aggregated into latency histograms per span type and per tool/model,
+      plus token counters per model (:meth:`metrics`);
+    - written from a background :class:`~nexau.archs.tracer.export.BatchExporter`
+      either to ``path`` as compact NDJSON (one span per line) or OTLP/JSON
+      (one ``ExportTraceServiceRequest`` per line, as the OpenTelemetry
+      collector file exporter writes), rotated at ``max_bytes``; or to an
+      OTLP/HTTP ``endpoint`` such as ``http://localhost:4318/v1/traces``,
+      which always receives OTLP/JSON.
+
+    Without ``path`` or ``endpoint`` only the ring buffer and metrics are kept.
+    Span payloads are omitted unless ``include_payloads`` is set.
+
+    Example:
+        ```python
+        tracer = LocalTracer(path="traces/nexau.jsonl", metrics_path="traces/metrics.json")
+        ```
+    """
+
+    def __init__(
+        self,
+        path: str | os.PathLike[str] | None = None,
+        *,
+        endpoint: str | None = None,
+        format: SpanFormat = "ndjson",
+        service_name: str = "nexau",
+        max_bytes: int = 50 * 1024 * 1024,
+        backup_count: int = 5,
+        buffer_size: int = 1000,
+        include_payloads: bool = False,
+        max_field_chars: int = 4000,
+        metrics_path: str | os.PathLike[str] | None = None,
+        latency_buckets_ms: tuple[float, ...] = DEFAULT_LATENCY_BUCKETS_MS,
+        headers: dict[str, str] | None = None,
+        batch_size: int = 100,
+        flush_interval: float = 1.0,
+        max_queue_size: int = 10_000,
+        overflow_policy: OverflowPolicy = "drop",
+    ):
+        """Initialize the local tracer.
+
+        Args:
+            path: File receiving the spans; rotated to ``path.1`` ... ``path.<backup_count>``
+            endpoint: OTLP/HTTP traces endpoint of a local collector
+            format: ``"ndjson"`` for compact records or ``"otlp"`` for OTLP/JSON (file output only)
+            service_name: ``service.name`` resource attribute of OTLP output
+            max_bytes: File size that triggers a rotation; 0 disables rotation
+            backup_count: Number of rotated files kept
+            buffer_size: Number of finished spans kept in memory
+            include_payloads: Record span inputs and outputs, truncated to ``max_field_chars``
+            max_field_chars: Longest string kept in recorded payloads
+            metrics_path: JSON file the metrics snapshot is written to on flush and shutdown
+            latency_buckets_ms: Upper bounds of the latency histogram buckets
+            headers: Extra HTTP headers sent to ``endpoint``
+            batch_size: Spans per write or request
+            flush_interval: Maximum seconds before buffered spans are written
+            max_queue_size: Maximum number of spans waiting to be written
+            overflow_policy: ``"drop"`` or ``"block"`` when the queue is full
+
+        Raises:
+            ValueError: If ``format`` is unknown
+        """
+        if format not in ("ndjson", "otlp"):
+            raise ValueError(f"Unknown span format '{format}', expected 'ndjson' or 'otlp'")
+        self.format = format
+        self.service_name = service_name
+        self.include_payloads = include_payloads
+        self.max_field_chars = max_field_chars
+        self.metrics_path = Path(metrics_path) if metrics_path else None
+        self.span_metrics = SpanMetrics(latency_buckets_ms)
+        self._recent: deque[dict[str, Any]] = deque(maxlen=max(1, buffer_size))
+
+        self._sinks: list[_FileSink | _CollectorSink] = []
+        if path is not None:
+            self._sinks.append(_FileSink(Path(path), format, service_name, max_bytes, backup_count))
+        if endpoint is not None:
+            self._sinks.append(_CollectorSink(endpoint, service_name, headers or {}))
+
+        self.exporter: BatchExporter | None = None
+        if self._sinks:
+            self.exporter = shared_exporter(
+                self._write_pending,
+                max_queue_size=max_queue_size,
+                batch_size=batch_size,
+                flush_interval=flush_interval,
+                overflow_policy=overflow_policy,
+            )
+
+    def start_span(
+        self,
+        name: str,
+        span_type: SpanType,
+        inputs: dict[str, Any] | None = None,
+        parent_span: Span | None = None,
+        attributes: dict[str, Any] | None = None,
+    ) -> Span:
+        """Start a span; children inherit the trace id of their parent."""
+        parent = parent_span.vendor_obj if parent_span is not None else None
+        handle = _LocalSpanHandle(
+            trace_id=parent.trace_id if isinstance(parent, _LocalSpanHandle) else uuid.uuid4().hex,
+            span_id=uuid.uuid4().hex[:16],
+            parent_span_id=parent.span_id if isinstance(parent, _LocalSpanHandle) else None,
+            name=name,
+            span_type=span_type,
+            start_time_ns=time.time_ns(),
+            start_perf=time.perf_counter(),
+            inputs=inputs or {},
+            attributes=dict(attributes or {}),
+        )
+        return Span(
+            id=handle.span_id,
+            name=name,
+            type=span_type,
+            parent_id=handle.parent_span_id,
+            start_time=handle.start_time_ns / 1e9,
+            inputs=inputs or {},
+            attributes=attributes or {},
+            vendor_obj=handle,
+        )
+
+    def end_span(
+        self,
+        span: Span,
+        outputs: Any = None,
+        error: Exception | None = None,
+        attributes: dict[str, Any] | None = None,
+    ) -> None:
+        """Record the finished span in the buffer and metrics and queue it for writing."""
+        handle = span.vendor_obj
+        if not isinstance(handle, _LocalSpanHandle):
+            return
+        duration_ms = (time.perf_counter() - handle.start_perf) * 1000
+        output_dict = outputs if isinstance(outputs, dict) else {}
+        usage = output_dict.get("usage") if isinstance(output_dict.get("usage"), dict) else None
+        model = output_dict.get("model") or handle.inputs.get("model")
+
+        record: dict[str, Any] = {
+            "trace_id": handle.trace_id,
+            "span_id": handle.span_id,
+            "parent_span_id": handle.parent_span_id,
+            "name": handle.name,
+            "type": handle.span_type.value,
+            "start_time_ns": handle.start_time_ns,
+            "duration_ms": round(duration_ms, 3),
+            "status": "error" if error is not None else "ok",
+        }
+        if error is not None:
+            record["error"] = str(error)
+        if model:
+            record["model"] = str(model)
+        if usage:
+            record["usage"] = usage
+        merged_attributes = {**handle.attributes, **(attributes or {})}
+        if merged_attributes:
+            record["attributes"] = merged_attributes
+        if self.include_payloads:
+            record["inputs"] = truncate_payload(handle.inputs, self.max_field_chars)
+            if outputs is not None:
+                record["outputs"] = truncate_payload(outputs, self.max_field_chars)
+
+        key = str(model) if handle.span_type == SpanType.LLM and model else handle.name
+        self.span_metrics.record(handle.span_type.value, key, duration_ms, error=error is not None, usage=usage)
+        self._recent.append(record)
+
+        if self.exporter is not None:
+            self.exporter.submit(self._enqueue, record)
+            if handle.parent_span_id is None:
+                self.exporter.request_flush()
+
+    def recent_spans(self) -> list[dict[str, Any]]:
+        """Return the most recently finished spans, oldest first."""
+        return list(self._recent)
+
+    def metrics(self) -> dict[str, Any]:
+        """Return latency histograms, error counts and token counters of the finished spans."""
+        return self.span_metrics.snapshot()
+
+    def write_metrics(self, path: str | os.PathLike[str] | None = None) -> Path | None:
+        """Write the metrics snapshot as JSON to ``path`` (default ``metrics_path``)."""
+        target = Path(path) if path is not None else self.metrics_path
+        if target is None:
+            return None
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_text(json.dumps(self.metrics(), indent=2), encoding="utf-8")
+        return target
+
+    def flush(self) -> None:
+        """Write all finished spans and the metrics snapshot."""
+        if self.exporter is not None:
+            self.exporter.flush()
+        self._write_metrics_safely()
+
+    def shutdown(self) -> None:
+        """Flush, release the exporter and close the output file."""
+        if self.exporter is not None:
+            release_exporter(self.exporter, self._write_pending)
+            self.exporter = None
+        for sink in self._sinks:
+            sink.close()
+        self._write_metrics_safely()
+
+    def _enqueue(self, record: dict[str, Any]) -> None:
+        for sink in self._sinks:
+            sink.add(record)
+
+    def _write_pending(self) -> None:
+        for sink in self._sinks:
+            try:
+                sink.flush()
+            except Exception as exc:
+                logger.warning(f"⚠️ Failed to write local trace spans: {exc}")
+
+    def _write_metrics_safely(self) -> None:
+        try:
+            self.write_metrics()
+        except OSError as exc:
+            logger.warning(f"⚠️ Failed to write trace metrics: {exc}")
+
+
+class _FileSink:
+    """Appends span batches to a size-rotated file."""
+
+    def __init__(self, path: Path, format: SpanFormat, service_name: str, max_bytes: int, backup_count: int) -> None:
+        self.path = path
+        self.format = format
+        self.service_name = service_name
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self._pending: list[dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def add(self, record: dict[str, Any]) -> None:
+        self._pending.append(record)
+
+    def flush(self) -> None:
+        with self._lock:
+            if not self._pending:
+                return
+            records, self._pending = self._pending, []
+            if self.format == "otlp":
+                lines = [json.dumps(_otlp_request(records, self.service_name), default=str)]
+            else:
+                lines = [json.dumps(record, default=str) for record in records]
+            data = "".join(f"{line}\n" for line in lines).encode("utf-8")
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            if self.max_bytes and self.path.exists() and self.path.stat().st_size + len(data) > self.max_bytes:
+                self._rotate()
+            with self.path.open("ab") as handle:
+                handle.write(data)
+
+    def _rotate(self) -> None:
+        if self.backup_count <= 0:
+            self.path.unlink(missing_ok=True)
+            return
+        for index in range(self.backup_count - 1, 0, -1):
+            source = self.path.with_name(f"{self.path.name}.{index}")
+            if source.exists():
+                source.replace(self.path.with_name(f"{self.path.name}.{index + 1}"))
+        self.path.replace(self.path.with_name(f"{self.path.name}.1"))
+
+    def close(self) -> None:
+        self.flush()
+
+
+class _CollectorSink:
+    """Posts span batches to an OTLP/HTTP JSON endpoint; only used from the exporter thread."""
+
+    def __init__(self, endpoint: str, service_name: str, headers: dict[str, str], timeout: float = 5.0) -> None:
+        self.endpoint = endpoint
+        self.service_name = service_name
+        self.headers = {"Content-Type": "application/json", **headers}
+        self.timeout = timeout
+        self._pending: list[dict[str, Any]] = []
+
+    def add(self, record: dict[str, Any]) -> None:
+        self._pending.append(record)
+
+    def flush(self) -> None:
+        if not self._pending:
+            return
+        records, self._pending = self._pending, []
+        body = json.dumps(_otlp_request(records, self.service_name), default=str).encode("utf-8")
+        request = urllib.request.Request(self.endpoint, data=body, headers=self.headers, method="POST")
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            response.read()
+
+    def close(self) -> None:
+        self.flush()
+
+
+def _otlp_value(value: Any) -> dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    if isinstance(value, str):
+        return {"stringValue": value}
+    return {"stringValue": json.dumps(value, default=str, ensure_ascii=False)}
+
+
+def _otlp_attributes(values: dict[str, Any]) -> list[dict[str, Any]]:
+    return [{"key": key, "value": _otlp_value(value)} for key, value in values.items() if value is not None]
+
+
+def _otlp_span(record: dict[str, Any]) -> dict[str, Any]:
+    """Convert a compact span record to an OTLP/JSON span, using GenAI semantic conventions for usage."""
+    attributes: dict[str, Any] = {"nexau.span.type": record["type"], **record.get("attributes", {})}
+    if "model" in record:
+        attributes["gen_ai.request.model"] = record["model"]
+    usage = record.get("usage") or {}
+    input_tokens = usage.get("input_tokens", usage.get("prompt_tokens"))
+    output_tokens = usage.get("output_tokens", usage.get("completion_tokens"))
+    if input_tokens is not None:
+        attributes["gen_ai.usage.input_tokens"] = input_tokens
+    if output_tokens is not None:
+        attributes["gen_ai.usage.output_tokens"] = output_tokens
+    for key in ("inputs", "outputs"):
+        if key in record:
+            attributes[f"nexau.{key}"] = record[key]
+
+    start_ns = record["start_time_ns"]
+    span: dict[str, Any] = {
+        "traceId": record["trace_id"],
+        "spanId": record["span_id"],
+        "name": record["name"],
+        "kind": _SPAN_KIND_INTERNAL,
+        "startTimeUnixNano": str(start_ns),
+        "endTimeUnixNano": str(start_ns + int(record["duration_ms"] * 1_000_000)),
+        "attributes": _otlp_attributes(attributes),
+        "status": {"code": _STATUS_ERROR, "message": record["error"]} if "error" in record else {"code": _STATUS_OK},
+    }
+    if record.get("parent_span_id"):
+        span["parentSpanId"] = record["parent_span_id"]
+    return span
+
+
+def _otlp_request(records: list[dict[str, Any]], service_name: str) -> dict[str, Any]:
+    """Wrap span records in an OTLP ``ExportTraceServiceRequest``."""
+    return {
+        "resourceSpans": [
+            {
+                "resource": {"attributes": _otlp_attributes({"service.name": service_name})},
+                "scopeSpans": [{"scope": {"name": "nexau"}, "spans": [_otlp_span(record) for record in records]}],
+            }
+        ]
+    }
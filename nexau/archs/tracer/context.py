@@ -23,6 +23,7 @@ from contextvars import ContextVar, Token
 from typing import Any
 
 from nexau.archs.tracer.core import BaseTracer, Span, SpanType
+from nexau.archs.tracer.payload import TraceHistory, begin_trace_history, end_trace_history, get_default_payload_policy
 
 # The current active span for this thread/context
 _current_span: ContextVar[Span | None] = ContextVar("current_span", default=None)
@@ -66,6 +67,9 @@ class TraceContext:
     - Setting the span as current in the context
     - Ending the span when exiting (with error handling)
     - Restoring the previous span as current
+    - Shaping inputs and outputs with the tracer's payload policy (history
+      deduplication, tool payload truncation, metadata-only mode); a context
+      without a parent span starts the trace's deduplication history
 
     Example:
         ```python
@@ -105,7 +109,9 @@ class TraceContext:
         self.attributes = attributes or {}
         self.span: Span | None = None
         self.token: Token[Span | None] | None = None
+        self._history_token: Token[TraceHistory | None] | None = None
         self._outputs: Any = None
+        self._end_attributes: dict[str, Any] = {}
 
     def __enter__(self) -> Span:
         """Enter the context and start a new span.
@@ -115,12 +121,15 @@ class TraceContext:
         """
         # Get the current parent span (if any)
         parent = get_current_span()
+        if parent is None:
+            self._history_token = begin_trace_history()
+        policy = self.tracer.payload_policy or get_default_payload_policy()
 
         # Create a new span with the parent relationship
         self.span = self.tracer.start_span(
             name=self.name,
             span_type=self.span_type,
-            inputs=self.inputs,
+            inputs=policy.shape_inputs(self.span_type, self.inputs),
             parent_span=parent,
             attributes=self.attributes,
         )
@@ -141,15 +150,18 @@ class TraceContext:
         if self.span is not None:
             # End the span with error info if exception occurred
             error = exc_val if isinstance(exc_val, Exception) else None
-            self.tracer.end_span(
-                self.span,
-                outputs=self._outputs,
-                error=error,
-            )
+            policy = self.tracer.payload_policy or get_default_payload_policy()
+            end_kwargs: dict[str, Any] = {"outputs": policy.shape_outputs(self.span_type, self._outputs), "error": error}
+            if self._end_attributes:
+                end_kwargs["attributes"] = self._end_attributes
+            self.tracer.end_span(self.span, **end_kwargs)
 
         # Restore the previous parent span
         if self.token is not None:
             reset_current_span(self.token)
+        if self._history_token is not None:
+            end_trace_history(self._history_token)
+            self._history_token = None
 
     def set_outputs(self, outputs: Any) -> None:
         """Set the outputs to be recorded when the span ends.
@@ -158,3 +170,11 @@ class TraceContext:
             outputs: The output data to record
         """
         self._outputs = outputs
+
+    def set_attributes(self, attributes: dict[str, Any]) -> None:
+        """Add attributes to be recorded when the span ends.
+
+        Args:
+            attributes: Attributes merged into the span's metadata
+        """
+        self._end_attributes.update(attributes)
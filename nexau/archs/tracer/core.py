@@ -18,7 +18,10 @@ from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
-from typing import Any
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from nexau.archs.tracer.payload import SpanPayloadPolicy
 
 
 class SpanType(str, Enum):
@@ -72,8 +75,14 @@ class BaseTracer(ABC):
 
     Implementations should handle the specifics of sending trace data
     to their respective backends (Langfuse, OpenTelemetry, etc.).
+
+    Attributes:
+        payload_policy: Policy applied by TraceContext to span inputs and outputs;
+            None uses the process default (see ``nexau.archs.tracer.payload``)
     """
 
+    payload_policy: "SpanPayloadPolicy | None" = None
+
     @abstractmethod
     def start_span(
         self,
@@ -0,0 +1,299 @@
+# Copyright (c) Nex-AGI. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Background export pipeline shared by tracer adapters."""
+
+from __future__ import annotations
+
+import atexit
+import functools
+import logging
+import threading
+import time
+import weakref
+from collections import deque
+from collections.abc import Callable
+from typing import Any, Literal
+
+logger = logging.getLogger(__name__)
+
+OverflowPolicy = Literal["drop", "block"]
+
+
+class BatchExporter:
+    """Run tracer export work on a background thread.
+
+    Adapters :meth:`submit` small operations (serialize and send a span
+    update, end a span, ...) instead of doing them on the agent thread. The
+    worker runs them in submission order and calls the attached flush
+    functions once ``batch_size`` operations ran or ``flush_interval`` seconds passed since
+    the last flush, whichever comes first.
+
+    The queue holds at most ``max_queue_size`` operations. When it is full,
+    ``overflow_policy="drop"`` discards the new operation (counted in
+    :attr:`dropped`) and ``"block"`` makes the producer wait for room.
+    Pending work is flushed on :meth:`shutdown` and at interpreter exit.
+
+    Several backends can share one exporter (and so one thread): each
+    :meth:`attach` adds its own flush function, and adapters normally get a
+    process-wide instance from :func:`shared_exporter`.
+    """
+
+    def __init__(
+        self,
+        flush_fn: Callable[[], Any] | None = None,
+        *,
+        max_queue_size: int = 10_000,
+        batch_size: int = 100,
+        flush_interval: float = 1.0,
+        overflow_policy: OverflowPolicy = "drop",
+        name: str = "tracer-export",
+    ):
+        """Initialize exporter and start its worker thread.
+
+        Args:
+            flush_fn: Attached right away (see :meth:`attach`), e.g. the SDK client's flush
+            max_queue_size: Maximum number of pending operations
+            batch_size: Operations per batch before ``flush_fn`` runs
+            flush_interval: Maximum seconds between flushes while work is pending
+            overflow_policy: ``"drop"`` or ``"block"`` when the queue is full
+            name: Name of the worker thread
+
+        Raises:
+            ValueError: If ``overflow_policy`` is unknown
+        """
+        if overflow_policy not in ("drop", "block"):
+            raise ValueError(f"Unknown overflow policy '{overflow_policy}', expected 'drop' or 'block'")
+        self.max_queue_size = max(1, max_queue_size)
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = max(0.0, flush_interval)
+        self.overflow_policy = overflow_policy
+
+        self.submitted = 0
+        self.exported = 0
+        self.dropped = 0
+        self.failed = 0
+
+        self._queue: deque[tuple[Callable[..., Any], tuple[Any, ...]]] = deque()
+        self._condition = threading.Condition()
+        self._flush_requested = False
+        self._in_progress = 0
+        self._closed = False
+        self._flush_fns: list[Callable[[], Any]] = []
+        self._exit_hook = functools.partial(_shutdown_at_exit, weakref.ref(self))
+        self._worker = threading.Thread(target=self._run, name=name, daemon=True)
+        self._worker.start()
+        if flush_fn is not None:
+            self.attach(flush_fn)
+        else:
+            atexit.register(self._exit_hook)
+
+    @property
+    def attached(self) -> int:
+        """Number of backends whose flush function is attached."""
+        with self._condition:
+            return len(self._flush_fns)
+
+    def attach(self, flush_fn: Callable[[], Any]) -> None:
+        """Also call ``flush_fn`` after every batch.
+
+        The exit hook is re-registered after ``flush_fn``'s SDK client so
+        pending work is exported before that client shuts down (atexit is LIFO).
+        """
+        with self._condition:
+            self._flush_fns.append(flush_fn)
+        atexit.unregister(self._exit_hook)
+        atexit.register(self._exit_hook)
+
+    def detach(self, flush_fn: Callable[[], Any]) -> int:
+        """Stop calling ``flush_fn`` after batches.
+
+        Returns:
+            Number of backends still attached
+        """
+        with self._condition:
+            if flush_fn in self._flush_fns:
+                self._flush_fns.remove(flush_fn)
+            return len(self._flush_fns)
+
+    @property
+    def pending(self) -> int:
+        """Number of queued or running operations."""
+        with self._condition:
+            return len(self._queue) + self._in_progress
+
+    def submit(self, fn: Callable[..., Any], *args: Any) -> bool:
+        """Queue ``fn(*args)`` for the worker.
+
+        Returns:
+            False if the operation was dropped because the queue is full or the exporter is shut down
+        """
+        with self._condition:
+            if self._closed:
+                self.dropped += 1
+                return False
+            if len(self._queue) >= self.max_queue_size:
+                if self.overflow_policy == "drop":
+                    self.dropped += 1
+                    return False
+                while len(self._queue) >= self.max_queue_size and not self._closed:
+                    self._condition.wait()
+                if self._closed:
+                    self.dropped += 1
+                    return False
+            self._queue.append((fn, args))
+            self.submitted += 1
+            self._condition.notify_all()
+        return True
+
+    def request_flush(self) -> None:
+        """Ask the worker to flush after the currently queued operations, without waiting."""
+        with self._condition:
+            self._flush_requested = True
+            self._condition.notify_all()
+
+    def flush(self, timeout: float | None = 10.0) -> bool:
+        """Wait until all queued operations ran and were flushed.
+
+        Returns:
+            False if the timeout expired first
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            self._flush_requested = True
+            self._condition.notify_all()
+            while (self._queue or self._in_progress or self._flush_requested) and self._worker.is_alive():
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._condition.wait(remaining)
+        return True
+
+    def shutdown(self, timeout: float | None = 10.0) -> None:
+        """Flush pending work and stop the worker; later submissions are dropped."""
+        if self._closed:
+            return
+        self.flush(timeout)
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        self._worker.join(timeout)
+        atexit.unregister(self._exit_hook)
+
+    def _run(self) -> None:
+        # Start of the current batch window; the first unflushed operation opens it
+        window_start = time.monotonic()
+        unflushed = 0
+        while True:
+            with self._condition:
+                while not self._queue and not self._closed and not self._flush_requested:
+                    wait = None if not unflushed else max(0.0, window_start + self.flush_interval - time.monotonic())
+                    if wait == 0.0:
+                        break
+                    self._condition.wait(wait)
+                if self._closed and not self._queue:
+                    return
+                batch = [self._queue.popleft() for _ in range(min(len(self._queue), self.batch_size))]
+                self._in_progress = len(batch)
+                flush_requested = self._flush_requested
+                self._condition.notify_all()
+
+            if batch and not unflushed:
+                window_start = time.monotonic()
+            for fn, args in batch:
+                try:
+                    fn(*args)
+                    self.exported += 1
+                except Exception as exc:
+                    self.failed += 1
+                    logger.warning(f"⚠️ Trace export operation failed: {exc}")
+            unflushed += len(batch)
+
+            due = time.monotonic() - window_start >= self.flush_interval
+            if flush_requested or (unflushed and (unflushed >= self.batch_size or due)):
+                self._flush_backend()
+                unflushed = 0
+
+            with self._condition:
+                self._in_progress = 0
+                if flush_requested and not self._queue:
+                    self._flush_requested = False
+                self._condition.notify_all()
+
+    def _flush_backend(self) -> None:
+        with self._condition:
+            flush_fns = list(self._flush_fns)
+        for flush_fn in flush_fns:
+            try:
+                flush_fn()
+            except Exception as exc:
+                logger.warning(f"⚠️ Trace export flush failed: {exc}")
+
+
+_shared_exporters: dict[tuple[Any, ...], BatchExporter] = {}
+_shared_lock = threading.Lock()
+
+
+def shared_exporter(
+    flush_fn: Callable[[], Any],
+    *,
+    max_queue_size: int = 10_000,
+    batch_size: int = 100,
+    flush_interval: float = 1.0,
+    overflow_policy: OverflowPolicy = "drop",
+) -> BatchExporter:
+    """Return the process-wide exporter for these settings with ``flush_fn`` attached.
+
+    Tracers created with the same settings share one worker thread. Pair
+    every call with :func:`release_exporter`, which stops the worker once
+    its last backend is released.
+
+    Raises:
+        ValueError: If ``overflow_policy`` is unknown
+    """
+    key = (max_queue_size, batch_size, flush_interval, overflow_policy)
+    with _shared_lock:
+        exporter = _shared_exporters.get(key)
+        if exporter is None or exporter._closed:
+            exporter = BatchExporter(
+                max_queue_size=max_queue_size,
+                batch_size=batch_size,
+                flush_interval=flush_interval,
+                overflow_policy=overflow_policy,
+            )
+            _shared_exporters[key] = exporter
+        exporter.attach(flush_fn)
+    return exporter
+
+
+def release_exporter(exporter: BatchExporter, flush_fn: Callable[[], Any], timeout: float | None = 10.0) -> bool:
+    """Flush ``exporter``, detach ``flush_fn`` and shut the exporter down if nothing else uses it.
+
+    Returns:
+        False if the flush timed out
+    """
+    flushed = exporter.flush(timeout)
+    with _shared_lock:
+        if exporter.detach(flush_fn) == 0:
+            for key, shared in list(_shared_exporters.items()):
+                if shared is exporter:
+                    del _shared_exporters[key]
+            exporter.shutdown(timeout)
+    return flushed
+
+
+def _shutdown_at_exit(ref: weakref.ReferenceType[BatchExporter]) -> None:
+    exporter = ref()
+    if exporter is not None:
+        exporter.shutdown(timeout=5.0)
@@ -0,0 +1,173 @@
+# Copyright (c) Nex-AGI. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Latency histograms and token counters derived from finished spans."""
+
+from __future__ import annotations
+
+import bisect
+import threading
+from collections.abc import Mapping, Sequence
+from typing import Any
+
+# Upper bucket bounds in milliseconds; the last bucket is unbounded
+DEFAULT_LATENCY_BUCKETS_MS: tuple[float, ...] = (
+    1,
+    2,
+    5,
+    10,
+    25,
+    50,
+    100,
+    250,
+    500,
+    1_000,
+    2_500,
+    5_000,
+    10_000,
+    30_000,
+    60_000,
+    120_000,
+    300_000,
+)
+
+# Usage keys reported by the supported providers, mapped to the counter they feed
+_USAGE_KEYS: dict[str, str] = {
+    "prompt_tokens": "input_tokens",
+    "input_tokens": "input_tokens",
+    "completion_tokens": "output_tokens",
+    "output_tokens": "output_tokens",
+    "total_tokens": "total_tokens",
+    "cache_read_input_tokens": "cache_read_tokens",
+    "cache_creation_input_tokens": "cache_write_tokens",
+}
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram with interpolated percentiles."""
+
+    def __init__(self, buckets_ms: Sequence[float] = DEFAULT_LATENCY_BUCKETS_MS) -> None:
+        self.bounds = tuple(sorted(buckets_ms))
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.min_ms: float | None = None
+        self.max_ms: float | None = None
+
+    def observe(self, value_ms: float) -> None:
+        """Record one duration."""
+        self.counts[bisect.bisect_left(self.bounds, value_ms)] += 1
+        self.count += 1
+        self.total_ms += value_ms
+        self.min_ms = value_ms if self.min_ms is None else min(self.min_ms, value_ms)
+        self.max_ms = value_ms if self.max_ms is None else max(self.max_ms, value_ms)
+
+    def percentile(self, q: float) -> float | None:
+        """Estimate the ``q`` quantile (0-100), interpolating within the bucket that holds it."""
+        if not self.count or self.min_ms is None or self.max_ms is None:
+            return None
+        rank = max(0.0, min(100.0, q)) / 100 * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            if not bucket_count or seen + bucket_count < rank:
+                seen += bucket_count
+                continue
+            lower = self.bounds[index - 1] if index else 0.0
+            upper = self.bounds[index] if index < len(self.bounds) else self.max_ms
+            lower, upper = max(lower, self.min_ms), min(upper, self.max_ms)
+            return lower + (upper - lower) * (rank - seen) / bucket_count
+        return self.max_ms
+
+    def to_dict(self) -> dict[str, Any]:
+        """Return count, mean, extremes, common percentiles and the non-empty buckets."""
+        return {
+            "count": self.count,
+            "mean_ms": self.total_ms / self.count if self.count else None,
+            "min_ms": self.min_ms,
+            "max_ms": self.max_ms,
+            "p50_ms": self.percentile(50),
+            "p90_ms": self.percentile(90),
+            "p99_ms": self.percentile(99),
+            "buckets": {("+Inf" if i == len(self.bounds) else str(self.bounds[i])): c for i, c in enumerate(self.counts) if c},
+        }
+
+
+class SpanMetrics:
+    """Thread-safe aggregates over finished spans.
+
+    Keeps a latency histogram per span type and per ``(span type, key)``,
+    where the key is the model for LLM spans and the span name otherwise, an
+    error count per span type and token counters per model.
+    """
+
+    def __init__(self, buckets_ms: Sequence[float] = DEFAULT_LATENCY_BUCKETS_MS) -> None:
+        self.buckets_ms = tuple(buckets_ms)
+        self._lock = threading.Lock()
+        self._by_type: dict[str, LatencyHistogram] = {}
+        self._by_key: dict[tuple[str, str], LatencyHistogram] = {}
+        self._errors: dict[str, int] = {}
+        self._tokens: dict[str, dict[str, int]] = {}
+
+    def record(
+        self,
+        span_type: str,
+        key: str,
+        duration_ms: float,
+        *,
+        error: bool = False,
+        usage: Mapping[str, Any] | None = None,
+    ) -> None:
+        """Add one finished span to the aggregates."""
+        with self._lock:
+            self._histogram(self._by_type, span_type).observe(duration_ms)
+            self._histogram(self._by_key, (span_type, key)).observe(duration_ms)
+            if error:
+                self._errors[span_type] = self._errors.get(span_type, 0) + 1
+            if usage:
+                counters = self._tokens.setdefault(key, {"calls": 0})
+                counters["calls"] += 1
+                counted: set[str] = set()
+                for usage_key, counter in _USAGE_KEYS.items():
+                    value = usage.get(usage_key)
+                    # Gateways may report both spellings of a counter; count it once
+                    if counter not in counted and isinstance(value, int | float) and not isinstance(value, bool):
+                        counters[counter] = counters.get(counter, 0) + int(value)
+                        counted.add(counter)
+
+    def _histogram(self, table: dict[Any, LatencyHistogram], key: Any) -> LatencyHistogram:
+        histogram = table.get(key)
+        if histogram is None:
+            histogram = table[key] = LatencyHistogram(self.buckets_ms)
+        return histogram
+
+    def snapshot(self) -> dict[str, Any]:
+        """Return the aggregates as plain JSON-serializable data."""
+        with self._lock:
+            by_name: dict[str, dict[str, Any]] = {}
+            for (span_type, key), histogram in sorted(self._by_key.items()):
+                by_name.setdefault(span_type, {})[key] = histogram.to_dict()
+            return {
+                "latency_by_type": {span_type: h.to_dict() for span_type, h in sorted(self._by_type.items())},
+                "latency_by_name": by_name,
+                "errors_by_type": dict(self._errors),
+                "tokens_by_model": {model: dict(counters) for model, counters in sorted(self._tokens.items())},
+            }
+
+    def reset(self) -> None:
+        """Drop all aggregates."""
+        with self._lock:
+            self._by_type.clear()
+            self._by_key.clear()
+            self._errors.clear()
+            self._tokens.clear()
@@ -0,0 +1,222 @@
+# Copyright (c) Nex-AGI. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Policies shaping the inputs and outputs recorded on spans.
+
+Every LLM span receives the full request, including the whole message
+history, so a long session would record the same messages over and over.
+:class:`SpanPayloadPolicy` is applied by :class:`~nexau.archs.tracer.context.TraceContext`
+before payloads reach any tracer. The default policy records payloads
+unchanged; every reduction is opt-in:
+
+- History deduplication: messages already recorded in the same trace are
+  replaced by ``{"$history": {"count", "first", "last"}}`` markers that name
+  the content hashes of the skipped run; new messages carry their ``"$hash"``.
+  Repeated static values (system prompt, tool schemas) become ``{"$ref": hash}``.
+  Hashes ignore Anthropic ``cache_control`` markers, which move between
+  requests, and are computed once per distinct message of a trace.
+- Truncation of large tool inputs and outputs.
+- A metadata-only mode that drops payloads and keeps model and usage.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from collections.abc import Hashable
+from contextvars import ContextVar, Token
+from dataclasses import dataclass
+from typing import Any
+
+from nexau.archs.tracer.core import SpanType
+
+# Output keys kept in metadata-only mode (tracers use them for cost accounting)
+_METADATA_KEYS = ("model", "usage")
+
+
+@dataclass
+class SpanPayloadPolicy:
+    """How span payloads are reduced before they are recorded.
+
+    Attributes:
+        dedupe_history: Replace messages and static values already recorded in the trace by hash references
+        history_keys: Input keys holding message histories
+        static_keys: Input keys whose values usually repeat unchanged between calls
+        max_tool_payload_chars: Longest string kept in tool span inputs and outputs; None disables truncation
+        metadata_only: Record no inputs or outputs, only model and usage
+    """
+
+    dedupe_history: bool = False
+    history_keys: tuple[str, ...] = ("messages", "input")
+    static_keys: tuple[str, ...] = ("system", "instructions", "tools")
+    max_tool_payload_chars: int | None = None
+    metadata_only: bool = False
+
+    def shape_inputs(self, span_type: SpanType, inputs: dict[str, Any]) -> dict[str, Any]:
+        """Return the inputs to record for a span; ``inputs`` itself is never modified."""
+        if not inputs:
+            return inputs
+        if self.metadata_only:
+            return {key: inputs[key] for key in _METADATA_KEYS if key in inputs}
+        if span_type == SpanType.TOOL and self.max_tool_payload_chars is not None:
+            return truncate_payload(inputs, self.max_tool_payload_chars)
+        history = _current_history.get()
+        if self.dedupe_history and history is not None and span_type == SpanType.LLM:
+            return self._dedupe(inputs, history)
+        return inputs
+
+    def shape_outputs(self, span_type: SpanType, outputs: Any) -> Any:
+        """Return the outputs to record for a span."""
+        if outputs is None:
+            return None
+        if self.metadata_only:
+            if isinstance(outputs, dict):
+                return {key: outputs[key] for key in _METADATA_KEYS if key in outputs}
+            return None
+        if span_type == SpanType.TOOL and self.max_tool_payload_chars is not None:
+            return truncate_payload(outputs, self.max_tool_payload_chars)
+        return outputs
+
+    def _dedupe(self, inputs: dict[str, Any], history: TraceHistory) -> dict[str, Any]:
+        shaped = dict(inputs)
+        for key in self.static_keys:
+            value = shaped.get(key)
+            if value:
+                digest = history.digest(value)
+                shaped[key] = {"$ref": digest} if history.seen(digest) else value
+        for key in self.history_keys:
+            value = shaped.get(key)
+            if isinstance(value, list):
+                shaped[key] = history.delta(value)
+        return shaped
+
+
+class TraceHistory:
+    """Content hashes of the payloads already recorded in one trace.
+
+    Every LLM span carries the whole history, so digests are cached by a
+    cheap structural fingerprint: interpreter-cached ``str`` hashes make an
+    unchanged message cost a walk over its keys instead of serializing and
+    hashing its full text again.
+    """
+
+    def __init__(self) -> None:
+        self._hashes: set[str] = set()
+        self._digests: dict[Hashable, str] = {}
+
+    def digest(self, value: Any) -> str:
+        """Return the content hash of ``value`` without its ``cache_control`` markers."""
+        fingerprint = _fingerprint(value)
+        digest = self._digests.get(fingerprint)
+        if digest is None:
+            digest = content_hash(_without_cache_control(value))
+            self._digests[fingerprint] = digest
+        return digest
+
+    def seen(self, digest: str) -> bool:
+        """Return whether ``digest`` was recorded before, remembering it either way."""
+        if digest in self._hashes:
+            return True
+        self._hashes.add(digest)
+        return False
+
+    def delta(self, messages: list[Any]) -> list[Any]:
+        """Replace runs of already recorded messages by markers and tag new ones with their hash."""
+        shaped: list[Any] = []
+        run: list[str] = []
+        for message in messages:
+            digest = self.digest(message)
+            if self.seen(digest):
+                run.append(digest)
+                continue
+            if run:
+                shaped.append(_history_marker(run))
+                run = []
+            shaped.append({"$hash": digest, **message} if isinstance(message, dict) else message)
+        if run:
+            shaped.append(_history_marker(run))
+        return shaped
+
+
+def _history_marker(run: list[str]) -> dict[str, Any]:
+    return {"$history": {"count": len(run), "first": run[0], "last": run[-1]}}
+
+
+def _fingerprint(value: Any) -> Hashable:
+    """Hashable stand-in for a JSON-like value, ignoring ``cache_control`` markers."""
+    if isinstance(value, str):
+        return hash(value)
+    if isinstance(value, dict):
+        return (dict, tuple((key, _fingerprint(item)) for key, item in value.items() if key != "cache_control"))
+    if isinstance(value, (list, tuple)):
+        return (list, tuple(_fingerprint(item) for item in value))
+    if value is None or isinstance(value, (bool, int, float)):
+        return (type(value), value)
+    return (type(value), str(value))
+
+
+def _without_cache_control(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {key: _without_cache_control(item) for key, item in value.items() if key != "cache_control"}
+    if isinstance(value, (list, tuple)):
+        return [_without_cache_control(item) for item in value]
+    return value
+
+
+def content_hash(value: Any) -> str:
+    """Return a short, stable hash of a JSON-like value."""
+    encoded = json.dumps(value, sort_keys=True, ensure_ascii=False, default=str).encode()
+    return hashlib.blake2b(encoded, digest_size=8).hexdigest()
+
+
+def truncate_payload(value: Any, max_chars: int) -> Any:
+    """Copy ``value`` with every string longer than ``max_chars`` cut short."""
+    if isinstance(value, str):
+        if len(value) <= max_chars:
+            return value
+        return f"{value[:max_chars]}... [truncated {len(value) - max_chars} chars]"
+    if isinstance(value, dict):
+        return {key: truncate_payload(item, max_chars) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [truncate_payload(item, max_chars) for item in value]
+    return value
+
+
+# History of the trace the current context belongs to; set by the root TraceContext
+_current_history: ContextVar[TraceHistory | None] = ContextVar("trace_history", default=None)
+
+
+def begin_trace_history() -> Token[TraceHistory | None]:
+    """Start a fresh history for a new trace in the current context."""
+    return _current_history.set(TraceHistory())
+
+
+def end_trace_history(token: Token[TraceHistory | None]) -> None:
+    """Drop the history started by :func:`begin_trace_history`."""
+    _current_history.reset(token)
+
+
+# Global instance
+_default_policy = SpanPayloadPolicy()
+
+
+def get_default_payload_policy() -> SpanPayloadPolicy:
+    """Return the policy used for tracers that do not set ``payload_policy``."""
+    return _default_policy
+
+
+def set_default_payload_policy(policy: SpanPayloadPolicy) -> None:
+    """Replace the process-wide default span payload policy."""
+    global _default_policy
+    _default_policy = policy
@@ -36,35 +36,44 @@ sys.modules.setdefault("anthropic", Mock())
 
 
 def _load_nexau_dependencies():
+    from nexau.archs.llm.client_registry import llm_client_registry as _llm_client_registry
     from nexau.archs.llm.llm_config import LLMConfig as _LLMConfig
+    from nexau.archs.llm.retry_policy import endpoint_guards as _endpoint_guards
     from nexau.archs.main_sub.agent import create_agent as _create_agent
     from nexau.archs.main_sub.agent_context import AgentContext as _AgentContext
     from nexau.archs.main_sub.agent_context import GlobalStorage as _GlobalStorage
     from nexau.archs.main_sub.agent_state import AgentState as _AgentState
     from nexau.archs.main_sub.config import AgentConfig as _AgentConfig
     from nexau.archs.main_sub.config import ExecutionConfig as _ExecutionConfig
+    from nexau.archs.main_sub.prompt_cache import prompt_cache as _prompt_cache
     from nexau.archs.tool.tool import Tool as _Tool
 
     return (
+        _llm_client_registry,
         _LLMConfig,
+        _endpoint_guards,
         _create_agent,
         _AgentContext,
         _GlobalStorage,
         _AgentState,
         _AgentConfig,
         _ExecutionConfig,
+        _prompt_cache,
         _Tool,
     )
 
 
 (
+    llm_client_registry,
     LLMConfig,
+    endpoint_guards,
     create_agent,
     AgentContext,
     GlobalStorage,
     AgentState,
     AgentConfig,
     ExecutionConfig,
+    prompt_cache,
     Tool,
 ) = _load_nexau_dependencies()
 
@@ -301,7 +310,7 @@ def mock_openai_client():
 @pytest.fixture
 def mock_agent(mock_llm_config, execution_config, global_storage):
     """Create a mock agent for testing."""
-    with patch("nexau.archs.main_sub.agent.openai") as mock_openai:
+    with patch("nexau.archs.llm.client_registry.openai") as mock_openai:
         mock_openai.OpenAI.return_value = Mock()
         agent = create_agent(
             name="test_agent",
@@ -341,6 +350,27 @@ def mock_env_vars():
         yield
 
 
+@pytest.fixture(autouse=True)
+def reset_llm_client_registry():
+    """Keep pooled LLM clients from leaking between tests."""
+    yield
+    llm_client_registry.close_all()
+
+
+@pytest.fixture(autouse=True)
+def reset_prompt_cache():
+    """Keep rendered prompts from leaking between tests."""
+    yield
+    prompt_cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def reset_endpoint_guards():
+    """Keep circuit breaker and rate-limit state from leaking between tests."""
+    yield
+    endpoint_guards.reset()
+
+
 # Test Data Fixtures
 @pytest.fixture
 def sample_conversation():
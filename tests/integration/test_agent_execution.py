@@ -75,7 +75,7 @@ class TestAgentExecutionIntegration:
             ]
         }
 
-        with patch("nexau.archs.main_sub.agent.openai") as mock_openai:
+        with patch("nexau.archs.llm.client_registry.openai") as mock_openai:
             mock_client = MagicMock()
             mock_client.chat.completions.create.return_value = mock_response
             mock_openai.OpenAI.return_value = mock_client
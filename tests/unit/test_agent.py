@@ -16,15 +16,17 @@
 Unit tests for agent components.
 """
 
-from unittest.mock import Mock, patch
+import asyncio
+from unittest.mock import AsyncMock, Mock, patch
 
 import pytest
 
 from nexau.archs.llm.llm_config import LLMConfig
 from nexau.archs.main_sub.agent import Agent, create_agent
-from nexau.archs.main_sub.agent_context import AgentContext, GlobalStorage
+from nexau.archs.main_sub.agent_context import AgentContext, GlobalStorage, get_context, get_context_dict
 from nexau.archs.main_sub.agent_state import AgentState
 from nexau.archs.main_sub.config import AgentConfig, ExecutionConfig
+from nexau.archs.main_sub.execution.subagent_pool import SubAgentPool
 from nexau.archs.tracer.core import BaseTracer
 
 
@@ -33,7 +35,7 @@ class TestAgent:
 
     def test_agent_initialization(self, agent_config, execution_config, global_storage):
         """Test agent initialization."""
-        with patch("nexau.archs.main_sub.agent.openai") as mock_openai:
+        with patch("nexau.archs.llm.client_registry.openai") as mock_openai:
             mock_openai.OpenAI.return_value = Mock()
 
             agent_config.max_iterations = execution_config.max_iterations
@@ -56,7 +58,7 @@ class TestAgent:
 
     def test_agent_initialization_no_external_client(self, agent_config, global_storage):
         """Test agent initialization when OpenAI client creation fails."""
-        with patch("nexau.archs.main_sub.agent.openai") as mock_openai:
+        with patch("nexau.archs.llm.client_registry.openai") as mock_openai:
             mock_openai.OpenAI.side_effect = Exception("API Error")
 
             agent = Agent(agent_config, global_storage)
@@ -65,7 +67,7 @@ class TestAgent:
 
     def test_add_tool(self, agent_config, global_storage, sample_tool):
         """Test adding tools to agent."""
-        with patch("nexau.archs.main_sub.agent.openai") as mock_openai:
+        with patch("nexau.archs.llm.client_registry.openai") as mock_openai:
             mock_openai.OpenAI.return_value = Mock()
 
             agent = Agent(agent_config, global_storage)
@@ -77,7 +79,7 @@ class TestAgent:
 
     def test_add_sub_agent(self, agent_config, global_storage):
         """Test adding sub-agents to agent."""
-        with patch("nexau.archs.main_sub.agent.openai") as mock_openai:
+        with patch("nexau.archs.llm.client_registry.openai") as mock_openai:
             mock_openai.OpenAI.return_value = Mock()
 
             agent = Agent(agent_config, global_storage)
@@ -91,7 +93,7 @@ class TestAgent:
 
     def test_enqueue_message(self, agent_config, global_storage):
         """Test enqueuing messages."""
-        with patch("nexau.archs.main_sub.agent.openai") as mock_openai:
+        with patch("nexau.archs.llm.client_registry.openai") as mock_openai:
             mock_openai.OpenAI.return_value = Mock()
 
             agent = Agent(agent_config, global_storage)
@@ -102,9 +104,55 @@ class TestAgent:
 
             assert test_message in agent.executor.queued_messages
 
+    def test_agent_reset_clears_conversation_state(self, agent_config, global_storage):
+        """reset() clears history and queues but refuses a stopped agent."""
+        with patch("nexau.archs.llm.client_registry.openai") as mock_openai:
+            mock_openai.OpenAI.return_value = Mock()
+
+            agent = Agent(agent_config, global_storage)
+            agent.history = [{"role": "user", "content": "old"}]
+            agent.enqueue_message({"role": "user", "content": "queued"})
+            agent.executor.stop_signal = True
+
+            agent.reset()
+
+            assert agent.history == []
+            assert agent.executor.queued_messages == []
+            assert agent.executor.stop_signal is False
+            assert agent.config.agent_id == "test_agent_123"
+            assert agent.executor.agent_id == "test_agent_123"
+
+            agent.stop()
+            with pytest.raises(RuntimeError):
+                agent.reset()
+
+    def test_pooled_agent_is_checked_out_without_previous_run_state(self, agent_config, global_storage):
+        """A released and reacquired instance has no cache planner state; only an unconfigured id changes."""
+        with patch("nexau.archs.llm.client_registry.openai") as mock_openai:
+            mock_openai.OpenAI.return_value = Mock()
+
+            agent_config.agent_id = None
+            pool = SubAgentPool("sub_agent", lambda: Agent(agent_config, global_storage))
+            agent = pool.acquire()
+            first_id = agent.executor.agent_id
+            planner = agent.executor.llm_caller.cache_planner
+            planner.apply_openai([{"role": "system", "content": "You are helpful."}, {"role": "user", "content": "hi"}])
+            assert planner._digests
+
+            pool.release(agent)
+            reused = pool.acquire()
+
+            assert reused is agent
+            assert reused.executor.llm_caller.cache_planner._digests == []
+            assert reused.executor.llm_caller.cache_planner._checkpoints == []
+            assert reused.executor.agent_id != first_id
+            assert reused.config.agent_id is None
+
+            reused.stop()
+
     def test_agent_cleanup(self, agent_config, global_storage):
         """Test agent cleanup."""
-        with patch("nexau.archs.main_sub.agent.openai") as mock_openai:
+        with patch("nexau.archs.llm.client_registry.openai") as mock_openai:
             mock_openai.OpenAI.return_value = Mock()
 
             agent = Agent(agent_config, global_storage)
@@ -116,7 +164,7 @@ class TestAgent:
 
     def test_agent_injects_tracer_into_global_storage(self, agent_config, global_storage):
         """Tracer set on config should be visible via shared global storage."""
-        with patch("nexau.archs.main_sub.agent.openai") as mock_openai:
+        with patch("nexau.archs.llm.client_registry.openai") as mock_openai:
             mock_openai.OpenAI.return_value = Mock()
 
             tracer = Mock(spec=BaseTracer)
@@ -130,7 +178,7 @@ class TestAgent:
 
     def test_agent_preserves_existing_global_tracer(self, agent_config, global_storage):
         """Nested agents should reuse tracer already stored in global storage without mutating config."""
-        with patch("nexau.archs.main_sub.agent.openai") as mock_openai:
+        with patch("nexau.archs.llm.client_registry.openai") as mock_openai:
             mock_openai.OpenAI.return_value = Mock()
 
             parent_tracer = Mock(spec=BaseTracer)
@@ -148,7 +196,7 @@ class TestAgent:
 
     def test_initialize_mcp_tools_success(self, agent_config, global_storage):
         """Test successful MCP tools initialization."""
-        with patch("nexau.archs.main_sub.agent.openai") as mock_openai:
+        with patch("nexau.archs.llm.client_registry.openai") as mock_openai:
             mock_openai.OpenAI.return_value = Mock()
 
             # Mock the sync_initialize_mcp_tools function
@@ -170,7 +218,7 @@ class TestAgent:
 
     def test_initialize_mcp_tools_import_error(self, agent_config, global_storage):
         """Test MCP tools initialization with import error."""
-        with patch("nexau.archs.main_sub.agent.openai") as mock_openai:
+        with patch("nexau.archs.llm.client_registry.openai") as mock_openai:
             mock_openai.OpenAI.return_value = Mock()
 
             # Mock import error
@@ -185,7 +233,7 @@ class TestAgent:
 
     def test_initialize_mcp_tools_general_error(self, agent_config, global_storage):
         """Test MCP tools initialization with general error."""
-        with patch("nexau.archs.main_sub.agent.openai") as mock_openai:
+        with patch("nexau.archs.llm.client_registry.openai") as mock_openai:
             mock_openai.OpenAI.return_value = Mock()
 
             # Mock general exception
@@ -200,7 +248,7 @@ class TestAgent:
 
     def test_run_basic(self, agent_config, global_storage):
         """Test basic agent run."""
-        with patch("nexau.archs.main_sub.agent.openai") as mock_openai:
+        with patch("nexau.archs.llm.client_registry.openai") as mock_openai:
             mock_openai.OpenAI.return_value = Mock()
 
             agent = Agent(agent_config, global_storage)
@@ -226,7 +274,7 @@ class TestAgent:
 
     def test_run_with_history(self, agent_config, global_storage):
         """Test agent run with existing history."""
-        with patch("nexau.archs.main_sub.agent.openai") as mock_openai:
+        with patch("nexau.archs.llm.client_registry.openai") as mock_openai:
             mock_openai.OpenAI.return_value = Mock()
 
             agent = Agent(agent_config, global_storage)
@@ -254,7 +302,7 @@ class TestAgent:
 
     def test_run_with_context_state_config(self, agent_config, global_storage):
         """Test agent run with context, state, and config."""
-        with patch("nexau.archs.main_sub.agent.openai") as mock_openai:
+        with patch("nexau.archs.llm.client_registry.openai") as mock_openai:
             mock_openai.OpenAI.return_value = Mock()
 
             # Set initial values in agent config
@@ -284,7 +332,7 @@ class TestAgent:
 
     def test_run_with_error_handler(self, agent_config, global_storage):
         """Test agent run with error handler."""
-        with patch("nexau.archs.main_sub.agent.openai") as mock_openai:
+        with patch("nexau.archs.llm.client_registry.openai") as mock_openai:
             mock_openai.OpenAI.return_value = Mock()
 
             error_handler_called = []
@@ -305,7 +353,7 @@ class TestAgent:
 
     def test_run_without_error_handler(self, agent_config, global_storage):
         """Test agent run without error handler."""
-        with patch("nexau.archs.main_sub.agent.openai") as mock_openai:
+        with patch("nexau.archs.llm.client_registry.openai") as mock_openai:
             mock_openai.OpenAI.return_value = Mock()
 
             agent = Agent(agent_config, global_storage)
@@ -316,7 +364,7 @@ class TestAgent:
 
     def test_run_with_parent_agent_state(self, agent_config, global_storage):
         """Test agent run with parent agent state."""
-        with patch("nexau.archs.main_sub.agent.openai") as mock_openai:
+        with patch("nexau.archs.llm.client_registry.openai") as mock_openai:
             mock_openai.OpenAI.return_value = Mock()
 
             agent = Agent(agent_config, global_storage)
@@ -346,13 +394,80 @@ class TestAgent:
                 agent_state = call_args[1]
                 assert agent_state.parent_agent_state == parent_state
 
+    def test_arun_basic(self, agent_config, global_storage):
+        """Test async agent run awaits the async executor loop."""
+        with patch("nexau.archs.llm.client_registry.openai") as mock_openai:
+            mock_openai.OpenAI.return_value = Mock()
+
+            agent = Agent(agent_config, global_storage)
+
+            with patch.object(agent.executor, "aexecute", new=AsyncMock()) as mock_aexecute:
+                mock_aexecute.return_value = (
+                    "Async response",
+                    [
+                        {"role": "system", "content": "System prompt"},
+                        {"role": "user", "content": "Test message"},
+                        {"role": "assistant", "content": "Async response"},
+                    ],
+                )
+
+                response = asyncio.run(agent.arun("Test message"))
+
+                assert response == "Async response"
+                assert agent.history[-1] == {"role": "assistant", "content": "Async response"}
+                mock_aexecute.assert_awaited_once()
+
+    def test_arun_with_error_handler(self, agent_config, global_storage):
+        """Test async agent run routes errors through the error handler."""
+        with patch("nexau.archs.llm.client_registry.openai") as mock_openai:
+            mock_openai.OpenAI.return_value = Mock()
+
+            agent_config.error_handler = lambda error, agent, context: f"Error handled: {error}"
+            agent = Agent(agent_config, global_storage)
+
+            with patch.object(agent.executor, "aexecute", new=AsyncMock(side_effect=Exception("Test error"))):
+                response = asyncio.run(agent.arun("Message"))
+
+                assert response == "Error handled: Test error"
+                assert agent.history[-1]["role"] == "assistant"
+
+    def test_concurrent_arun_sessions_isolate_context(self, agent_config):
+        """Concurrent async sessions each see only their own AgentContext."""
+        with patch("nexau.archs.llm.client_registry.openai") as mock_openai:
+            mock_openai.OpenAI.return_value = Mock()
+
+            agents = [Agent(agent_config, GlobalStorage()) for _ in range(3)]
+            seen: dict[str, str | None] = {}
+
+            def make_aexecute(session: str):
+                async def aexecute(history, agent_state):
+                    await asyncio.sleep(0.01)
+                    seen[session] = get_context_dict().get("session")
+                    return session, history + [{"role": "assistant", "content": session}]
+
+                return aexecute
+
+            async def run_all():
+                tasks = []
+                for index, agent in enumerate(agents):
+                    session = f"session-{index}"
+                    agent.executor.aexecute = make_aexecute(session)
+                    tasks.append(agent.arun("Message", context={"session": session}))
+                return await asyncio.gather(*tasks)
+
+            responses = asyncio.run(run_all())
+
+            assert responses == ["session-0", "session-1", "session-2"]
+            assert seen == {f"session-{i}": f"session-{i}" for i in range(3)}
+            assert get_context() is None
+
 
 class TestCreateAgent:
     """Test cases for create_agent factory function."""
 
     def test_create_agent_minimal(self):
         """Test creating agent with minimal parameters."""
-        with patch("nexau.archs.main_sub.agent.openai") as mock_openai:
+        with patch("nexau.archs.llm.client_registry.openai") as mock_openai:
             mock_openai.OpenAI.return_value = Mock()
 
             agent = create_agent(
@@ -367,7 +482,7 @@ class TestCreateAgent:
 
     def test_create_agent_with_dict_llm_config(self):
         """Test creating agent with dictionary LLM config."""
-        with patch("nexau.archs.main_sub.agent.openai") as mock_openai:
+        with patch("nexau.archs.llm.client_registry.openai") as mock_openai:
             mock_openai.OpenAI.return_value = Mock()
 
             agent = create_agent(
@@ -380,7 +495,7 @@ class TestCreateAgent:
 
     def test_create_agent_with_llm_kwargs(self):
         """Test creating agent with LLM kwargs."""
-        with patch("nexau.archs.main_sub.agent.openai") as mock_openai:
+        with patch("nexau.archs.llm.client_registry.openai") as mock_openai:
             mock_openai.OpenAI.return_value = Mock()
 
             agent = create_agent(
@@ -401,7 +516,7 @@ class TestCreateAgent:
 
     def test_create_agent_with_tools(self, sample_tool):
         """Test creating agent with tools."""
-        with patch("nexau.archs.main_sub.agent.openai") as mock_openai:
+        with patch("nexau.archs.llm.client_registry.openai") as mock_openai:
             mock_openai.OpenAI.return_value = Mock()
 
             agent = create_agent(
@@ -415,7 +530,7 @@ class TestCreateAgent:
 
     def test_create_agent_with_mcp_servers(self):
         """Test creating agent with MCP servers."""
-        with patch("nexau.archs.main_sub.agent.openai") as mock_openai:
+        with patch("nexau.archs.llm.client_registry.openai") as mock_openai:
             mock_openai.OpenAI.return_value = Mock()
 
             # Mock the MCP initialization to prevent actual server startup
@@ -437,7 +552,7 @@ class TestCreateAgent:
         def mock_hook(*args, **kwargs):
             pass
 
-        with patch("nexau.archs.main_sub.agent.openai") as mock_openai:
+        with patch("nexau.archs.llm.client_registry.openai") as mock_openai:
             mock_openai.OpenAI.return_value = Mock()
 
             agent = create_agent(
@@ -80,6 +80,40 @@ class TestExecutionConfig:
         with pytest.raises(ValueError):
             ExecutionConfig(tool_call_mode="json")
 
+    def test_execution_config_stream_tool_dispatch_opt_in(self):
+        """Streaming tool dispatch is off unless requested."""
+        assert ExecutionConfig().stream_tool_dispatch is False
+        assert ExecutionConfig(stream_tool_dispatch=True).stream_tool_dispatch is True
+
+    def test_execution_config_adaptive_concurrency_opt_in(self):
+        """Adaptive concurrency is off unless requested and carries its ceiling from AgentConfig."""
+        assert ExecutionConfig().adaptive_concurrency is False
+
+        agent_config = AgentConfig(name="test", llm_config=LLMConfig(model="gpt-4"), adaptive_concurrency=True, max_adaptive_concurrency=12)
+        config = ExecutionConfig.from_agent_config(agent_config)
+
+        assert config.adaptive_concurrency is True
+        assert config.max_adaptive_concurrency == 12
+
+    def test_execution_config_batch_processes_opt_in(self):
+        """Batches run in-process unless worker processes are configured."""
+        assert ExecutionConfig().batch_processes == 0
+
+        agent_config = AgentConfig(
+            name="test", llm_config=LLMConfig(model="gpt-4"), batch_processes=4, batch_shards=16, batch_work_dir="/shared/batches"
+        )
+        config = ExecutionConfig.from_agent_config(agent_config)
+
+        assert (config.batch_processes, config.batch_shards, config.batch_work_dir) == (4, 16, "/shared/batches")
+
+    def test_execution_config_sub_agent_pool_defaults(self):
+        """Sub-agent pooling keeps up to four warm instances by default."""
+        config = ExecutionConfig()
+
+        assert config.sub_agent_pool_min_size == 0
+        assert config.sub_agent_pool_max_size == 4
+        assert config.sub_agent_pool_idle_timeout == 300.0
+
 
 class TestAgentConfigSkills:
     """Test cases for skill-related functionality in AgentConfig."""
@@ -0,0 +1,84 @@
+# Copyright (c) Nex-AGI. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Unit tests for BatchResultCache.
+"""
+
+import time
+
+import pytest
+
+from nexau.archs.main_sub.execution.batch_cache import BatchResultCache, message_digest
+
+
+class TestBatchResultCache:
+    """Test cases for BatchResultCache."""
+
+    @pytest.fixture
+    def cache(self, tmp_path):
+        """Create a cache in a temporary directory and close it after the test."""
+        cache = BatchResultCache(str(tmp_path / "cache"))
+        yield cache
+        cache.close()
+
+    def test_key_depends_on_config_and_message(self):
+        """Test that keys are stable and separate configs and messages."""
+        key = BatchResultCache.key("config", "message")
+
+        assert BatchResultCache.key("config", "message") == key
+        assert BatchResultCache.key("other-config", "message") != key
+        assert BatchResultCache.key("config", "other message") != key
+
+    def test_message_digest_includes_agent(self):
+        """Test that the same message for another agent is a different item."""
+        assert message_digest("agent", "hello") == message_digest("agent", "hello")
+        assert message_digest("agent", "hello") != message_digest("other", "hello")
+
+    def test_get_set_and_stats(self, cache):
+        """Test round trip and hit/miss counting."""
+        assert cache.get("key") is None
+
+        cache.set("key", "result")
+
+        assert cache.get("key") == "result"
+        stats = cache.stats()
+        assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 1, 1)
+
+    def test_entries_expire_after_max_age(self, tmp_path):
+        """Test eviction by age."""
+        cache = BatchResultCache(str(tmp_path / "cache"), max_age=0.05)
+        cache.set("key", "result")
+        time.sleep(0.1)
+
+        assert cache.get("key") is None
+        cache.close()
+
+    def test_oldest_entries_evicted_over_size_limit(self, tmp_path):
+        """Test eviction by size."""
+        cache = BatchResultCache(str(tmp_path / "cache"), size_limit=100_000)
+        for i in range(200):
+            cache.set(f"key-{i}", "x" * 2000)
+
+        assert cache.stats()["entries"] < 200
+        assert cache.get("key-0") is None
+        assert cache.get("key-199") is not None
+        cache.close()
+
+    def test_reopens_after_close(self, cache):
+        """Test that entries persist across close and reopen."""
+        cache.set("key", "result")
+        cache.close()
+
+        assert cache.get("key") == "result"
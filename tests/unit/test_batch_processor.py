@@ -22,7 +22,10 @@ from unittest.mock import Mock, patch
 
 import pytest
 
+from nexau.archs.main_sub.execution.batch_cache import BatchResultCache
 from nexau.archs.main_sub.execution.batch_processor import BatchProcessor
+from nexau.archs.main_sub.execution.batch_readers import JsonlLineIndex
+from nexau.archs.main_sub.execution.concurrency import AdaptiveConcurrencyLimiter, current_concurrency_limiter
 from nexau.archs.main_sub.utils.xml_utils import XMLParser
 
 
@@ -184,7 +187,7 @@ class TestBatchProcessor:
     def test_process_batch_data_unsupported_format(self, batch_processor, temp_jsonl_file):
         """Test processing with unsupported data format."""
         with pytest.raises(ValueError, match="Unsupported data format"):
-            batch_processor._process_batch_data("test_agent", temp_jsonl_file, "csv", "test message")
+            batch_processor._process_batch_data("test_agent", temp_jsonl_file, "xml", "test message")
 
     def test_process_batch_data_empty_file(self, batch_processor, tmp_path):
         """Test processing an empty JSONL file."""
@@ -570,3 +573,264 @@ class TestBatchProcessor:
         assert "result" in first_result
         assert "data" in first_result
         assert isinstance(first_result["data"], dict)
+
+    # Streaming and Resume Tests
+    def test_process_batch_data_writes_results_file(self, batch_processor, temp_jsonl_file, mock_subagent_manager):
+        """Test that every finished item is written to the results file and progress is exposed."""
+        result_data = json.loads(batch_processor._process_batch_data("test_agent", temp_jsonl_file, "jsonl", "Process: {name}"))
+
+        with open(result_data["results_file"], encoding="utf-8") as f:
+            records = [json.loads(line) for line in f]
+        assert sorted(record["line"] for record in records) == [1, 2, 3]
+        assert all(record["status"] == "success" for record in records)
+        assert batch_processor.progress.succeeded == 3
+        assert batch_processor.progress.in_flight == 0
+
+    def test_process_batch_data_bounded_in_flight(self, mock_subagent_manager, tmp_path):
+        """Test that at most max_in_flight items are pending at once."""
+        import threading
+        import time
+
+        test_file = tmp_path / "many.jsonl"
+        test_file.write_text("".join(json.dumps({"id": i}) + "\n" for i in range(30)))
+        processor = BatchProcessor(subagent_manager=mock_subagent_manager, max_workers=8, max_in_flight=3)
+        lock = threading.Lock()
+        running = 0
+        peak = 0
+
+        def slow_call(agent_name, message):
+            nonlocal running, peak
+            with lock:
+                running += 1
+                peak = max(peak, running)
+            time.sleep(0.005)
+            with lock:
+                running -= 1
+            return "ok"
+
+        mock_subagent_manager.call_sub_agent.side_effect = slow_call
+        result_data = json.loads(processor._process_batch_data("test_agent", str(test_file), "jsonl", "Process ID: {id}"))
+
+        assert result_data["successful_items"] == 30
+        assert peak <= 3
+
+    def test_process_batch_data_follows_concurrency_limiter(self, mock_subagent_manager, tmp_path):
+        """Test that items only run while holding a slot of the adaptive limiter."""
+        import threading
+        import time
+
+        test_file = tmp_path / "many.jsonl"
+        test_file.write_text("".join(json.dumps({"id": i}) + "\n" for i in range(20)))
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=2, max_limit=4)
+        processor = BatchProcessor(subagent_manager=mock_subagent_manager, max_workers=8, concurrency_limiter=limiter)
+        lock = threading.Lock()
+        running = 0
+        peak = 0
+
+        def slow_call(agent_name, message):
+            nonlocal running, peak
+            assert current_concurrency_limiter() is limiter
+            with lock:
+                running += 1
+                peak = max(peak, running)
+            time.sleep(0.005)
+            with lock:
+                running -= 1
+            return "ok"
+
+        mock_subagent_manager.call_sub_agent.side_effect = slow_call
+        result_data = json.loads(processor._process_batch_data("test_agent", str(test_file), "jsonl", "Process ID: {id}"))
+
+        assert result_data["successful_items"] == 20
+        assert peak <= 2
+        assert processor.max_in_flight == 16
+        assert limiter.in_use == 0
+
+    def test_process_batch_data_deduplicates_rendered_messages(self, mock_subagent_manager, tmp_path):
+        """Items with the same rendered message run once and share the result."""
+        test_file = tmp_path / "dupes.jsonl"
+        rows = [{"id": 1, "x": "a"}, {"id": 2, "x": "b"}, {"id": 1, "x": "c"}, {"id": 1, "x": "d"}, {"id": 2, "x": "e"}]
+        test_file.write_text("".join(json.dumps(row) + "\n" for row in rows))
+        processor = BatchProcessor(subagent_manager=mock_subagent_manager, max_workers=1, max_in_flight=1)
+        mock_subagent_manager.call_sub_agent.side_effect = lambda agent_name, message: f"answer to {message}"
+
+        result_data = json.loads(processor._process_batch_data("test_agent", str(test_file), "jsonl", "ID: {id}"))
+
+        assert result_data["successful_items"] == 5
+        assert result_data["deduplicated_items"] == 3
+        assert mock_subagent_manager.call_sub_agent.call_count == 2
+        records = {record["line"]: record for record in map(json.loads, open(result_data["results_file"]))}
+        assert records[3]["duplicate_of"] == 1
+        assert records[3]["result"] == "answer to ID: 1"
+        assert records[5]["duplicate_of"] == 2
+        assert "duplicate_of" not in records[1]
+
+    def test_process_batch_data_duplicates_share_in_flight_failure(self, mock_subagent_manager, tmp_path):
+        """Duplicates waiting on a running item get its error, and failures are not memoized."""
+        import threading
+
+        test_file = tmp_path / "dupes.jsonl"
+        test_file.write_text("".join(json.dumps({"id": 1}) + "\n" for _ in range(3)))
+        processor = BatchProcessor(subagent_manager=mock_subagent_manager, max_workers=1, max_in_flight=10)
+        release = threading.Event()
+
+        def failing_call(agent_name, message):
+            release.wait(5)
+            raise RuntimeError("boom")
+
+        mock_subagent_manager.call_sub_agent.side_effect = failing_call
+        timer = threading.Timer(0.05, release.set)
+        timer.start()
+        result_data = json.loads(processor._process_batch_data("test_agent", str(test_file), "jsonl", "ID: {id}"))
+        timer.join()
+
+        assert result_data["failed_items"] == 3
+        assert mock_subagent_manager.call_sub_agent.call_count == 1
+
+    def test_process_batch_data_result_cache_across_runs(self, mock_subagent_manager, tmp_path):
+        """A second run is answered from the persistent cache until the sub-agent config changes."""
+        test_file = tmp_path / "cached.jsonl"
+        test_file.write_text("".join(json.dumps({"id": i}) + "\n" for i in range(3)))
+        cache = BatchResultCache(str(tmp_path / "cache"))
+        mock_subagent_manager.config_fingerprint.return_value = "config-v1"
+
+        def run_batch():
+            processor = BatchProcessor(subagent_manager=mock_subagent_manager, max_workers=2, result_cache=cache)
+            result = json.loads(processor._process_batch_data("test_agent", str(test_file), "jsonl", "ID: {id}"))
+            assert result["successful_items"] == 3
+            return result
+
+        run_batch()
+        assert mock_subagent_manager.call_sub_agent.call_count == 3
+
+        assert run_batch()["cached_items"] == 3
+        assert mock_subagent_manager.call_sub_agent.call_count == 3
+
+        mock_subagent_manager.config_fingerprint.return_value = "config-v2"
+        assert "cached_items" not in run_batch()
+        assert mock_subagent_manager.call_sub_agent.call_count == 6
+        cache.close()
+
+    def test_process_batch_data_result_cache_skips_failures(self, mock_subagent_manager, tmp_path):
+        """Failed items are retried on the next run instead of served from the cache."""
+        test_file = tmp_path / "cached.jsonl"
+        test_file.write_text(json.dumps({"id": 1}) + "\n")
+        cache = BatchResultCache(str(tmp_path / "cache"))
+        mock_subagent_manager.config_fingerprint.return_value = "config"
+        mock_subagent_manager.call_sub_agent.side_effect = [RuntimeError("transient"), "ok"]
+
+        for _ in range(2):
+            BatchProcessor(subagent_manager=mock_subagent_manager, result_cache=cache)._process_batch_data(
+                "test_agent", str(test_file), "jsonl", "ID: {id}"
+            )
+
+        assert mock_subagent_manager.call_sub_agent.call_count == 2
+        assert cache.stats()["entries"] == 1
+        cache.close()
+
+    def test_process_batch_data_resumes_after_interruption(self, mock_subagent_manager, tmp_path):
+        """Test that an interrupted batch resumes from its checkpoint without redoing finished items."""
+        test_file = tmp_path / "resume.jsonl"
+        test_file.write_text("".join(json.dumps({"id": i}) + "\n" for i in range(10)))
+        processor = BatchProcessor(subagent_manager=mock_subagent_manager, max_workers=1, max_in_flight=1, checkpoint_every=1)
+
+        def interrupt_at_six(agent_name, message):
+            if message == "Process ID: 5":
+                raise KeyboardInterrupt
+            return f"done {message}"
+
+        mock_subagent_manager.call_sub_agent.side_effect = interrupt_at_six
+        with pytest.raises(KeyboardInterrupt):
+            processor._process_batch_data("test_agent", str(test_file), "jsonl", "Process ID: {id}")
+        assert (tmp_path / "resume.jsonl.checkpoint.json").exists()
+
+        mock_subagent_manager.call_sub_agent.side_effect = None
+        mock_subagent_manager.call_sub_agent.reset_mock()
+        result_data = json.loads(processor._process_batch_data("test_agent", str(test_file), "jsonl", "Process ID: {id}"))
+
+        assert mock_subagent_manager.call_sub_agent.call_count == 5
+        assert result_data["total_items"] == 10
+        assert result_data["resumed_items"] == 5
+        assert [r["line"] for r in result_data["displayed_results"]] == [1, 2, 3]
+        assert not (tmp_path / "resume.jsonl.checkpoint.json").exists()
+        lines = (tmp_path / "resume.jsonl.results.jsonl").read_text().splitlines()
+        assert sorted(json.loads(line)["line"] for line in lines) == list(range(1, 11))
+
+    def test_process_batch_data_ignores_checkpoint_of_other_template(self, mock_subagent_manager, tmp_path):
+        """Test that a checkpoint is only used for the same input and template."""
+        test_file = tmp_path / "other.jsonl"
+        test_file.write_text("".join(json.dumps({"id": i}) + "\n" for i in range(4)))
+        processor = BatchProcessor(subagent_manager=mock_subagent_manager, max_workers=1, max_in_flight=1, checkpoint_every=1)
+
+        mock_subagent_manager.call_sub_agent.side_effect = ["ok", KeyboardInterrupt()]
+        with pytest.raises(KeyboardInterrupt):
+            processor._process_batch_data("test_agent", str(test_file), "jsonl", "Process ID: {id}")
+
+        mock_subagent_manager.call_sub_agent.side_effect = None
+        result_data = json.loads(processor._process_batch_data("test_agent", str(test_file), "jsonl", "Handle {id}"))
+
+        assert result_data["total_items"] == 4
+        assert "resumed_items" not in result_data
+
+    # Input Format Tests
+    def test_process_batch_data_csv_and_tsv(self, batch_processor, tmp_path, mock_subagent_manager):
+        """Test that CSV and TSV rows are keyed by the header, including quoted multi-line fields."""
+        csv_file = tmp_path / "people.csv"
+        csv_file.write_text('name,city\nAlice,"New\nYork"\n\nBob,Paris\n')
+        tsv_file = tmp_path / "people.tsv"
+        tsv_file.write_text("name\tcity\nCarol\tRome\n")
+
+        csv_result = json.loads(batch_processor._process_batch_data("test_agent", str(csv_file), "csv", "{name} in {city}"))
+        tsv_result = json.loads(batch_processor._process_batch_data("test_agent", str(tsv_file), "TSV", "{name} in {city}"))
+
+        assert csv_result["total_items"] == 2
+        assert tsv_result["total_items"] == 1
+        messages = sorted(call.args[1] for call in mock_subagent_manager.call_sub_agent.call_args_list)
+        assert messages == ["Alice in New\nYork", "Bob in Paris", "Carol in Rome"]
+
+    def test_process_batch_data_parquet(self, batch_processor, tmp_path, mock_subagent_manager):
+        """Test that parquet rows are streamed across row groups."""
+        pa = pytest.importorskip("pyarrow")
+        pq = pytest.importorskip("pyarrow.parquet")
+        parquet_file = tmp_path / "items.parquet"
+        pq.write_table(pa.table({"id": list(range(7)), "label": [f"item-{i}" for i in range(7)]}), parquet_file, row_group_size=3)
+
+        result_data = json.loads(batch_processor._process_batch_data("test_agent", str(parquet_file), "parquet", "Label {label}"))
+
+        assert result_data["total_items"] == 7
+        assert [r["data"]["id"] for r in result_data["displayed_results"]] == [0, 1, 2]
+
+    def test_process_batch_data_indexed_jsonl_resume(self, mock_subagent_manager, tmp_path):
+        """Test that indexed JSONL builds its line index once and resumes from the checkpoint."""
+        test_file = tmp_path / "indexed.jsonl"
+        test_file.write_text("".join(json.dumps({"id": i}) + "\n" for i in range(6)))
+        processor = BatchProcessor(subagent_manager=mock_subagent_manager, max_workers=1, max_in_flight=1, checkpoint_every=1)
+
+        mock_subagent_manager.call_sub_agent.side_effect = ["ok", "ok", KeyboardInterrupt()]
+        with pytest.raises(KeyboardInterrupt):
+            processor._process_batch_data("test_agent", str(test_file), "indexed_jsonl", "ID {id}")
+        index_mtime = (tmp_path / "indexed.jsonl.idx").stat().st_mtime_ns
+
+        mock_subagent_manager.call_sub_agent.side_effect = None
+        mock_subagent_manager.call_sub_agent.reset_mock()
+        result_data = json.loads(processor._process_batch_data("test_agent", str(test_file), "indexed_jsonl", "ID {id}"))
+
+        assert mock_subagent_manager.call_sub_agent.call_count == 4
+        assert result_data["total_items"] == 6
+        assert (tmp_path / "indexed.jsonl.idx").stat().st_mtime_ns == index_mtime
+
+    def test_jsonl_line_index_random_access_and_shards(self, tmp_path):
+        """Test line index lookups, shards and rebuild after the input changes."""
+        test_file = tmp_path / "lines.jsonl"
+        test_file.write_text('{"a": 1}\n\n{"a": 3}\n{"a": 4}')
+
+        with JsonlLineIndex(str(test_file)) as index:
+            assert len(index) == 4
+            assert index.line(2) == b'{"a": 3}\n'
+            assert index.line(3) == b'{"a": 4}'
+            assert [list(index.shard(i, 3)) for i in range(3)] == [[0], [1], [2, 3]]
+
+        test_file.write_text('{"a": 1}\n{"a": 2}\n')
+        with JsonlLineIndex(str(test_file)) as index:
+            assert len(index) == 2
+            assert index.offset(1) == 9
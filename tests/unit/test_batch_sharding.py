@@ -0,0 +1,310 @@
+# Copyright (c) Nex-AGI. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Unit tests for batch sharding across processes and hosts.
+"""
+
+import json
+import os
+import time
+from types import SimpleNamespace
+from unittest.mock import Mock, patch
+
+import pytest
+
+from nexau.archs.main_sub.execution import batch_sharding
+from nexau.archs.main_sub.execution.batch_processor import BatchProcessor
+from nexau.archs.main_sub.execution.batch_readers import BatchShard, create_batch_reader
+from nexau.archs.main_sub.execution.batch_sharding import ShardedBatchRunner, _ShardedBatch
+
+
+class _EchoAgent:
+    """Picklable stand-in for a sub-agent that echoes its message."""
+
+    def __init__(self):
+        self.config = SimpleNamespace(agent_id=str(id(self)))
+
+    def run(self, message, context=None, parent_agent_state=None):
+        return f"echo: {message} (pid {os.getpid()})"
+
+    def reset(self):
+        return None
+
+    def stop(self):
+        return None
+
+
+def _echo_agent_factory():
+    return _EchoAgent()
+
+
+def _write_jsonl(path, count):
+    path.write_text("".join(json.dumps({"id": i}) + "\n" for i in range(count)))
+    return str(path)
+
+
+def _shard_records(reader, shards):
+    return [
+        [
+            (number, data["id"])
+            for number, position, data in reader.records(shard.start_position, shard.start_number)
+            if position < shard.end_position
+        ]
+        for shard in shards
+    ]
+
+
+class TestBatchReaderShards:
+    """Test cases for BatchReader.shards."""
+
+    @pytest.mark.parametrize("data_format", ["jsonl", "indexed_jsonl", "csv"])
+    def test_shards_partition_records_in_order(self, tmp_path, data_format):
+        """Test that shards cover every record once, in order, with their original numbers."""
+        if data_format == "csv":
+            path = tmp_path / "items.csv"
+            path.write_text("id\n" + "".join(f"{i}\n" for i in range(10)))
+        else:
+            path = tmp_path / "items.jsonl"
+            _write_jsonl(path, 10)
+        reader = create_batch_reader(data_format, str(path), index_dir=str(tmp_path))
+
+        shards = reader.shards(3)
+        per_shard = _shard_records(reader, shards)
+        reader.close()
+
+        assert [shard.index for shard in shards] == [0, 1, 2]
+        assert [len(records) for records in per_shard] == [3, 3, 4]
+        assert [number for records in per_shard for number, _ in records] == list(range(1, 11))
+        assert [str(item) for records in per_shard for _, item in records] == [str(i) for i in range(10)]
+
+    def test_parquet_shards_by_row(self, tmp_path):
+        """Test that parquet inputs are split by row ranges."""
+        pa = pytest.importorskip("pyarrow")
+        pq = pytest.importorskip("pyarrow.parquet")
+        path = tmp_path / "items.parquet"
+        pq.write_table(pa.table({"id": list(range(7))}), path, row_group_size=3)
+        reader = create_batch_reader("parquet", str(path))
+
+        shards = reader.shards(2)
+        per_shard = _shard_records(reader, shards)
+        reader.close()
+
+        assert [(shard.start_position, shard.end_position) for shard in shards] == [(0, 3), (3, 7)]
+        assert per_shard == [[(1, 0), (2, 1), (3, 2)], [(4, 3), (5, 4), (6, 5), (7, 6)]]
+
+    def test_more_shards_than_records_drops_empty_shards(self, tmp_path):
+        """Test that small inputs get one shard per record and empty inputs none."""
+        reader = create_batch_reader("jsonl", _write_jsonl(tmp_path / "small.jsonl", 2))
+        empty = create_batch_reader("jsonl", _write_jsonl(tmp_path / "empty.jsonl", 0))
+
+        assert [(shard.index, shard.count) for shard in reader.shards(5)] == [(0, 2), (1, 2)]
+        assert empty.shards(5) == []
+        with pytest.raises(ValueError):
+            reader.shards(0)
+
+
+class TestShardedBatchProcessing:
+    """Test cases for processing and merging shards."""
+
+    @pytest.fixture
+    def mock_subagent_manager(self):
+        """Create a mock SubAgentManager."""
+        manager = Mock()
+        manager.call_sub_agent = Mock(side_effect=lambda agent_name, message: f"done {message}")
+        return manager
+
+    def test_process_batch_data_runs_only_its_shard(self, tmp_path, mock_subagent_manager):
+        """Test that a shard run processes its records into shard-named results."""
+        path = _write_jsonl(tmp_path / "items.jsonl", 6)
+        reader = create_batch_reader("jsonl", path)
+        shard = reader.shards(2)[1]
+        processor = BatchProcessor(subagent_manager=mock_subagent_manager, output_dir=str(tmp_path / "out"))
+
+        result = json.loads(processor._process_batch_data("test_agent", path, "jsonl", "ID {id}", shard))
+
+        assert result["total_items"] == 3
+        assert result["results_file"] == str(tmp_path / "out" / "items.jsonl.shard-0001-of-0002.results.jsonl")
+        assert sorted(r["line"] for r in result["displayed_results"]) == [4, 5, 6]
+
+    def test_shards_merge_into_ordered_results(self, tmp_path, mock_subagent_manager):
+        """Test that shard results merge in line order with the regular summary format."""
+        path = _write_jsonl(tmp_path / "items.jsonl", 7)
+        batch = _ShardedBatch.create(path, "jsonl", "test_agent", "ID {id}", str(tmp_path), str(tmp_path / "work"), 60)
+        plan = batch.load_or_create_plan(3)
+        processor = BatchProcessor(subagent_manager=mock_subagent_manager, max_workers=3, output_dir=batch.work_dir)
+
+        with patch.object(batch_sharding, "_worker_processor", processor):
+            assert all(batch_sharding._run_shard(batch, shard) for shard in reversed(plan))
+            assert not batch_sharding._run_shard(batch, plan[0])
+        summary = json.loads(batch.merge(plan))
+
+        with open(tmp_path / "items.jsonl.results.jsonl") as f:
+            merged = [json.loads(line) for line in f]
+        assert [record["line"] for record in merged] == list(range(1, 8))
+        assert summary["total_items"] == 7
+        assert summary["successful_items"] == 7
+        assert [r["result"] for r in summary["displayed_results"]] == ["done ID 0", "done ID 1", "done ID 2"]
+        assert summary["remaining_items"] == 4
+        assert summary["results_file"] == str(tmp_path / "items.jsonl.results.jsonl")
+
+    def test_plan_is_shared_by_later_runners(self, tmp_path):
+        """Test that the first plan written to a work directory wins."""
+        path = _write_jsonl(tmp_path / "items.jsonl", 8)
+        first = _ShardedBatch.create(path, "jsonl", "test_agent", "ID {id}", str(tmp_path), str(tmp_path / "work"), 60)
+        second = _ShardedBatch.create(path, "jsonl", "test_agent", "ID {id}", str(tmp_path), str(tmp_path / "work"), 60)
+        other_template = _ShardedBatch.create(path, "jsonl", "test_agent", "Item {id}", str(tmp_path), str(tmp_path / "work"), 60)
+        other_config = _ShardedBatch.create(path, "jsonl", "test_agent", "ID {id}", str(tmp_path), str(tmp_path / "work"), 60, "v2")
+
+        assert len(first.load_or_create_plan(4)) == 4
+        assert len(second.load_or_create_plan(2)) == 4
+        assert other_template.work_dir != first.work_dir
+        assert other_config.work_dir != first.work_dir
+
+
+class TestShardClaims:
+    """Test cases for shard claims in the work directory."""
+
+    @pytest.fixture
+    def batch(self, tmp_path):
+        """Create a sharded batch with a short claim timeout."""
+        path = _write_jsonl(tmp_path / "items.jsonl", 2)
+        return _ShardedBatch.create(path, "jsonl", "test_agent", "ID {id}", str(tmp_path), str(tmp_path / "work"), 1.0)
+
+    def test_claim_is_exclusive_until_released(self, batch):
+        """Test that a held claim cannot be taken and is removed on release."""
+        path = batch.claim_path(BatchShard(0, 1, 0, 1, 10))
+
+        claim = batch.claim(path)
+        assert claim is not None
+        with claim:
+            assert batch.claim(path) is None
+            assert not batch.claimable(path)
+
+        assert not os.path.exists(path)
+        assert batch.claimable(path)
+
+    def test_stale_claim_from_another_host_is_taken_over(self, batch):
+        """Test that a claim without heartbeat for the claim timeout is stolen."""
+        path = batch.claim_path(BatchShard(0, 1, 0, 1, 10))
+        with open(path, "w") as f:
+            json.dump({"host": "other-host", "pid": 1, "token": "other"}, f)
+        assert batch.claim(path) is None
+
+        past = time.time() - 10
+        os.utime(path, (past, past))
+        claim = batch.claim(path)
+
+        assert claim is not None
+        with open(path) as f:
+            assert json.load(f)["token"] == claim.token
+
+    def test_claim_of_dead_local_process_is_taken_over(self, batch):
+        """Test that a claim left by a process of this host that died is stolen at once."""
+        path = batch.claim_path(BatchShard(0, 1, 0, 1, 10))
+        with open(path, "w") as f:
+            json.dump({"host": batch_sharding.socket.gethostname(), "pid": 2**22 + 12345, "token": "dead"}, f)
+
+        assert batch.claim(path) is not None
+
+
+class TestShardedBatchRunner:
+    """Test cases for ShardedBatchRunner."""
+
+    def test_unpicklable_factory_rejected(self):
+        """Test that factories that cannot reach spawned workers are rejected up front."""
+        with pytest.raises(ValueError, match="cannot be sent to worker processes"):
+            ShardedBatchRunner("test_agent", lambda: _EchoAgent())
+
+    def test_runs_shards_in_worker_processes(self, tmp_path):
+        """Test a batch processed by a spawned process pool and merged in order."""
+        path = _write_jsonl(tmp_path / "items.jsonl", 12)
+        runner = ShardedBatchRunner("echo", _echo_agent_factory, processes=2, shards=4, threads_per_process=2, poll_interval=0.05)
+
+        summary = json.loads(runner.run(path, "jsonl", "ID {id}"))
+
+        with open(tmp_path / "items.jsonl.results.jsonl") as f:
+            merged = [json.loads(line) for line in f]
+        assert [record["line"] for record in merged] == list(range(1, 13))
+        assert all(record["status"] == "success" for record in merged)
+        assert str(os.getpid()) not in merged[0]["result"]
+        assert summary["total_items"] == 12
+        assert summary["displayed_results"][0]["result"].startswith("echo: ID 0")
+
+        # Resuming a finished batch returns its summary without starting workers again
+        resuming = ShardedBatchRunner("echo", _echo_agent_factory, processes=2, shards=4, resume=True)
+        with patch.object(ShardedBatchRunner, "_run_shards") as run_shards:
+            assert json.loads(resuming.run(path, "jsonl", "ID {id}")) == summary
+        run_shards.assert_not_called()
+
+
+class TestShardedBatchReruns:
+    """Test cases for running a batch again."""
+
+    @pytest.fixture
+    def manager(self):
+        """Create a mock SubAgentManager whose answers name the configuration version."""
+        manager = Mock()
+        manager.version = "v1"
+        manager.call_sub_agent = Mock(side_effect=lambda agent_name, message: f"{manager.version} {message}")
+        return manager
+
+    @pytest.fixture
+    def run_shards(self, manager):
+        """Run shards in this process instead of a process pool."""
+
+        def run_in_process(runner, batch, plan):
+            processor = BatchProcessor(subagent_manager=manager, output_dir=batch.work_dir)
+            with patch.object(batch_sharding, "_worker_processor", processor):
+                for shard in plan:
+                    batch_sharding._run_shard(batch, shard)
+
+        with patch.object(ShardedBatchRunner, "_run_shards", autospec=True, side_effect=run_in_process) as run_shards:
+            yield run_shards
+
+    def _results(self, tmp_path):
+        with open(tmp_path / "items.jsonl.results.jsonl") as f:
+            return [json.loads(line)["result"] for line in f]
+
+    def test_rerun_after_config_change_processes_items_again(self, tmp_path, manager, run_shards):
+        """Test that a changed agent configuration never returns the earlier summary."""
+        path = _write_jsonl(tmp_path / "items.jsonl", 4)
+        work_dir = str(tmp_path / "work")
+
+        ShardedBatchRunner("echo", _echo_agent_factory, shards=2, work_dir=work_dir, config_fingerprint="v1").run(path, "jsonl", "ID {id}")
+        manager.version = "v2"
+        summary = json.loads(
+            ShardedBatchRunner("echo", _echo_agent_factory, shards=2, work_dir=work_dir, config_fingerprint="v2").run(
+                path, "jsonl", "ID {id}"
+            )
+        )
+
+        assert run_shards.call_count == 2
+        assert self._results(tmp_path) == ["v2 ID 0", "v2 ID 1", "v2 ID 2", "v2 ID 3"]
+        assert summary["displayed_results"][0]["result"] == "v2 ID 0"
+
+    def test_finished_batch_runs_again_unless_resumed(self, tmp_path, manager, run_shards):
+        """Test that a finished batch is discarded and rerun without resume."""
+        path = _write_jsonl(tmp_path / "items.jsonl", 3)
+        runner = ShardedBatchRunner("echo", _echo_agent_factory, shards=2, work_dir=str(tmp_path / "work"))
+
+        first = json.loads(runner.run(path, "jsonl", "ID {id}"))
+        manager.version = "v2"
+        second = json.loads(runner.run(path, "jsonl", "ID {id}"))
+
+        assert run_shards.call_count == 2
+        assert first["displayed_results"][0]["result"] == "v1 ID 0"
+        assert second["displayed_results"][0]["result"] == "v2 ID 0"
+        assert "resumed_items" not in second
+        assert self._results(tmp_path) == ["v2 ID 0", "v2 ID 1", "v2 ID 2"]
@@ -0,0 +1,254 @@
+# Copyright (c) Nex-AGI. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Unit tests for prompt-cache breakpoint planning."""
+
+from unittest.mock import Mock, patch
+
+from nexau.archs.main_sub.execution import cache_breakpoints
+from nexau.archs.main_sub.execution.cache_breakpoints import CacheBreakpointPlanner
+from nexau.archs.main_sub.execution.hooks import ModelCallParams
+from nexau.archs.main_sub.execution.llm_caller import (
+    call_llm_with_anthropic_chat_completion,
+    call_llm_with_openai_chat_completion,
+)
+from nexau.archs.main_sub.execution.model_response import ModelResponse, extract_cache_usage
+from nexau.archs.tracer.adapters.in_memory import InMemoryTracer
+from nexau.archs.tracer.context import TraceContext
+from nexau.archs.tracer.core import SpanType
+
+
+def _anthropic_kwargs(turns: int, tools: list | None = None) -> dict:
+    messages = [{"role": "user" if i % 2 == 0 else "assistant", "content": [{"type": "text", "text": f"turn {i}"}]} for i in range(turns)]
+    return {"system": [{"type": "text", "text": "You are helpful."}], "messages": messages, "tools": tools or []}
+
+
+def _marked(api_kwargs: dict) -> list[int]:
+    return [i for i, message in enumerate(api_kwargs["messages"]) if "cache_control" in message["content"][-1]]
+
+
+class TestCacheBreakpointPlanner:
+    """Test breakpoint placement across requests."""
+
+    def test_marks_tools_system_and_last_message(self):
+        """The first request caches tools, system prompt and the whole prompt."""
+        tools = [{"name": "a", "input_schema": {}}, {"name": "b", "input_schema": {}}]
+        api_kwargs = _anthropic_kwargs(3, tools)
+
+        plan = CacheBreakpointPlanner().apply_anthropic(api_kwargs, ttl="1h")
+
+        assert api_kwargs["tools"][-1]["cache_control"] == {"type": "ephemeral", "ttl": "1h"}
+        assert "cache_control" not in tools[-1]
+        assert "cache_control" in api_kwargs["system"][-1]
+        assert _marked(api_kwargs) == [2]
+        assert plan.count == 3
+
+    def test_next_request_reads_previous_checkpoint(self):
+        """A grown conversation keeps a breakpoint on the previous prompt end."""
+        planner = CacheBreakpointPlanner()
+        planner.apply_anthropic(_anthropic_kwargs(3))
+
+        api_kwargs = _anthropic_kwargs(5)
+        plan = planner.apply_anthropic(api_kwargs)
+
+        assert plan.stable_prefix == 3
+        assert _marked(api_kwargs) == [2, 4]
+        assert plan.count == 3
+
+    def test_compaction_keeps_unchanged_checkpoints(self):
+        """Rewriting a later turn only drops the checkpoints after it."""
+        planner = CacheBreakpointPlanner(lookback=2)
+        planner.apply_anthropic(_anthropic_kwargs(7))
+        assert planner._checkpoints == [2, 4, 6]
+
+        api_kwargs = _anthropic_kwargs(9)
+        api_kwargs["messages"][5]["content"][0]["text"] = "[compacted]"
+        plan = planner.apply_anthropic(api_kwargs)
+
+        assert plan.stable_prefix == 5
+        assert not plan.invalidated
+        assert 4 in _marked(api_kwargs)
+
+    def test_full_rewrite_is_reported(self):
+        """A sliding-window compaction invalidates the history checkpoints only."""
+        planner = CacheBreakpointPlanner()
+        planner.apply_anthropic(_anthropic_kwargs(6))
+
+        api_kwargs = _anthropic_kwargs(2)
+        api_kwargs["messages"][0]["content"][0]["text"] = "summary"
+        plan = planner.apply_anthropic(api_kwargs)
+
+        assert plan.invalidated
+        assert plan.system
+        assert planner.invalidations == 1
+
+    def test_respects_breakpoint_budget(self):
+        """No more than the configured number of markers are placed."""
+        plan = CacheBreakpointPlanner().apply_anthropic(_anthropic_kwargs(3, [{"name": "a"}]), max_breakpoints=1)
+
+        assert plan.tools
+        assert not plan.system
+        assert plan.message_indices == []
+
+    def test_openai_messages_are_copied(self):
+        """OpenAI-style messages get content parts without mutating the input."""
+        messages = [
+            {"role": "system", "content": "You are helpful."},
+            {"role": "user", "content": "hi"},
+        ]
+
+        marked, plan = CacheBreakpointPlanner().apply_openai(messages)
+
+        assert messages[0]["content"] == "You are helpful."
+        assert marked[0]["content"] == [{"type": "text", "text": "You are helpful.", "cache_control": {"type": "ephemeral"}}]
+        assert marked[1]["content"][-1]["cache_control"] == {"type": "ephemeral"}
+        assert plan.message_indices == [1]
+
+    def test_only_new_or_changed_messages_are_hashed(self):
+        """Messages seen unchanged in the previous request reuse their digest."""
+        planner = CacheBreakpointPlanner()
+        messages = [{"role": "user" if i % 2 == 0 else "assistant", "content": f"turn {i}"} for i in range(4)]
+        digest = Mock(side_effect=cache_breakpoints._message_digest)
+
+        with patch.object(cache_breakpoints, "_message_digest", digest):
+            planner.apply_openai(messages)
+            assert digest.call_count == 4
+
+            messages.extend([{"role": "user", "content": "turn 4"}, {"role": "assistant", "content": "turn 5"}])
+            plan = planner.apply_openai(messages)[1]
+            assert digest.call_count == 6
+            assert plan.stable_prefix == 4
+
+            messages[1]["content"] = "[compacted]"
+            plan = planner.apply_openai(messages)[1]
+            assert digest.call_count == 7
+            assert plan.stable_prefix == 1
+
+    def test_anthropic_digests_follow_source_messages(self):
+        """Freshly converted Anthropic blocks are keyed by the chat messages they came from."""
+        planner = CacheBreakpointPlanner()
+        source = [{"role": "user", "content": f"turn {i}"} for i in range(3)]
+        digest = Mock(side_effect=cache_breakpoints._message_digest)
+
+        with patch.object(cache_breakpoints, "_message_digest", digest):
+            planner.apply_anthropic(_anthropic_kwargs(3), source_messages=source)
+            plan = planner.apply_anthropic(_anthropic_kwargs(3), source_messages=source)
+
+        assert digest.call_count == 3
+        assert plan.stable_prefix == 3
+
+
+class TestCacheUsage:
+    """Test cache token extraction and span recording."""
+
+    def test_extract_cache_usage_formats(self):
+        """Anthropic, OpenAI chat and Responses API counts are recognized."""
+        assert extract_cache_usage({"cache_read_input_tokens": 90, "cache_creation_input_tokens": 10}) == {
+            "cache_read_tokens": 90,
+            "cache_write_tokens": 10,
+        }
+        assert extract_cache_usage({"prompt_tokens_details": {"cached_tokens": 64}}) == {"cache_read_tokens": 64}
+        assert extract_cache_usage({"input_tokens_details": {"cached_tokens": 32}}) == {"cache_read_tokens": 32}
+        assert extract_cache_usage({"prompt_tokens": 5}) == {}
+
+    def test_normalized_total_includes_cached_prompt(self):
+        """Anthropic totals count cached prompt tokens toward the context size."""
+        response = ModelResponse.from_anthropic_message(
+            {
+                "content": [{"type": "text", "text": "ok"}],
+                "usage": {"input_tokens": 5, "output_tokens": 3, "cache_read_input_tokens": 100, "cache_creation_input_tokens": 20},
+            },
+        )
+
+        assert response.usage["cache_read_tokens"] == 100
+        assert response.usage["cache_write_tokens"] == 20
+        assert response.usage["total_tokens"] == 128
+
+    def test_anthropic_call_plans_and_records_cache_tokens(self):
+        """The Anthropic request carries breakpoints and the span gets cache counts."""
+        client = Mock()
+        client.messages.create.return_value = {
+            "content": [{"type": "text", "text": "ok"}],
+            "usage": {"input_tokens": 5, "output_tokens": 3, "cache_read_input_tokens": 100, "cache_creation_input_tokens": 0},
+        }
+        tracer = InMemoryTracer()
+        kwargs = {
+            "model": "claude",
+            "messages": [{"role": "system", "content": "sys"}, {"role": "user", "content": "hi"}],
+            "tools": [{"name": "tool", "input_schema": {"type": "object"}}],
+            "anthropic_cache_control_ttl": "1h",
+        }
+
+        with TraceContext(tracer, "agent", SpanType.AGENT):
+            call_llm_with_anthropic_chat_completion(client, kwargs, tracer=tracer)
+
+        sent = client.messages.create.call_args.kwargs
+        assert "anthropic_cache_control_ttl" not in sent
+        assert sent["tools"][-1]["cache_control"] == {"type": "ephemeral", "ttl": "1h"}
+        assert sent["system"][-1]["cache_control"] == {"type": "ephemeral", "ttl": "1h"}
+        assert sent["messages"][-1]["content"][-1]["cache_control"] == {"type": "ephemeral", "ttl": "1h"}
+
+        llm_span = next(span for span in tracer.spans.values() if span.type == SpanType.LLM)
+        assert llm_span.attributes["cache_read_tokens"] == 100
+        assert llm_span.attributes["cache_write_tokens"] == 0
+
+    def test_openai_breakpoints_are_opt_in(self):
+        """OpenAI chat requests stay unmarked unless prompt_cache_breakpoints is set."""
+        client = Mock()
+        client.chat.completions.create.return_value.choices = [Mock(message={"role": "assistant", "content": "ok"})]
+        client.chat.completions.create.return_value.usage = None
+        messages = [{"role": "system", "content": "sys"}, {"role": "user", "content": "hi"}]
+
+        call_llm_with_openai_chat_completion(client, {"model": "m", "messages": list(messages)})
+        assert client.chat.completions.create.call_args.kwargs["messages"] == messages
+
+        call_llm_with_openai_chat_completion(client, {"model": "m", "messages": list(messages), "prompt_cache_breakpoints": 2})
+        sent = client.chat.completions.create.call_args.kwargs
+        assert "prompt_cache_breakpoints" not in sent
+        assert sent["messages"][0]["content"][-1]["cache_control"] == {"type": "ephemeral"}
+
+    def test_calls_reuse_digests_of_the_conversation_messages(self):
+        """Sanitized per-request copies do not defeat the planner's digest cache."""
+        client = Mock()
+        client.messages.create.return_value = {
+            "content": [{"type": "text", "text": "ok"}],
+            "usage": {"input_tokens": 1, "output_tokens": 1},
+        }
+        client.chat.completions.create.return_value.choices = [Mock(message={"role": "assistant", "content": "ok"})]
+        client.chat.completions.create.return_value.usage = None
+
+        for call, extra in (
+            (call_llm_with_anthropic_chat_completion, {}),
+            (call_llm_with_openai_chat_completion, {"prompt_cache_breakpoints": 4}),
+        ):
+            planner = CacheBreakpointPlanner()
+            params = ModelCallParams(
+                messages=[],
+                max_tokens=None,
+                force_stop_reason=None,
+                agent_state=None,
+                tool_call_mode="openai",
+                tools=None,
+                api_params={},
+                cache_planner=planner,
+            )
+            history = [{"role": "system", "content": "sys"}]
+            digest = Mock(side_effect=cache_breakpoints._message_digest)
+            with patch.object(cache_breakpoints, "_message_digest", digest):
+                for turn in range(3):
+                    history.append({"role": "user", "content": f"question {turn}", "reasoning": None})
+                    history.append({"role": "assistant", "content": f"answer {turn}"})
+                    call(client, {"model": "m", "messages": history, **extra}, model_call_params=params)
+
+            assert digest.call_count == 6
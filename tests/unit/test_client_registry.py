@@ -0,0 +1,153 @@
+# Copyright (c) Nex-AGI. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Unit tests for the shared LLM client registry."""
+
+import asyncio
+from unittest.mock import Mock
+
+import pytest
+
+from nexau.archs.llm.client_registry import LLMClientRegistry
+from nexau.archs.llm.llm_config import LLMConfig
+from nexau.archs.main_sub.utils.cleanup_manager import CleanupManager
+
+
+def _config(**overrides) -> LLMConfig:
+    params = {"model": "gpt-4o-mini", "base_url": "https://example.invalid/v1", "api_key": "test-key"}
+    params.update(overrides)
+    return LLMConfig(**params)
+
+
+class TestLLMClientRegistry:
+    """Test client sharing and lifecycle."""
+
+    def test_same_endpoint_shares_client(self):
+        """Configs for the same endpoint reuse one client and connection pool."""
+        registry = LLMClientRegistry()
+
+        first = registry.get_client(_config())
+        second = registry.get_client(_config(temperature=0.2, model="other-model"))
+
+        assert first is second
+        assert registry.stats()["clients"] == 1
+        registry.close_all()
+
+    def test_key_fields_separate_clients(self):
+        """A different api_key, base_url, timeout or api_type gets its own client."""
+        registry = LLMClientRegistry()
+
+        base = registry.get_client(_config())
+        assert registry.get_client(_config(api_key="other-key")) is not base
+        assert registry.get_client(_config(base_url="https://other.invalid/v1")) is not base
+        assert registry.get_client(_config(timeout=5)) is not base
+        assert registry.get_client(_config(api_type="anthropic_chat_completion")) is not base
+        assert registry.stats()["clients"] == 5
+        registry.close_all()
+
+    def test_sync_and_async_clients_are_distinct(self):
+        """Sync and async variants are pooled separately."""
+        registry = LLMClientRegistry()
+        sync_client = registry.get_client(_config())
+
+        async def main():
+            async_client = registry.get_async_client(_config())
+            assert async_client is not sync_client
+            assert registry.get_async_client(_config()) is async_client
+            assert registry.stats()["clients"] == 2
+            await registry.aclose_all()
+
+        asyncio.run(main())
+        assert registry.stats()["clients"] == 0
+
+    def test_async_clients_are_not_shared_across_event_loops(self):
+        """Consecutive asyncio.run calls get their own async client; those of closed loops are dropped."""
+        registry = LLMClientRegistry()
+
+        async def get_client():
+            return registry.get_async_client(_config())
+
+        first = asyncio.run(get_client())
+        second = asyncio.run(get_client())
+
+        assert second is not first
+        assert registry.stats()["clients"] == 1
+        assert registry.get_async_client(_config()) is not registry.get_async_client(_config())
+        registry.close_all()
+
+    def test_max_retries_override_shares_http_pool(self):
+        """A different max_retries yields a copy that reuses the pooled HTTP client."""
+        registry = LLMClientRegistry()
+
+        base = registry.get_client(_config(max_retries=3))
+        retried = registry.get_client(_config(max_retries=7))
+
+        assert retried.max_retries == 7
+        assert retried._client is base._client
+        registry.close_all()
+
+    def test_pool_limits_are_applied(self):
+        """Configured limits reach the underlying HTTP transport."""
+        registry = LLMClientRegistry()
+        registry.configure(max_connections=4, max_keepalive_connections=2)
+
+        client = registry.get_client(_config())
+
+        pool = client._client._transport._pool
+        assert pool._max_connections == 4
+        assert pool._max_keepalive_connections == 2
+        registry.close_all()
+
+    def test_invalid_api_type(self):
+        """Unsupported API types raise ValueError."""
+        registry = LLMClientRegistry()
+
+        with pytest.raises(ValueError, match="Invalid API type"):
+            registry.get_client(_config(api_type="unknown"))
+
+    def test_close_all_closes_sync_clients(self):
+        """close_all closes pooled clients and the next request builds a new one."""
+        registry = LLMClientRegistry()
+        client = registry.get_client(_config())
+
+        registry.close_all()
+
+        assert client.is_closed()
+        assert registry.get_client(_config()) is not client
+        registry.close_all()
+
+
+class TestCleanupManagerShutdownHooks:
+    """Test process-wide shutdown hooks."""
+
+    def test_hooks_run_after_agents_stop(self):
+        """Shutdown hooks run once, after every active agent is stopped."""
+        manager = CleanupManager()
+        calls: list[str] = []
+        agent = Mock()
+        agent.stop.side_effect = lambda: calls.append("agent")
+
+        def hook() -> None:
+            calls.append("hook")
+
+        manager.register_agent(agent)
+        manager.register_shutdown_hook(hook)
+        manager.register_shutdown_hook(hook)
+        try:
+            manager._cleanup_all_agents()
+        finally:
+            manager._shutdown_hooks.remove(hook)
+            manager._active_agents.discard(agent)
+
+        assert calls == ["agent", "hook"]
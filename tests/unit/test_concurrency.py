@@ -0,0 +1,246 @@
+# Copyright (c) Nex-AGI. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Unit tests for AdaptiveConcurrencyLimiter.
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from nexau.archs.llm.retry_policy import ErrorClass
+from nexau.archs.main_sub.agent_context import GlobalStorage
+from nexau.archs.main_sub.execution.concurrency import (
+    CONCURRENCY_LIMITER_STORAGE_KEY,
+    AdaptiveConcurrencyLimiter,
+    current_concurrency_limiter,
+    get_shared_concurrency_limiter,
+)
+
+
+def _fill_window(limiter: AdaptiveConcurrencyLimiter, latency: float, count: int | None = None) -> None:
+    for _ in range(count or limiter.window_size):
+        limiter.record_latency(latency)
+
+
+class TestAdaptiveConcurrencyLimiter:
+    """Test cases for AdaptiveConcurrencyLimiter."""
+
+    def test_invalid_bounds_rejected(self):
+        """Test that inconsistent limits are rejected."""
+        with pytest.raises(ValueError):
+            AdaptiveConcurrencyLimiter(min_limit=4, max_limit=2)
+        with pytest.raises(ValueError):
+            AdaptiveConcurrencyLimiter(backoff_factor=1.5)
+
+    def test_acquire_blocks_at_limit(self):
+        """Test that slots beyond the limit wait for a release."""
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=2)
+
+        assert limiter.acquire(timeout=0)
+        assert limiter.acquire(timeout=0)
+        assert not limiter.acquire(timeout=0.01)
+        assert limiter.stats()["waiting"] == 0
+
+        limiter.release()
+        assert limiter.acquire(timeout=0)
+        assert limiter.in_use == 2
+
+    def test_release_hands_slot_to_waiting_thread(self):
+        """Test that a blocked thread gets the released slot."""
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=1)
+        limiter.acquire()
+        acquired = threading.Event()
+
+        def worker():
+            limiter.acquire()
+            acquired.set()
+
+        thread = threading.Thread(target=worker)
+        thread.start()
+        time.sleep(0.05)
+        assert not acquired.is_set()
+
+        limiter.release()
+        thread.join(timeout=5)
+        assert acquired.is_set()
+        assert limiter.in_use == 1
+
+    def test_nested_slot_reuses_parent_slot(self):
+        """Test that nested fan-out runs under the slot its parent holds."""
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=1)
+
+        with limiter.slot():
+            assert current_concurrency_limiter() is limiter
+            with limiter.slot():
+                assert limiter.in_use == 1
+
+        assert limiter.in_use == 0
+        assert current_concurrency_limiter() is None
+
+    def test_async_slot_waits_without_blocking_loop(self):
+        """Test that coroutines share the limit and are woken on release."""
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=2)
+        running = 0
+        peak = 0
+
+        async def unit():
+            nonlocal running, peak
+            async with limiter.aslot():
+                running += 1
+                peak = max(peak, running)
+                await asyncio.sleep(0.01)
+                running -= 1
+
+        async def main():
+            await asyncio.gather(*(unit() for _ in range(6)))
+
+        asyncio.run(main())
+
+        assert peak == 2
+        assert limiter.in_use == 0
+
+    def test_cancelled_async_waiter_leaves_queue(self):
+        """Test that cancelling a waiting coroutine does not leak a slot."""
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=1)
+
+        async def main():
+            limiter.acquire()
+            waiter = asyncio.create_task(limiter.aacquire())
+            await asyncio.sleep(0.01)
+            waiter.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await waiter
+            limiter.release()
+
+        asyncio.run(main())
+
+        assert limiter.in_use == 0
+        assert limiter.stats()["waiting"] == 0
+
+    def test_grows_after_healthy_saturated_window(self):
+        """Test additive increase when every slot was busy and latency held steady."""
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=2, max_limit=4, window_size=5)
+        limiter.acquire()
+        limiter.acquire()
+
+        _fill_window(limiter, 0.1)
+        assert limiter.limit == 3
+
+        # The new slot has to be used before the limit grows again
+        _fill_window(limiter, 0.1)
+        assert limiter.limit == 3
+
+        limiter.acquire()
+        _fill_window(limiter, 0.1)
+        assert limiter.limit == 4
+        assert limiter.stats()["increases"] == 2
+
+    def test_does_not_grow_when_idle(self):
+        """Test that an unsaturated limit stays where it is."""
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=2, window_size=5)
+
+        _fill_window(limiter, 0.1)
+
+        assert limiter.limit == 2
+
+    def test_rate_limit_backs_off_once_per_cooldown(self):
+        """Test multiplicative decrease on rate limits, bounded by the cooldown."""
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=8, backoff_cooldown=60)
+
+        limiter.record_error(ErrorClass.RATE_LIMIT)
+        limiter.record_error(ErrorClass.RATE_LIMIT)
+
+        stats = limiter.stats()
+        assert stats["limit"] == 4
+        assert stats["decreases"] == 1
+        assert stats["rate_limited"] == 2
+
+    def test_backoff_respects_min_limit(self):
+        """Test that backoff never goes below the minimum."""
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=3, min_limit=2, backoff_cooldown=0)
+
+        limiter.record_error(ErrorClass.OVERLOADED)
+        limiter.record_error(ErrorClass.OVERLOADED)
+
+        assert limiter.limit == 2
+
+    def test_rising_p95_backs_off(self):
+        """Test that a window whose p95 jumps over the baseline lowers the limit."""
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=8, window_size=10, backoff_cooldown=0)
+
+        _fill_window(limiter, 0.1)
+        _fill_window(limiter, 2.0)
+
+        stats = limiter.stats()
+        assert stats["limit"] == 4
+        assert stats["window_p95_ms"] > stats["baseline_p95_ms"]
+
+    def test_error_rate_backs_off(self):
+        """Test that server errors over the threshold lower the limit."""
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=8, window_size=10, max_error_rate=0.1, backoff_cooldown=0)
+
+        _fill_window(limiter, 0.1, count=7)
+        for _ in range(3):
+            limiter.record_error(ErrorClass.SERVER)
+
+        assert limiter.limit == 4
+        assert limiter.stats()["window_error_rate"] == pytest.approx(0.3)
+
+    def test_client_errors_ignored(self):
+        """Test that errors unrelated to load do not change the limit."""
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=8, window_size=2)
+
+        limiter.record_error(ErrorClass.CLIENT)
+        limiter.record_error(ErrorClass.CLIENT)
+
+        assert limiter.limit == 8
+        assert limiter.stats()["samples"] == 0
+
+    def test_growth_wakes_waiters(self):
+        """Test that raising the limit lets queued threads start."""
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=1, max_limit=2, window_size=2)
+        limiter.acquire()
+        acquired = threading.Event()
+        thread = threading.Thread(target=lambda: (limiter.acquire(), acquired.set()))
+        thread.start()
+        time.sleep(0.05)
+
+        _fill_window(limiter, 0.1)
+        thread.join(timeout=5)
+
+        assert acquired.is_set()
+        assert limiter.in_use == 2
+
+
+class TestGetSharedConcurrencyLimiter:
+    """Test cases for get_shared_concurrency_limiter."""
+
+    def test_limiter_shared_through_global_storage(self):
+        """Test that every agent using the same storage gets the same limiter."""
+        storage = GlobalStorage()
+
+        first = get_shared_concurrency_limiter(storage, initial_limit=3)
+        second = get_shared_concurrency_limiter(storage, initial_limit=10)
+
+        assert first is second
+        assert first.limit == 3
+        assert storage.get(CONCURRENCY_LIMITER_STORAGE_KEY) is first
+
+    def test_without_global_storage_creates_private_limiter(self):
+        """Test that agents without storage get their own limiter."""
+        assert get_shared_concurrency_limiter(None) is not get_shared_concurrency_limiter(None)
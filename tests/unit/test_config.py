@@ -16,6 +16,8 @@
 Unit tests for configuration loading components.
 """
 
+import os
+import pickle
 from pathlib import Path
 from unittest.mock import Mock, patch
 
@@ -25,6 +27,7 @@ from pydantic import ValidationError
 
 from nexau.archs.config.config_loader import (
     AgentBuilder,
+    AgentConfigCache,
     ConfigError,
     apply_agent_name_overrides,
     load_agent_config,
@@ -659,7 +662,7 @@ class TestConfigIntegration:
         with open(config_path, "w") as f:
             yaml.dump(config, f)
 
-        with patch("nexau.archs.main_sub.agent.openai") as mock_openai:
+        with patch("nexau.archs.llm.client_registry.openai") as mock_openai:
             mock_openai.OpenAI.return_value = Mock()
 
             agent = load_agent_config(str(config_path))
@@ -680,7 +683,7 @@ class TestConfigIntegration:
         config_path = Path(temp_dir) / "typed_agent.yaml"
         config_path.write_text(yaml.dump(config))
 
-        with patch("nexau.archs.main_sub.agent.openai") as mock_openai:
+        with patch("nexau.archs.llm.client_registry.openai") as mock_openai:
             mock_openai.OpenAI.return_value = Mock()
 
             agent = load_agent_config(str(config_path))
@@ -866,3 +869,126 @@ class TestConfigIntegration:
         assert name == "sub_agent"
         # Factory should be callable
         assert callable(factory)
+
+    def test_sub_agent_factory_is_picklable(self, temp_dir):
+        """Test that YAML sub-agent factories survive pickling for worker processes."""
+        sub_path = Path(temp_dir) / "sub_agent.yaml"
+        sub_path.write_text(yaml.dump({"name": "sub_agent", "system_prompt": "You are a sub-agent.", "llm_config": {"model": "m"}}))
+        config = {"name": "sub_agent", "config_path": str(sub_path)}
+
+        _, factory = load_sub_agent_from_config(config, Path(temp_dir), overrides={"max_iterations": 3})
+        restored = pickle.loads(pickle.dumps(factory))
+
+        assert restored.config_path == factory.config_path
+        assert restored.overrides == {"max_iterations": 3}
+
+
+class TestAgentConfigCache:
+    """Test compiled agent config caching."""
+
+    @staticmethod
+    def _write_agent(temp_dir, **extra) -> Path:
+        tool_path = Path(temp_dir) / "echo_tool.yaml"
+        tool_path.write_text(
+            yaml.dump({"name": "echo", "description": "Echo", "input_schema": {"type": "object"}}),
+        )
+        config = {
+            "name": "cached_agent",
+            "llm_config": {"model": "gpt-4o-mini"},
+            "tools": [{"name": "echo", "yaml_path": "echo_tool.yaml", "binding": "builtins:print"}],
+            **extra,
+        }
+        config_path = Path(temp_dir) / "agent.yaml"
+        config_path.write_text(yaml.dump(config))
+        return config_path
+
+    def test_compiles_once(self, temp_dir):
+        """Repeated lookups reuse the compiled config without re-reading YAML."""
+        config_path = self._write_agent(temp_dir)
+        cache = AgentConfigCache()
+
+        with patch.object(Tool, "load_definition", wraps=Tool.load_definition) as load_definition:
+            first = cache.get(config_path)
+            second = cache.get(str(config_path))
+
+        assert first is second
+        assert load_definition.call_count == 1
+        assert str(Path(temp_dir) / "echo_tool.yaml") in first.tool_definitions
+        assert cache.stats() == {"entries": 1, "hits": 1, "misses": 1}
+
+    def test_recompiles_when_file_changes(self, temp_dir):
+        """A changed config or tool YAML invalidates the entry."""
+        config_path = self._write_agent(temp_dir)
+        cache = AgentConfigCache()
+        first = cache.get(config_path)
+
+        tool_path = Path(temp_dir) / "echo_tool.yaml"
+        tool_path.write_text(
+            yaml.dump({"name": "echo", "description": "Echo again", "input_schema": {"type": "object"}}),
+        )
+        stat = tool_path.stat()
+        os.utime(tool_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+        second = cache.get(config_path)
+        assert second is not first
+        assert second.tool_definitions[str(tool_path)]["description"] == "Echo again"
+
+    def test_recompiles_when_env_changes(self, temp_dir, monkeypatch):
+        """Referenced environment variables are part of the cache key."""
+        monkeypatch.setenv("NEXAU_TEST_MODEL", "model-a")
+        config_path = Path(temp_dir) / "agent.yaml"
+        config_path.write_text("name: env_agent\nllm_config:\n  model: ${env.NEXAU_TEST_MODEL}\n")
+        cache = AgentConfigCache()
+
+        first = cache.get(config_path)
+        assert cache.get(config_path) is first
+
+        monkeypatch.setenv("NEXAU_TEST_MODEL", "model-b")
+        second = cache.get(config_path)
+        assert second is not first
+        assert second.config["llm_config"]["model"] == "model-b"
+
+    def test_compiles_nested_sub_agents(self, temp_dir):
+        """Sub-agent configs are compiled with the parent, including cycles."""
+        sub_path = Path(temp_dir) / "sub.yaml"
+        main_path = Path(temp_dir) / "main.yaml"
+        sub_path.write_text(
+            yaml.dump(
+                {
+                    "name": "sub",
+                    "llm_config": {"model": "gpt-4o-mini"},
+                    "sub_agents": [{"name": "main", "config_path": "main.yaml"}],
+                },
+            ),
+        )
+        main_path.write_text(
+            yaml.dump(
+                {
+                    "name": "main",
+                    "llm_config": {"model": "gpt-4o-mini"},
+                    "sub_agents": [{"name": "sub", "config_path": "sub.yaml"}],
+                },
+            ),
+        )
+        cache = AgentConfigCache()
+
+        compiled = cache.get(main_path)
+
+        assert compiled.sub_agents["sub"].config["name"] == "sub"
+        assert compiled.sub_agents["sub"] is cache.get(sub_path)
+        assert cache.stats()["entries"] == 2
+
+    def test_build_does_not_mutate_cached_config(self, temp_dir, mock_llm_config):
+        """Overrides apply to the built agent only."""
+        config_path = self._write_agent(temp_dir)
+        cache = AgentConfigCache()
+        compiled = cache.get(config_path)
+
+        with patch("nexau.archs.llm.client_registry.openai"):
+            agent = compiled.build(overrides={"cached_agent": {"llm_config": {"model": "other-model"}}})
+            plain = compiled.build()
+
+        assert agent.config.llm_config.model == "other-model"
+        assert plain.config.llm_config.model == "gpt-4o-mini"
+        assert compiled.config["llm_config"]["model"] == "gpt-4o-mini"
+        assert [tool.name for tool in plain.config.tools] == ["echo"]
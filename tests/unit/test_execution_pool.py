@@ -0,0 +1,134 @@
+# Copyright (c) Nex-AGI. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Unit tests for ExecutionPool.
+"""
+
+import threading
+from contextvars import ContextVar
+
+import pytest
+
+from nexau.archs.main_sub.agent_context import GlobalStorage
+from nexau.archs.main_sub.execution.execution_pool import (
+    BATCH_LANE,
+    EXECUTION_POOL_STORAGE_KEY,
+    SUB_AGENTS_LANE,
+    TOOLS_LANE,
+    ExecutionPool,
+    get_shared_execution_pool,
+)
+
+_test_var: ContextVar[str] = ContextVar("execution_pool_test_var", default="unset")
+
+
+class TestExecutionPool:
+    """Test cases for ExecutionPool."""
+
+    @pytest.fixture
+    def pool(self):
+        """Create a pool and shut it down after the test."""
+        pool = ExecutionPool({TOOLS_LANE: 2, SUB_AGENTS_LANE: 1, BATCH_LANE: 1})
+        yield pool
+        pool.shutdown(wait=True)
+
+    def test_lane_reused_across_submits(self, pool):
+        """Test that workers persist between submissions to the same lane."""
+        first = pool.submit(TOOLS_LANE, threading.current_thread).result(timeout=5)
+        second = pool.submit(TOOLS_LANE, threading.current_thread).result(timeout=5)
+
+        assert first.name.startswith("nexau-tools-0")
+        assert second.name.startswith("nexau-tools-0")
+        assert pool.stats()["levels"] == {TOOLS_LANE: [0]}
+
+    def test_lanes_are_isolated(self, pool):
+        """Test that each lane gets its own workers."""
+        tool_thread = pool.submit(TOOLS_LANE, threading.current_thread).result(timeout=5)
+        batch_thread = pool.submit(BATCH_LANE, threading.current_thread).result(timeout=5)
+
+        assert tool_thread.name.startswith("nexau-tools-")
+        assert batch_thread.name.startswith("nexau-batch-")
+
+    def test_context_propagated_to_workers(self, pool):
+        """Test that context variables of the submitter are visible in workers."""
+        token = _test_var.set("from-caller")
+        try:
+            result = pool.submit(TOOLS_LANE, _test_var.get).result(timeout=5)
+        finally:
+            _test_var.reset(token)
+
+        assert result == "from-caller"
+
+    def test_nested_submission_does_not_deadlock(self, pool):
+        """Test that a task waiting on same-lane work is not starved by its own lane."""
+
+        def parent():
+            return pool.submit(SUB_AGENTS_LANE, lambda: "child done").result(timeout=5)
+
+        # The sub-agent lane has a single worker, so the child must run on the next level
+        assert pool.submit(SUB_AGENTS_LANE, parent).result(timeout=5) == "child done"
+        assert pool.stats()["levels"][SUB_AGENTS_LANE] == [0, 1]
+
+    def test_submit_after_shutdown_raises(self, pool):
+        """Test that a shut down pool rejects new work."""
+        pool.shutdown()
+
+        assert pool.is_shutdown
+        with pytest.raises(RuntimeError):
+            pool.submit(TOOLS_LANE, lambda: None)
+
+
+class TestGetSharedExecutionPool:
+    """Test cases for get_shared_execution_pool."""
+
+    def test_pool_shared_through_global_storage(self):
+        """Test that the first caller creates the pool and later callers reuse it."""
+        storage = GlobalStorage()
+
+        pool, created = get_shared_execution_pool(storage, {TOOLS_LANE: 2})
+        same_pool, created_again = get_shared_execution_pool(storage, {TOOLS_LANE: 8})
+
+        try:
+            assert created is True
+            assert created_again is False
+            assert same_pool is pool
+            assert storage.get(EXECUTION_POOL_STORAGE_KEY) is pool
+            assert pool.lane_sizes[TOOLS_LANE] == 2
+        finally:
+            pool.shutdown()
+
+    def test_shut_down_pool_is_replaced(self):
+        """Test that a new pool is created once the stored one is shut down."""
+        storage = GlobalStorage()
+        pool, _ = get_shared_execution_pool(storage)
+        pool.shutdown()
+
+        new_pool, created = get_shared_execution_pool(storage)
+
+        try:
+            assert created is True
+            assert new_pool is not pool
+        finally:
+            new_pool.shutdown()
+
+    def test_without_global_storage_creates_private_pool(self):
+        """Test that callers without global storage own a private pool."""
+        pool, created = get_shared_execution_pool(None)
+
+        try:
+            assert created is True
+            assert isinstance(pool, ExecutionPool)
+        finally:
+            pool.shutdown()
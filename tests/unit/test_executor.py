@@ -24,11 +24,15 @@ Tests cover:
 - Token and iteration limit handling
 """
 
+import asyncio
 import json
-from unittest.mock import Mock, patch
+from unittest.mock import AsyncMock, Mock, patch
 
 import pytest
 
+from nexau.archs.main_sub.agent_context import GlobalStorage
+from nexau.archs.main_sub.execution.concurrency import CONCURRENCY_LIMITER_STORAGE_KEY, current_concurrency_limiter
+from nexau.archs.main_sub.execution.execution_pool import BATCH_LANE, SUB_AGENTS_LANE
 from nexau.archs.main_sub.execution.executor import Executor
 from nexau.archs.main_sub.execution.model_response import ModelResponse, ModelToolCall
 from nexau.archs.main_sub.execution.parse_structures import (
@@ -40,6 +44,10 @@ from nexau.archs.main_sub.execution.parse_structures import (
 from nexau.archs.tool.tool import Tool
 
 
+def _module_level_sub_agent_factory():
+    return Mock()
+
+
 class TestExecutorInitialization:
     """Test Executor initialization and configuration."""
 
@@ -775,7 +783,35 @@ class TestExecutorCleanup:
         assert executor._shutdown_event.is_set()
 
     def test_cleanup_with_running_executors(self, mock_llm_config):
-        """Test cleanup with running executors."""
+        """Test cleanup cancels in-flight work and shuts down the owned pool."""
+        executor = Executor(
+            agent_name="test_agent",
+            agent_id="test_id",
+            tool_registry={},
+            sub_agent_factories={},
+            stop_tools=set(),
+            openai_client=Mock(),
+            llm_config=mock_llm_config,
+        )
+
+        # Add mock in-flight futures and an owned execution pool
+        mock_future1 = Mock()
+        mock_future2 = Mock()
+        executor._inflight_futures = {mock_future1, mock_future2}
+        mock_pool = Mock()
+        executor._execution_pool = mock_pool
+        executor._owns_execution_pool = True
+
+        executor.cleanup()
+
+        # Verify pending work was cancelled and the pool was shut down
+        mock_future1.cancel.assert_called_once()
+        mock_future2.cancel.assert_called_once()
+        mock_pool.shutdown.assert_called_once_with(wait=False, cancel_futures=True)
+        assert len(executor._inflight_futures) == 0
+
+    def test_cleanup_does_not_shut_down_shared_pool(self, mock_llm_config):
+        """Test cleanup leaves a pool owned by another agent running."""
         executor = Executor(
             agent_name="test_agent",
             agent_id="test_id",
@@ -786,20 +822,41 @@ class TestExecutorCleanup:
             llm_config=mock_llm_config,
         )
 
-        # Add mock executors to running_executors
-        mock_executor1 = Mock()
-        mock_executor2 = Mock()
-        executor._running_executors = {
-            "executor_1": mock_executor1,
-            "executor_2": mock_executor2,
-        }
+        mock_pool = Mock()
+        executor._execution_pool = mock_pool
+        executor._owns_execution_pool = False
 
         executor.cleanup()
 
-        # Verify shutdown was called on executors
-        mock_executor1.shutdown.assert_called_once()
-        mock_executor2.shutdown.assert_called_once()
-        assert len(executor._running_executors) == 0
+        mock_pool.shutdown.assert_not_called()
+
+    def test_execution_pool_shared_through_global_storage(self, mock_llm_config):
+        """Test executors in one hierarchy reuse a single persistent pool."""
+        global_storage = GlobalStorage()
+        executors = [
+            Executor(
+                agent_name=f"agent_{i}",
+                agent_id=f"id_{i}",
+                tool_registry={},
+                sub_agent_factories={},
+                stop_tools=set(),
+                openai_client=Mock(),
+                llm_config=mock_llm_config,
+                global_storage=global_storage,
+            )
+            for i in range(2)
+        ]
+
+        try:
+            pool = executors[0]._get_execution_pool()
+            assert executors[0]._get_execution_pool() is pool
+            assert executors[1]._get_execution_pool() is pool
+            assert executors[0]._owns_execution_pool is True
+            assert executors[1]._owns_execution_pool is False
+        finally:
+            for executor in executors:
+                executor.cleanup()
+        assert pool.is_shutdown
 
 
 class TestExecutorHelperMethods:
@@ -1240,3 +1297,436 @@ class TestExecutorEdgeCases:
 
             assert result == "Batch result"
             mock_batch.assert_called_once_with("sub_agent", test_file, "json", "Process {id}")
+
+
+class TestExecutorTokenLedger:
+    """Test incremental token accounting in the execution loop."""
+
+    def test_execute_reuses_cached_message_counts(self, mock_llm_config, agent_state):
+        """Messages already counted are not re-encoded on later counts."""
+        executor = Executor(
+            agent_name="test_agent",
+            agent_id="test_id",
+            tool_registry={},
+            sub_agent_factories={},
+            stop_tools=set(),
+            openai_client=Mock(),
+            llm_config=mock_llm_config,
+        )
+
+        history = [
+            {"role": "system", "content": "You are a helpful assistant."},
+            {"role": "user", "content": "Hello"},
+        ]
+
+        with patch.object(executor.token_counter, "count_tokens", return_value=10) as mock_count:
+            with patch.object(executor.llm_caller, "call_llm") as mock_call_llm:
+                mock_call_llm.return_value = ModelResponse(content="Hi there")
+                executor.execute(history, agent_state)
+
+        # Every call encodes exactly one message, and the two history messages only once
+        assert all(len(call.args[0]) == 1 for call in mock_count.call_args_list)
+        assert mock_count.call_count == 2
+        assert executor.token_ledger.total == 20
+
+
+class TestExecutorAsyncExecution:
+    """Test the asyncio execution loop."""
+
+    def test_aexecute_simple_response(self, mock_llm_config, agent_state):
+        """aexecute awaits the async model call and never uses the sync one."""
+        executor = Executor(
+            agent_name="test_agent",
+            agent_id="test_id",
+            tool_registry={},
+            sub_agent_factories={},
+            stop_tools=set(),
+            openai_client=Mock(),
+            llm_config=mock_llm_config,
+        )
+
+        history = [
+            {"role": "system", "content": "You are a helpful assistant."},
+            {"role": "user", "content": "Hello"},
+        ]
+
+        with patch.object(executor.llm_caller, "acall_llm", new=AsyncMock(return_value=ModelResponse(content="Hi there"))):
+            with patch.object(executor.llm_caller, "call_llm") as mock_call_llm:
+                response, messages = asyncio.run(executor.aexecute(history, agent_state))
+
+        assert response == "Hi there"
+        assert messages[-1]["role"] == "assistant"
+        mock_call_llm.assert_not_called()
+
+    def test_aexecute_openai_tool_messages_with_async_tool(self, mock_llm_config, agent_state):
+        """Coroutine tools are awaited and their results become tool messages."""
+
+        async def async_tool(x: int) -> dict:
+            await asyncio.sleep(0)
+            return {"result": x + 1}
+
+        tool = Tool(
+            name="async_tool",
+            description="An async tool",
+            input_schema={
+                "type": "object",
+                "properties": {"x": {"type": "integer"}},
+                "required": ["x"],
+            },
+            implementation=async_tool,
+        )
+
+        executor = Executor(
+            agent_name="test_agent",
+            agent_id="test_id",
+            tool_registry={"async_tool": tool},
+            sub_agent_factories={},
+            stop_tools=set(),
+            openai_client=Mock(),
+            llm_config=mock_llm_config,
+            max_iterations=2,
+            tool_call_mode="openai",
+            openai_tools=[
+                {
+                    "type": "function",
+                    "function": {
+                        "name": "async_tool",
+                        "description": "An async tool",
+                        "parameters": {"type": "object", "properties": {"x": {"type": "integer"}}},
+                    },
+                },
+            ],
+        )
+
+        history = [
+            {"role": "system", "content": "You are a helpful assistant."},
+            {"role": "user", "content": "Use the tool"},
+        ]
+        first_response = ModelResponse(
+            content="",
+            tool_calls=[ModelToolCall(call_id="call_123", name="async_tool", arguments={"x": 3}, raw_arguments='{"x": 3}')],
+        )
+        second_response = ModelResponse(content="Final response")
+
+        with patch.object(executor.llm_caller, "acall_llm", new=AsyncMock(side_effect=[first_response, second_response])):
+            response, messages = asyncio.run(executor.aexecute(history, agent_state))
+
+        assert response == "Final response"
+        tool_messages = [msg for msg in messages if msg.get("role") == "tool" and msg.get("tool_call_id") == "call_123"]
+        assert tool_messages
+        assert '"result": 4' in tool_messages[0]["content"]
+        assert executor._inflight_tasks == set()
+
+    def test_aexecute_parsed_calls_matches_sync_path(self, mock_llm_config, agent_state):
+        """Async and thread-pool paths render the same results for sync tools."""
+
+        def tool1(x: int) -> dict:
+            return {"result": x * 2}
+
+        tool = Tool(
+            name="tool1",
+            description="Tool 1",
+            input_schema={"type": "object", "properties": {"x": {"type": "integer"}}, "required": ["x"]},
+            implementation=tool1,
+        )
+
+        executor = Executor(
+            agent_name="test_agent",
+            agent_id="test_id",
+            tool_registry={"tool1": tool},
+            sub_agent_factories={},
+            stop_tools=set(),
+            openai_client=Mock(),
+            llm_config=mock_llm_config,
+            serial_tool_name=[],
+        )
+
+        def make_parsed_response() -> ParsedResponse:
+            return ParsedResponse(
+                original_response="Using tools",
+                tool_calls=[
+                    ToolCall(tool_name="tool1", parameters={"x": 5}, raw_content="<tool_call>...</tool_call>", tool_call_id="call_1"),
+                ],
+                sub_agent_calls=[],
+                batch_agent_calls=[],
+            )
+
+        sync_processed, _, _, sync_feedbacks = executor._execute_parsed_calls(make_parsed_response(), agent_state)
+        async_processed, _, _, async_feedbacks = asyncio.run(
+            executor._aexecute_parsed_calls(make_parsed_response(), agent_state),
+        )
+
+        assert async_processed == sync_processed
+        assert [fb["content"] for fb in async_feedbacks] == [fb["content"] for fb in sync_feedbacks]
+        executor.cleanup()
+
+    def test_aexecute_sub_agent_call_safe(self, mock_llm_config, agent_state):
+        """Sub-agents are awaited through the manager's async entry point."""
+        executor = Executor(
+            agent_name="test_agent",
+            agent_id="test_id",
+            tool_registry={},
+            sub_agent_factories={"sub_agent": Mock()},
+            stop_tools=set(),
+            openai_client=Mock(),
+            llm_config=mock_llm_config,
+        )
+        sub_agent_call = SubAgentCall(
+            agent_name="sub_agent",
+            message="Test message",
+            raw_content="<sub_agent>...</sub_agent>",
+        )
+
+        with patch.object(executor.subagent_manager, "acall_sub_agent", new=AsyncMock(return_value="Sub-agent response")):
+            agent_name, result, is_error = asyncio.run(
+                executor._aexecute_sub_agent_call_safe(sub_agent_call, context=None, parent_agent_state=agent_state),
+            )
+
+        assert (agent_name, result, is_error) == ("sub_agent", "Sub-agent response", False)
+
+    def test_adaptive_concurrency_slots_sub_agent_calls(self, mock_llm_config, agent_state):
+        """Sub-agent calls hold a slot of the shared limiter on both paths and the lanes leave room to grow."""
+        storage = GlobalStorage()
+        executor = Executor(
+            agent_name="test_agent",
+            agent_id="test_id",
+            tool_registry={},
+            sub_agent_factories={"sub_agent": Mock()},
+            stop_tools=set(),
+            openai_client=Mock(),
+            llm_config=mock_llm_config,
+            max_running_subagents=2,
+            global_storage=storage,
+            adaptive_concurrency=True,
+        )
+        sub_agent_call = SubAgentCall(
+            agent_name="sub_agent",
+            message="Test message",
+            raw_content="<sub_agent>...</sub_agent>",
+        )
+        holders = []
+
+        def call_sub_agent(*args, **kwargs):
+            holders.append(current_concurrency_limiter())
+            return "Sub-agent response"
+
+        async def acall_sub_agent(*args, **kwargs):
+            return call_sub_agent()
+
+        with (
+            patch.object(executor.subagent_manager, "call_sub_agent", side_effect=call_sub_agent),
+            patch.object(executor.subagent_manager, "acall_sub_agent", new=acall_sub_agent),
+        ):
+            executor._execute_sub_agent_call_safe(sub_agent_call, context=None, parent_agent_state=agent_state)
+            asyncio.run(executor._aexecute_sub_agent_call_safe(sub_agent_call, context=None, parent_agent_state=agent_state))
+
+        limiter = storage.get(CONCURRENCY_LIMITER_STORAGE_KEY)
+        assert holders == [limiter, limiter]
+        assert executor.concurrency_stats() == limiter.stats()
+        assert limiter.stats()["in_use"] == 0
+        assert (limiter.limit, limiter.max_limit) == (2, 8)
+        lane_sizes = executor._get_execution_pool().stats()["lane_sizes"]
+        assert lane_sizes[SUB_AGENTS_LANE] == 8
+        assert lane_sizes[BATCH_LANE] == 8
+        executor.cleanup()
+
+    def test_batch_cache_dir_enables_result_cache(self, mock_llm_config, tmp_path):
+        """A batch cache directory gives the batch processor a persistent result cache."""
+        executor = Executor(
+            agent_name="test_agent",
+            agent_id="test_id",
+            tool_registry={},
+            sub_agent_factories={},
+            stop_tools=set(),
+            openai_client=Mock(),
+            llm_config=mock_llm_config,
+            batch_cache_dir=str(tmp_path / "batch_cache"),
+            batch_cache_max_age=60,
+        )
+
+        cache = executor.batch_processor.result_cache
+        assert cache is not None
+        assert (cache.directory, cache.max_age) == (str(tmp_path / "batch_cache"), 60)
+        executor.cleanup()
+
+    def test_batch_processes_run_batches_sharded(self, mock_llm_config, tmp_path):
+        """With batch processes, batch calls go to a sharded runner built from the sub-agent factory."""
+        executor = Executor(
+            agent_name="test_agent",
+            agent_id="test_id",
+            tool_registry={},
+            sub_agent_factories={"sub_agent": _module_level_sub_agent_factory},
+            stop_tools=set(),
+            openai_client=Mock(),
+            llm_config=mock_llm_config,
+            max_batch_workers=3,
+            batch_processes=2,
+            batch_work_dir=str(tmp_path / "work"),
+        )
+        batch_call = BatchAgentCall(
+            agent_name="sub_agent",
+            file_path=str(tmp_path / "items.jsonl"),
+            data_format="jsonl",
+            message_template="Process: {value}",
+            raw_content="<batch_agent>...</batch_agent>",
+        )
+
+        with (
+            patch("nexau.archs.main_sub.execution.executor.ShardedBatchRunner") as runner_cls,
+            patch.object(executor.subagent_manager, "config_fingerprint", return_value="config-fp"),
+        ):
+            runner_cls.return_value.run.return_value = "merged summary"
+            assert executor._execute_batch_call(batch_call) == "merged summary"
+
+        runner_cls.assert_called_once_with(
+            "sub_agent",
+            _module_level_sub_agent_factory,
+            processes=2,
+            shards=None,
+            threads_per_process=3,
+            work_dir=str(tmp_path / "work"),
+            result_cache=None,
+            config_fingerprint="config-fp",
+        )
+        runner_cls.return_value.run.assert_called_once_with(str(tmp_path / "items.jsonl"), "jsonl", "Process: {value}")
+        executor.cleanup()
+
+    def test_batch_processes_fall_back_for_unpicklable_factory(self, mock_llm_config, tmp_path):
+        """Sub-agents whose factory cannot reach worker processes run their batches in-process."""
+        test_file = tmp_path / "items.jsonl"
+        test_file.write_text('{"value": 1}\n')
+        executor = Executor(
+            agent_name="test_agent",
+            agent_id="test_id",
+            tool_registry={},
+            sub_agent_factories={"sub_agent": lambda: Mock()},
+            stop_tools=set(),
+            openai_client=Mock(),
+            llm_config=mock_llm_config,
+            batch_processes=2,
+        )
+        batch_call = BatchAgentCall(
+            agent_name="sub_agent",
+            file_path=str(test_file),
+            data_format="jsonl",
+            message_template="Process: {value}",
+            raw_content="<batch_agent>...</batch_agent>",
+        )
+
+        with patch.object(executor.batch_processor, "_process_batch_data", return_value="in-process summary") as process:
+            assert executor._execute_batch_call(batch_call) == "in-process summary"
+
+        process.assert_called_once()
+        executor.cleanup()
+
+    def test_aexecute_wraps_exceptions(self, mock_llm_config, agent_state):
+        """Errors in the async loop surface as RuntimeError like the sync path."""
+        executor = Executor(
+            agent_name="test_agent",
+            agent_id="test_id",
+            tool_registry={},
+            sub_agent_factories={},
+            stop_tools=set(),
+            openai_client=Mock(),
+            llm_config=mock_llm_config,
+        )
+
+        with patch.object(executor.llm_caller, "acall_llm", new=AsyncMock(side_effect=Exception("Test exception"))):
+            with pytest.raises(RuntimeError, match="Test exception"):
+                asyncio.run(executor.aexecute([{"role": "user", "content": "Hello"}], agent_state))
+
+
+class TestExecutorStreamToolDispatch:
+    """Test tool calls dispatched while the model response streams."""
+
+    @staticmethod
+    def _make_executor(mock_llm_config, implementation, **kwargs):
+        tool = Tool(
+            name="lookup",
+            description="Lookup tool",
+            input_schema={"type": "object", "properties": {"q": {"type": "string"}}, "required": ["q"]},
+            implementation=implementation,
+        )
+        return Executor(
+            agent_name="test_agent",
+            agent_id="test_id",
+            tool_registry={"lookup": tool},
+            sub_agent_factories={},
+            stop_tools=set(),
+            openai_client=Mock(),
+            llm_config=mock_llm_config,
+            max_iterations=2,
+            tool_call_mode="openai",
+            openai_tools=[{"type": "function", "function": {"name": "lookup", "parameters": {"type": "object"}}}],
+            stream_tool_dispatch=True,
+            **kwargs,
+        )
+
+    def test_disabled_by_default(self, mock_llm_config, agent_state):
+        """No dispatcher is created unless the option is enabled."""
+        executor = Executor(
+            agent_name="test_agent",
+            agent_id="test_id",
+            tool_registry={},
+            sub_agent_factories={},
+            stop_tools=set(),
+            openai_client=Mock(),
+            llm_config=mock_llm_config,
+        )
+
+        assert executor._new_stream_dispatcher(agent_state, asynchronous=False) is None
+
+    def test_streamed_call_is_claimed_not_rerun(self, mock_llm_config, agent_state):
+        """A call dispatched from the stream runs once and its result is used."""
+        calls: list[str] = []
+
+        def lookup(q: str) -> dict:
+            calls.append(q)
+            return {"answer": q.upper()}
+
+        executor = self._make_executor(mock_llm_config, lookup)
+        tool_call = ModelToolCall(call_id="call_1", name="lookup", arguments={"q": "abc"}, raw_arguments='{"q": "abc"}')
+
+        def fake_call_llm(*args, stream_listener=None, **kwargs):
+            if not calls and stream_listener is not None:
+                stream_listener.begin_attempt()
+                stream_listener.on_tool_call(tool_call)
+                assert stream_listener.dispatched_count == 1
+                return ModelResponse(content="", tool_calls=[tool_call])
+            return ModelResponse(content="Done")
+
+        history = [{"role": "user", "content": "Look it up"}]
+        with patch.object(executor.llm_caller, "call_llm", side_effect=fake_call_llm):
+            response, messages = executor.execute(history, agent_state)
+
+        assert response == "Done"
+        assert calls == ["abc"]
+        tool_messages = [msg for msg in messages if msg.get("role") == "tool"]
+        assert '"answer": "ABC"' in tool_messages[0]["content"]
+        assert executor._inflight_futures == set()
+        executor.cleanup()
+
+    def test_unclaimed_async_dispatch_is_cancelled(self, mock_llm_config, agent_state):
+        """Calls that the final response does not contain are cancelled, not awaited."""
+        started = asyncio.Event()
+
+        async def lookup(q: str) -> dict:
+            started.set()
+            await asyncio.sleep(10)
+            return {"answer": q}
+
+        executor = self._make_executor(mock_llm_config, lookup)
+        stray_call = ModelToolCall(call_id="call_1", name="lookup", arguments={"q": "stray"})
+
+        async def fake_acall_llm(*args, stream_listener=None, **kwargs):
+            stream_listener.begin_attempt()
+            stream_listener.on_tool_call(stray_call)
+            await started.wait()
+            return ModelResponse(content="No tools after all")
+
+        with patch.object(executor.llm_caller, "acall_llm", new=AsyncMock(side_effect=fake_acall_llm)):
+            response, _ = asyncio.run(executor.aexecute([{"role": "user", "content": "Hi"}], agent_state))
+
+        assert response == "No tools after all"
+        assert executor._inflight_tasks == set()
+        executor.cleanup()
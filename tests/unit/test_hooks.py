@@ -14,6 +14,10 @@
 
 """Comprehensive tests for the hooks module."""
 
+import asyncio
+import time
+from typing import Any
+
 import pytest
 
 from nexau.archs.main_sub.agent_context import AgentContext, GlobalStorage
@@ -537,6 +541,85 @@ class TestMiddlewareManager:
         assert order == ["first", "second"]
         assert updated == {"initial": True, "first": True, "second": True}
 
+    def test_arun_before_model_mixes_async_and_sync_hooks(self, agent_state, messages):
+        """Async hooks are awaited and sync hooks still run, in declaration order."""
+        order: list[str] = []
+
+        class AsyncMiddleware(Middleware):
+            async def abefore_model(self, hook_input: BeforeModelHookInput) -> HookResult:  # type: ignore[override]
+                await asyncio.sleep(0)
+                order.append("async")
+                return HookResult.with_modifications(messages=hook_input.messages + [{"role": "system", "content": "async"}])
+
+        def sync_hook(hook_input: BeforeModelHookInput) -> HookResult:
+            order.append("sync")
+            return HookResult.with_modifications(messages=hook_input.messages + [{"role": "system", "content": "sync"}])
+
+        manager = MiddlewareManager([AsyncMiddleware(), FunctionMiddleware(before_model_hook=sync_hook)])
+        hook_input = BeforeModelHookInput(
+            agent_state=agent_state,
+            max_iterations=5,
+            current_iteration=0,
+            messages=messages.copy(),
+        )
+
+        updated_messages = asyncio.run(manager.arun_before_model(hook_input))
+        assert order == ["async", "sync"]
+        assert [msg["content"] for msg in updated_messages[-2:]] == ["async", "sync"]
+
+    def test_awrap_model_call_bridges_sync_wrappers(self):
+        """Sync wrap_model_call overrides run off-loop and nest around async ones."""
+        call_log: list[str] = []
+
+        class AsyncRecording(Middleware):
+            async def awrap_model_call(self, params, call_next):  # type: ignore[override]
+                call_log.append("before_async")
+                result = await call_next(params)
+                call_log.append("after_async")
+                return result
+
+        class SyncRecording(Middleware):
+            def wrap_model_call(self, params, call_next):  # type: ignore[override]
+                call_log.append("before_sync")
+                result = call_next(params)
+                call_log.append("after_sync")
+                return result
+
+        manager = MiddlewareManager([AsyncRecording(), SyncRecording(), Middleware()])
+        params = ModelCallParams(
+            messages=[{"role": "user", "content": "hi"}],
+            max_tokens=10,
+            force_stop_reason=None,
+            agent_state=None,
+            tool_call_mode="xml",
+            tools=None,
+            api_params={},
+        )
+
+        async def base_call(_: ModelCallParams) -> ModelResponse:
+            call_log.append("base")
+            return ModelResponse(content="ok")
+
+        response = asyncio.run(manager.awrap_model_call(params, base_call))
+        assert response.content == "ok"
+        assert call_log == ["before_async", "before_sync", "base", "after_sync", "after_async"]
+
+    def test_awrap_tool_call_without_wrappers_calls_base(self, agent_state):
+        """Middleware that does not wrap tool calls is skipped on the async path."""
+        manager = MiddlewareManager([Middleware()])
+        params = ToolCallParams(
+            agent_state=agent_state,
+            tool_name="demo",
+            parameters={},
+            tool_call_id="call_1",
+            execution_params={},
+        )
+
+        async def base_call(_: ToolCallParams) -> dict[str, str]:
+            return {"result": "ok"}
+
+        assert asyncio.run(manager.awrap_tool_call(params, base_call)) == {"result": "ok"}
+
     def test_logging_middleware_wrap_model_call(self, agent_state, capsys):
         """LoggingMiddleware can wrap model calls and emit console output."""
         middleware = LoggingMiddleware(log_model_calls=True)
@@ -563,6 +646,171 @@ class TestMiddlewareManager:
         assert "LLM call invoked with 1 messages" in captured
 
 
+class TestMiddlewarePlan:
+    """Tests for the compiled middleware plan and its timing counters."""
+
+    @staticmethod
+    def _tool_params(agent_state) -> ToolCallParams:
+        return ToolCallParams(
+            agent_state=agent_state,
+            tool_name="demo",
+            parameters={},
+            tool_call_id="call_1",
+            execution_params={},
+        )
+
+    def test_plan_skips_unimplemented_phases(self):
+        """Only middleware overriding a phase end up in that phase's handlers."""
+
+        class WrapOnly(Middleware):
+            def wrap_tool_call(self, params, call_next):  # type: ignore[override]
+                return call_next(params)
+
+        hook_middleware = FunctionMiddleware(after_tool_hook=lambda hook_input: HookResult.no_changes())
+        wrap_middleware = WrapOnly()
+        plan = MiddlewareManager([hook_middleware, wrap_middleware, Middleware()]).plan
+
+        assert [entry.middleware for entry in plan.after_tool] == [hook_middleware]
+        assert [entry.middleware for entry in plan.aafter_tool] == [hook_middleware]
+        assert plan.before_model == plan.before_tool == plan.stream_chunk == ()
+        assert [entry.middleware for entry in plan.wrap_tool_call] == [wrap_middleware]
+        assert plan.wrap_model_call == ()
+        assert not hook_middleware.implements("before_model")
+        assert hook_middleware.implements("after_tool")
+
+    def test_plan_follows_middleware_list_changes(self, agent_state):
+        """Middleware inserted into the list after first use are picked up."""
+        order: list[str] = []
+
+        def make_hook(name: str):
+            def hook(hook_input: AfterToolHookInput) -> HookResult:
+                order.append(name)
+                return HookResult.no_changes()
+
+            return hook
+
+        manager = MiddlewareManager([FunctionMiddleware(after_tool_hook=make_hook("configured"))])
+        hook_input = AfterToolHookInput(agent_state=agent_state, tool_name="demo", tool_call_id="call_1", tool_input={}, tool_output="x")
+        manager.run_after_tool(hook_input, "x")
+        plan = manager.plan
+
+        manager.middlewares.insert(0, FunctionMiddleware(after_tool_hook=make_hook("inserted")))
+        manager.run_after_tool(hook_input, "x")
+
+        assert manager.plan is not plan
+        assert order == ["configured", "configured", "inserted"]
+
+    def test_wrapper_can_call_next_repeatedly(self, agent_state):
+        """Retrying wrappers re-run the inner layers each time."""
+        calls: list[str] = []
+
+        class Retry(Middleware):
+            def wrap_tool_call(self, params, call_next):  # type: ignore[override]
+                try:
+                    return call_next(params)
+                except RuntimeError:
+                    calls.append("retry")
+                    return call_next(params)
+
+        class Inner(Middleware):
+            def wrap_tool_call(self, params, call_next):  # type: ignore[override]
+                calls.append("inner")
+                return call_next(params)
+
+        attempts = iter([RuntimeError("flaky"), {"result": "ok"}])
+
+        def base_call(_: ToolCallParams):
+            outcome = next(attempts)
+            if isinstance(outcome, Exception):
+                raise outcome
+            return outcome
+
+        manager = MiddlewareManager([Retry(), Inner()])
+
+        assert manager.wrap_tool_call(self._tool_params(agent_state), base_call) == {"result": "ok"}
+        assert calls == ["inner", "retry", "inner"]
+
+    def test_wrapper_chain_is_reused_across_calls(self, agent_state):
+        """Sequential calls share one prebuilt chain; a nested call gets its own."""
+        seen: list[Any] = []
+
+        class Recording(Middleware):
+            def wrap_tool_call(self, params, call_next):  # type: ignore[override]
+                seen.append(call_next)
+                return call_next(params)
+
+        manager = MiddlewareManager([Recording(), Recording()])
+        params = self._tool_params(agent_state)
+
+        def nested_call(_: ToolCallParams):
+            return manager.wrap_tool_call(params, lambda _: {"result": "inner"})
+
+        assert manager.wrap_tool_call(params, lambda _: {"result": "first"}) == {"result": "first"}
+        assert manager.wrap_tool_call(params, nested_call) == {"result": "inner"}
+
+        first, second, outer, outer_inner, nested, nested_inner = seen
+        assert (outer, outer_inner) == (first, second)
+        assert nested is not outer and nested_inner is not outer_inner
+        with pytest.raises(RuntimeError, match="after its wrapped call returned"):
+            second(params)
+
+    def test_async_wrapper_chain_is_reused_across_calls(self, agent_state):
+        """Async wrapped calls reuse their chain, including bridged sync wrappers."""
+        seen: list[Any] = []
+
+        class AsyncRecording(Middleware):
+            async def awrap_tool_call(self, params, call_next):  # type: ignore[override]
+                seen.append(call_next)
+                return await call_next(params)
+
+        class SyncRecording(Middleware):
+            def wrap_tool_call(self, params, call_next):  # type: ignore[override]
+                return call_next(params)
+
+        manager = MiddlewareManager([AsyncRecording(), SyncRecording()])
+        params = self._tool_params(agent_state)
+
+        async def base_call(_: ToolCallParams):
+            return {"result": "ok"}
+
+        async def run_twice():
+            return [await manager.awrap_tool_call(params, base_call) for _ in range(2)]
+
+        assert asyncio.run(run_twice()) == [{"result": "ok"}, {"result": "ok"}]
+        assert seen[0] is seen[1]
+
+    def test_stats_count_calls_and_self_time(self, agent_state):
+        """Counters are kept per middleware and phase; wrappers exclude inner time."""
+
+        class Outer(Middleware):
+            name = "outer"
+
+            def wrap_tool_call(self, params, call_next):  # type: ignore[override]
+                return call_next(params)
+
+        def failing_hook(hook_input: AfterToolHookInput) -> HookResult:
+            raise ValueError("broken")
+
+        manager = MiddlewareManager([Outer(), FunctionMiddleware(after_tool_hook=failing_hook, name="failing")])
+
+        def slow_call(_: ToolCallParams) -> dict[str, str]:
+            time.sleep(0.02)
+            return {"result": "ok"}
+
+        for _ in range(2):
+            manager.wrap_tool_call(self._tool_params(agent_state), slow_call)
+        hook_input = AfterToolHookInput(agent_state=agent_state, tool_name="demo", tool_call_id="call_1", tool_input={}, tool_output="x")
+        assert manager.run_after_tool(hook_input, "x") == "x"
+
+        stats = {(row["name"], row["phase"]): row for row in manager.stats()}
+        assert stats[("outer", "wrap_tool_call")]["calls"] == 2
+        assert stats[("outer", "wrap_tool_call")]["total_time"] < 0.02
+        assert stats[("failing", "after_tool")]["errors"] == 1
+
+        manager.reset_stats()
+        assert manager.stats() == []
+
+
 class TestHookProtocols:
     """Tests for hook protocol compliance."""
 
@@ -26,12 +26,15 @@ Tests cover:
 - Error scenarios
 """
 
+import asyncio
 import logging
 from types import SimpleNamespace
-from unittest.mock import Mock, call, patch
+from unittest.mock import AsyncMock, Mock, patch
 
 import pytest
 
+from nexau.archs.llm.retry_policy import CircuitBreaker, EndpointGuard, TokenBucket
+from nexau.archs.main_sub.execution.concurrency import AdaptiveConcurrencyLimiter
 from nexau.archs.main_sub.execution.hooks import MiddlewareManager
 from nexau.archs.main_sub.execution.llm_caller import LLMCaller
 from nexau.archs.main_sub.execution.model_response import ModelResponse
@@ -41,7 +44,10 @@ from nexau.archs.main_sub.execution.stop_reason import AgentStopReason
 @pytest.fixture(autouse=True)
 def mock_openai_module():
     """Mock the openai module to prevent any real API calls."""
-    with patch("nexau.archs.main_sub.execution.llm_caller.openai") as mock_openai:
+    with (
+        patch("nexau.archs.main_sub.execution.llm_caller.openai") as mock_openai,
+        patch("nexau.archs.llm.client_registry.openai", new=mock_openai),
+    ):
         # Ensure OpenAI client cannot be instantiated
         mock_openai.OpenAI.side_effect = RuntimeError("Real OpenAI client cannot be instantiated in tests")
         yield mock_openai
@@ -726,11 +732,11 @@ class TestLLMCallerRetryLogic:
         with patch("time.sleep") as mock_sleep:
             caller.call_llm(messages, max_tokens=100, force_stop_reason=AgentStopReason.SUCCESS, agent_state=agent_state)
 
-        # Check that sleep was called with exponential backoff
-        sleep_calls = mock_sleep.call_args_list
+        # Check that sleep was called with full-jitter exponential backoff
+        sleep_calls = [args.args[0] for args in mock_sleep.call_args_list]
         assert len(sleep_calls) == 2  # Two failures before success
-        assert sleep_calls[0] == call(1)  # First backoff: 1 second
-        assert sleep_calls[1] == call(2)  # Second backoff: 2 seconds
+        assert 0 <= sleep_calls[0] <= 1  # First backoff: up to 1 second
+        assert 0 <= sleep_calls[1] <= 2  # Second backoff: up to 2 seconds
 
     def test_call_llm_empty_response_triggers_retry(self, mock_openai_client, mock_llm_config, agent_state):
         """Test that empty response content triggers retry."""
@@ -755,6 +761,60 @@ class TestLLMCallerRetryLogic:
         assert response.content == "Valid response"
         assert mock_openai_client.chat.completions.create.call_count == 2
 
+    def test_call_llm_does_not_retry_client_errors(self, mock_openai_client, mock_llm_config, agent_state):
+        """Non-retryable 4xx errors fail on the first attempt."""
+        error = Exception("Bad request")
+        error.status_code = 400
+        mock_openai_client.chat.completions.create.side_effect = error
+
+        caller = LLMCaller(openai_client=mock_openai_client, llm_config=mock_llm_config, retry_attempts=3)
+
+        with patch("time.sleep") as mock_sleep:
+            with pytest.raises(Exception, match="Bad request"):
+                caller.call_llm([{"role": "user", "content": "Hello"}], force_stop_reason=AgentStopReason.SUCCESS, agent_state=agent_state)
+
+        assert mock_openai_client.chat.completions.create.call_count == 1
+        mock_sleep.assert_not_called()
+
+    def test_call_llm_honors_retry_after(self, mock_openai_client, mock_llm_config, agent_state):
+        """A 429 waits at least the server-requested time and pauses the endpoint."""
+        error = Exception("Rate limited")
+        error.status_code = 429
+        error.response = SimpleNamespace(status_code=429, headers={"retry-after": "7"})
+        mock_openai_client.chat.completions.create.side_effect = [
+            error,
+            Mock(choices=[Mock(message=Mock(content="Success", tool_calls=[]))]),
+        ]
+
+        caller = LLMCaller(openai_client=mock_openai_client, llm_config=mock_llm_config, retry_attempts=3)
+
+        with patch("time.sleep") as mock_sleep:
+            caller.call_llm([{"role": "user", "content": "Hello"}], force_stop_reason=AgentStopReason.SUCCESS, agent_state=agent_state)
+
+        delays = [args.args[0] for args in mock_sleep.call_args_list]
+        # Backoff after the 429, then the shared endpoint pause before the retry
+        assert 7 <= delays[0] <= 8
+        assert 0 < delays[1] <= 7
+
+    def test_call_llm_reports_to_concurrency_limiter(self, mock_openai_client, mock_llm_config, agent_state):
+        """Calls made inside a concurrency slot report rate limits and latency to its limiter."""
+        error = Exception("Rate limited")
+        error.status_code = 429
+        mock_openai_client.chat.completions.create.side_effect = [
+            error,
+            Mock(choices=[Mock(message=Mock(content="Success", tool_calls=[]))]),
+        ]
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=4)
+        caller = LLMCaller(openai_client=mock_openai_client, llm_config=mock_llm_config, retry_attempts=3)
+
+        with patch("time.sleep"), limiter.slot():
+            caller.call_llm([{"role": "user", "content": "Hello"}], force_stop_reason=AgentStopReason.SUCCESS, agent_state=agent_state)
+
+        stats = limiter.stats()
+        assert stats["rate_limited"] == 1
+        assert stats["limit"] == 2
+        assert stats["samples"] == 1
+
 
 class TestLLMCallerForceStopReason:
     """Test cases for force stop reason handling."""
@@ -1007,3 +1067,132 @@ class TestLLMCallerIntegration:
         assert call_args[1]["max_tokens"] == 200
         assert "custom_stop" in call_args[1]["stop"]
         assert "</tool_use>" in call_args[1]["stop"]
+
+
+class TestLLMCallerAsync:
+    """Test cases for the asyncio model call path."""
+
+    @staticmethod
+    def _async_client(*responses):
+        client = Mock()
+        client.chat.completions.create = AsyncMock(side_effect=list(responses))
+        return client
+
+    def test_acall_llm_success(self, mock_openai_client, mock_llm_config, agent_state):
+        """acall_llm awaits the async client and returns a ModelResponse."""
+        async_client = self._async_client(
+            Mock(choices=[Mock(message=Mock(content="Async hello", tool_calls=[]))]),
+        )
+        caller = LLMCaller(
+            openai_client=mock_openai_client,
+            llm_config=mock_llm_config,
+            async_client=async_client,
+        )
+
+        messages = [{"role": "user", "content": "Hello"}]
+        response = asyncio.run(
+            caller.acall_llm(messages, max_tokens=100, force_stop_reason=AgentStopReason.SUCCESS, agent_state=agent_state),
+        )
+
+        assert isinstance(response, ModelResponse)
+        assert response.content == "Async hello"
+        async_client.chat.completions.create.assert_awaited_once()
+        mock_openai_client.chat.completions.create.assert_not_called()
+
+    def test_acall_llm_retries_with_async_sleep(self, mock_openai_client, mock_llm_config, agent_state):
+        """Retries back off with asyncio.sleep instead of blocking the loop."""
+        async_client = self._async_client(
+            Exception("API Error 1"),
+            Exception("API Error 2"),
+            Mock(choices=[Mock(message=Mock(content="Success after retry", tool_calls=[]))]),
+        )
+        caller = LLMCaller(
+            openai_client=mock_openai_client,
+            llm_config=mock_llm_config,
+            retry_attempts=3,
+            async_client=async_client,
+        )
+
+        messages = [{"role": "user", "content": "Hello"}]
+        with patch("asyncio.sleep", new=AsyncMock()) as mock_sleep, patch("time.sleep") as mock_time_sleep:
+            response = asyncio.run(
+                caller.acall_llm(messages, max_tokens=100, force_stop_reason=AgentStopReason.SUCCESS, agent_state=agent_state),
+            )
+
+        assert response.content == "Success after retry"
+        assert async_client.chat.completions.create.await_count == 3
+        delays = [args.args[0] for args in mock_sleep.await_args_list]
+        assert len(delays) == 2
+        assert 0 <= delays[0] <= 1
+        assert 0 <= delays[1] <= 2
+        mock_time_sleep.assert_not_called()
+
+    def test_acall_llm_uses_client_of_each_event_loop(self, mock_openai_client, mock_llm_config, agent_state):
+        """Without an injected client, every asyncio.run gets the pooled client of its own loop."""
+        clients = []
+
+        def client_for_loop(llm_config):
+            client = self._async_client(Mock(choices=[Mock(message=Mock(content="Hi", tool_calls=[]))]))
+            clients.append((asyncio.get_running_loop(), client))
+            return client
+
+        caller = LLMCaller(openai_client=mock_openai_client, llm_config=mock_llm_config)
+        messages = [{"role": "user", "content": "Hello"}]
+
+        with patch("nexau.archs.main_sub.execution.llm_caller.create_async_llm_client", side_effect=client_for_loop):
+            for _ in range(2):
+                response = asyncio.run(caller.acall_llm(messages, agent_state=agent_state))
+                assert response.content == "Hi"
+
+        loops = {id(loop) for loop, _ in clients}
+        assert len(loops) == 2
+        assert caller.async_client is None
+
+    def test_acall_llm_cancelled_probe_reopens_circuit(self, mock_openai_client, mock_llm_config, agent_state):
+        """A half-open probe cancelled mid-call cannot leave the circuit half-open."""
+        async_client = self._async_client(asyncio.CancelledError())
+        caller = LLMCaller(openai_client=mock_openai_client, llm_config=mock_llm_config, async_client=async_client)
+        guard = EndpointGuard("endpoint", CircuitBreaker("endpoint", failure_threshold=1, recovery_timeout=0.0), TokenBucket())
+        guard.breaker.record_failure()
+
+        with patch("nexau.archs.main_sub.execution.llm_caller.endpoint_guards.get", return_value=guard):
+            with pytest.raises(asyncio.CancelledError):
+                asyncio.run(caller.acall_llm([{"role": "user", "content": "Hello"}], agent_state=agent_state))
+
+        assert guard.breaker.state == CircuitBreaker.OPEN
+        # The next call after the recovery timeout is let through as a new probe
+        assert guard.start_call()[1]
+
+    def test_acall_llm_force_stop_skips_call(self, mock_openai_client, mock_llm_config, agent_state):
+        """A forced stop returns None without touching the client."""
+        async_client = self._async_client()
+        caller = LLMCaller(
+            openai_client=mock_openai_client,
+            llm_config=mock_llm_config,
+            async_client=async_client,
+        )
+
+        response = asyncio.run(
+            caller.acall_llm(
+                [{"role": "user", "content": "Hello"}],
+                force_stop_reason=AgentStopReason.MAX_ITERATIONS_REACHED,
+                agent_state=agent_state,
+            ),
+        )
+
+        assert response is None
+        async_client.chat.completions.create.assert_not_called()
+
+    def test_async_client_created_lazily_from_config(self, mock_openai_module, mock_openai_client, mock_llm_config):
+        """The async client is built from the LLM config on first use and reused on the same loop."""
+        mock_openai_module.AsyncOpenAI.return_value.max_retries = mock_llm_config.max_retries
+        caller = LLMCaller(openai_client=mock_openai_client, llm_config=mock_llm_config)
+
+        async def get_clients():
+            return caller._get_async_client(), caller._get_async_client()
+
+        first, second = asyncio.run(get_clients())
+
+        assert first is mock_openai_module.AsyncOpenAI.return_value
+        assert second is first
+        mock_openai_module.AsyncOpenAI.assert_called_once()
@@ -14,10 +14,17 @@
 
 """Unit tests for stream aggregation helpers."""
 
+from unittest.mock import patch
+
+from openai.types.chat import ChatCompletionChunk
+from openai.types.responses import ResponseStreamEvent
+from pydantic import TypeAdapter
+
 from nexau.archs.main_sub.execution.llm_caller import (
     AnthropicStreamAggregator,
     OpenAIChatStreamAggregator,
     OpenAIResponsesStreamAggregator,
+    _to_serializable_dict,
 )
 
 
@@ -190,3 +197,193 @@ def test_openai_responses_stream_aggregator_reconstructs_items():
     assert response_payload["output"][1]["arguments"] == '{"value": 42}'
     assert response_payload["output"][2]["type"] == "reasoning"
     assert response_payload["output"][2]["id"] == "rs_reason_1"
+
+
+class _RecordingListener:
+    def __init__(self) -> None:
+        self.text: list[str] = []
+        self.tool_calls: list = []
+
+    def begin_attempt(self) -> None:
+        pass
+
+    def on_text_delta(self, delta: str) -> None:
+        self.text.append(delta)
+
+    def on_tool_call(self, tool_call) -> None:
+        self.tool_calls.append(tool_call)
+
+
+def test_openai_chat_stream_aggregator_reports_completed_tool_calls():
+    listener = _RecordingListener()
+    aggregator = OpenAIChatStreamAggregator(listener=listener)
+
+    def tool_chunk(index, **function):
+        call = {"index": index, "function": function}
+        if "name" in function:
+            call.update({"id": f"call_{index}", "type": "function"})
+        return {"choices": [{"delta": {"tool_calls": [call]}}]}
+
+    aggregator.consume(tool_chunk(0, name="lookup", arguments='{"q": '))
+    aggregator.consume(tool_chunk(0, arguments='"a"}'))
+    assert listener.tool_calls == []
+
+    aggregator.consume(tool_chunk(1, name="lookup", arguments='{"q": "b"}'))
+    assert [call.arguments for call in listener.tool_calls] == [{"q": "a"}]
+
+    aggregator.consume({"choices": [{"delta": {}, "finish_reason": "tool_calls"}]})
+    aggregator.finalize()
+    assert [call.call_id for call in listener.tool_calls] == ["call_0", "call_1"]
+
+
+def test_anthropic_stream_aggregator_reports_tool_use_on_block_stop():
+    listener = _RecordingListener()
+    aggregator = AnthropicStreamAggregator(listener=listener)
+
+    aggregator.consume({"type": "message_start", "message": {"role": "assistant"}})
+    aggregator.consume({"type": "content_block_start", "index": 0, "content_block": {"type": "text", "text": ""}})
+    aggregator.consume({"type": "content_block_delta", "index": 0, "delta": {"type": "text_delta", "text": "Hi"}})
+    aggregator.consume({"type": "content_block_stop", "index": 0})
+    aggregator.consume(
+        {"type": "content_block_start", "index": 1, "content_block": {"type": "tool_use", "id": "toolu_1", "name": "lookup"}},
+    )
+    aggregator.consume(
+        {"type": "content_block_delta", "index": 1, "delta": {"type": "input_json_delta", "partial_json": '{"q": "a"}'}},
+    )
+    assert listener.tool_calls == []
+
+    aggregator.consume({"type": "content_block_stop", "index": 1})
+
+    assert listener.text == ["Hi"]
+    assert listener.tool_calls[0].call_id == "toolu_1"
+    assert listener.tool_calls[0].arguments == {"q": "a"}
+
+
+def test_openai_responses_stream_aggregator_reports_arguments_done():
+    listener = _RecordingListener()
+    aggregator = OpenAIResponsesStreamAggregator(listener=listener)
+
+    aggregator.consume(
+        {
+            "type": "response.output_item.added",
+            "item": {"type": "function_call", "id": "fc_1", "call_id": "call_1", "name": "lookup", "arguments": ""},
+        },
+    )
+    aggregator.consume({"type": "response.function_call_arguments.delta", "item_id": "fc_1", "delta": '{"q": "a"}'})
+    assert listener.tool_calls == []
+
+    aggregator.consume({"type": "response.function_call_arguments.done", "item_id": "fc_1", "arguments": '{"q": "a"}'})
+    aggregator.consume(
+        {
+            "type": "response.output_item.done",
+            "item": {"type": "function_call", "id": "fc_1", "call_id": "call_1", "name": "lookup", "arguments": '{"q": "a"}'},
+        },
+    )
+
+    assert len(listener.tool_calls) == 1
+    assert listener.tool_calls[0].call_id == "call_1"
+    assert listener.tool_calls[0].arguments == {"q": "a"}
+
+
+def _sdk_chunk(delta: dict, finish_reason: str | None = None, usage: dict | None = None) -> ChatCompletionChunk:
+    return ChatCompletionChunk.model_validate(
+        {
+            "id": "chatcmpl-1",
+            "object": "chat.completion.chunk",
+            "created": 0,
+            "model": "gpt-4o-mini",
+            "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+            "usage": usage,
+        },
+    )
+
+
+def test_openai_chat_stream_aggregator_reads_sdk_chunks_like_dicts():
+    chunks = [
+        _sdk_chunk({"role": "assistant", "content": "Hel", "reasoning_content": "think"}),
+        _sdk_chunk(
+            {
+                "content": "lo",
+                "tool_calls": [{"index": 0, "id": "call_1", "type": "function", "function": {"name": "lookup", "arguments": '{"q": '}}],
+            }
+        ),
+        _sdk_chunk({"tool_calls": [{"index": 0, "function": {"arguments": '"a"}'}}]}),
+        _sdk_chunk({}, finish_reason="tool_calls", usage={"prompt_tokens": 3, "completion_tokens": 4, "total_tokens": 7}),
+    ]
+    typed = OpenAIChatStreamAggregator()
+    dumped = OpenAIChatStreamAggregator()
+
+    with patch("nexau.archs.main_sub.execution.llm_caller._to_serializable_dict", wraps=_to_serializable_dict) as convert:
+        for chunk in chunks:
+            typed.consume(chunk)
+    # Only the usage payload is converted
+    assert convert.call_count == 1
+
+    for chunk in chunks:
+        dumped.consume(chunk.model_dump())
+
+    message = typed.finalize()
+    assert message == dumped.finalize()
+    assert message["content"] == "Hello"
+    assert message["reasoning_content"] == "think"
+    assert message["tool_calls"][0]["function"]["arguments"] == '{"q": "a"}'
+
+
+def test_anthropic_stream_aggregator_concatenates_thinking_deltas():
+    aggregator = AnthropicStreamAggregator()
+
+    aggregator.consume({"type": "content_block_start", "index": 0, "content_block": {"type": "thinking", "thinking": ""}})
+    aggregator.consume({"type": "content_block_delta", "index": 0, "delta": {"type": "thinking_delta", "thinking": "Let me "}})
+    aggregator.consume({"type": "content_block_delta", "index": 0, "delta": {"type": "thinking_delta", "thinking": "check."}})
+    aggregator.consume({"type": "content_block_delta", "index": 0, "delta": {"type": "signature_delta", "signature": "sig"}})
+    aggregator.consume({"type": "content_block_stop", "index": 0})
+
+    block = aggregator.finalize()["content"][0]
+
+    assert block == {"type": "thinking", "thinking": "Let me check.", "signature": "sig"}
+
+
+def test_openai_responses_stream_aggregator_reads_sdk_delta_events():
+    adapter = TypeAdapter(ResponseStreamEvent)
+    events = [
+        {
+            "type": "response.output_item.added",
+            "output_index": 0,
+            "item": {"type": "message", "id": "msg_1", "role": "assistant", "status": "in_progress", "content": []},
+        },
+        {
+            "type": "response.output_text.delta",
+            "item_id": "msg_1",
+            "output_index": 0,
+            "content_index": 0,
+            "delta": "Answer",
+            "logprobs": [],
+        },
+        {"type": "response.output_text.delta", "item_id": "msg_1", "output_index": 0, "content_index": 0, "delta": ": 42", "logprobs": []},
+        {
+            "type": "response.output_item.added",
+            "output_index": 1,
+            "item": {
+                "type": "function_call",
+                "id": "fc_1",
+                "call_id": "call_1",
+                "name": "compute",
+                "arguments": "",
+                "status": "in_progress",
+            },
+        },
+        {"type": "response.function_call_arguments.delta", "item_id": "fc_1", "output_index": 1, "delta": '{"v": '},
+        {"type": "response.function_call_arguments.delta", "item_id": "fc_1", "output_index": 1, "delta": "42}"},
+    ]
+    typed = OpenAIResponsesStreamAggregator()
+    dumped = OpenAIResponsesStreamAggregator()
+
+    for sequence_number, event in enumerate(events):
+        sdk_event = adapter.validate_python({**event, "sequence_number": sequence_number})
+        typed.consume(sdk_event)
+        dumped.consume(sdk_event.model_dump())
+
+    payload = typed.finalize()
+    assert payload == dumped.finalize()
+    assert payload["output"][0]["content"] == [{"type": "output_text", "text": "Answer: 42"}]
+    assert payload["output"][1]["arguments"] == '{"v": 42}'
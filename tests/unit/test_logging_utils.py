@@ -0,0 +1,131 @@
+# Copyright (c) Nex-AGI. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Unit tests for the hot-path logging helpers."""
+
+import json
+import logging
+from unittest.mock import Mock
+
+import pytest
+
+from nexau.archs.main_sub.execution.executor import Executor
+from nexau.archs.main_sub.execution.model_response import ModelResponse
+from nexau.archs.main_sub.utils import logging_utils
+from nexau.archs.main_sub.utils.logging_utils import (
+    SUBSYSTEM_LOGGERS,
+    StructuredFormatter,
+    capped,
+    configure_logging,
+    configure_logging_from_env,
+    lazy,
+    log_fields,
+    truncate_for_log,
+)
+
+
+@pytest.fixture(autouse=True)
+def restore_logging_settings():
+    original_cap = logging_utils.get_max_value_chars()
+    levels = {name: logging.getLogger(name).level for name in SUBSYSTEM_LOGGERS.values()}
+    yield
+    configure_logging(max_value_chars=original_cap)
+    for name, level in levels.items():
+        logging.getLogger(name).setLevel(level)
+
+
+def _record(message: str, *args, **extra) -> logging.LogRecord:
+    record = logging.LogRecord("test", logging.INFO, __file__, 1, message, args, None)
+    record.__dict__.update(extra)
+    return record
+
+
+class TestLazyValues:
+    """Test deferred, size-capped log arguments."""
+
+    def test_truncate_reports_dropped_length(self):
+        """Long values are cut to the cap with a note on what was dropped."""
+        assert truncate_for_log("abcdef", 3) == "abc... [3 more chars]"
+        assert truncate_for_log({"a": 1}, 0) == "{'a': 1}"
+
+    def test_lazy_value_is_not_computed_when_level_is_disabled(self):
+        """Disabled log calls never run the producer."""
+        producer = Mock(return_value="expensive")
+        test_logger = logging.getLogger("nexau.tests.lazy")
+        test_logger.setLevel(logging.WARNING)
+
+        test_logger.info("value: %s", lazy(producer))
+
+        producer.assert_not_called()
+
+    def test_capped_uses_configured_limit(self):
+        """The global cap applies when no explicit limit is given."""
+        configure_logging(max_value_chars=4)
+
+        assert str(capped("x" * 10)) == "xxxx... [6 more chars]"
+        assert str(capped("x" * 10, limit=20)) == "x" * 10
+
+
+class TestStructuredFormatter:
+    """Test rendering of structured fields."""
+
+    def test_key_value_fields_are_appended(self):
+        """Fields follow the message as truncated key=value pairs."""
+        configure_logging(max_value_chars=5)
+        record = _record("tool %s", "demo", **log_fields(tool="demo", output="0123456789"))
+
+        assert StructuredFormatter("%(message)s").format(record) == "tool demo | tool=demo output=01234... [5 more chars]"
+
+    def test_json_lines(self):
+        """json_lines renders the whole record as one JSON object."""
+        record = _record("hello %s", capped("world"), **log_fields(agent="a1"))
+
+        payload = json.loads(StructuredFormatter(json_lines=True).format(record))
+
+        assert payload["message"] == "hello world"
+        assert payload["agent"] == "a1"
+        assert payload["level"] == "INFO"
+
+
+class TestConfiguration:
+    """Test per-subsystem levels and environment settings."""
+
+    def test_levels_by_subsystem(self):
+        """Subsystem names map onto their module loggers."""
+        configure_logging(levels={"tools": "warning", "executor": logging.DEBUG})
+
+        assert logging.getLogger(SUBSYSTEM_LOGGERS["tools"]).level == logging.WARNING
+        assert logging.getLogger(SUBSYSTEM_LOGGERS["executor"]).level == logging.DEBUG
+        with pytest.raises(ValueError):
+            configure_logging(levels={"tools": "chatty"})
+
+    def test_from_env(self):
+        """NEXAU_LOG_LEVELS and NEXAU_LOG_MAX_CHARS are applied."""
+        configure_logging_from_env({"NEXAU_LOG_LEVELS": "llm=ERROR, sub_agents=DEBUG", "NEXAU_LOG_MAX_CHARS": "123"})
+
+        assert logging.getLogger(SUBSYSTEM_LOGGERS["llm"]).level == logging.ERROR
+        assert logging.getLogger(SUBSYSTEM_LOGGERS["sub_agents"]).level == logging.DEBUG
+        assert logging_utils.get_max_value_chars() == 123
+
+    def test_executor_skips_rendering_when_disabled(self):
+        """The executor does not render responses unless its INFO logs are emitted."""
+        configure_logging(levels={"executor": "WARNING"})
+        executor = Mock(agent_name="agent", max_iterations=3)
+        executor.response_parser.parse_response.return_value = None
+        response = Mock(spec=ModelResponse, content="hi")
+        response.to_message_dict.return_value = {"role": "assistant", "content": "hi"}
+
+        Executor._record_model_response(executor, response, Mock(), 0, [])
+
+        response.render_text.assert_not_called()
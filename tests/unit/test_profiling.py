@@ -0,0 +1,173 @@
+# Copyright (c) Nex-AGI. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Unit tests for the phase profiler and ProfilingMiddleware."""
+
+import asyncio
+import time
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from nexau.archs.main_sub.execution.executor import Executor
+from nexau.archs.main_sub.execution.llm_caller import OpenAIChatStreamAggregator, _TimedStreamAggregator
+from nexau.archs.main_sub.execution.model_response import ModelResponse, ModelToolCall
+from nexau.archs.main_sub.execution.profiling import ProfilingMiddleware, profile_mark_once, profile_phase
+from nexau.archs.tool.tool import Tool
+
+LLM_CALLER = "nexau.archs.main_sub.execution.llm_caller"
+
+
+def _build_executor(mock_llm_config, profiler: ProfilingMiddleware) -> Executor:
+    def simple_tool(x: int) -> dict:
+        return {"result": x + 1}
+
+    schema = {"type": "object", "properties": {"x": {"type": "integer"}}, "required": ["x"]}
+    tool = Tool(name="simple_tool", description="A simple tool", input_schema=schema, implementation=simple_tool)
+    return Executor(
+        agent_name="test_agent",
+        agent_id="test_id",
+        tool_registry={"simple_tool": tool},
+        sub_agent_factories={},
+        stop_tools=set(),
+        openai_client=object(),
+        llm_config=mock_llm_config,
+        max_iterations=3,
+        retry_attempts=1,
+        middlewares=[profiler],
+        tool_call_mode="openai",
+        openai_tools=[{"type": "function", "function": {"name": "simple_tool", "description": "A simple tool", "parameters": schema}}],
+    )
+
+
+def _responses() -> list[ModelResponse]:
+    tool_call = ModelToolCall(call_id="call_1", name="simple_tool", arguments={"x": 1}, raw_arguments='{"x": 1}')
+    return [ModelResponse(content="", tool_calls=[tool_call]), ModelResponse(content="done")]
+
+
+HISTORY = [{"role": "system", "content": "You are a helpful assistant."}, {"role": "user", "content": "Use the tool"}]
+
+
+class TestProfilePhase:
+    """Phase recording primitives."""
+
+    def test_noop_outside_profiled_run(self):
+        assert profile_phase("a") is profile_phase("b", "tool", "x")
+        with profile_phase("a"):
+            profile_mark_once("first_byte")
+
+    def test_mark_once_per_phase(self):
+        profiler = ProfilingMiddleware()
+        with profiler.profile_run("agent") as run:
+            for _ in range(2):
+                with profile_phase("network", "model", "m"):
+                    profiler.stream_chunk({"delta": "a"}, None)  # type: ignore[arg-type]
+                    profiler.stream_chunk({"delta": "b"}, None)  # type: ignore[arg-type]
+
+        assert run.stacks[("agent", "network")][0] == 2
+        assert run.stacks[("agent", "network", "first_byte")][0] == 2
+        summary = profiler.summary()
+        assert summary["model"]["m"]["count"] == 2
+        assert summary["agent"]["agent"]["count"] == 1
+        assert summary["phase"]["first_byte"]["count"] == 2
+
+    def test_stream_chunk_processing_counts_as_aggregation(self):
+        """Per-chunk consume() time is reported under stream_aggregation, not as network self time."""
+        profiler = ProfilingMiddleware()
+        aggregator = OpenAIChatStreamAggregator()
+        consume = aggregator._consume
+
+        def slow_consume(chunk):
+            time.sleep(0.01)
+            consume(chunk)
+
+        aggregator._consume = slow_consume  # type: ignore[method-assign]
+        with profiler.profile_run("agent") as run:
+            with profile_phase("network", "model", "m"):
+                for text in "abc":
+                    aggregator.consume({"choices": [{"index": 0, "delta": {"content": text}}]})
+                message = aggregator.finalize()
+
+        assert message["content"] == "abc"
+        calls, aggregation = run.stacks[("agent", "network", "stream_aggregation")]
+        assert calls == 1
+        assert aggregation >= 0.03
+        network_self_us = dict(line.rsplit(" ", 1) for line in run.folded())["agent;network"]
+        assert int(network_self_us) <= (run.stacks[("agent", "network")][1] - 0.03) * 1_000_000 + 1
+
+    def test_aggregator_without_consume_cannot_be_created(self):
+        """A timed aggregator must implement _consume."""
+
+        class Incomplete(_TimedStreamAggregator):
+            pass
+
+        with pytest.raises(TypeError):
+            Incomplete()  # type: ignore[abstract]
+
+
+class TestProfilingMiddleware:
+    """Executor and LLM caller instrumentation."""
+
+    def test_execute_records_iteration_phases(self, mock_llm_config, agent_state, tmp_path):
+        profiler = ProfilingMiddleware(report_dir=tmp_path)
+        executor = _build_executor(mock_llm_config, profiler)
+
+        with patch(f"{LLM_CALLER}.call_llm_with_different_client", side_effect=_responses()):
+            response, _ = executor.execute(list(HISTORY), agent_state)
+
+        assert response == "done"
+        run = profiler.last_run
+        assert run is not None and run.duration is not None
+        for stack in (
+            ("test_agent", "token_count"),
+            ("test_agent", "model_call", "network"),
+            ("test_agent", "parse_response"),
+            ("test_agent", "after_model_hooks"),
+            ("test_agent", "execute_calls", "tool:simple_tool"),
+            ("test_agent", "format_results"),
+        ):
+            assert stack in run.stacks, stack
+        assert run.stacks[("test_agent", "model_call", "network")][0] == 2
+
+        summary = profiler.summary()
+        assert summary["model"]["gpt-4o-mini"]["count"] == 2
+        assert summary["tool"]["simple_tool"]["count"] == 1
+        assert summary["agent"]["test_agent"]["p50_ms"] is not None
+
+        folded = (tmp_path / f"test_agent-{run.run_id}.folded").read_text().splitlines()
+        assert "test_agent;execute_calls;tool:simple_tool" in {line.rsplit(" ", 1)[0] for line in folded}
+        assert all(int(line.rsplit(" ", 1)[1]) >= 0 for line in folded)
+        assert "tool:simple_tool" in run.report()
+
+    def test_aexecute_records_tool_and_model_phases(self, mock_llm_config, agent_state):
+        profiler = ProfilingMiddleware(keep_runs=1)
+        executor = _build_executor(mock_llm_config, profiler)
+        executor.llm_caller.async_client = object()
+
+        with patch(f"{LLM_CALLER}.acall_llm_with_different_client", AsyncMock(side_effect=[*_responses(), ModelResponse(content="again")])):
+            asyncio.run(executor.aexecute(list(HISTORY), agent_state))
+            asyncio.run(executor.aexecute(list(HISTORY[:1]), agent_state))
+
+        assert len(profiler.runs) == 1
+        assert profiler.summary()["tool"]["simple_tool"]["count"] == 1
+        assert profiler.summary()["agent"]["test_agent"]["count"] == 2
+
+    def test_executor_without_profiler_is_unchanged(self, mock_llm_config, agent_state):
+        executor = _build_executor(mock_llm_config, ProfilingMiddleware())
+        executor.profiler = None
+
+        with patch(f"{LLM_CALLER}.call_llm_with_different_client", side_effect=_responses()):
+            response, _ = executor.execute(list(HISTORY), agent_state)
+
+        assert response == "done"
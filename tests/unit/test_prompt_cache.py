@@ -0,0 +1,219 @@
+# Copyright (c) Nex-AGI. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Unit tests for the system prompt and tool payload cache."""
+
+import os
+from unittest.mock import Mock, patch
+
+from nexau.archs.main_sub.agent import Agent
+from nexau.archs.main_sub.agent_context import AgentContext
+from nexau.archs.main_sub.config import AgentConfig
+from nexau.archs.main_sub.prompt_builder import PromptBuilder
+from nexau.archs.main_sub.prompt_cache import (
+    PromptCache,
+    agent_config_fingerprint,
+    prompt_cache,
+    system_prompt_fingerprint,
+    system_prompt_is_cacheable,
+    tool_payload_fingerprint,
+)
+
+
+class TestPromptCache:
+    """Test memoization and statistics."""
+
+    def test_hit_returns_same_object(self):
+        """A second lookup reuses the first rendered value."""
+        cache = PromptCache()
+        build = Mock(return_value="You are helpful.")
+
+        first = cache.get_system_prompt("fp", build)
+        second = cache.get_system_prompt("fp", build)
+
+        assert first is second
+        build.assert_called_once()
+        stats = cache.stats()
+        assert stats["system_prompt_hits"] == 1
+        assert stats["system_prompt_misses"] == 1
+        assert stats["reused_prefix_chars"] == len("You are helpful.")
+        assert stats["prefix_reuse_ratio"] == 0.5
+
+    def test_prompts_and_payloads_are_separate(self):
+        """The same fingerprint does not collide across kinds."""
+        cache = PromptCache()
+
+        prompt = cache.get_system_prompt("fp", lambda: "prompt")
+        payload = cache.get_tool_payload("fp", lambda: [{"name": "tool"}])
+
+        assert prompt == "prompt"
+        assert payload == [{"name": "tool"}]
+        assert cache.stats()["entries"] == 2
+
+    def test_least_recently_used_entries_are_dropped(self):
+        """Entries beyond max_entries are evicted oldest first."""
+        cache = PromptCache(max_entries=2)
+        cache.get_system_prompt("a", lambda: "a")
+        cache.get_system_prompt("b", lambda: "b")
+        cache.get_system_prompt("a", lambda: "a")
+        cache.get_system_prompt("c", lambda: "c")
+
+        build = Mock(return_value="b")
+        cache.get_system_prompt("b", build)
+        build.assert_called_once()
+
+    def test_clear_resets_stats(self):
+        """clear drops entries and counters."""
+        cache = PromptCache()
+        cache.get_system_prompt("fp", lambda: "prompt")
+
+        cache.clear()
+
+        assert cache.stats()["entries"] == 0
+        assert cache.stats()["system_prompt_misses"] == 0
+
+
+class TestFingerprints:
+    """Test what invalidates a cached prefix."""
+
+    def test_runtime_context_changes_system_prompt_fingerprint(self, agent_config):
+        """Different render context means a different prompt."""
+        first = system_prompt_fingerprint(agent_config, [], [], {"user": "a"}, True)
+
+        assert system_prompt_fingerprint(agent_config, [], [], {"user": "a"}, True) == first
+        assert system_prompt_fingerprint(agent_config, [], [], {"user": "b"}, True) != first
+
+    def test_agent_id_only_keys_templates_that_render_it(self, agent_config):
+        """Instances of one configuration share the prompt unless it renders their id."""
+        agent_config.system_prompt = "You are {{ agent_name }}."
+        agent_config.agent_id = "first"
+        first = system_prompt_fingerprint(agent_config, [], [], None, False)
+
+        agent_config.agent_id = "second"
+        assert system_prompt_fingerprint(agent_config, [], [], None, False) == first
+
+        agent_config.system_prompt = "You are {{ agent_name }} ({{ agent_id }})."
+        keyed = system_prompt_fingerprint(agent_config, [], [], None, False)
+        agent_config.agent_id = "first"
+        assert system_prompt_fingerprint(agent_config, [], [], None, False) != keyed
+
+    def test_tool_schema_changes_payload_fingerprint(self, sample_tool):
+        """Tool schema edits produce a new payload fingerprint."""
+        first = tool_payload_fingerprint("openai", [sample_tool], ["researcher"])
+
+        sample_tool.input_schema = {"type": "object", "properties": {}}
+
+        assert tool_payload_fingerprint("openai", [sample_tool], ["researcher"]) != first
+        assert tool_payload_fingerprint("anthropic", [sample_tool], ["researcher"]) != first
+
+    def test_prompt_file_change_changes_fingerprint(self, agent_config, temp_dir):
+        """File-based prompts are keyed by the file version."""
+        prompt_path = os.path.join(temp_dir, "prompt.j2")
+        with open(prompt_path, "w") as f:
+            f.write("Hello")
+        agent_config.system_prompt = prompt_path
+        agent_config.system_prompt_type = "jinja"
+        first = system_prompt_fingerprint(agent_config, [], [], None, False)
+
+        with open(prompt_path, "w") as f:
+            f.write("Hello again")
+
+        assert system_prompt_fingerprint(agent_config, [], [], None, False) != first
+
+    def test_time_varying_templates_are_not_cacheable(self, agent_config, temp_dir):
+        """Templates using {{ timestamp }} are cached only when the context pins it."""
+        agent_config.system_prompt = "You are {{ role }}."
+        assert system_prompt_is_cacheable(agent_config, None)
+
+        agent_config.system_prompt = "Now is {{ timestamp }}."
+        assert not system_prompt_is_cacheable(agent_config, None)
+        assert system_prompt_is_cacheable(agent_config, {"timestamp": "2024-01-01"})
+
+        prompt_path = os.path.join(temp_dir, "prompt.j2")
+        with open(prompt_path, "w") as f:
+            f.write("{% if timestamp %}Now is {{ timestamp }}.{% endif %}")
+        agent_config.system_prompt = prompt_path
+        agent_config.system_prompt_type = "jinja"
+        assert not system_prompt_is_cacheable(agent_config, {})
+
+    def test_agent_config_fingerprint_ignores_agent_id(self, agent_config):
+        """Instances of one configuration share a fingerprint; prompt or model edits change it."""
+        first = agent_config_fingerprint(agent_config)
+
+        agent_config.agent_id = "another_instance"
+        assert agent_config_fingerprint(agent_config) == first
+
+        agent_config.system_prompt = "You are a terse assistant."
+        second = agent_config_fingerprint(agent_config)
+        assert second != first
+
+        agent_config.llm_config.temperature = 0.0
+        assert agent_config_fingerprint(agent_config) != second
+
+
+class TestAgentPrefixReuse:
+    """Test that agents built from the same config share the request prefix."""
+
+    def test_agents_share_tool_payload_and_system_prompt(self, mock_llm_config, sample_tool):
+        """Two instances with their own ids render once and send byte-identical prefixes."""
+
+        def make_agent(agent_id: str) -> Agent:
+            config = AgentConfig(
+                name="cached_agent",
+                agent_id=agent_id,
+                system_prompt="You are {{ role }}.",
+                tools=[sample_tool],
+                llm_config=mock_llm_config,
+                tool_call_mode="openai",
+            )
+            return Agent(config)
+
+        with patch("nexau.archs.llm.client_registry.openai"):
+            first = make_agent("first")
+            second = make_agent("second")
+
+            with patch.object(PromptBuilder, "build_system_prompt", autospec=True, return_value="You are a tester.") as build:
+                first._prepare_run("hi", None, {"role": "a tester"}, AgentContext(), None)
+                second._prepare_run("hi", None, {"role": "a tester"}, AgentContext(), None)
+
+        assert first.tool_call_payload is second.tool_call_payload
+        assert first.history[0]["content"] is second.history[0]["content"]
+        build.assert_called_once()
+        stats = prompt_cache.stats()
+        assert stats["tool_payload_hits"] == 1
+        assert stats["system_prompt_hits"] == 1
+
+    def test_timestamp_is_rendered_on_every_run(self, mock_llm_config):
+        """A prompt using {{ timestamp }} shows the current time on each run."""
+        config = AgentConfig(
+            name="clock_agent",
+            system_prompt="Now is {{ timestamp }}.",
+            llm_config=mock_llm_config,
+        )
+        times = iter(["2024-01-01T00:00:00", "2024-01-01T00:05:00"])
+
+        with (
+            patch("nexau.archs.llm.client_registry.openai"),
+            patch("nexau.archs.main_sub.prompt_handler.PromptHandler._get_timestamp", side_effect=lambda: next(times)),
+        ):
+            agent = Agent(config)
+            agent._prepare_run("hi", None, {}, AgentContext(), None)
+            first = agent.history[0]["content"]
+            agent.history = []
+            agent._prepare_run("hi", None, {}, AgentContext(), None)
+            second = agent.history[0]["content"]
+
+        assert first == "Now is 2024-01-01T00:00:00."
+        assert second == "Now is 2024-01-01T00:05:00."
+        assert prompt_cache.stats()["system_prompt_hits"] == 0
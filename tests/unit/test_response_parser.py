@@ -36,6 +36,7 @@ from nexau.archs.main_sub.execution.parse_structures import (
     ToolCall,
 )
 from nexau.archs.main_sub.execution.response_parser import ResponseParser
+from nexau.archs.main_sub.utils.xml_utils import ToolCallStreamParser, XMLParser
 
 
 class TestResponseParser:
@@ -1225,3 +1226,95 @@ class TestResponseParserLogging:
 
         # Should log error about invalid XML
         assert any("Invalid XML format" in record.message or "XML parsing" in record.message for record in caplog.records)
+
+
+class TestToolCallStreamParser:
+    """Test the single-pass scanner for XML call blocks."""
+
+    RESPONSE = (
+        "Thinking <tool_use>ignored</tool_use>\n"
+        "<use_batch_agent><agent_name>a</agent_name></use_batch_agent>"
+        "<use_parallel_tool_calls><parallel_tool>one</parallel_tool>"
+        "<parallel_tool>two</parallel_tool></use_parallel_tool_calls>"
+        "<use_batch_agent>second</use_batch_agent>"
+    )
+
+    def test_scan_matches_first_blocks(self):
+        """Only the first batch and parallel blocks count; tool_use blocks are all kept."""
+        blocks = ToolCallStreamParser.scan(self.RESPONSE)
+
+        assert blocks.batch_agent == "<agent_name>a</agent_name>"
+        assert blocks.parallel_tools == ["one", "two"]
+        assert blocks.tool_uses == ["ignored"]
+
+    def test_chunked_feed_matches_whole_scan(self):
+        """Tags split across chunks are found the same way."""
+        parser = ToolCallStreamParser()
+        closed = []
+        for char in self.RESPONSE:
+            closed.extend(parser.feed(char))
+
+        assert parser.close() == ToolCallStreamParser.scan(self.RESPONSE)
+        assert [tag for tag, _ in closed] == ["tool_use", "use_batch_agent", "parallel_tool", "parallel_tool", "use_parallel_tool_calls"]
+
+    def test_unclosed_blocks_are_ignored(self):
+        """Truncated blocks yield nothing, as with the non-greedy patterns."""
+        blocks = ToolCallStreamParser.scan(
+            "<use_parallel_tool_calls><parallel_tool>one</parallel_tool><tool_use>a</tool_use><tool_use>cut",
+        )
+
+        assert blocks.parallel_tools is None
+        assert blocks.tool_uses == ["a"]
+
+    def test_nested_opening_tag_is_content(self):
+        """A block ends at the first closing tag after its opening tag."""
+        blocks = ToolCallStreamParser.scan("<tool_use>a<tool_use>b</tool_use>c</tool_use>")
+
+        assert blocks.tool_uses == ["a<tool_use>b"]
+
+    def test_parallel_tool_outside_parallel_block_is_ignored(self):
+        """Entries closing after the parallel block ends do not count."""
+        blocks = ToolCallStreamParser.scan(
+            "<parallel_tool>x</parallel_tool><use_parallel_tool_calls><parallel_tool>y</use_parallel_tool_calls></parallel_tool>",
+        )
+
+        assert blocks.parallel_tools == []
+
+
+class TestDirectTreeBuilding:
+    """Test that the direct tree builder agrees with the ElementTree strategies."""
+
+    def _dump(self, element):
+        return element.tag, element.text, element.tail, [self._dump(child) for child in element]
+
+    @pytest.mark.parametrize(
+        "xml_content",
+        [
+            "<tool_name>search</tool_name>\n<parameter>\n<query>a < b && c</query>\n<empty></empty>\n</parameter>",
+            "<agent_name>x</agent_name><input_data_source><file_name>d.jsonl</file_name></input_data_source>",
+            "<tool_name>t</tool_name><parameter><html><div>nested</div></html></parameter>",
+        ],
+    )
+    def test_matches_cdata_strategy(self, xml_content):
+        """Accepted content produces the same tree as CDATA preprocessing."""
+        parser = XMLParser()
+
+        direct = parser._build_tree_directly(xml_content)
+        expected = ET.fromstring(f"<root>{parser._wrap_parameter_content_in_cdata(xml_content)}</root>")
+
+        assert direct is not None
+        assert self._dump(direct) == self._dump(expected)
+
+    @pytest.mark.parametrize(
+        "xml_content",
+        [
+            "<tool_name>a &amp; b</tool_name>",
+            "<tool_name>broken<parameter>",
+            "<tool_name>t</tool_name><parameter><p><![CDATA[x]]></p></parameter>",
+            '<tool_name kind="x">t</tool_name>',
+            "<tool_name>t\r\n</tool_name>",
+        ],
+    )
+    def test_unusual_content_uses_strategies(self, xml_content):
+        """Entities, attributes, CDATA and malformed input are left to ElementTree."""
+        assert XMLParser()._build_tree_directly(xml_content) is None
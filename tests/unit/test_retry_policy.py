@@ -0,0 +1,234 @@
+# Copyright (c) Nex-AGI. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Unit tests for the LLM retry policy, circuit breaker and rate limiter."""
+
+import random
+import time
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import httpx
+import pytest
+
+from nexau.archs.llm.llm_config import LLMConfig
+from nexau.archs.llm.retry_policy import (
+    CircuitBreaker,
+    CircuitOpenError,
+    EndpointGuard,
+    EndpointGuardRegistry,
+    ErrorClass,
+    RetryPolicy,
+    TokenBucket,
+    classify_error,
+    retry_after_seconds,
+)
+
+
+def _http_error(status: int, headers: dict[str, str] | None = None) -> Exception:
+    error = Exception(f"HTTP {status}")
+    error.response = SimpleNamespace(status_code=status, headers=headers or {})
+    return error
+
+
+class TestClassification:
+    """Test error classification and server wait hints."""
+
+    @pytest.mark.parametrize(
+        ("status", "expected"),
+        [
+            (429, ErrorClass.RATE_LIMIT),
+            (529, ErrorClass.OVERLOADED),
+            (503, ErrorClass.OVERLOADED),
+            (500, ErrorClass.SERVER),
+            (408, ErrorClass.TIMEOUT),
+            (400, ErrorClass.CLIENT),
+            (401, ErrorClass.CLIENT),
+        ],
+    )
+    def test_status_codes(self, status, expected):
+        """HTTP status decides the class when present."""
+        assert classify_error(_http_error(status)) is expected
+
+    def test_transport_errors(self):
+        """Timeouts and connection failures are recognized by class name."""
+        assert classify_error(httpx.ReadTimeout("slow")) is ErrorClass.TIMEOUT
+        assert classify_error(httpx.ConnectError("refused")) is ErrorClass.CONNECTION
+        assert classify_error(ValueError("empty")) is ErrorClass.UNKNOWN
+
+    def test_retry_after_headers(self):
+        """retry-after-ms, retry-after and exhausted x-ratelimit resets are honored."""
+        assert retry_after_seconds(_http_error(429, {"retry-after-ms": "1500"})) == 1.5
+        assert retry_after_seconds(_http_error(429, {"retry-after": "3"})) == 3.0
+        assert (
+            retry_after_seconds(
+                _http_error(
+                    429,
+                    {
+                        "x-ratelimit-remaining-requests": "0",
+                        "x-ratelimit-reset-requests": "1m30s",
+                        "x-ratelimit-remaining-tokens": "10",
+                        "x-ratelimit-reset-tokens": "500ms",
+                    },
+                ),
+            )
+            == 90.0
+        )
+        assert retry_after_seconds(_http_error(429)) is None
+
+
+class TestRetryPolicy:
+    """Test retry decisions."""
+
+    def test_full_jitter_is_bounded(self):
+        """Delays stay within the exponential ceiling."""
+        policy = RetryPolicy(base_delay=1.0, max_delay=5.0, rng=random.Random(0))
+
+        for attempt in range(6):
+            decision = policy.decide(ValueError("boom"), attempt)
+            assert decision.retry
+            assert 0 <= decision.delay <= min(5.0, 2**attempt)
+
+    def test_client_errors_are_not_retried(self):
+        """Requests the server rejected are final."""
+        decision = RetryPolicy().decide(_http_error(400), 0)
+
+        assert not decision.retry
+        assert decision.error_class is ErrorClass.CLIENT
+
+    def test_retry_after_replaces_backoff(self):
+        """A server wait is honored, unless it exceeds max_retry_after."""
+        policy = RetryPolicy(base_delay=1.0, max_retry_after=60.0)
+
+        decision = policy.decide(_http_error(429, {"retry-after": "10"}), 0)
+        assert decision.retry
+        assert 10 <= decision.delay <= 11
+        assert decision.retry_after == 10
+
+        assert not policy.decide(_http_error(429, {"retry-after": "600"}), 0).retry
+
+
+class TestCircuitBreaker:
+    """Test circuit breaker state transitions."""
+
+    def test_opens_after_threshold_and_probes(self):
+        """Failures open the circuit; after the timeout one probe is allowed."""
+        breaker = CircuitBreaker("endpoint", failure_threshold=2, recovery_timeout=10.0)
+
+        with patch("nexau.archs.llm.retry_policy.time.monotonic", return_value=100.0):
+            breaker.record_failure()
+            breaker.before_call()
+            breaker.record_failure()
+            assert breaker.state == CircuitBreaker.OPEN
+            with pytest.raises(CircuitOpenError) as exc_info:
+                breaker.before_call()
+            assert exc_info.value.retry_after == 10.0
+
+        with patch("nexau.archs.llm.retry_policy.time.monotonic", return_value=111.0):
+            breaker.before_call()
+            assert breaker.state == CircuitBreaker.HALF_OPEN
+            with pytest.raises(CircuitOpenError):
+                breaker.before_call()
+            breaker.record_success()
+
+        assert breaker.state == CircuitBreaker.CLOSED
+
+    def test_half_open_failure_reopens(self):
+        """A failed probe opens the circuit again."""
+        breaker = CircuitBreaker("endpoint", failure_threshold=1, recovery_timeout=0.0)
+        breaker.record_failure()
+        breaker.before_call()
+
+        breaker.record_failure()
+
+        assert breaker.state == CircuitBreaker.OPEN
+
+    def test_probe_rate_limited_reopens(self):
+        """A probe answered with 429 does not leave the circuit half-open forever."""
+        guard = EndpointGuard("endpoint", CircuitBreaker("endpoint", failure_threshold=1, recovery_timeout=10.0), TokenBucket())
+        guard.breaker.record_failure()
+
+        with patch("nexau.archs.llm.retry_policy.time.monotonic", return_value=time.monotonic() + 11.0):
+            _, probe = guard.start_call()
+            guard.record_failure(RetryPolicy().decide(_http_error(429), 0))
+            guard.finish_call(probe)
+
+        assert probe
+        assert guard.breaker.state == CircuitBreaker.OPEN
+        with patch("nexau.archs.llm.retry_policy.time.monotonic", return_value=time.monotonic() + 30.0):
+            assert guard.start_call()[1]
+
+
+class TestTokenBucket:
+    """Test rate limiting and shared pauses."""
+
+    def test_unlimited_bucket_only_waits_for_pauses(self):
+        """Without a rate only pause() delays callers."""
+        bucket = TokenBucket()
+        assert bucket.reserve() == 0.0
+
+        bucket.pause(5.0)
+
+        assert 4.9 < bucket.reserve() <= 5.0
+
+    def test_rate_limits_bursts(self):
+        """Reservations beyond the burst wait for refill."""
+        with patch("nexau.archs.llm.retry_policy.time.monotonic", return_value=0.0):
+            bucket = TokenBucket(rate=2.0, capacity=2.0)
+            assert bucket.reserve() == 0.0
+            assert bucket.reserve() == 0.0
+            assert bucket.reserve() == pytest.approx(0.5)
+            assert bucket.reserve() == pytest.approx(1.0)
+
+
+class TestEndpointGuardRegistry:
+    """Test sharing of guards between callers."""
+
+    def _config(self, **overrides) -> LLMConfig:
+        params = {"model": "gpt-4o-mini", "base_url": "https://example.invalid/v1", "api_key": "key"}
+        params.update(overrides)
+        return LLMConfig(**params)
+
+    def test_same_endpoint_shares_guard(self):
+        """Agents with different keys on one endpoint coordinate through one guard."""
+        registry = EndpointGuardRegistry()
+
+        guard = registry.get(self._config())
+
+        assert registry.get(self._config(api_key="other", temperature=0.3)) is guard
+        assert registry.get(self._config(model="other-model")) is not guard
+
+    def test_rate_limit_pauses_all_callers(self):
+        """A 429 with Retry-After holds back every caller of the endpoint."""
+        registry = EndpointGuardRegistry()
+        guard = registry.get(self._config())
+        decision = RetryPolicy().decide(_http_error(429, {"retry-after": "4"}), 0)
+
+        guard.record_failure(decision)
+
+        assert registry.get(self._config()).start_call()[0] > 3.9
+
+    def test_configure_applies_to_new_guards(self):
+        """Settings replace existing guards; unknown settings are rejected."""
+        registry = EndpointGuardRegistry()
+        old = registry.get(self._config())
+
+        registry.configure(failure_threshold=1, requests_per_second=10.0)
+        guard = registry.get(self._config())
+
+        assert guard is not old
+        assert guard.breaker.failure_threshold == 1
+        assert guard.bucket.rate == 10.0
+        with pytest.raises(ValueError):
+            registry.configure(unknown=1)
@@ -0,0 +1,111 @@
+# Copyright (c) Nex-AGI. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Unit tests for the streaming tool dispatcher."""
+
+from unittest.mock import Mock
+
+from nexau.archs.main_sub.execution.model_response import ModelToolCall
+from nexau.archs.main_sub.execution.parse_structures import ToolCall
+from nexau.archs.main_sub.execution.response_parser import ResponseParser
+from nexau.archs.main_sub.execution.stream_dispatch import StreamingToolDispatcher
+
+
+def _make_dispatcher(skip_tools=None):
+    submitted: list[ToolCall] = []
+
+    def submit(tool_call: ToolCall) -> Mock:
+        submitted.append(tool_call)
+        return Mock(name=f"handle_{tool_call.tool_name}")
+
+    dispatcher = StreamingToolDispatcher(submit, ResponseParser()._parse_tool_call, skip_tools=skip_tools)
+    return dispatcher, submitted
+
+
+def _parallel_xml(*calls: tuple[str, str]) -> str:
+    blocks = "".join(
+        f"<parallel_tool><tool_name>{name}</tool_name><parameter><path>{path}</path></parameter></parallel_tool>" for name, path in calls
+    )
+    return f"<use_parallel_tool_calls>{blocks}</use_parallel_tool_calls>"
+
+
+class TestXMLDetection:
+    """Closed XML blocks are dispatched as soon as they stream in."""
+
+    def test_dispatches_each_parallel_tool_when_closed(self):
+        """Each <parallel_tool> is submitted the moment its closing tag arrives."""
+        dispatcher, submitted = _make_dispatcher()
+        text = _parallel_xml(("read_file", "a.txt"), ("read_file", "b.txt"))
+        first_end = text.index("</parallel_tool>") + len("</parallel_tool>")
+
+        dispatcher.begin_attempt()
+        for char in text[: first_end - 1]:
+            dispatcher.on_text_delta(char)
+        assert submitted == []
+
+        dispatcher.on_text_delta(text[first_end - 1])
+        assert [call.parameters for call in submitted] == [{"path": "a.txt"}]
+
+        dispatcher.on_text_delta(text[first_end:])
+        assert [call.parameters for call in submitted] == [{"path": "a.txt"}, {"path": "b.txt"}]
+        assert dispatcher.dispatched_count == 2
+
+    def test_skips_sub_agents_and_skip_tools(self):
+        """Sub-agent calls and serial tools are left for the regular path."""
+        dispatcher, submitted = _make_dispatcher(skip_tools={"write_file"})
+
+        dispatcher.begin_attempt()
+        dispatcher.on_text_delta(_parallel_xml(("write_file", "a.txt"), ("sub-agent-researcher", "b.txt")))
+
+        assert submitted == []
+
+
+class TestStructuredDispatch:
+    """Structured tool calls are dispatched when the aggregator reports them."""
+
+    def test_on_tool_call_submits_and_claim_returns_handle(self):
+        """A parsed call with the same name and arguments claims the running handle."""
+        dispatcher, submitted = _make_dispatcher()
+
+        dispatcher.begin_attempt()
+        dispatcher.on_tool_call(ModelToolCall(call_id="call_1", name="lookup", arguments={"q": "x"}, raw_arguments='{"q": "x"}'))
+
+        assert submitted[0].tool_call_id == "call_1"
+        parsed = ToolCall(tool_name="lookup", parameters={"q": "x"}, raw_content="", tool_call_id="call_1")
+        assert dispatcher.claim(parsed) is not None
+        assert dispatcher.claim(parsed) is None
+
+    def test_release_unclaimed_returns_remaining_handles(self):
+        """Calls the parsed response no longer contains are handed back for cancellation."""
+        dispatcher, _ = _make_dispatcher()
+
+        dispatcher.begin_attempt()
+        dispatcher.on_tool_call(ModelToolCall(call_id="call_1", name="lookup", arguments={"q": "x"}))
+
+        assert len(dispatcher.release_unclaimed()) == 1
+        assert dispatcher.dispatched_count == 0
+
+    def test_retry_does_not_dispatch_twice(self):
+        """A retried model call that streams the same call reuses the first handle."""
+        dispatcher, submitted = _make_dispatcher()
+        call = ModelToolCall(call_id="call_1", name="lookup", arguments={"q": "x"})
+
+        dispatcher.begin_attempt()
+        dispatcher.on_tool_call(call)
+        dispatcher.begin_attempt()
+        dispatcher.on_tool_call(call)
+        dispatcher.on_tool_call(ModelToolCall(call_id="call_2", name="lookup", arguments={"q": "x"}))
+
+        assert len(submitted) == 2
+        assert dispatcher.dispatched_count == 2
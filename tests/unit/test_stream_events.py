@@ -0,0 +1,241 @@
+# Copyright (c) Nex-AGI. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Unit tests for streamed agent runs and their normalized events."""
+
+import asyncio
+import threading
+import time
+from unittest.mock import Mock, patch
+
+from nexau.archs.main_sub.agent import Agent
+from nexau.archs.main_sub.config import AgentConfig
+from nexau.archs.main_sub.execution.llm_caller import AnthropicStreamAggregator, OpenAIChatStreamAggregator
+from nexau.archs.main_sub.execution.model_response import ModelResponse, ModelToolCall
+from nexau.archs.main_sub.execution.parse_structures import ParsedResponse, ToolCall
+from nexau.archs.main_sub.execution.stream_events import (
+    AgentEventStream,
+    StreamEvent,
+    StreamEventListener,
+    StreamEventType,
+)
+
+
+def _event(text: str) -> StreamEvent:
+    return StreamEvent(type=StreamEventType.TEXT_DELTA, data={"text": text})
+
+
+def _types(events) -> list[str]:
+    return [event.type.value for event in events]
+
+
+class TestAgentEventStream:
+    """Test the bounded event channel."""
+
+    def test_producer_waits_for_slow_consumer(self):
+        """Emitting beyond max_pending blocks until events are read."""
+        stream = AgentEventStream(max_pending=2)
+        producer = threading.Thread(target=lambda: [stream.emit(_event(str(i))) for i in range(5)])
+        producer.start()
+        time.sleep(0.05)
+
+        assert producer.is_alive()
+        assert len(stream._events) == 2
+
+        received = []
+        for _ in range(5):
+            received.append(stream.get().data["text"])
+        producer.join(timeout=1)
+        stream.finish()
+
+        assert received == ["0", "1", "2", "3", "4"]
+        assert stream.get() is None
+
+    def test_close_releases_blocked_producer(self):
+        """A consumer that stops reading never leaves producers hanging."""
+        stream = AgentEventStream(max_pending=1)
+        producer = threading.Thread(target=lambda: [stream.emit(_event("x")) for _ in range(3)])
+        producer.start()
+        time.sleep(0.02)
+
+        stream.close()
+        producer.join(timeout=1)
+
+        assert not producer.is_alive()
+        assert stream.get() is None
+
+    def test_async_iteration_receives_thread_events(self):
+        """aget wakes up for events emitted from other threads."""
+        stream = AgentEventStream()
+
+        def produce():
+            for text in ("a", "b"):
+                time.sleep(0.01)
+                stream.emit(_event(text))
+            stream.finish()
+
+        async def consume():
+            threading.Thread(target=produce).start()
+            return [event.data["text"] async for event in stream]
+
+        assert asyncio.run(consume()) == ["a", "b"]
+
+
+class TestStreamEventListener:
+    """Test conversion of aggregator callbacks into events."""
+
+    def test_openai_chunks_become_events(self):
+        """Reasoning, text and tool-call deltas are reported in order."""
+        stream = AgentEventStream()
+        inner = Mock()
+        aggregator = OpenAIChatStreamAggregator(listener=StreamEventListener(stream, None, inner))
+
+        aggregator.consume({"choices": [{"delta": {"reasoning_content": "hmm"}}]})
+        aggregator.consume({"choices": [{"delta": {"content": "Hi"}}]})
+        aggregator.consume(
+            {"choices": [{"delta": {"tool_calls": [{"index": 0, "id": "call_1", "function": {"name": "search", "arguments": '{"q"'}}]}}]},
+        )
+        aggregator.consume({"choices": [{"delta": {"tool_calls": [{"index": 0, "function": {"arguments": ': "a"}'}}]}}]})
+        aggregator.consume({"choices": [{"delta": {}, "finish_reason": "tool_calls"}]})
+        stream.finish()
+        events = list(stream)
+
+        assert _types(events) == [
+            "reasoning_delta",
+            "text_delta",
+            "tool_call_start",
+            "tool_call_args",
+            "tool_call_args",
+            "tool_call_end",
+        ]
+        assert events[2].data == {"index": 0, "call_id": "call_1", "name": "search"}
+        assert events[-1].data["arguments"] == {"q": "a"}
+        inner.on_text_delta.assert_called_once_with("Hi")
+        inner.on_tool_call.assert_called_once()
+
+    def test_anthropic_thinking_and_tool_input(self):
+        """Anthropic thinking and input_json deltas map to the same events."""
+        stream = AgentEventStream()
+        aggregator = AnthropicStreamAggregator(listener=StreamEventListener(stream, None))
+
+        aggregator.consume({"type": "content_block_start", "index": 0, "content_block": {"type": "thinking", "thinking": ""}})
+        aggregator.consume({"type": "content_block_delta", "index": 0, "delta": {"type": "thinking_delta", "thinking": "plan"}})
+        aggregator.consume({"type": "content_block_stop", "index": 0})
+        aggregator.consume(
+            {"type": "content_block_start", "index": 1, "content_block": {"type": "tool_use", "id": "toolu_1", "name": "search"}}
+        )
+        aggregator.consume({"type": "content_block_delta", "index": 1, "delta": {"type": "input_json_delta", "partial_json": "{}"}})
+        aggregator.consume({"type": "content_block_stop", "index": 1})
+        stream.finish()
+
+        assert _types(stream) == ["reasoning_delta", "tool_call_start", "tool_call_args", "tool_call_end"]
+
+    def test_finish_reports_unstreamed_output(self):
+        """Non-streamed text and XML tool calls are emitted once the call returns."""
+        stream = AgentEventStream()
+        listener = StreamEventListener(stream, None)
+        listener.begin_attempt()
+        tool_call = ToolCall(tool_name="search", parameters={"q": "a"}, tool_call_id="xml_1")
+
+        listener.finish_model_call(
+            ModelResponse(content="<tool_use>...</tool_use>"),
+            ParsedResponse(original_response="", tool_calls=[tool_call], sub_agent_calls=[], batch_agent_calls=[]),
+        )
+        stream.finish()
+        events = list(stream)
+
+        assert _types(events) == ["text_delta", "tool_call_start", "tool_call_end"]
+        assert events[2].data["arguments"] == {"q": "a"}
+
+    def test_retry_is_announced(self):
+        """A retried model call tells consumers to drop the partial output."""
+        stream = AgentEventStream()
+        listener = StreamEventListener(stream, None)
+
+        listener.begin_attempt()
+        listener.on_text_delta("partial")
+        listener.begin_attempt()
+        stream.finish()
+
+        assert _types(stream) == ["text_delta", "model_retry"]
+
+
+class TestAgentRunStream:
+    """Test the public streaming API on Agent."""
+
+    def _agent(self, mock_llm_config, tools=None) -> Agent:
+        config = AgentConfig(
+            name="stream_agent",
+            system_prompt="You are helpful.",
+            tools=tools or [],
+            llm_config=mock_llm_config,
+            tool_call_mode="openai",
+        )
+        with patch("nexau.archs.llm.client_registry.openai"):
+            return Agent(config)
+
+    def test_run_stream_yields_deltas_tools_and_done(self, mock_llm_config, sample_tool):
+        """Text streams as it is generated, tool results follow, done carries the response."""
+        agent = self._agent(mock_llm_config, [sample_tool])
+        responses = [
+            ModelResponse(
+                content="",
+                tool_calls=[ModelToolCall(call_id="call_1", name="sample_tool", arguments={"x": 1}, raw_arguments='{"x": 1}')],
+            ),
+            ModelResponse(content="Hello"),
+        ]
+
+        def fake_call_llm(*args, stream_listener=None, **kwargs):
+            response = responses.pop(0)
+            stream_listener.begin_attempt()
+            if response.content:
+                stream_listener.on_text_delta("Hel")
+                stream_listener.on_text_delta("lo")
+            return response
+
+        with patch.object(agent.executor.llm_caller, "call_llm", side_effect=fake_call_llm):
+            events = list(agent.run_stream("hi"))
+
+        assert _types(events) == ["tool_call_start", "tool_call_end", "tool_result", "text_delta", "text_delta", "done"]
+        assert events[2].data["output"] == {"result": "1_default"}
+        assert events[2].agent_name == "stream_agent"
+        assert events[-1].data == {"response": "Hello"}
+
+    def test_run_stream_reports_errors(self, mock_llm_config):
+        """A failing run ends the stream with an error event."""
+        agent = self._agent(mock_llm_config)
+
+        with patch.object(agent.executor.llm_caller, "call_llm", side_effect=RuntimeError("boom")):
+            events = list(agent.run_stream("hi"))
+
+        assert events[-1].type == StreamEventType.ERROR
+        assert "boom" in events[-1].data["error"]
+
+    def test_arun_stream(self, mock_llm_config):
+        """The async iterator streams from arun on the running loop."""
+        agent = self._agent(mock_llm_config)
+
+        async def fake_acall_llm(*args, stream_listener=None, **kwargs):
+            stream_listener.begin_attempt()
+            stream_listener.on_text_delta("ok")
+            return ModelResponse(content="ok")
+
+        async def collect():
+            return [event async for event in agent.arun_stream("hi")]
+
+        with patch.object(agent.executor.llm_caller, "acall_llm", side_effect=fake_acall_llm):
+            events = asyncio.run(collect())
+
+        assert _types(events) == ["text_delta", "done"]
+        assert events[-1].data == {"response": "ok"}
@@ -16,8 +16,9 @@
 Unit tests for SubAgentManager class.
 """
 
+import asyncio
 import threading
-from unittest.mock import Mock, patch
+from unittest.mock import AsyncMock, Mock, patch
 
 import pytest
 
@@ -143,6 +144,34 @@ class TestSubAgentManager:
         call_args = mock_sub_agent.run.call_args
         assert call_args[1]["parent_agent_state"] == agent_state
 
+    @patch("nexau.archs.main_sub.agent_context.get_context")
+    def test_acall_sub_agent_awaits_arun(self, mock_get_context, subagent_manager, mock_sub_agent, agent_state):
+        """Test async sub-agent call awaits the sub-agent's arun."""
+        mock_context = Mock()
+        mock_context.context = {"key": "value"}
+        mock_get_context.return_value = mock_context
+        mock_sub_agent.arun = AsyncMock(return_value="async sub agent result")
+
+        result = asyncio.run(
+            subagent_manager.acall_sub_agent("test_sub_agent", "test message", parent_agent_state=agent_state),
+        )
+
+        assert result == "async sub agent result"
+        mock_sub_agent.arun.assert_awaited_once()
+        mock_sub_agent.run.assert_not_called()
+        call_args = mock_sub_agent.arun.call_args
+        assert call_args[0][0] == "test message"
+        assert call_args[1]["context"] == {"key": "value"}
+        assert call_args[1]["parent_agent_state"] == agent_state
+        assert subagent_manager.running_sub_agents == {}
+
+    def test_acall_sub_agent_during_shutdown(self, subagent_manager):
+        """Test async sub-agent call when manager is shutting down."""
+        subagent_manager.shutdown()
+
+        with pytest.raises(RuntimeError, match="Agent 'parent_agent' is shutting down"):
+            asyncio.run(subagent_manager.acall_sub_agent("test_sub_agent", "test message"))
+
     @patch("nexau.archs.main_sub.agent_context.get_context")
     def test_call_sub_agent_with_global_storage(self, mock_get_context, sub_agent_factories):
         """Test sub-agent call with global storage."""
@@ -311,3 +340,124 @@ class TestSubAgentManager:
         assert result2 == "sub agent result"
         # Each call should create a new sub-agent instance
         assert len(subagent_manager.running_sub_agents) == 0
+
+
+class TestSubAgentManagerPooling:
+    """Test warm reuse of sub-agent instances."""
+
+    @staticmethod
+    def _make_factory():
+        def factory():
+            sub_agent = Mock()
+            sub_agent.config = Mock()
+            sub_agent.config.agent_id = f"sub_agent_{factory.call_count}"
+            sub_agent.run = Mock(return_value="sub agent result")
+            factory.call_count += 1
+            return sub_agent
+
+        factory.call_count = 0
+        return factory
+
+    @patch("nexau.archs.main_sub.agent_context.get_context", return_value=None)
+    def test_sequential_calls_reuse_instance(self, _mock_get_context):
+        """A finished sub-agent is reset and reused instead of rebuilt."""
+        factory = self._make_factory()
+        manager = SubAgentManager(agent_name="parent_agent", sub_agent_factories={"worker": factory})
+
+        manager.call_sub_agent("worker", "message 1")
+        manager.call_sub_agent("worker", "message 2")
+
+        assert factory.call_count == 1
+        stats = manager.get_pool("worker").stats()
+        assert stats["reused"] == 1
+        assert stats["idle"] == 1
+
+    def test_config_fingerprint_computed_once_per_factory(self, agent_config):
+        """The fingerprint comes from a pooled instance and is dropped when the factory is replaced."""
+        factory = self._make_factory()
+        manager = SubAgentManager(agent_name="parent_agent", sub_agent_factories={"worker": factory})
+
+        with patch("nexau.archs.main_sub.execution.subagent_manager.agent_config_fingerprint", return_value="fp") as fingerprint:
+            assert manager.config_fingerprint("worker") == "fp"
+            assert manager.config_fingerprint("worker") == "fp"
+            assert fingerprint.call_count == 1
+            assert manager.get_pool("worker").stats()["idle"] == 1
+
+            manager.add_sub_agent("worker", self._make_factory())
+            manager.config_fingerprint("worker")
+            assert fingerprint.call_count == 2
+
+        with pytest.raises(ValueError):
+            manager.config_fingerprint("missing")
+
+    @patch("nexau.archs.main_sub.agent_context.get_context", return_value=None)
+    def test_failed_run_is_not_reused(self, _mock_get_context):
+        """An instance whose run raised is stopped rather than returned to the pool."""
+        factory = self._make_factory()
+        manager = SubAgentManager(agent_name="parent_agent", sub_agent_factories={"worker": factory})
+        failing = manager.get_pool("worker").acquire()
+        failing.run.side_effect = Exception("boom")
+        manager.get_pool("worker").release(failing)
+
+        with pytest.raises(Exception, match="boom"):
+            manager.call_sub_agent("worker", "message")
+
+        failing.stop.assert_called_once()
+        assert manager.get_pool("worker").stats()["idle"] == 0
+
+    @patch("nexau.archs.main_sub.agent_context.get_context", return_value=None)
+    def test_pool_max_size_zero_disables_reuse(self, _mock_get_context):
+        """With pool_max_size=0 every call builds a fresh instance."""
+        factory = self._make_factory()
+        manager = SubAgentManager(agent_name="parent_agent", sub_agent_factories={"worker": factory}, pool_max_size=0)
+
+        manager.call_sub_agent("worker", "message 1")
+        manager.call_sub_agent("worker", "message 2")
+
+        assert factory.call_count == 2
+
+    @patch("nexau.archs.main_sub.agent_context.get_context", return_value=None)
+    def test_async_calls_reuse_instance(self, _mock_get_context):
+        """acall_sub_agent returns instances to the same pool."""
+        factory = self._make_factory()
+        manager = SubAgentManager(agent_name="parent_agent", sub_agent_factories={"worker": factory})
+        sub_agent = manager.get_pool("worker").acquire()
+        sub_agent.arun = AsyncMock(return_value="async result")
+        manager.get_pool("worker").release(sub_agent)
+
+        asyncio.run(manager.acall_sub_agent("worker", "message 1"))
+        asyncio.run(manager.acall_sub_agent("worker", "message 2"))
+
+        assert factory.call_count == 1
+        assert sub_agent.arun.await_count == 2
+
+    def test_prewarm_and_shutdown(self):
+        """prewarm builds min_size instances; shutdown stops idle ones."""
+        factory = self._make_factory()
+        manager = SubAgentManager(
+            agent_name="parent_agent",
+            sub_agent_factories={"worker": factory},
+            pool_min_size=2,
+        )
+
+        manager.prewarm()
+        idle = [manager.get_pool("worker").acquire() for _ in range(2)]
+        for sub_agent in idle:
+            manager.get_pool("worker").release(sub_agent)
+        manager.shutdown()
+
+        assert factory.call_count == 2
+        for sub_agent in idle:
+            sub_agent.stop.assert_called_once()
+
+    def test_add_sub_agent_drops_stale_pool(self):
+        """Replacing a factory stops instances built by the old one."""
+        factory = self._make_factory()
+        manager = SubAgentManager(agent_name="parent_agent", sub_agent_factories={"worker": factory})
+        stale = manager.get_pool("worker").acquire()
+        manager.get_pool("worker").release(stale)
+
+        manager.add_sub_agent("worker", self._make_factory())
+
+        stale.stop.assert_called_once()
+        assert manager.get_pool("worker").stats()["idle"] == 0
@@ -0,0 +1,100 @@
+# Copyright (c) Nex-AGI. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Unit tests for the sub-agent warm pool."""
+
+import time
+from unittest.mock import Mock
+
+from nexau.archs.main_sub.execution.subagent_pool import SubAgentPool
+
+
+class TestSubAgentPool:
+    """Test acquire/release, sizing and eviction."""
+
+    def test_release_resets_and_reuses(self):
+        """Released instances are reset and handed out again."""
+        factory = Mock(side_effect=lambda: Mock())
+        pool = SubAgentPool("worker", factory)
+
+        agent = pool.acquire()
+        pool.release(agent)
+
+        assert pool.acquire() is agent
+        agent.reset.assert_called_once()
+        assert factory.call_count == 1
+
+    def test_concurrent_acquires_get_distinct_instances(self):
+        """Each caller holding an instance gets its own."""
+        pool = SubAgentPool("worker", lambda: Mock())
+
+        assert pool.acquire() is not pool.acquire()
+
+    def test_max_size_bounds_idle_instances(self):
+        """Instances released beyond max_size are stopped."""
+        pool = SubAgentPool("worker", lambda: Mock(), max_size=1)
+        first, second = pool.acquire(), pool.acquire()
+
+        pool.release(first)
+        pool.release(second)
+
+        assert pool.stats()["idle"] == 1
+        second.stop.assert_called_once()
+
+    def test_reset_failure_discards_instance(self):
+        """An instance that cannot be reset is stopped instead of parked."""
+        pool = SubAgentPool("worker", lambda: Mock())
+        agent = pool.acquire()
+        agent.reset.side_effect = RuntimeError("stopped")
+
+        pool.release(agent)
+
+        agent.stop.assert_called_once()
+        assert pool.stats()["idle"] == 0
+
+    def test_evict_idle_keeps_min_size(self):
+        """Idle eviction stops expired instances but keeps min_size warm."""
+        pool = SubAgentPool("worker", lambda: Mock(), min_size=1, max_size=3, idle_timeout=10)
+        agents = [pool.acquire() for _ in range(3)]
+        for agent in agents:
+            pool.release(agent)
+
+        evicted = pool.evict_idle(now=time.monotonic() + 60)
+
+        assert evicted == 2
+        assert pool.stats()["idle"] == 1
+        agents[0].stop.assert_called_once()
+        agents[2].stop.assert_not_called()
+
+    def test_prewarm_fills_to_min_size(self):
+        """prewarm builds idle instances up to min_size."""
+        factory = Mock(side_effect=lambda: Mock())
+        pool = SubAgentPool("worker", factory, min_size=2)
+
+        assert pool.prewarm() == 2
+        assert pool.prewarm() == 0
+        assert factory.call_count == 2
+
+    def test_shutdown_stops_idle_and_refuses_release(self):
+        """After shutdown, idle instances are stopped and releases are discarded."""
+        pool = SubAgentPool("worker", lambda: Mock())
+        idle, busy = pool.acquire(), pool.acquire()
+        pool.release(idle)
+
+        pool.shutdown()
+        pool.release(busy)
+
+        idle.stop.assert_called_once()
+        busy.stop.assert_called_once()
+        assert pool.stats()["idle"] == 0
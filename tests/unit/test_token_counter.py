@@ -0,0 +1,92 @@
+# Copyright (c) Nex-AGI. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Unit tests for TokenCounter and TokenLedger.
+"""
+
+from unittest.mock import Mock
+
+from nexau.archs.main_sub.utils.token_counter import TokenCounter, TokenLedger
+
+
+def _counting_counter() -> Mock:
+    counter = Mock()
+    counter.count_tokens.side_effect = lambda msgs: sum(len(m.get("content", "")) for m in msgs)
+    return counter
+
+
+class TestTokenLedger:
+    """Test incremental token accounting."""
+
+    def test_count_matches_full_count(self):
+        """Ledger totals match a full recount with the fallback counter."""
+        counter = TokenCounter(strategy="fallback")
+        ledger = TokenLedger(counter)
+        messages = [
+            {"role": "system", "content": "You are a helpful assistant." * 10},
+            {"role": "user", "content": "Hello there"},
+        ]
+
+        assert ledger.count(messages) == sum(counter.count_tokens([m]) for m in messages)
+        assert ledger.total == ledger.count(messages)
+
+    def test_only_new_messages_are_encoded(self):
+        """Unchanged messages are served from the cache."""
+        counter = _counting_counter()
+        ledger = TokenLedger(counter)
+        messages = [{"role": "system", "content": "abc"}, {"role": "user", "content": "de"}]
+
+        assert ledger.count(messages) == 5
+        assert counter.count_tokens.call_count == 2
+
+        messages.append({"role": "assistant", "content": "fghi"})
+        assert ledger.count(messages) == 9
+        assert counter.count_tokens.call_count == 3
+        assert ledger.hits == 2
+        assert ledger.misses == 3
+
+    def test_modified_message_is_re_encoded(self):
+        """In-place content changes invalidate the cached entry."""
+        counter = _counting_counter()
+        ledger = TokenLedger(counter)
+        messages = [{"role": "user", "content": "ab"}]
+        ledger.count(messages)
+
+        messages[0]["content"] += "cd"
+
+        assert ledger.count(messages) == 4
+        assert counter.count_tokens.call_count == 2
+
+    def test_dropped_messages_are_evicted(self):
+        """Messages removed from the history no longer contribute or stay cached."""
+        counter = _counting_counter()
+        ledger = TokenLedger(counter)
+        first = {"role": "user", "content": "aaaa"}
+        second = {"role": "assistant", "content": "bb"}
+        ledger.count([first, second])
+
+        assert ledger.count([second]) == 2
+        assert len(ledger._entries) == 1
+
+    def test_structured_content_is_fingerprinted(self):
+        """List content is supported for change detection."""
+        counter = Mock()
+        counter.count_tokens.return_value = 7
+        ledger = TokenLedger(counter)
+        messages = [{"role": "user", "content": [{"type": "text", "text": "hi"}]}]
+
+        assert ledger.count(messages) == 7
+        assert ledger.count(messages) == 7
+        assert counter.count_tokens.call_count == 1
@@ -24,15 +24,19 @@ Tests cover:
 - Error handling and edge cases
 """
 
+import asyncio
 import logging
+import threading
 from unittest.mock import Mock
 
 import pytest
 
+from nexau.archs.main_sub.execution.execution_pool import TOOLS_LANE, ExecutionPool
 from nexau.archs.main_sub.execution.hooks import (
     AfterToolHookInput,
     FunctionMiddleware,
     HookResult,
+    Middleware,
     MiddlewareManager,
 )
 from nexau.archs.main_sub.execution.tool_executor import ToolExecutor
@@ -433,6 +437,110 @@ class TestToolExecutorHooks:
         assert result["result"] == 20
 
 
+class TestToolExecutorAsync:
+    """Test the asyncio tool execution path."""
+
+    def test_aexecute_awaits_coroutine_tool_on_loop(self, agent_state):
+        """Coroutine tools are awaited on the calling event loop."""
+        seen_threads: list[int] = []
+
+        async def async_tool(message: str, agent_state=None) -> dict:
+            await asyncio.sleep(0)
+            seen_threads.append(threading.get_ident())
+            return {"result": f"Async: {message}"}
+
+        tool = Tool(
+            name="async_tool",
+            description="An async tool",
+            input_schema={"type": "object", "properties": {"message": {"type": "string"}}, "required": ["message"]},
+            implementation=async_tool,
+        )
+        executor = ToolExecutor(tool_registry={"async_tool": tool}, stop_tools=set())
+
+        async def run():
+            result = await executor.aexecute_tool(agent_state, "async_tool", {"message": "hi"}, "call_1")
+            return result, threading.get_ident()
+
+        result, loop_thread = asyncio.run(run())
+
+        assert tool.is_async is True
+        assert result["result"] == "Async: hi"
+        assert seen_threads == [loop_thread]
+
+    def test_aexecute_offloads_sync_tool_to_pool(self, agent_state):
+        """Sync tools run on the tools lane of the shared execution pool."""
+        seen_threads: list[str] = []
+
+        def blocking_tool(x: int, agent_state=None) -> dict:
+            seen_threads.append(threading.current_thread().name)
+            return {"result": x * 2}
+
+        tool = Tool(
+            name="blocking_tool",
+            description="A blocking tool",
+            input_schema={"type": "object", "properties": {"x": {"type": "integer"}}, "required": ["x"]},
+            implementation=blocking_tool,
+        )
+        executor = ToolExecutor(tool_registry={"blocking_tool": tool}, stop_tools=set())
+        executor.execution_pool = ExecutionPool({TOOLS_LANE: 1}, name="test")
+
+        try:
+            result = asyncio.run(executor.aexecute_tool(agent_state, "blocking_tool", {"x": 4}, "call_2"))
+        finally:
+            executor.execution_pool.shutdown(wait=True)
+
+        assert result["result"] == 8
+        assert seen_threads and seen_threads[0].startswith("test-tools-")
+
+    def test_aexecute_runs_async_after_tool_middleware(self, agent_state):
+        """Async after-tool hooks can modify the tool output."""
+
+        class AsyncAfterTool(Middleware):
+            async def aafter_tool(self, hook_input: AfterToolHookInput) -> HookResult:  # type: ignore[override]
+                return HookResult.with_modifications(tool_output={"result": "patched"})
+
+        tool = Tool(
+            name="simple_tool",
+            description="A simple tool",
+            input_schema={"type": "object", "properties": {}},
+            implementation=lambda agent_state=None: {"result": "raw"},
+        )
+        executor = ToolExecutor(
+            tool_registry={"simple_tool": tool},
+            stop_tools=set(),
+            middleware_manager=MiddlewareManager([AsyncAfterTool()]),
+        )
+
+        result = asyncio.run(executor.aexecute_tool(agent_state, "simple_tool", {}, "call_3"))
+
+        assert result["result"] == "patched"
+
+    def test_sync_execute_runs_coroutine_tool(self, agent_state):
+        """The sync path still supports coroutine tools outside an event loop."""
+
+        async def async_tool(agent_state=None) -> dict:
+            return {"result": "from coroutine"}
+
+        tool = Tool(
+            name="async_tool",
+            description="An async tool",
+            input_schema={"type": "object", "properties": {}},
+            implementation=async_tool,
+        )
+        executor = ToolExecutor(tool_registry={"async_tool": tool}, stop_tools=set())
+
+        result = executor.execute_tool(agent_state, "async_tool", {}, "call_5")
+
+        assert result["result"] == "from coroutine"
+
+    def test_aexecute_tool_not_found(self, agent_state):
+        """Unknown tools raise the same error as the sync path."""
+        executor = ToolExecutor(tool_registry={}, stop_tools=set())
+
+        with pytest.raises(ValueError, match="not found"):
+            asyncio.run(executor.aexecute_tool(agent_state, "missing", {}, "call_4"))
+
+
 class TestToolExecutorStopTools:
     """Test stop tool handling."""
 
@@ -2,12 +2,16 @@
 
 from __future__ import annotations
 
+import json
+import threading
+import time
 import uuid
 from typing import Any
+from unittest.mock import patch
 
 import pytest
 
-from nexau.archs.tracer.adapters import InMemoryTracer, LangfuseTracer
+from nexau.archs.tracer.adapters import InMemoryTracer, LangfuseTracer, LocalTracer
 from nexau.archs.tracer.composite import CompositeTracer
 from nexau.archs.tracer.context import (
     TraceContext,
@@ -16,6 +20,9 @@ from nexau.archs.tracer.context import (
     set_current_span,
 )
 from nexau.archs.tracer.core import BaseTracer, Span, SpanType
+from nexau.archs.tracer.export import BatchExporter
+from nexau.archs.tracer.metrics import LatencyHistogram
+from nexau.archs.tracer.payload import SpanPayloadPolicy, TraceHistory, content_hash
 
 
 class RecordingTracer(BaseTracer):
@@ -295,7 +302,7 @@ def test_in_memory_tracer_works_with_composite():
 
 
 def test_langfuse_tracer_creates_trace_and_generation():
-    tracer = LangfuseTracer(debug=True)
+    tracer = LangfuseTracer(debug=True, async_export=False)
     root_inputs = {"payload": (1, "two")}
     root_span = tracer.start_span("root", SpanType.AGENT, inputs=root_inputs)
 
@@ -309,7 +316,7 @@ def test_langfuse_tracer_creates_trace_and_generation():
 
 
 def test_langfuse_tracer_end_span_updates_and_flushes():
-    tracer = LangfuseTracer(debug=True)
+    tracer = LangfuseTracer(debug=True, async_export=False)
     span = tracer.start_span("tool", SpanType.TOOL)
     outputs = {"model": "gpt", "usage": {"input_tokens": 1}, "result": "ok"}
 
@@ -340,3 +347,250 @@ def test_langfuse_serialization_handles_custom_objects():
     serialized = LangfuseTracer._serialize_for_langfuse(data)
     assert serialized["values"] == [1, 2]
     assert serialized["obj"].replace('"', "") == "custom-object"
+
+
+def test_langfuse_tracer_exports_in_background():
+    tracer = LangfuseTracer(flush_interval=60.0)
+    messages = [{"role": "user", "content": "hi"}]
+    root = tracer.start_span("root", SpanType.AGENT, inputs={"messages": messages})
+    child = tracer.start_span("tool", SpanType.TOOL, parent_span=root)
+    messages.append({"role": "assistant", "content": "later"})
+
+    tracer.end_span(child, outputs={"result": "x" * 50}, error=RuntimeError("boom"))
+    tracer.end_span(root, outputs="done")
+    tracer.flush()
+
+    root_obj: DummyLangfuseObject = root.vendor_obj  # type: ignore[assignment]
+    child_obj: DummyLangfuseObject = child.vendor_obj  # type: ignore[assignment]
+    client = DummyLangfuseClient.instances[-1]
+    assert "input" not in client.start_span_calls[0]
+    assert root_obj.update_calls[0] == {"input": {"messages": [{"role": "user", "content": "hi"}]}}
+    assert child_obj.ended and root_obj.ended
+    assert next(call for call in child_obj.update_calls if "level" in call)["status_message"] == "boom"
+    assert client.flush_count >= 1
+    tracer.shutdown()
+    assert client.shutdown_count == 1
+
+
+def test_langfuse_tracer_caps_payloads_and_samples_traces():
+    tracer = LangfuseTracer(max_field_chars=10, sample_rate=0.0)
+    assert tracer.exporter is not None
+    submitted = tracer.exporter.submitted
+    root = tracer.start_span("root", SpanType.AGENT)
+    child = tracer.start_span("llm", SpanType.LLM, parent_span=root)
+    tracer.end_span(child, outputs={"text": "ignored"})
+    tracer.flush()
+
+    assert DummyLangfuseClient.instances[-1].start_span_calls == []
+    assert tracer.exporter.submitted == submitted
+    assert LangfuseTracer._serialize_for_langfuse({"text": "y" * 25}, 10)["text"] == "yyyyyyyyyy... [truncated 15 chars]"
+    tracer.shutdown()
+
+
+def test_langfuse_tracer_exports_payloads_whole_by_default():
+    tracer = LangfuseTracer()
+    span = tracer.start_span("tool", SpanType.TOOL, inputs={"text": "x" * 50_000})
+    tracer.end_span(span, outputs={"result": "y" * 50_000})
+    tracer.flush()
+
+    vendor_obj: DummyLangfuseObject = span.vendor_obj  # type: ignore[assignment]
+    assert vendor_obj.update_calls[0] == {"input": {"text": "x" * 50_000}}
+    assert next(call for call in vendor_obj.update_calls if "output" in call)["output"]["result"] == "y" * 50_000
+    tracer.shutdown()
+
+
+def test_tracers_share_one_exporter_thread():
+    first = LangfuseTracer(flush_interval=30.0)
+    second = LangfuseTracer(flush_interval=30.0)
+    other = LangfuseTracer(flush_interval=31.0)
+    exporter = first.exporter
+    assert exporter is not None and second.exporter is exporter and other.exporter is not exporter
+
+    span = second.start_span("root", SpanType.AGENT)
+    second.end_span(span, outputs="done")
+    first.flush()
+    assert DummyLangfuseClient.instances[-3].flush_count >= 1
+    assert DummyLangfuseClient.instances[-2].flush_count >= 1
+
+    first.shutdown()
+    assert exporter._worker.is_alive()
+    second.shutdown()
+    other.shutdown()
+    assert not exporter._worker.is_alive()
+    third = LangfuseTracer(flush_interval=30.0)
+    assert third.exporter is not exporter
+    third.shutdown()
+
+
+def test_batch_exporter_batches_and_applies_overflow_policy():
+    release = threading.Event()
+    flushes: list[int] = []
+    ran: list[int] = []
+    exporter = BatchExporter(lambda: flushes.append(len(ran)), max_queue_size=2, batch_size=2, flush_interval=60.0)
+
+    exporter.submit(release.wait)
+    time.sleep(0.05)
+    assert exporter.submit(ran.append, 1)
+    assert exporter.submit(ran.append, 2)
+    assert not exporter.submit(ran.append, 3)
+    release.set()
+    exporter.shutdown()
+
+    assert ran == [1, 2]
+    assert exporter.dropped == 1
+    assert flushes and flushes[-1] == 2
+    assert not exporter.submit(ran.append, 4)
+
+
+def _llm_inputs(tracer: InMemoryTracer) -> list[dict[str, Any]]:
+    return [span.inputs for span in tracer.spans.values() if span.type == SpanType.LLM]
+
+
+def test_trace_context_records_full_history_by_default():
+    tracer = InMemoryTracer()
+    messages = [{"role": "user", "content": "hi"}]
+
+    with TraceContext(tracer, "agent", SpanType.AGENT):
+        for _ in range(2):
+            with TraceContext(tracer, "llm", SpanType.LLM, inputs={"messages": messages}):
+                pass
+        with TraceContext(tracer, "tool", SpanType.TOOL, inputs={"content": "x" * 30_000}) as tool_span:
+            pass
+
+    assert [inputs["messages"] for inputs in _llm_inputs(tracer)] == [messages, messages]
+    assert tool_span.inputs["content"] == "x" * 30_000
+
+
+def test_trace_context_dedupes_history_within_trace():
+    tracer = InMemoryTracer()
+    tracer.payload_policy = SpanPayloadPolicy(dedupe_history=True)
+    system = [{"type": "text", "text": "You are helpful."}]
+    first = [{"role": "user", "content": "hi"}]
+    second = first + [{"role": "assistant", "content": "hello"}, {"role": "user", "content": "more"}]
+
+    with TraceContext(tracer, "agent", SpanType.AGENT):
+        for messages in (first, second):
+            with TraceContext(tracer, "llm", SpanType.LLM, inputs={"system": system, "messages": messages}):
+                pass
+    with TraceContext(tracer, "agent", SpanType.AGENT):
+        with TraceContext(tracer, "llm", SpanType.LLM, inputs={"messages": first}):
+            pass
+
+    initial, follow_up, next_trace = _llm_inputs(tracer)
+    assert initial["system"] == system
+    assert initial["messages"][0]["content"] == "hi"
+    assert follow_up["system"] == {"$ref": content_hash(system)}
+    assert follow_up["messages"][0] == {
+        "$history": {"count": 1, "first": initial["messages"][0]["$hash"], "last": initial["messages"][0]["$hash"]}
+    }
+    assert [message["content"] for message in follow_up["messages"][1:]] == ["hello", "more"]
+    assert next_trace["messages"][0]["content"] == "hi"
+    assert "$hash" not in second[0]
+
+
+def test_trace_history_ignores_cache_control_and_hashes_each_message_once():
+    history = TraceHistory()
+    system = [{"type": "text", "text": "You are helpful."}]
+    turns = [{"role": "user", "content": [{"type": "text", "text": f"turn {i}"}]} for i in range(3)]
+    marked = [*turns[:-1], {"role": "user", "content": [{"type": "text", "text": "turn 2", "cache_control": {"type": "ephemeral"}}]}]
+
+    with patch("nexau.archs.tracer.payload.content_hash", side_effect=content_hash) as hashed:
+        first = history.delta(marked)
+        # The next request moves the marker and rebuilds every message dict
+        again = history.delta([{**turn, "content": [dict(part) for part in turn["content"]]} for turn in turns])
+
+    assert first[2]["$hash"] == content_hash(turns[2])
+    assert again == [{"$history": {"count": 3, "first": content_hash(turns[0]), "last": content_hash(turns[2])}}]
+    assert hashed.call_count == 3
+    assert history.digest([{**system[0], "cache_control": {"type": "ephemeral"}}]) == content_hash(system)
+
+
+def test_trace_context_truncates_tool_payloads_and_supports_metadata_only():
+    tracer = InMemoryTracer()
+    tracer.payload_policy = SpanPayloadPolicy(max_tool_payload_chars=5)
+
+    with TraceContext(tracer, "agent", SpanType.AGENT):
+        tool_ctx = TraceContext(tracer, "tool", SpanType.TOOL, inputs={"content": "abcdefgh"})
+        tool_ctx.set_outputs({"result": "0123456789"})
+        with tool_ctx as tool_span:
+            pass
+
+    assert tool_span.inputs == {"content": "abcde... [truncated 3 chars]"}
+    assert tool_span.outputs["result"] == "01234... [truncated 5 chars]"
+
+    tracer.payload_policy = SpanPayloadPolicy(metadata_only=True)
+    with TraceContext(tracer, "agent", SpanType.AGENT):
+        llm_ctx = TraceContext(tracer, "llm", SpanType.LLM, inputs={"model": "m", "messages": [{"role": "user"}]})
+        llm_ctx.set_outputs({"model": "m", "usage": {"total_tokens": 3}, "choices": ["..."]})
+        with llm_ctx as llm_span:
+            pass
+
+    assert llm_span.inputs == {"model": "m"}
+    assert llm_span.outputs == {"model": "m", "usage": {"total_tokens": 3}}
+
+
+def test_local_tracer_writes_ndjson_and_aggregates_metrics(tmp_path):
+    tracer = LocalTracer(tmp_path / "spans.jsonl", metrics_path=tmp_path / "metrics.json", buffer_size=2)
+
+    with TraceContext(tracer, "agent", SpanType.AGENT):
+        for _ in range(2):
+            llm_ctx = TraceContext(tracer, "llm", SpanType.LLM, inputs={"model": "m1", "messages": []})
+            llm_ctx.set_outputs({"usage": {"prompt_tokens": 10, "input_tokens": 10, "completion_tokens": 4}})
+            with llm_ctx:
+                pass
+        with pytest.raises(RuntimeError):
+            with TraceContext(tracer, "Tool: bash", SpanType.TOOL, inputs={"parameters": {}}):
+                raise RuntimeError("boom")
+    tracer.flush()
+
+    records = [json.loads(line) for line in (tmp_path / "spans.jsonl").read_text().splitlines()]
+    assert [record["name"] for record in records] == ["llm", "llm", "Tool: bash", "agent"]
+    assert len({record["trace_id"] for record in records}) == 1
+    assert records[0]["parent_span_id"] == records[-1]["span_id"]
+    assert records[2]["status"] == "error" and records[2]["error"] == "boom"
+    assert "inputs" not in records[0]
+    assert [record["name"] for record in tracer.recent_spans()] == ["Tool: bash", "agent"]
+
+    metrics = json.loads((tmp_path / "metrics.json").read_text())
+    assert metrics["latency_by_type"]["LLM"]["count"] == 2
+    assert metrics["latency_by_name"]["LLM"]["m1"]["count"] == 2
+    assert metrics["latency_by_name"]["TOOL"]["Tool: bash"]["count"] == 1
+    assert metrics["errors_by_type"] == {"TOOL": 1}
+    assert metrics["tokens_by_model"]["m1"] == {"calls": 2, "input_tokens": 20, "output_tokens": 8}
+    tracer.shutdown()
+
+
+def test_local_tracer_writes_rotated_otlp(tmp_path):
+    path = tmp_path / "otlp.jsonl"
+    tracer = LocalTracer(path, format="otlp", max_bytes=1, backup_count=1, include_payloads=True, max_field_chars=3)
+
+    for name in ("first", "second", "third"):
+        with TraceContext(tracer, name, SpanType.AGENT, inputs={"query": "abcdef"}):
+            pass
+        tracer.flush()
+    tracer.shutdown()
+
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["otlp.jsonl", "otlp.jsonl.1"]
+    request = json.loads(path.read_text())
+    span = request["resourceSpans"][0]["scopeSpans"][0]["spans"][0]
+    assert span["name"] == "third"
+    assert len(span["traceId"]) == 32 and len(span["spanId"]) == 16
+    assert int(span["endTimeUnixNano"]) >= int(span["startTimeUnixNano"])
+    attributes = {item["key"]: item["value"] for item in span["attributes"]}
+    assert attributes["nexau.span.type"] == {"stringValue": "AGENT"}
+    assert json.loads(attributes["nexau.inputs"]["stringValue"]) == {"query": "abc... [truncated 3 chars]"}
+    with pytest.raises(ValueError):
+        LocalTracer(format="xml")  # type: ignore[arg-type]
+
+
+def test_latency_histogram_estimates_percentiles():
+    histogram = LatencyHistogram((10, 100, 1000))
+    for value in (5, 6, 7, 8, 50, 60, 70, 80, 90, 500):
+        histogram.observe(value)
+
+    assert histogram.percentile(0) == 5
+    assert 5 <= histogram.percentile(40) <= 10
+    assert 10 <= histogram.percentile(50) <= 100
+    assert histogram.percentile(100) == 500
+    assert histogram.to_dict()["buckets"] == {"10": 4, "100": 5, "1000": 1}
+    assert LatencyHistogram().percentile(50) is None